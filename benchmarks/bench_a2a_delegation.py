@@ -0,0 +1,131 @@
+"""
+Per-delegation latency of A2A calls between agents of the same process.
+
+Mounts an echo agent on the FastAPI app exactly like the server does (A2AUtils), serves
+it with uvicorn on a local port and sends the same messages through:
+
+- http: JSON-RPC over the loopback interface, as RemoteA2aAgent did before
+- in-process: LocalAgentClientFactory routing the call straight to the request handler
+
+The agent does no LLM work, so the numbers are the transport overhead alone.
+
+Usage:
+    python benchmarks/bench_a2a_delegation.py [--requests 500] [--port 8765]
+"""
+
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+from uuid import uuid4
+
+import httpx
+import uvicorn
+from a2a.client import A2ACardResolver
+from a2a.server.agent_execution import AgentExecutor
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import InMemoryTaskStore
+from a2a.types import AgentCapabilities, AgentCard, Message, Part, Role, TextPart
+from a2a.utils import new_agent_text_message
+from fastapi import FastAPI
+
+from buildgentic.a2a_local import LocalAgentClientFactory, LocalAgentRegistry
+from buildgentic.a2a_utils import A2AUtils
+
+
+class EchoExecutor(AgentExecutor):
+    async def execute(self, context, event_queue):
+        await event_queue.enqueue_event(new_agent_text_message(f"echo: {context.get_user_input()}"))
+
+    async def cancel(self, context, event_queue):
+        raise NotImplementedError
+
+
+def make_message() -> Message:
+    return Message(role=Role.user, parts=[Part(root=TextPart(text="Review ticket 1234"))], message_id=str(uuid4()))
+
+
+async def delegate(client) -> None:
+    async for _ in client.send_message(make_message()):
+        pass
+
+
+async def measure(client, requests: int) -> list[float]:
+    # Warm up connections, handler and task store
+    for _ in range(10):
+        await delegate(client)
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        await delegate(client)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def measure_card_fetch(base_url: str, requests: int) -> list[float]:
+    samples = []
+    async with httpx.AsyncClient() as http:
+        resolver = A2ACardResolver(http, base_url, "/qa/.well-known/agent-card.json")
+        for _ in range(requests):
+            start = time.perf_counter()
+            await resolver.get_agent_card()
+            samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(label: str, samples: list[float]) -> None:
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<22} mean {statistics.mean(samples):7.3f} ms   p50 {statistics.median(samples):7.3f} ms   p95 {p95:7.3f} ms")
+
+
+async def main(requests: int, port: int) -> None:
+    base_url = f"http://127.0.0.1:{port}"
+    card = AgentCard(
+        name="QA Agent",
+        description="Echo agent",
+        url=f"{base_url}/qa/",
+        version="1.0",
+        capabilities=AgentCapabilities(streaming=True),
+        default_input_modes=["text/plain"],
+        default_output_modes=["text/plain"],
+        skills=[],
+    )
+    handler = DefaultRequestHandler(agent_executor=EchoExecutor(), task_store=InMemoryTaskStore())
+    app = FastAPI()
+    A2AUtils._mount("qa", card, handler, app)
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    registry = LocalAgentRegistry()
+    registry.register("qa", card, handler)
+
+    http_client = LocalAgentClientFactory(registry=registry, in_process=False).create(card)
+    local_client = LocalAgentClientFactory(registry=registry).create(card)
+
+    http_samples = await measure(http_client, requests)
+    local_samples = await measure(local_client, requests)
+    card_samples = await measure_card_fetch(base_url, requests)
+
+    print(f"{requests} delegations to an echo agent")
+    report("http (JSON-RPC)", http_samples)
+    report("in-process", local_samples)
+    report("agent card fetch", card_samples)
+    saved = statistics.mean(http_samples) - statistics.mean(local_samples)
+    print(f"saved per delegation   {saved:7.3f} ms ({statistics.mean(http_samples) / statistics.mean(local_samples):.1f}x faster)")
+
+    server.should_exit = True
+    thread.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.port))
@@ -0,0 +1,286 @@
+import copy
+import dataclasses
+import logging
+import os
+import threading
+from collections.abc import AsyncGenerator, Callable
+from typing import Dict, Optional
+
+import httpx
+from a2a.client.base_client import BaseClient
+from a2a.client.client import Client, ClientConfig, Consumer
+from a2a.client.client_factory import ClientFactory
+from a2a.client.errors import A2AClientJSONRPCError
+from a2a.client.middleware import ClientCallContext, ClientCallInterceptor
+from a2a.client.transports.base import ClientTransport
+from a2a.server.context import ServerCallContext
+from a2a.server.request_handlers.request_handler import RequestHandler
+from a2a.types import (
+    AgentCard,
+    GetTaskPushNotificationConfigParams,
+    InternalError,
+    JSONRPCErrorResponse,
+    Message,
+    MessageSendParams,
+    Task,
+    TaskArtifactUpdateEvent,
+    TaskIdParams,
+    TaskNotFoundError,
+    TaskPushNotificationConfig,
+    TaskQueryParams,
+    TaskStatusUpdateEvent,
+    TransportProtocol,
+)
+from a2a.utils.errors import ServerError
+
+from buildgentic.a2a_remote import AgentDirectory, BalancedTransport, agent_directory
+from buildgentic.limits import PRIORITY_HEADER
+
+
+logger = logging.getLogger(__name__)
+
+# Send calls between agents mounted in this process straight to their request handler
+# instead of going through JSON-RPC over the loopback interface
+A2A_IN_PROCESS = os.getenv("A2A_IN_PROCESS", "true").lower() in ("1", "true", "yes")
+
+# Timeout of the HTTP client used for agents that are not in this process
+A2A_CLIENT_TIMEOUT = float(os.getenv("A2A_CLIENT_TIMEOUT", "600"))
+
+
+class LocalAgentRegistry:
+    """
+    Agents mounted on the A2A server of this process, by name and by card URL.
+
+    A2AUtils.build_all registers every agent it mounts, so clients created by
+    LocalAgentClientFactory can find the request handler behind a card.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cards: Dict[str, AgentCard] = {}
+        self._handlers: Dict[str, RequestHandler] = {}
+
+    def register(self, name: str, agent_card: AgentCard, request_handler: RequestHandler) -> None:
+        with self._lock:
+            self._cards[name] = agent_card
+            self._handlers[self._url_key(agent_card.url)] = request_handler
+        logger.info("Registered local A2A agent '%s' at %s", name, agent_card.url)
+
+    def unregister(self, name: str) -> None:
+        with self._lock:
+            agent_card = self._cards.pop(name, None)
+            if agent_card is not None:
+                self._handlers.pop(self._url_key(agent_card.url), None)
+
+    def get_card(self, name: str) -> Optional[AgentCard]:
+        """Card of a local agent, or None when the agent is not in this process."""
+        with self._lock:
+            return self._cards.get(name)
+
+    def get_handler(self, agent_card: AgentCard) -> Optional[RequestHandler]:
+        """Request handler serving agent_card, or None when the agent is remote."""
+        with self._lock:
+            return self._handlers.get(self._url_key(agent_card.url))
+
+    @staticmethod
+    def _url_key(url: str) -> str:
+        return url.rstrip("/")
+
+
+# Registry shared by the A2A server and the agents that delegate to other agents
+local_agents = LocalAgentRegistry()
+
+
+class InProcessTransport(ClientTransport):
+    """
+    A2A client transport that calls a RequestHandler of the same process directly.
+
+    There is no JSON-RPC serialization and no HTTP hop. Requests and results are deep
+    copied so the caller and the task store never share mutable objects, and server
+    errors are raised as A2AClientJSONRPCError, like the JSON-RPC transport does.
+    Client interceptors are not applied: they only add HTTP headers.
+    """
+
+    def __init__(self, request_handler: RequestHandler, agent_card: AgentCard, extensions: list[str] | None = None):
+        self.request_handler = request_handler
+        self.agent_card = agent_card
+        self.extensions = extensions
+
+    def _server_context(self, extensions: list[str] | None) -> ServerCallContext:
+        requested = extensions if extensions is not None else self.extensions
+        return ServerCallContext(state={"transport": "in-process"}, requested_extensions=set(requested or []))
+
+    @staticmethod
+    def _client_error(error: ServerError) -> A2AClientJSONRPCError:
+        return A2AClientJSONRPCError(JSONRPCErrorResponse(id=None, error=error.error or InternalError()))
+
+    async def send_message(
+        self,
+        request: MessageSendParams,
+        *,
+        context: ClientCallContext | None = None,
+        extensions: list[str] | None = None,
+    ) -> Task | Message:
+        try:
+            result = await self.request_handler.on_message_send(request.model_copy(deep=True), self._server_context(extensions))
+        except ServerError as e:
+            raise self._client_error(e) from e
+        return result.model_copy(deep=True)
+
+    async def send_message_streaming(
+        self,
+        request: MessageSendParams,
+        *,
+        context: ClientCallContext | None = None,
+        extensions: list[str] | None = None,
+    ) -> AsyncGenerator[Message | Task | TaskStatusUpdateEvent | TaskArtifactUpdateEvent]:
+        try:
+            async for event in self.request_handler.on_message_send_stream(request.model_copy(deep=True), self._server_context(extensions)):
+                yield event.model_copy(deep=True)
+        except ServerError as e:
+            raise self._client_error(e) from e
+
+    async def get_task(
+        self,
+        request: TaskQueryParams,
+        *,
+        context: ClientCallContext | None = None,
+        extensions: list[str] | None = None,
+    ) -> Task:
+        try:
+            task = await self.request_handler.on_get_task(request, self._server_context(extensions))
+        except ServerError as e:
+            raise self._client_error(e) from e
+        if task is None:
+            raise self._client_error(ServerError(error=TaskNotFoundError()))
+        return task.model_copy(deep=True)
+
+    async def cancel_task(
+        self,
+        request: TaskIdParams,
+        *,
+        context: ClientCallContext | None = None,
+        extensions: list[str] | None = None,
+    ) -> Task:
+        try:
+            task = await self.request_handler.on_cancel_task(request, self._server_context(extensions))
+        except ServerError as e:
+            raise self._client_error(e) from e
+        if task is None:
+            raise self._client_error(ServerError(error=TaskNotFoundError()))
+        return task.model_copy(deep=True)
+
+    async def set_task_callback(
+        self,
+        request: TaskPushNotificationConfig,
+        *,
+        context: ClientCallContext | None = None,
+        extensions: list[str] | None = None,
+    ) -> TaskPushNotificationConfig:
+        try:
+            return await self.request_handler.on_set_task_push_notification_config(request, self._server_context(extensions))
+        except ServerError as e:
+            raise self._client_error(e) from e
+
+    async def get_task_callback(
+        self,
+        request: GetTaskPushNotificationConfigParams,
+        *,
+        context: ClientCallContext | None = None,
+        extensions: list[str] | None = None,
+    ) -> TaskPushNotificationConfig:
+        try:
+            return await self.request_handler.on_get_task_push_notification_config(request, self._server_context(extensions))
+        except ServerError as e:
+            raise self._client_error(e) from e
+
+    async def resubscribe(
+        self,
+        request: TaskIdParams,
+        *,
+        context: ClientCallContext | None = None,
+        extensions: list[str] | None = None,
+    ) -> AsyncGenerator[Task | Message | TaskStatusUpdateEvent | TaskArtifactUpdateEvent]:
+        try:
+            async for event in self.request_handler.on_resubscribe_to_task(request, self._server_context(extensions)):
+                yield event.model_copy(deep=True)
+        except ServerError as e:
+            raise self._client_error(e) from e
+
+    async def get_card(
+        self,
+        *,
+        context: ClientCallContext | None = None,
+        extensions: list[str] | None = None,
+        signature_verifier: Callable[[AgentCard], None] | None = None,
+    ) -> AgentCard:
+        if signature_verifier is not None:
+            signature_verifier(self.agent_card)
+        return self.agent_card
+
+    async def close(self) -> None:
+        # Nothing to release: the request handler belongs to the server
+        return None
+
+
+class LocalAgentClientFactory(ClientFactory):
+    """
+    ClientFactory that talks to agents of this process in-process and to the rest over HTTP.
+
+    create() returns a client on an InProcessTransport when the card URL belongs to an
+    agent registered in local_agents (and A2A_IN_PROCESS is enabled). When it belongs to
+    an agent with several replicas in the agent directory, the client spreads its calls
+    over them (see BalancedTransport). Otherwise it falls back to the regular JSON-RPC /
+    HTTP+JSON transports.
+    """
+
+    def __init__(
+        self,
+        config: ClientConfig | None = None,
+        consumers: list[Consumer] | None = None,
+        registry: LocalAgentRegistry | None = None,
+        in_process: bool = A2A_IN_PROCESS,
+        directory: AgentDirectory | None = None,
+    ):
+        if config is None:
+            # An httpx client is always set: RemoteA2aAgent rebuilds factories without one
+            # as plain ClientFactory instances, which would drop the in-process routing
+            config = ClientConfig(
+                # Delegations go first in the queue of the agents (see AgentLimiter)
+                httpx_client=httpx.AsyncClient(timeout=httpx.Timeout(timeout=A2A_CLIENT_TIMEOUT), headers={PRIORITY_HEADER: "high"}),
+                streaming=False,
+                polling=False,
+                supported_transports=[TransportProtocol.jsonrpc, TransportProtocol.http_json],
+            )
+        super().__init__(config, consumers)
+        self._local_agents = registry if registry is not None else local_agents
+        self._in_process = in_process
+        self._directory = directory if directory is not None else agent_directory
+
+    def create(
+        self,
+        card: AgentCard,
+        consumers: list[Consumer] | None = None,
+        interceptors: list[ClientCallInterceptor] | None = None,
+        extensions: list[str] | None = None,
+    ) -> Client:
+        # The factory is shared by every client: the extensions of this client go in its own config
+        config = dataclasses.replace(self._config, extensions=self._config.extensions + (extensions or []))
+        request_handler = self._local_agents.get_handler(card) if self._in_process else None
+        if request_handler is not None:
+            logger.debug("Using in-process transport for agent '%s'", card.name)
+            transport = InProcessTransport(request_handler, card, config.extensions or None)
+            return BaseClient(card, config, transport, self._consumers + (consumers or []), interceptors or [])
+
+        replicas = self._directory.replicas_of(card.url)
+        protocol = card.preferred_transport or TransportProtocol.jsonrpc
+        if replicas is None or len(replicas.urls) < 2 or protocol not in self._registry:
+            # ClientFactory.create would add the extensions to the shared config
+            factory = copy.copy(self)
+            factory._config = config
+            return ClientFactory.create(factory, card, consumers, interceptors)
+
+        logger.debug("Balancing the calls of agent '%s' over %d replicas", card.name, len(replicas.urls))
+        transports = [self._registry[protocol](card, url, config, interceptors or []) for url in replicas.urls]
+        transport = BalancedTransport(replicas, transports)
+        return BaseClient(card, config, transport, self._consumers + (consumers or []), interceptors or [])
@@ -0,0 +1,312 @@
+import logging
+import os
+import threading
+import time
+from collections.abc import AsyncGenerator, Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from typing import Dict, List, Optional, TypeVar
+
+from a2a.client.errors import A2AClientHTTPError
+from a2a.client.middleware import ClientCallContext
+from a2a.client.transports.base import ClientTransport
+from a2a.types import (
+    AgentCard,
+    GetTaskPushNotificationConfigParams,
+    Message,
+    MessageSendParams,
+    Task,
+    TaskArtifactUpdateEvent,
+    TaskIdParams,
+    TaskPushNotificationConfig,
+    TaskQueryParams,
+    TaskStatusUpdateEvent,
+)
+from a2a.utils.constants import AGENT_CARD_WELL_KNOWN_PATH
+
+from buildgentic.storage.lru import BoundedCache
+
+
+logger = logging.getLogger(__name__)
+
+
+# Remote agents configuration - Global Variables from .env file
+# Replicas of the agents served by other processes: "developer=http://dev-1:8008/a2a/developer/,http://dev-2:8008/a2a/developer/;qa=..."
+# (the URLs the agents advertise in their card, i.e. built from their AGENT_BASE_URL)
+A2A_AGENT_URLS = os.getenv("A2A_AGENT_URLS", "")
+# Base URL of the agents missing from A2A_AGENT_URLS (the agent name is appended)
+A2A_AGENTS_BASE_URL = os.getenv("A2A_AGENTS_BASE_URL", "http://localhost:8008/a2a")
+# Seconds a replica that refused a call (unreachable or overloaded) is tried last
+A2A_REPLICA_COOLDOWN = float(os.getenv("A2A_REPLICA_COOLDOWN", "10"))
+# Tasks whose replica is remembered, so the follow-up calls of a task reach the replica running it
+A2A_TASK_AFFINITY_SIZE = int(os.getenv("A2A_TASK_AFFINITY_SIZE", "10000"))
+
+# HTTP statuses meaning the replica did not take the call: another one can be tried
+# (the JSON-RPC transport reports connection errors as 503)
+_RETRYABLE_STATUSES = {429, 503}
+
+T = TypeVar("T")
+
+
+class ReplicaSet:
+    """
+    Replicas of one agent, with their load and health, shared by every client of the agent.
+
+    New tasks go to the healthy replica with the fewest calls in progress (round robin
+    between equals). The replica of every task is remembered, so later calls about it
+    (follow-up messages, get, cancel, resubscribe) reach the replica that runs it.
+    """
+
+    def __init__(self, name: str, urls: List[str], cooldown: float = A2A_REPLICA_COOLDOWN, affinity_size: int = A2A_TASK_AFFINITY_SIZE):
+        """
+        Args:
+            name: Agent name
+            urls: Agent URL of every replica
+            cooldown: Seconds a replica that refused a call is tried last
+            affinity_size: Tasks whose replica is remembered
+        """
+        if not urls:
+            raise ValueError(f"Agent '{name}' has no replica")
+        self.name = name
+        self.urls = urls
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._in_flight = [0] * len(urls)
+        self._down_until = [0.0] * len(urls)
+        self._next = 0
+        self._tasks: BoundedCache[int] = BoundedCache(affinity_size)
+
+    @property
+    def card_url(self) -> str:
+        return self.urls[0].rstrip("/") + AGENT_CARD_WELL_KNOWN_PATH
+
+    def order(self, task_id: Optional[str] = None) -> List[int]:
+        """Replicas to try for a call, best first (only the replica of the task when it is known)."""
+        if task_id is not None:
+            index = self._tasks.get(task_id)
+            if index is not None:
+                return [index]
+        with self._lock:
+            now = time.monotonic()
+            start = self._next
+            self._next = (self._next + 1) % len(self.urls)
+            rotated = [(start + offset) % len(self.urls) for offset in range(len(self.urls))]
+            # Stable sort: replicas in cooldown last, then by load, round robin between equals
+            return sorted(rotated, key=lambda index: (self._down_until[index] > now, self._in_flight[index]))
+
+    def bind(self, task_id: Optional[str], index: int) -> None:
+        if task_id:
+            self._tasks.put(task_id, index)
+
+    def mark_down(self, index: int) -> None:
+        with self._lock:
+            self._down_until[index] = time.monotonic() + self.cooldown
+        logger.warning("Replica %s of agent '%s' refused a call, trying it last for %ss", self.urls[index], self.name, self.cooldown)
+
+    @contextmanager
+    def track(self, index: int) -> Iterator[None]:
+        """Count a call in progress on a replica."""
+        with self._lock:
+            self._in_flight[index] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight[index] -= 1
+
+    def load(self) -> Dict[str, int]:
+        """Calls in progress by replica URL."""
+        with self._lock:
+            return dict(zip(self.urls, self._in_flight))
+
+
+class AgentDirectory:
+    """
+    Where the agents that are not served by this process are.
+
+    Every agent has one or more replicas; agents that are not configured are looked
+    for at base_url/<name>/.
+    """
+
+    def __init__(self, agent_urls: str = A2A_AGENT_URLS, base_url: str = A2A_AGENTS_BASE_URL):
+        """
+        Args:
+            agent_urls: Replicas by agent, "name=url1,url2;name2=url3"
+            base_url: Base URL of the agents missing from agent_urls
+        """
+        self.base_url = base_url.rstrip("/")
+        self._lock = threading.Lock()
+        self._replicas: Dict[str, ReplicaSet] = {}
+        self._by_url: Dict[str, ReplicaSet] = {}
+        for entry in filter(None, (entry.strip() for entry in agent_urls.split(";"))):
+            name, separator, urls = entry.partition("=")
+            if not separator:
+                raise ValueError(f"Invalid A2A_AGENT_URLS entry '{entry}', expected name=url1,url2")
+            self._add(ReplicaSet(name.strip(), [url.strip() for url in urls.split(",") if url.strip()]))
+
+    def replicas(self, name: str) -> ReplicaSet:
+        """Replicas of an agent (a single one at base_url/<name>/ if the agent is not configured)."""
+        with self._lock:
+            replicas = self._replicas.get(name)
+        if replicas is None:
+            replicas = self._add(ReplicaSet(name, [f"{self.base_url}/{name}/"]))
+        return replicas
+
+    def replicas_of(self, url: str) -> Optional[ReplicaSet]:
+        """Replicas of the agent one of whose replicas serves url, None if url is unknown."""
+        with self._lock:
+            return self._by_url.get(url.rstrip("/"))
+
+    def card_url(self, name: str) -> str:
+        """URL of the agent card of an agent (from its first replica)."""
+        return self.replicas(name).card_url
+
+    def _add(self, replicas: ReplicaSet) -> ReplicaSet:
+        with self._lock:
+            replicas = self._replicas.setdefault(replicas.name, replicas)
+            for url in replicas.urls:
+                self._by_url[url.rstrip("/")] = replicas
+        return replicas
+
+
+# Directory shared by the agents that delegate to agents of other processes
+agent_directory = AgentDirectory()
+
+
+class BalancedTransport(ClientTransport):
+    """
+    A2A client transport spreading calls over the replicas of an agent.
+
+    Every replica has its own transport. Calls about a known task go to the replica
+    running it; other calls go to the best replica (see ReplicaSet.order), and to the
+    next one when a replica is unreachable or overloaded (HTTP 503 or 429) before it
+    answered anything.
+    """
+
+    def __init__(self, replicas: ReplicaSet, transports: List[ClientTransport]):
+        if len(transports) != len(replicas.urls):
+            raise ValueError("One transport per replica is needed")
+        self.replicas = replicas
+        self.transports = transports
+
+    async def _call(self, task_id: Optional[str], call: Callable[[ClientTransport], Awaitable[T]]) -> T:
+        order = self.replicas.order(task_id)
+        for attempt, index in enumerate(order):
+            try:
+                with self.replicas.track(index):
+                    result = await call(self.transports[index])
+            except A2AClientHTTPError as e:
+                if e.status_code not in _RETRYABLE_STATUSES or attempt == len(order) - 1:
+                    raise
+                self.replicas.mark_down(index)
+                continue
+            self.replicas.bind(_task_id_of(result) or task_id, index)
+            return result
+        raise AssertionError("unreachable")
+
+    async def _stream(self, task_id: Optional[str], call: Callable[[ClientTransport], AsyncGenerator]) -> AsyncGenerator:
+        order = self.replicas.order(task_id)
+        for attempt, index in enumerate(order):
+            started = False
+            try:
+                with self.replicas.track(index):
+                    async for event in call(self.transports[index]):
+                        if not started:
+                            started = True
+                            self.replicas.bind(_task_id_of(event) or task_id, index)
+                        yield event
+                return
+            except A2AClientHTTPError as e:
+                if started or e.status_code not in _RETRYABLE_STATUSES or attempt == len(order) - 1:
+                    raise
+                self.replicas.mark_down(index)
+
+    async def send_message(
+        self,
+        request: MessageSendParams,
+        *,
+        context: ClientCallContext | None = None,
+        extensions: list[str] | None = None,
+    ) -> Task | Message:
+        return await self._call(request.message.task_id, lambda transport: transport.send_message(request, context=context, extensions=extensions))
+
+    async def send_message_streaming(
+        self,
+        request: MessageSendParams,
+        *,
+        context: ClientCallContext | None = None,
+        extensions: list[str] | None = None,
+    ) -> AsyncGenerator[Message | Task | TaskStatusUpdateEvent | TaskArtifactUpdateEvent]:
+        stream = self._stream(
+            request.message.task_id,
+            lambda transport: transport.send_message_streaming(request, context=context, extensions=extensions),
+        )
+        async for event in stream:
+            yield event
+
+    async def get_task(
+        self,
+        request: TaskQueryParams,
+        *,
+        context: ClientCallContext | None = None,
+        extensions: list[str] | None = None,
+    ) -> Task:
+        return await self._call(request.id, lambda transport: transport.get_task(request, context=context, extensions=extensions))
+
+    async def cancel_task(
+        self,
+        request: TaskIdParams,
+        *,
+        context: ClientCallContext | None = None,
+        extensions: list[str] | None = None,
+    ) -> Task:
+        return await self._call(request.id, lambda transport: transport.cancel_task(request, context=context, extensions=extensions))
+
+    async def set_task_callback(
+        self,
+        request: TaskPushNotificationConfig,
+        *,
+        context: ClientCallContext | None = None,
+        extensions: list[str] | None = None,
+    ) -> TaskPushNotificationConfig:
+        return await self._call(request.task_id, lambda transport: transport.set_task_callback(request, context=context, extensions=extensions))
+
+    async def get_task_callback(
+        self,
+        request: GetTaskPushNotificationConfigParams,
+        *,
+        context: ClientCallContext | None = None,
+        extensions: list[str] | None = None,
+    ) -> TaskPushNotificationConfig:
+        return await self._call(request.id, lambda transport: transport.get_task_callback(request, context=context, extensions=extensions))
+
+    async def resubscribe(
+        self,
+        request: TaskIdParams,
+        *,
+        context: ClientCallContext | None = None,
+        extensions: list[str] | None = None,
+    ) -> AsyncGenerator[Task | Message | TaskStatusUpdateEvent | TaskArtifactUpdateEvent]:
+        stream = self._stream(request.id, lambda transport: transport.resubscribe(request, context=context, extensions=extensions))
+        async for event in stream:
+            yield event
+
+    async def get_card(
+        self,
+        *,
+        context: ClientCallContext | None = None,
+        extensions: list[str] | None = None,
+        signature_verifier: Callable[[AgentCard], None] | None = None,
+    ) -> AgentCard:
+        return await self._call(
+            None, lambda transport: transport.get_card(context=context, extensions=extensions, signature_verifier=signature_verifier)
+        )
+
+    async def close(self) -> None:
+        for transport in self.transports:
+            await transport.close()
+
+
+def _task_id_of(result) -> Optional[str]:
+    if isinstance(result, Task):
+        return result.id
+    return getattr(result, "task_id", None)
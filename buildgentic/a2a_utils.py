@@ -1,31 +1,127 @@
-from typing import Callable
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, NamedTuple
  
 from a2a.types import AgentCard
 from fastapi import FastAPI
 from google.adk.agents import LlmAgent
  
 from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore
 from google.adk import Runner
-from google.adk.a2a.executor.a2a_agent_executor import A2aAgentExecutor, A2aAgentExecutorConfig
+from google.adk.a2a.executor.a2a_agent_executor import A2aAgentExecutor
 from google.adk.agents import LlmAgent
-from google.adk.artifacts import InMemoryArtifactService
 from google.adk.memory import InMemoryMemoryService
-from google.adk.sessions import InMemorySessionService
+from google.adk.apps import App
 
 from collections.abc import Callable
 from typing import Any
  
+from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.apps.jsonrpc.jsonrpc_app import CallContextBuilder, JSONRPCApplication
 from a2a.server.context import ServerCallContext
+from a2a.server.events import EventQueue
 from a2a.server.request_handlers.request_handler import RequestHandler
-from a2a.types import AgentCard
+from a2a.types import (
+    AgentCard,
+    DeleteTaskPushNotificationConfigParams,
+    GetTaskPushNotificationConfigParams,
+    ListTaskPushNotificationConfigParams,
+    MessageSendParams,
+    TaskIdParams,
+    TaskPushNotificationConfig,
+    TaskQueryParams,
+    TaskState,
+)
 from a2a.utils.constants import AGENT_CARD_WELL_KNOWN_PATH, DEFAULT_RPC_URL, EXTENDED_AGENT_CARD_PATH
 from fastapi import APIRouter, FastAPI
 from starlette.applications import Starlette
+from starlette.background import BackgroundTasks
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+from buildgentic.a2a_local import local_agents
+from buildgentic.code_operations.worktree_pool import WorktreePool, get_worktree_pool, use_worktree
+from buildgentic.limits import DEFAULT_PRIORITY, PRIORITY_HEADER, AgentBusyError, AgentLimiter, get_agent_limiter
+from buildgentic.storage.artifact_service import get_shared_artifact_service
+from buildgentic.storage.session_service import get_compaction_config, get_shared_session_service
+from buildgentic.storage.task_store import get_shared_task_store
+from buildgentic.streaming import ChunkCoalescingExecutor, executor_config
+from buildgentic.workers import TaskClaimingExecutor, get_task_router
+
+
+logger = logging.getLogger(__name__)
+
+# How agents are built at startup: "eager" (before serving), "background" (while
+# serving, first request waits if needed) or "lazy" (on the first request to the agent)
+AGENT_STARTUP_MODE = os.getenv("AGENT_STARTUP_MODE", "background")
+STARTUP_MODES = ("eager", "background", "lazy")
+# Agents whose tasks each work in a git worktree of their own (comma separated names, e.g. "developer,qa")
+WORKTREE_AGENTS = {name.strip() for name in os.getenv("WORKTREE_AGENTS", "").split(",") if name.strip()}
+
+# A task in these states is waiting for the client and keeps its worktree
+_PAUSED_STATES = {TaskState.input_required, TaskState.auth_required}
+# JSON-RPC methods starting work on an agent, subject to its concurrency limit
+_LIMITED_METHODS = ("message/send", "message/stream")
+
+
+class _RequestSlot:
+    """
+    Limiter slot taken by one HTTP request, given back exactly once.
+
+    The execution of the task started by the request takes the slot over (see
+    SlotHoldingExecutor) and gives it back when it ends, so tasks outliving the
+    response (non-blocking message/send, streams whose client went away) still count
+    in max_in_flight. A request that started no execution gives it back with its response.
+    """
+
+    def __init__(self, limiter: AgentLimiter):
+        self._limiter = limiter
+        self._released = False
+        self.held = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._limiter.release()
+
+    async def release_unless_held(self) -> None:
+        if not self.held:
+            self.release()
+
+
+# Slot of the request being handled, inherited by the producer task a2a starts for it
+_request_slot: ContextVar[_RequestSlot | None] = ContextVar("request_slot", default=None)
+
+
+class AgentSpec(NamedTuple):
+    """Everything needed to mount one agent on the A2A server."""
+    name: str
+    get_agent: Callable[[str], LlmAgent]
+    get_agent_card: Callable[[str], AgentCard]
+
+
+class StartupTimings:
+    """Thread-safe record of how long each startup phase took for each agent."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timings: Dict[str, Dict[str, float]] = {}
+
+    def record(self, agent_name: str, phase: str, seconds: float) -> None:
+        with self._lock:
+            self._timings.setdefault(agent_name, {})[phase] = round(seconds, 4)
+        logger.info("Startup: agent '%s' %s took %.3fs", agent_name, phase, seconds)
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {name: dict(phases) for name, phases in self._timings.items()}
 
 
- 
 class A2AUtils:
     """Utility class for A2A (Agent-to-Agent) communication."""
     @staticmethod
@@ -40,24 +136,289 @@ class A2AUtils:
         agent = get_agent(model_name)
         agent_request_handler = A2ARequestHandler.get_request_handler(agent)
         agent_card = get_agent_card(f"{agent_base_url}/{name}/")
-        agent_server = A2AFastApiApp(fastapi_app=app, agent_card=agent_card, http_handler=agent_request_handler)
+        A2AUtils._mount(name, agent_card, agent_request_handler, app, get_agent_limiter(name))
+
+    @staticmethod
+    def build_all(
+            agents: List[AgentSpec],
+            model_name: str,
+            agent_base_url: str,
+            app: FastAPI,
+            startup_mode: str = AGENT_STARTUP_MODE,
+            worktree_agents: Iterable[str] = WORKTREE_AGENTS,
+    ) -> StartupTimings:
+        """
+        Mount several agents, fetching their contexts concurrently.
+
+        Agent cards (which need the agent context from the wiki) are built in parallel, so
+        startup waits for the slowest context instead of the sum of all of them. Agents
+        themselves are built according to startup_mode (see AGENT_STARTUP_MODE). Tasks of
+        the worktree_agents run in a worktree of their own (see WorktreeAgentExecutor); the
+        idle worktrees of the pool are created in the background. Every agent runs a limited
+        number of tasks at once (see AgentLimiter).
+
+        Returns:
+            StartupTimings with the per-agent card and agent build times
+        """
+        if startup_mode not in STARTUP_MODES:
+            raise ValueError(f"Unknown startup mode '{startup_mode}'. Valid values: {STARTUP_MODES}")
+
+        timings = StartupTimings()
+        worktree_agents = set(worktree_agents)
+        if worktree_agents & {spec.name for spec in agents}:
+            get_worktree_pool().warm_in_background()
+
+        def build_card(spec: AgentSpec) -> AgentCard:
+            start = time.perf_counter()
+            card = spec.get_agent_card(f"{agent_base_url}/{spec.name}/")
+            timings.record(spec.name, "card", time.perf_counter() - start)
+            return card
+
+        handlers = [
+            LazyRequestHandler(
+                name=spec.name,
+                factory=lambda spec=spec: A2ARequestHandler.get_request_handler(
+                    spec.get_agent(model_name), worktrees=spec.name in worktree_agents
+                ),
+                timings=timings,
+                limiter=get_agent_limiter(spec.name),
+            )
+            for spec in agents
+        ]
+
+        with ThreadPoolExecutor(max_workers=max(1, len(agents))) as pool:
+            cards = list(pool.map(build_card, agents))
+            # Registered before any agent is built, so agents that delegate to other
+            # agents of this process (the manager) reach them in-process
+            for spec, card, handler in zip(agents, cards, handlers):
+                local_agents.register(spec.name, card, handler)
+            if startup_mode == "eager":
+                list(pool.map(LazyRequestHandler.build, handlers))
+
+        for spec, card, handler in zip(agents, cards, handlers):
+            A2AUtils._mount(spec.name, card, handler, app, handler.limiter)
+            if startup_mode == "background":
+                handler.build_in_background()
+
+        return timings
+
+    @staticmethod
+    def _mount(name: str, agent_card: AgentCard, request_handler: RequestHandler, app: FastAPI, limiter: AgentLimiter | None = None) -> None:
+        agent_server = A2AFastApiApp(fastapi_app=app, agent_card=agent_card, http_handler=request_handler, limiter=limiter)
         agent_server.build(rpc_url=f"/{name}/", agent_card_url=f"/{name}/{{path:path}}")
 
 class A2ARequestHandler:
     @staticmethod
-    def get_request_handler(agent: LlmAgent):
+    def get_request_handler(agent: LlmAgent, worktrees: bool = False):
+        # The App carries the history compaction settings of the agent
+        app = App(name=agent.name, root_agent=agent, events_compaction_config=get_compaction_config())
         runner = Runner(
-            app_name=agent.name,
-            agent=agent,
-            artifact_service=InMemoryArtifactService(),
-            session_service=InMemorySessionService(),
+            app=app,
+            artifact_service=get_shared_artifact_service(),
+            session_service=get_shared_session_service(),
             memory_service=InMemoryMemoryService(),
         )
-        config = A2aAgentExecutorConfig()
-        executor = A2aAgentExecutor(runner=runner, config=config)
-        return DefaultRequestHandler(agent_executor=executor, task_store=InMemoryTaskStore())
+        executor = SlotHoldingExecutor(ChunkCoalescingExecutor(A2aAgentExecutor(runner=runner, config=executor_config())))
+        if worktrees:
+            executor = WorktreeAgentExecutor(executor, get_worktree_pool())
+        task_router = get_task_router()
+        if task_router is not None:
+            executor = TaskClaimingExecutor(executor, task_router)
+        return DefaultRequestHandler(agent_executor=executor, task_store=get_shared_task_store())
+
+
+class SlotHoldingExecutor(AgentExecutor):
+    """Agent executor keeping the limiter slot of the HTTP request that started a task until its execution ends."""
+
+    def __init__(self, executor: AgentExecutor):
+        self._executor = executor
+
+    async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
+        slot = _request_slot.get()
+        if slot is None:
+            await self._executor.execute(context, event_queue)
+            return
+        slot.held = True
+        # Agents called in-process by this task must not take its slot over
+        token = _request_slot.set(None)
+        try:
+            await self._executor.execute(context, event_queue)
+        finally:
+            _request_slot.reset(token)
+            slot.release()
+
+    async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
+        await self._executor.cancel(context, event_queue)
+
+
+class WorktreeAgentExecutor(AgentExecutor):
+    """
+    Agent executor running every A2A task in a git worktree of its own.
+
+    Before the agent runs, the task gets a worktree from the pool (on the branch given
+    in the "branch" metadata of the request, if any) and the code operations called by
+    its tools work in it, so parallel tasks never share a checkout. The worktree stays
+    with the task while it waits for input (see WorktreePool.pause) and returns to the
+    pool once the task is finished, failed or canceled.
+    """
+
+    def __init__(self, executor: AgentExecutor, pool: WorktreePool):
+        self._executor = executor
+        self._pool = pool
+
+    async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
+        worktree = await asyncio.to_thread(self._pool.acquire, context.task_id, context.metadata.get("branch"))
+        recorder = _TaskStateRecorder(event_queue)
+        try:
+            with use_worktree(worktree):
+                await self._executor.execute(context, recorder)
+        finally:
+            if recorder.state in _PAUSED_STATES:
+                self._pool.pause(context.task_id)
+            else:
+                await asyncio.to_thread(self._pool.release, context.task_id)
+
+    async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
+        await self._executor.cancel(context, event_queue)
+        # A running task releases its worktree when execute unwinds; a task waiting for
+        # input has no execute left to do it
+        await asyncio.to_thread(self._pool.release_paused, context.task_id)
+
+
+class _TaskStateRecorder:
+    """Event queue forwarding the events of a task and remembering its last state."""
+
+    def __init__(self, event_queue: EventQueue):
+        self._event_queue = event_queue
+        self.state: TaskState | None = None
+
+    async def enqueue_event(self, event) -> None:
+        status = getattr(event, "status", None)
+        if status is not None:
+            self.state = status.state
+        await self._event_queue.enqueue_event(event)
+
+    def __getattr__(self, name):
+        return getattr(self._event_queue, name)
+
     
+class LazyRequestHandler(RequestHandler):
+    """
+    Request handler that builds the agent behind it on first use.
+
+    Every A2A call is forwarded to the real handler returned by factory. The factory
+    runs once, either when build() is called (eagerly or from a background thread) or
+    when the first request arrives; concurrent callers wait for that single build.
+
+    Messages from agents of this process (in-process transport) take a slot of the
+    limiter, in the high priority lane and never refused; HTTP requests take theirs in
+    A2AFastApiApp.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], RequestHandler], timings: StartupTimings | None = None, limiter: AgentLimiter | None = None):
+        self.name = name
+        self.limiter = limiter
+        self._factory = factory
+        self._timings = timings
+        self._handler: RequestHandler | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_built(self) -> bool:
+        return self._handler is not None
+
+    def build(self) -> RequestHandler:
+        """Build the real handler if needed and return it (thread-safe)."""
+        if self._handler is None:
+            with self._lock:
+                if self._handler is None:
+                    start = time.perf_counter()
+                    handler = self._factory()
+                    if self._timings is not None:
+                        self._timings.record(self.name, "agent", time.perf_counter() - start)
+                    self._handler = handler
+        return self._handler
+
+    def build_in_background(self) -> threading.Thread:
+        """Start building the real handler in a daemon thread."""
+        thread = threading.Thread(target=self.build, name=f"build-{self.name}-agent", daemon=True)
+        thread.start()
+        return thread
+
+    async def _resolve(self) -> RequestHandler:
+        if self._handler is not None:
+            return self._handler
+        return await asyncio.to_thread(self.build)
+
+    async def on_get_task(self, params: TaskQueryParams, context: ServerCallContext | None = None):
+        return await (await self._resolve()).on_get_task(params, context)
+
+    async def on_cancel_task(self, params: TaskIdParams, context: ServerCallContext | None = None):
+        return await (await self._resolve()).on_cancel_task(params, context)
+
+    def _in_process_limiter(self, context: ServerCallContext | None) -> AgentLimiter | None:
+        if self.limiter is not None and context is not None and context.state.get("transport") == "in-process":
+            return self.limiter
+        return None
+
+    async def on_message_send(self, params: MessageSendParams, context: ServerCallContext | None = None):
+        limiter = self._in_process_limiter(context)
+        if limiter is None:
+            return await (await self._resolve()).on_message_send(params, context)
+        async with limiter.slot("high", bounded=False):
+            return await (await self._resolve()).on_message_send(params, context)
+
+    async def on_message_send_stream(self, params: MessageSendParams, context: ServerCallContext | None = None):
+        handler = await self._resolve()
+        limiter = self._in_process_limiter(context)
+        if limiter is None:
+            async for event in handler.on_message_send_stream(params, context):
+                yield event
+            return
+        async with limiter.slot("high", bounded=False):
+            async for event in handler.on_message_send_stream(params, context):
+                yield event
+
+    async def on_set_task_push_notification_config(self, params: TaskPushNotificationConfig, context: ServerCallContext | None = None):
+        return await (await self._resolve()).on_set_task_push_notification_config(params, context)
+
+    async def on_get_task_push_notification_config(
+            self,
+            params: TaskIdParams | GetTaskPushNotificationConfigParams,
+            context: ServerCallContext | None = None,
+    ):
+        return await (await self._resolve()).on_get_task_push_notification_config(params, context)
+
+    async def on_resubscribe_to_task(self, params: TaskIdParams, context: ServerCallContext | None = None):
+        handler = await self._resolve()
+        async for event in handler.on_resubscribe_to_task(params, context):
+            yield event
+
+    async def on_list_task_push_notification_config(
+            self,
+            params: ListTaskPushNotificationConfigParams,
+            context: ServerCallContext | None = None,
+    ):
+        return await (await self._resolve()).on_list_task_push_notification_config(params, context)
+
+    async def on_delete_task_push_notification_config(
+            self,
+            params: DeleteTaskPushNotificationConfigParams,
+            context: ServerCallContext | None = None,
+    ):
+        return await (await self._resolve()).on_delete_task_push_notification_config(params, context)
+
+
 class A2AFastApiApp(JSONRPCApplication):
+    """
+    JSON-RPC application of one agent, mounted on the FastAPI app of the server.
+
+    With a limiter, message/send and message/stream wait for a slot of the agent before
+    they run, in the priority lane given by the X-A2A-Priority header or the "priority"
+    metadata of the request; when the agent queue is full they are refused with HTTP 429
+    and a Retry-After header. A stream keeps its slot until it ends.
+    """
+
     def __init__(
             self,
             fastapi_app: FastAPI,
@@ -67,6 +428,7 @@ class A2AFastApiApp(JSONRPCApplication):
             context_builder: CallContextBuilder | None = None,
             card_modifier: Callable[[AgentCard], AgentCard] | None = None,
             extended_card_modifier: Callable[[AgentCard, ServerCallContext], AgentCard] | None = None,
+            limiter: AgentLimiter | None = None,
     ):
         super().__init__(
             agent_card=agent_card,
@@ -77,6 +439,7 @@ class A2AFastApiApp(JSONRPCApplication):
             extended_card_modifier=extended_card_modifier,
         )
         self.fastapi_app = fastapi_app
+        self.limiter = limiter
  
     def build( self,
         agent_card_url: str = AGENT_CARD_WELL_KNOWN_PATH,
@@ -90,7 +453,7 @@ class A2AFastApiApp(JSONRPCApplication):
         # Add RPC endpoint
         router.add_api_route(
             rpc_url,
-            endpoint=self._handle_requests,
+            endpoint=self._handle_limited_requests if self.limiter is not None else self._handle_requests,
             name=f"{name_prefix}_a2a_handler",
             methods=["POST"],
         )
@@ -104,4 +467,63 @@ class A2AFastApiApp(JSONRPCApplication):
         )
         
         self.fastapi_app.include_router(router)
-        return self.fastapi_app
\ No newline at end of file
+        return self.fastapi_app
+
+    async def _handle_limited_requests(self, request: Request) -> Response:
+        try:
+            # Cached by the request, so _handle_requests does not parse the body again
+            body = await request.json()
+        except ValueError:
+            body = None
+        if not isinstance(body, dict) or body.get("method") not in _LIMITED_METHODS:
+            return await self._handle_requests(request)
+
+        try:
+            await self.limiter.acquire(_priority(request, body))
+        except AgentBusyError as e:
+            return JSONResponse(
+                {"jsonrpc": "2.0", "id": body.get("id"), "error": {"code": -32000, "message": str(e)}},
+                status_code=429,
+                headers={"Retry-After": str(e.retry_after)},
+            )
+        slot = _RequestSlot(self.limiter)
+        token = _request_slot.set(slot)
+        try:
+            response = await self._handle_requests(request)
+        except BaseException:
+            _request_slot.reset(token)
+            slot.release()
+            raise
+        if hasattr(response, "body_iterator"):
+            # The slot stays set: the producer task of message/stream starts when the stream is iterated
+            response.body_iterator = _release_when_done(response.body_iterator, slot)
+            # Also run when the client disconnects before the stream is iterated at all
+            background = BackgroundTasks([response.background] if response.background else [])
+            background.add_task(slot.release_unless_held)
+            response.background = background
+        else:
+            _request_slot.reset(token)
+            await slot.release_unless_held()
+        return response
+
+
+def _priority(request: Request, body: dict) -> str:
+    """Priority lane of a JSON-RPC request: X-A2A-Priority header, else "priority" metadata of the params or message."""
+    priority = request.headers.get(PRIORITY_HEADER)
+    if priority:
+        return priority.lower()
+    params = body.get("params")
+    if isinstance(params, dict):
+        message = params.get("message")
+        for metadata in (params.get("metadata"), message.get("metadata") if isinstance(message, dict) else None):
+            if isinstance(metadata, dict) and metadata.get("priority"):
+                return str(metadata["priority"]).lower()
+    return DEFAULT_PRIORITY
+
+
+async def _release_when_done(iterator, slot: _RequestSlot):
+    try:
+        async for item in iterator:
+            yield item
+    finally:
+        await slot.release_unless_held()
@@ -1,19 +1,19 @@
 from google.adk.agents.llm_agent import Agent
-from google.adk.models.lite_llm import LiteLlm
 
 from a2a.types import AgentCapabilities, AgentCard, AgentSkill, TransportProtocol
 
-from buildgentic.tools.tools_azureDevOps import add_comment_to_ticket, download_attachment, get_tickets_assigned_to_me, get_work_item_details, load_context, update_ticket_description, update_ticket_status
+from buildgentic.code_operations.filesystem_resolver import find_symbol, search_code
+from buildgentic.llm import get_llm
+from buildgentic.tools.tools_azureDevOps import load_context
+from buildgentic.tools.tools_azureDevOps_async import add_comment_to_ticket, download_attachment, get_tickets_assigned_to_me, get_work_item_details, update_ticket_description, update_ticket_status
 
 
-
-manager_context = load_context("Jonathan")
-
 def get_architect_agent(model_name) -> Agent:
     """Creates and returns the architect agent."""
+    manager_context = load_context("Jonathan")
 
     return Agent(
-        model=LiteLlm(model=model_name),
+        model=get_llm(model_name, 'architect'),
         name='architect',
         description=manager_context['description'],
         instruction=manager_context['instruction'],
@@ -23,13 +23,17 @@ def get_architect_agent(model_name) -> Agent:
             update_ticket_description,
             add_comment_to_ticket,
             download_attachment,
-            update_ticket_status
+            update_ticket_status,
+            search_code,
+            find_symbol
         ],
     )
 
 
 def get_architect_agent_card(agent_url: str) -> AgentCard:
     """Creates and returns the architect agent card."""
+    manager_context = load_context("Jonathan")
+
     return AgentCard(
         name="Architect Agent",
         description=manager_context['description'],
@@ -50,4 +54,9 @@ def get_architect_agent_card(agent_url: str) -> AgentCard:
     )
 
 
-root_agent = get_architect_agent("openai/gpt-4o")
+def __getattr__(name):
+    # ADK tooling (adk web / adk run) looks up root_agent; build it on first access
+    # instead of at import time so importing this module does not hit the wiki.
+    if name == "root_agent":
+        return get_architect_agent("openai/gpt-4o")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
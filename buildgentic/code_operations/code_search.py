@@ -0,0 +1,336 @@
+import logging
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from buildgentic.code_operations.file_index import FILE_INDEX_REFRESH_SECONDS, FileIndex, get_file_index
+from buildgentic.code_operations.git_sync import subscribe
+from buildgentic.code_operations.incremental_index import ChangedFile, IncrementalIndex
+
+
+logger = logging.getLogger(__name__)
+
+
+# Code search configuration - Global Variables from .env file
+CODE_SEARCH_INDEX_DIR = os.getenv("CODE_SEARCH_INDEX_DIR", "data/code_search")
+# Larger files (generated code, data dumps) are not indexed nor searched
+CODE_SEARCH_MAX_FILE_BYTES = int(os.getenv("CODE_SEARCH_MAX_FILE_BYTES", str(1024 * 1024)))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    is_text INTEGER NOT NULL
+);
+"""
+
+# Full text table of the file contents (rowid = files.id), indexed by trigrams
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS contents USING fts5(body, tokenize='trigram', detail=full);
+"""
+
+# Files written per transaction while the index is updated
+_WRITE_BATCH = 200
+
+
+class SearchHit(NamedTuple):
+    """One matching line, with the lines around it."""
+    path: str
+    line: int
+    text: str
+    before: List[str]
+    after: List[str]
+
+
+class CodeSearchIndex(IncrementalIndex):
+    """
+    Trigram index of the text files of a repository, kept in SQLite.
+
+    The file contents go into an FTS5 table with the trigram tokenizer. A search
+    extracts the literal parts the pattern requires, asks the index for the files
+    containing all of them, and runs the regular expression on those files alone.
+    The file list comes from the repository FileIndex, and files are indexed again
+    only when their mtime or size changes, so an update after a pull costs the
+    changed files only. If the SQLite library has no FTS5 trigram tokenizer, every
+    text file is a candidate (the search still works, just slower).
+    """
+
+    _schema = _SCHEMA
+    _label = "Code search index"
+
+    def __init__(self, file_index: FileIndex, cache_dir: Optional[str] = CODE_SEARCH_INDEX_DIR, refresh_seconds: float = FILE_INDEX_REFRESH_SECONDS):
+        """
+        Args:
+            file_index: Index of the files of the repository
+            cache_dir: Directory of the SQLite index (None = in memory)
+            refresh_seconds: Seconds searches trust the index before checking for changed files
+        """
+        super().__init__(file_index, cache_dir, refresh_seconds)
+        try:
+            self._connection.executescript(_FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError as e:
+            logger.warning("SQLite FTS5 trigram tokenizer not available (%s), code search will read every file", e)
+            self.has_fts = False
+
+    def search(
+        self,
+        pattern: str,
+        regex: bool = True,
+        ignore_case: bool = False,
+        path: str = "",
+        glob: Optional[str] = None,
+        max_results: int = 50,
+        context_lines: int = 2,
+    ) -> List[SearchHit]:
+        """
+        Lines of the repository matching a pattern.
+
+        Args:
+            pattern: Regular expression (or plain text when regex is False)
+            regex: Whether pattern is a regular expression
+            ignore_case: Case insensitive match
+            path: Optional sub-directory to search in
+            glob: Optional glob the file paths must match (see FileIndex.files)
+            max_results: Maximum number of hits returned
+            context_lines: Lines returned before and after every hit
+
+        Returns:
+            Hits sorted by file path and line
+        """
+        expression = pattern if regex else re.escape(pattern)
+        compiled = re.compile(expression, re.IGNORECASE if ignore_case else 0)
+        self.update()
+
+        allowed = set(self.file_index.files(pattern=glob, path=path)) if (glob or path) else None
+        hits: List[SearchHit] = []
+        for candidate in self._candidates(expression):
+            if allowed is not None and candidate not in allowed:
+                continue
+            hits.extend(self._search_file(candidate, compiled, context_lines, max_results - len(hits)))
+            if len(hits) >= max_results:
+                break
+        return hits
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            files, text_files = self._connection.execute("SELECT COUNT(*), COALESCE(SUM(is_text), 0) FROM files").fetchone()
+        return {"files": files, "text_files": text_files}
+
+    def _accepts(self, stat: os.stat_result) -> bool:
+        return stat.st_size <= CODE_SEARCH_MAX_FILE_BYTES
+
+    def _apply(self, changed: List[ChangedFile], removed: List[int]) -> None:
+        with self._connection:
+            self._delete([(file_id,) for file_id in removed])
+        for start in range(0, len(changed), _WRITE_BATCH):
+            self._index_files(changed[start:start + _WRITE_BATCH])
+
+    def _index_files(self, files: List[ChangedFile]) -> None:
+        rows = []
+        for path, mtime_ns, size in files:
+            try:
+                with open(os.path.join(self.root, path), "rb") as file:
+                    data = file.read()
+            except OSError:
+                continue
+            # Binary files are remembered (so they are not read again) but never searched
+            is_text = b"\0" not in data[:8192]
+            rows.append((path, mtime_ns, size, is_text, data.decode("utf-8", errors="replace") if is_text else None))
+
+        with self._connection:
+            placeholders = ",".join("?" * len(files))
+            stale = self._connection.execute(f"SELECT id FROM files WHERE path IN ({placeholders})", [path for path, _, _ in files]).fetchall()
+            self._delete(stale)
+            for path, mtime_ns, size, is_text, body in rows:
+                file_id = self._connection.execute(
+                    "INSERT INTO files (path, mtime_ns, size, is_text) VALUES (?, ?, ?, ?)", (path, mtime_ns, size, is_text)
+                ).lastrowid
+                if self.has_fts and body is not None:
+                    self._connection.execute("INSERT INTO contents (rowid, body) VALUES (?, ?)", (file_id, body))
+
+    def _delete(self, file_ids: List[tuple]) -> None:
+        self._connection.executemany("DELETE FROM files WHERE id = ?", file_ids)
+        if self.has_fts:
+            self._connection.executemany("DELETE FROM contents WHERE rowid = ?", file_ids)
+
+    def _candidates(self, expression: str) -> List[str]:
+        # The trigram index is case insensitive, so it narrows case sensitive searches too
+        literals = _required_literals(expression)
+        with self._lock:
+            if not literals or not self.has_fts:
+                return [row[0] for row in self._connection.execute("SELECT path FROM files WHERE is_text = 1 ORDER BY path")]
+            query = " AND ".join('"{}"'.format(literal.replace('"', '""')) for literal in literals)
+            rows = self._connection.execute(
+                "SELECT f.path FROM contents JOIN files f ON f.id = contents.rowid WHERE contents MATCH ? ORDER BY f.path", (query,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def _search_file(self, path: str, compiled: re.Pattern, context_lines: int, limit: int) -> List[SearchHit]:
+        try:
+            with open(os.path.join(self.root, path), "r", encoding="utf-8", errors="replace") as file:
+                lines = file.read().splitlines()
+        except OSError:
+            return []
+        hits = []
+        for number, line in enumerate(lines, start=1):
+            if compiled.search(line):
+                before = lines[max(number - 1 - context_lines, 0):number - 1]
+                after = lines[number:number + context_lines]
+                hits.append(SearchHit(path, number, line, before, after))
+                if len(hits) >= limit:
+                    break
+        return hits
+
+
+# Escapes that stand for a single character, a class or a back reference, not for the next character
+_ESCAPE = re.compile(r"\\(?:x[0-9a-fA-F]{2}|u[0-9a-fA-F]{4}|U[0-9a-fA-F]{8}|N\{[^}]*\}|[0-7]{1,3}|\d{1,2}|.)", re.DOTALL)
+_REPEAT = re.compile(r"(?:[*+?]|\{[\d,]*\})[?+]?")
+# Opening of a group and its extension: comment, inline flags, back reference, condition, lookaround, name, flags
+_GROUP_START = re.compile(r"\((\?(?:#[^)]*|[aiLmsux]+\)|P=\w+|\(\w+\)|<?[=!]|P?<\w+>|[aiLmsux-]*:|>))?")
+
+
+def _required_literals(expression: str) -> List[str]:
+    """Literal strings every match of the regular expression must contain."""
+    try:
+        compiled = re.compile(expression)
+    except re.error:
+        return []
+    if compiled.flags & re.VERBOSE:
+        return []
+    _, literals, alternatives = _scan_literals(expression, 0)
+    if alternatives:
+        return []
+    return [literal for literal in literals if len(literal) >= 3]
+
+
+def _scan_literals(expression: str, position: int) -> Tuple[int, List[str], bool]:
+    """
+    Scan a sequence of the expression up to the ")" closing its group.
+
+    Only the items of a plain sequence are mandatory: repeats, alternatives, character
+    classes and lookarounds end the current literal and drop what they contain. The
+    scan is conservative: when in doubt a literal is dropped, as it only narrows the
+    candidate files.
+
+    Returns:
+        (position of the closing ")" or of the end, literals, whether the sequence has alternatives)
+    """
+    literals: List[str] = []
+    current: List[str] = []
+    alternatives = False
+    # Literals added by the last atom when it is a group, to drop them when it is repeated
+    group_start: Optional[int] = None
+
+    def end_literal() -> None:
+        if current:
+            literals.append("".join(current))
+            current.clear()
+
+    while position < len(expression):
+        char = expression[position]
+        if char == ")":
+            break
+        repeat = _REPEAT.match(expression, position)
+        if repeat:
+            if group_start is not None:
+                del literals[group_start:]
+            elif current:
+                current.pop()
+            end_literal()
+            group_start = None
+            position = repeat.end()
+            continue
+        group_start = None
+        if char == "|":
+            alternatives = True
+            end_literal()
+            position += 1
+        elif char == "\\":
+            escape = _ESCAPE.match(expression, position)
+            escaped = escape.group()[1:]
+            if len(escaped) == 1 and not escaped.isalnum():
+                current.append(escaped)
+            else:
+                end_literal()
+            position = escape.end()
+        elif char == "[":
+            end_literal()
+            position = _skip_class(expression, position)
+        elif char == "(":
+            end_literal()
+            start = _GROUP_START.match(expression, position)
+            prefix, position = start.group(1), start.end()
+            if prefix and prefix.startswith("?#"):
+                position += 1
+                continue
+            if prefix and prefix.endswith(")") and not prefix.startswith("?("):
+                continue
+            # Capturing, non-capturing and atomic groups must match; lookarounds and conditionals need not
+            plain = prefix is None or prefix[-1] in ":>"
+            position, group_literals, group_alternatives = _scan_literals(expression, position)
+            position += 1
+            if plain and not group_alternatives:
+                group_start = len(literals)
+                literals.extend(group_literals)
+        else:
+            if char in ".^$":
+                end_literal()
+            else:
+                current.append(char)
+            position += 1
+    end_literal()
+    return position, literals, alternatives
+
+
+def _skip_class(expression: str, position: int) -> int:
+    """Position after the character class starting at position."""
+    position += 1
+    if expression.startswith("^", position):
+        position += 1
+    if expression.startswith("]", position):
+        position += 1
+    while position < len(expression) and expression[position] != "]":
+        position += 2 if expression[position] == "\\" else 1
+    return position + 1
+
+
+def format_hits(hits: List[SearchHit]) -> str:
+    """Format hits like grep: "path:line: text" for matches, "path-line- text" for context lines."""
+    blocks = []
+    for hit in hits:
+        first = hit.line - len(hit.before)
+        lines = [f"{hit.path}-{first + offset}- {text}" for offset, text in enumerate(hit.before)]
+        lines.append(f"{hit.path}:{hit.line}: {hit.text}")
+        lines.extend(f"{hit.path}-{hit.line + offset}- {text}" for offset, text in enumerate(hit.after, start=1))
+        blocks.append("\n".join(lines))
+    return "\n--\n".join(blocks)
+
+
+_search_indexes: Dict[str, CodeSearchIndex] = {}
+_search_indexes_lock = threading.Lock()
+
+
+def get_code_search_index(root: Optional[str] = None) -> CodeSearchIndex:
+    """
+    Return the process-wide search index of a repository, creating it on first use.
+
+    Args:
+        root: Repository directory (defaults to the REPO_PATH2 environment variable)
+
+    Returns:
+        CodeSearchIndex of the repository
+    """
+    file_index = get_file_index(root)
+    index = _search_indexes.get(file_index.root)
+    if index is None:
+        with _search_indexes_lock:
+            index = _search_indexes.get(file_index.root)
+            if index is None:
+                index = _search_indexes[file_index.root] = CodeSearchIndex(file_index, cache_dir=CODE_SEARCH_INDEX_DIR)
+                subscribe(index.on_sync)
+    return index
@@ -0,0 +1,354 @@
+import fnmatch
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from buildgentic.code_operations.git_sync import GitSyncResult, subscribe
+
+
+logger = logging.getLogger(__name__)
+
+
+# File index configuration - Global Variables from .env file
+FILE_INDEX_DIR = os.getenv("FILE_INDEX_DIR", "data/file_index")
+# Seconds a tree query is answered from memory before the index checks the disk again
+FILE_INDEX_REFRESH_SECONDS = float(os.getenv("FILE_INDEX_REFRESH_SECONDS", "30"))
+
+# Directories skipped when the repository is not a git checkout (no .gitignore to follow)
+DEFAULT_IGNORED_DIRS = {".git", "node_modules", "__pycache__", ".venv", "venv", "build", "dist", ".tox", ".mypy_cache", ".pytest_cache"}
+
+_GIT_TIMEOUT_SECONDS = 60
+
+# Directory tree: name -> subtree for folders, None for files
+Tree = Dict[str, Optional[dict]]
+
+
+class FileIndex:
+    """
+    In-memory index of the files of a repository, refreshed incrementally.
+
+    In a git checkout the file list comes from git itself (the files of HEAD plus
+    the untracked files reported by `git status`), so .gitignore is respected and
+    .git, node_modules or build output never show up. When HEAD moves, for example
+    after git_pull, only the `git diff` between the indexed HEAD and the new one is
+    applied. Outside git the directories are
+    walked, and a directory whose mtime did not change is not listed again.
+
+    The file list is saved to disk (keyed by HEAD), so a restart does not rebuild it.
+    Tree and file queries are answered from memory.
+    """
+
+    def __init__(self, root: str, cache_dir: Optional[str] = FILE_INDEX_DIR, refresh_seconds: float = FILE_INDEX_REFRESH_SECONDS):
+        """
+        Args:
+            root: Repository directory
+            cache_dir: Directory where the index is persisted (None = memory only)
+            refresh_seconds: Seconds queries trust the index before checking for changes
+        """
+        self.root = os.path.abspath(root)
+        self.refresh_seconds = refresh_seconds
+        self.cache_path = None
+        if cache_dir:
+            digest = hashlib.sha1(self.root.encode("utf-8")).hexdigest()[:16]
+            self.cache_path = os.path.join(cache_dir, f"{digest}.json")
+        self.is_git = os.path.exists(os.path.join(self.root, ".git"))
+
+        self._lock = threading.RLock()
+        self._head: Optional[str] = None
+        # git: files committed at HEAD; walk: files per directory with the directory mtime
+        self._tracked: Set[str] = set()
+        self._dirs: Dict[str, Tuple[float, List[str], List[str]]] = {}
+        self._files: List[str] = []
+        self._tree: Tree = {}
+        self._checked_at: Optional[float] = None
+        self._load()
+
+    @property
+    def head(self) -> Optional[str]:
+        """Commit the index was built for (None outside git)."""
+        return self._head
+
+    def files(self, pattern: Optional[str] = None, path: str = "") -> List[str]:
+        """
+        Relative paths of the indexed files, sorted.
+
+        Args:
+            pattern: Optional glob, matched against the relative path (or the file name if it has no "/")
+            path: Optional sub-directory the files must be in
+
+        Returns:
+            List of relative file paths using "/" as separator
+        """
+        self._ensure_fresh()
+        prefix = path.strip("/")
+        files = self._files
+        if prefix:
+            files = [name for name in files if name.startswith(prefix + "/")]
+        if pattern:
+            files = [name for name in files if _matches(name, pattern)]
+        return files
+
+    def tree(self, path: str = "", max_depth: Optional[int] = None, pattern: Optional[str] = None, max_entries: Optional[int] = None) -> str:
+        """
+        Indented text tree of a directory of the repository.
+
+        Args:
+            path: Sub-directory to show ("" = repository root)
+            max_depth: Levels shown below path; deeper folders are collapsed with their file count
+            pattern: Optional glob; only matching files (and the folders containing them) are shown
+            max_entries: Maximum number of lines, the rest is summarized in a last line
+
+        Returns:
+            Tree with one entry per line, folders ending in "/"
+        """
+        self._ensure_fresh()
+        node: Optional[Tree] = self._tree
+        prefix = path.strip("/")
+        for part in prefix.split("/") if prefix else []:
+            node = node.get(part) if node else None
+        if node is None:
+            raise ValueError(f"The directory '{path}' is not in the repository index")
+        if pattern:
+            node = _filter_tree(node, prefix, pattern)
+
+        lines = [f"{os.path.basename(prefix) or os.path.basename(self.root)}/"]
+        _render(node, 1, max_depth, lines)
+        if max_entries and len(lines) > max_entries:
+            hidden = len(lines) - max_entries
+            lines = lines[:max_entries] + [f"... ({hidden} more entries, use path, max_depth or pattern to narrow the tree)"]
+        return "\n".join(lines)
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Bring the index up to date with the disk.
+
+        Args:
+            force: Check now even if the last check is younger than refresh_seconds
+
+        Returns:
+            True if the file list changed
+        """
+        with self._lock:
+            if not force and not self._is_stale():
+                return False
+            started = time.perf_counter()
+            head = self._head
+            try:
+                files = self._refresh_git() if self.is_git else self._refresh_walk()
+            except (OSError, subprocess.SubprocessError) as e:
+                logger.error("File index of %s could not be refreshed: %s", self.root, e)
+                return False
+            self._checked_at = time.monotonic()
+            if files == self._files:
+                if head != self._head:
+                    self._save()
+                return False
+            self._files = files
+            self._tree = _build_tree(files)
+            self._save()
+            logger.info("File index of %s refreshed: %d files in %.0f ms", self.root, len(files), (time.perf_counter() - started) * 1000)
+            return True
+
+    def on_sync(self, result: GitSyncResult) -> None:
+        """Git sync listener: apply the new HEAD before the indexes built on this one."""
+        if result.repo_path == self.root:
+            self.refresh(force=True)
+
+    def _is_stale(self) -> bool:
+        return self._checked_at is None or time.monotonic() - self._checked_at >= self.refresh_seconds
+
+    def _ensure_fresh(self) -> None:
+        if self._is_stale():
+            self.refresh()
+
+    def _git(self, *args: str) -> str:
+        result = subprocess.run(
+            ["git", *args], cwd=self.root, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=_GIT_TIMEOUT_SECONDS
+        )
+        return result.stdout.decode("utf-8", errors="surrogateescape")
+
+    def _refresh_git(self) -> List[str]:
+        head = self._current_head()
+        if head != self._head or not self._tracked:
+            self._tracked = self._tracked_files(head)
+            self._head = head
+
+        # Working tree changes are applied on top of HEAD on every refresh, so files that
+        # stop being untracked or deleted go back to the HEAD state by themselves
+        added, deleted = set(), set()
+        status = self._git("status", "--porcelain=v1", "-z", "--untracked-files=all", "--no-renames")
+        for entry in filter(None, status.split("\0")):
+            code, name = entry[:2], entry[3:]
+            if "D" in code:
+                deleted.add(name)
+            elif code == "??" or "A" in code:
+                added.add(name)
+        return sorted((self._tracked - deleted) | added)
+
+    def _current_head(self) -> Optional[str]:
+        try:
+            return self._git("rev-parse", "--verify", "--quiet", "HEAD").strip()
+        except subprocess.CalledProcessError:
+            # Repository without commits yet
+            return None
+
+    def _tracked_files(self, head: Optional[str]) -> Set[str]:
+        if head is None:
+            return set()
+        if self._head and self._tracked:
+            try:
+                diff = self._git("diff", "--name-status", "--no-renames", "-z", self._head, head)
+            except subprocess.CalledProcessError:
+                # Old HEAD no longer exists (history rewritten): list everything again
+                diff = None
+            if diff is not None:
+                tracked = set(self._tracked)
+                fields = diff.split("\0")
+                for status, name in zip(fields[0::2], fields[1::2]):
+                    if status.startswith("D"):
+                        tracked.discard(name)
+                    elif status:
+                        tracked.add(name)
+                return tracked
+        return set(filter(None, self._git("ls-tree", "-r", "-z", "--name-only", head).split("\0")))
+
+    def _refresh_walk(self) -> List[str]:
+        dirs: Dict[str, Tuple[float, List[str], List[str]]] = {}
+        files: List[str] = []
+        pending = [""]
+        while pending:
+            relative = pending.pop()
+            absolute = os.path.join(self.root, relative) if relative else self.root
+            try:
+                mtime = os.stat(absolute).st_mtime
+            except FileNotFoundError:
+                continue
+            cached = self._dirs.get(relative)
+            if cached and cached[0] == mtime:
+                _, names, subdirs = cached
+            else:
+                names, subdirs = [], []
+                with os.scandir(absolute) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in DEFAULT_IGNORED_DIRS:
+                                subdirs.append(entry.name)
+                        else:
+                            names.append(entry.name)
+            dirs[relative] = (mtime, names, subdirs)
+            files.extend(f"{relative}/{name}" if relative else name for name in names)
+            pending.extend(f"{relative}/{name}" if relative else name for name in subdirs)
+        self._dirs = dirs
+        return sorted(files)
+
+    def _load(self) -> None:
+        if not self.cache_path or not os.path.isfile(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError) as e:
+            logger.warning("File index cache %s could not be read: %s", self.cache_path, e)
+            return
+        if data.get("root") != self.root:
+            return
+        self._head = data.get("head")
+        self._tracked = set(data.get("tracked", []))
+        self._dirs = {name: (mtime, names, subdirs) for name, (mtime, names, subdirs) in data.get("dirs", {}).items()}
+
+    def _save(self) -> None:
+        if not self.cache_path:
+            return
+        data = {"root": self.root, "head": self._head, "tracked": sorted(self._tracked), "dirs": self._dirs}
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(data, file)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning("File index cache %s could not be written: %s", self.cache_path, e)
+
+
+def _matches(name: str, pattern: str) -> bool:
+    if "/" in pattern:
+        return fnmatch.fnmatch(name, pattern)
+    return fnmatch.fnmatch(name.rsplit("/", 1)[-1], pattern)
+
+
+def _build_tree(files: Iterable[str]) -> Tree:
+    tree: Tree = {}
+    for name in files:
+        node = tree
+        *folders, filename = name.split("/")
+        for folder in folders:
+            child = node.get(folder)
+            if child is None:
+                child = node[folder] = {}
+            node = child
+        node.setdefault(filename, None)
+    return tree
+
+
+def _filter_tree(node: Tree, prefix: str, pattern: str) -> Tree:
+    filtered: Tree = {}
+    for name, child in node.items():
+        path = f"{prefix}/{name}" if prefix else name
+        if child is None:
+            if _matches(path, pattern):
+                filtered[name] = None
+        else:
+            sub_tree = _filter_tree(child, path, pattern)
+            if sub_tree:
+                filtered[name] = sub_tree
+    return filtered
+
+
+def _count_files(node: Tree) -> int:
+    return sum(1 if child is None else _count_files(child) for child in node.values())
+
+
+def _render(node: Tree, level: int, max_depth: Optional[int], lines: List[str]) -> None:
+    indent = " " * 4 * level
+    folders = sorted(name for name, child in node.items() if child is not None)
+    for name in folders:
+        child = node[name]
+        if max_depth is not None and level >= max_depth:
+            lines.append(f"{indent}{name}/ ({_count_files(child)} files)")
+        else:
+            lines.append(f"{indent}{name}/")
+            _render(child, level + 1, max_depth, lines)
+    lines.extend(f"{indent}{name}" for name in sorted(name for name, child in node.items() if child is None))
+
+
+_file_indexes: Dict[str, FileIndex] = {}
+_file_indexes_lock = threading.Lock()
+
+
+def get_file_index(root: Optional[str] = None) -> FileIndex:
+    """
+    Return the process-wide index of a repository, creating it on first use.
+
+    Args:
+        root: Repository directory (defaults to the REPO_PATH2 environment variable)
+
+    Returns:
+        FileIndex of the repository
+    """
+    root = root or os.getenv("REPO_PATH2")
+    if not root:
+        raise ValueError("Environment variable 'REPO_PATH2' is not set")
+    key = os.path.abspath(root)
+    index = _file_indexes.get(key)
+    if index is None:
+        with _file_indexes_lock:
+            index = _file_indexes.get(key)
+            if index is None:
+                index = _file_indexes[key] = FileIndex(key, cache_dir=FILE_INDEX_DIR)
+                subscribe(index.on_sync)
+    return index
@@ -0,0 +1,160 @@
+import contextlib
+import logging
+import mmap
+import os
+from typing import Iterator, List, NamedTuple, Optional, Union
+
+from buildgentic.storage.lru import BoundedCache
+
+
+logger = logging.getLogger(__name__)
+
+
+# File reader configuration - Global Variables from .env file
+# Maximum bytes returned by one read, so a single file cannot fill the LLM context
+READ_FILE_MAX_BYTES = int(os.getenv("READ_FILE_MAX_BYTES", str(64 * 1024)))
+# Files at least this large are read through mmap instead of being loaded
+READ_FILE_MMAP_THRESHOLD = int(os.getenv("READ_FILE_MMAP_THRESHOLD", str(1024 * 1024)))
+
+# Bytes inspected to decide whether a file is binary
+_BINARY_SNIFF_BYTES = 8192
+# Every this many lines the byte offset is recorded in the line index of a large file
+_LINE_INDEX_STEP = 1024
+
+Buffer = Union[bytes, mmap.mmap]
+
+
+class FileSlice(NamedTuple):
+    """Part of a file returned by read_range."""
+    text: str
+    start: int
+    end: int
+    total_bytes: int
+    start_line: Optional[int]
+    end_line: Optional[int]
+    truncated: bool
+    binary: bool
+
+
+# (path, mtime_ns, size) -> byte offset of lines 1, 1 + step, 1 + 2 * step...
+_line_indexes: BoundedCache[List[int]] = BoundedCache(max_entries=64)
+
+
+def is_binary(path: str) -> bool:
+    """True if the file looks binary (it has a NUL byte near the start)."""
+    with open(path, "rb") as file:
+        return b"\0" in file.read(_BINARY_SNIFF_BYTES)
+
+
+def read_range(
+    path: str,
+    start_line: Optional[int] = None,
+    end_line: Optional[int] = None,
+    offset: Optional[int] = None,
+    length: Optional[int] = None,
+    max_bytes: Optional[int] = READ_FILE_MAX_BYTES,
+) -> FileSlice:
+    """
+    Read part of a text file without loading the rest of it.
+
+    The range is given either in lines (1-based, end_line included) or in bytes.
+    Files larger than READ_FILE_MMAP_THRESHOLD are memory-mapped, and the line
+    offsets found are kept in a sparse index, so paging through a large file does
+    not scan it from the start on every call. Binary files are not decoded.
+
+    Args:
+        path: File to read
+        start_line: First line to return
+        end_line: Last line to return (default: end of file)
+        offset: First byte to return (when no line range is given)
+        length: Bytes to return from offset (default: end of file)
+        max_bytes: Maximum bytes returned; longer ranges are cut at a line boundary, or inside a line
+            longer than max_bytes (None = no limit)
+
+    Returns:
+        FileSlice with the text and the byte and line positions actually returned
+    """
+    if (start_line is not None or end_line is not None) and (offset is not None or length is not None):
+        raise ValueError("Use either a line range (start_line/end_line) or a byte range (offset/length), not both")
+
+    with _open_buffer(path) as (data, size, key):
+        if b"\0" in data[:_BINARY_SNIFF_BYTES]:
+            return FileSlice("", 0, 0, size, None, None, False, True)
+
+        line_mode = start_line is not None or end_line is not None
+        if line_mode:
+            first_line = max(start_line or 1, 1)
+            start = _line_offset(data, size, key, first_line)
+            end = size if end_line is None else _line_offset(data, size, key, end_line + 1, first_line, start)
+        else:
+            first_line = None
+            start = min(max(offset or 0, 0), size)
+            end = size if length is None else min(start + max(length, 0), size)
+
+        truncated = False
+        if max_bytes is not None and end - start > max_bytes:
+            truncated = True
+            cut = data.rfind(b"\n", start, start + max_bytes)
+            end = cut + 1 if cut >= start else start + max_bytes
+
+        chunk = data[start:end]
+        text = chunk.decode("utf-8", errors="replace")
+        last_line = None
+        if first_line is not None:
+            # Last line included in the text (first_line - 1 when nothing was returned). A line
+            # longer than max_bytes is cut in the middle: it is not complete, so it is not counted
+            newlines = chunk.count(b"\n")
+            if not chunk:
+                last_line = first_line - 1
+            elif chunk.endswith(b"\n"):
+                last_line = first_line + newlines - 1
+            else:
+                last_line = first_line + newlines - (1 if truncated else 0)
+        return FileSlice(text, start, end, size, first_line, last_line, truncated, False)
+
+
+@contextlib.contextmanager
+def _open_buffer(path: str) -> Iterator[tuple]:
+    with open(path, "rb") as file:
+        stat = os.fstat(file.fileno())
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        if stat.st_size < READ_FILE_MMAP_THRESHOLD or stat.st_size == 0:
+            yield file.read(), stat.st_size, None
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped, stat.st_size, key
+
+
+def _line_offset(data: Buffer, size: int, key: Optional[tuple], line: int, from_line: int = 1, from_offset: int = 0) -> int:
+    """Byte offset where a line starts (size if the file has fewer lines)."""
+    if key is not None and line > from_line + _LINE_INDEX_STEP:
+        offsets = _line_index(data, size, key)
+        slot = min((line - 1) // _LINE_INDEX_STEP, len(offsets) - 1)
+        if slot * _LINE_INDEX_STEP + 1 > from_line:
+            from_line, from_offset = slot * _LINE_INDEX_STEP + 1, offsets[slot]
+
+    position = from_offset
+    for _ in range(line - from_line):
+        newline = data.find(b"\n", position)
+        if newline < 0:
+            return size
+        position = newline + 1
+    return position
+
+
+def _line_index(data: Buffer, size: int, key: tuple) -> List[int]:
+    offsets = _line_indexes.get(key)
+    if offsets is None:
+        offsets = [0]
+        position, line = 0, 1
+        while True:
+            newline = data.find(b"\n", position)
+            if newline < 0:
+                break
+            position, line = newline + 1, line + 1
+            if (line - 1) % _LINE_INDEX_STEP == 0:
+                offsets.append(position)
+        _line_indexes.put(key, offsets)
+        logger.debug("Line index of %s: %d lines", key[0], line)
+    return offsets
+
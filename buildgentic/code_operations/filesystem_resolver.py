@@ -1,58 +1,100 @@
-import subprocess
+import asyncio
+import re
 import os
 
+from buildgentic.code_operations.code_search import format_hits, get_code_search_index
+from buildgentic.code_operations.file_index import get_file_index
+from buildgentic.code_operations.file_reader import READ_FILE_MAX_BYTES, read_range
+from buildgentic.code_operations.git_sync import GIT_SYNC_DEPTH, GitError, git_sync
+from buildgentic.code_operations.python_summary import get_python_summary_cache
+from buildgentic.code_operations.symbol_index import get_symbol_index
+from buildgentic.code_operations.worktree_pool import current_repo_path
 
-def git_pull():
-    """
-    Runs 'git pull' in the repository path specified by the environment variable 'REPO_PATH'.
-    """
+
+# Directory tree limits, so the structure fits in the LLM context - Global Variables from .env file
+DIRECTORY_TREE_MAX_DEPTH = int(os.getenv("DIRECTORY_TREE_MAX_DEPTH", "3"))
+DIRECTORY_TREE_MAX_ENTRIES = int(os.getenv("DIRECTORY_TREE_MAX_ENTRIES", "500"))
+DIRECTORY_SUMMARY_MAX_FILES = int(os.getenv("DIRECTORY_SUMMARY_MAX_FILES", "200"))
+
+
+def _validate_repo_path():
     repo_path = os.getenv('REPO_PATH2')
-    print("repo_path", repo_path)
 
     if not repo_path:
-        raise ValueError("The environment variable 'REPO_PATH' is not set.")
+        raise ValueError("The environment variable 'REPO_PATH2' is not set.")
     
     if not os.path.isdir(repo_path):
         raise ValueError(f"The path {repo_path} is not a valid directory.")
     
-    if not os.path.isdir(os.path.join(repo_path, '.git')):
+    if not os.path.exists(os.path.join(repo_path, '.git')):
         raise ValueError(f"The path {repo_path} is not a valid git repository.")
-    
+
+    return repo_path
+
+
+async def git_pull_async(depth=GIT_SYNC_DEPTH):
+    """
+    Runs 'git pull' in the repository path specified by the environment variable 'REPO_PATH2', without blocking.
+    The repository indexes (tree, search, symbols, summaries) are updated with the changed files only.
+    Worktrees lent to running tasks are not touched; the next tasks start from the new commit.
+
+    :param depth: Fetch only this many commits (0 = full history).
+    :return: A string with the old and new HEAD and the list of changed files.
+    """
+    repo_path = _validate_repo_path()
+
     try:
-        result = subprocess.run(['git', 'pull'], cwd=repo_path, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        print(result.stdout.decode('utf-8'))
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred while running git pull: {e.stderr.decode('utf-8')}")
-    
-    return "source code updated"
+        result = await git_sync(repo_path, depth=depth)
+    except GitError as e:
+        return f"Error occurred while running git pull: {e}"
+
+    if not result.changed:
+        return f"Already up to date at {result.new_head}"
+    if result.changed_files is None:
+        return f"Source code updated from {result.old_head} to {result.new_head} (changed files unknown)"
+    lines = [f"Source code updated from {result.old_head} to {result.new_head}: {len(result.changed_files)} files changed"]
+    lines.extend(f"{changed_file.status}\t{changed_file.path}" for changed_file in result.changed_files)
+    return "\n".join(lines)
+
+
+def git_pull(depth=GIT_SYNC_DEPTH):
+    """
+    Runs 'git pull' in the repository path specified by the environment variable 'REPO_PATH2'.
+    The repository indexes (tree, search, symbols, summaries) are updated with the changed files only.
+
+    Not callable from a running event loop, which it would block: await git_pull_async there.
+
+    :param depth: Fetch only this many commits (0 = full history).
+    :return: A string with the old and new HEAD and the list of changed files.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(git_pull_async(depth))
+    raise RuntimeError("git_pull cannot run inside an event loop, await git_pull_async instead")
 
 # Example usage:
 # Make sure to set the environment variable 'REPO_PATH' before running the function
 # os.environ['REPO_PATH'] = '/path/to/your/repo'
 # git_pull()
 
-def get_directory_structure():
+def get_directory_structure(path="", max_depth=DIRECTORY_TREE_MAX_DEPTH, pattern=None, max_entries=DIRECTORY_TREE_MAX_ENTRIES):
     """
-    Returns a string representing the full structure of files and folders inside the given path.
-    This structure includes nested folders and files. The path is retrieved from an environment variable.
+    Returns a string representing the structure of files and folders of the repository.
+    The repository path is retrieved from an environment variable (or is the worktree of the current task). The structure comes from the
+    repository file index, so files ignored by git (.git, node_modules, build output...) are not listed.
 
+    :param path: Sub-directory to show, relative to the repository root (default: the whole repository).
+    :param max_depth: Levels of folders shown; deeper folders are collapsed with their file count (None = no limit).
+    :param pattern: Optional glob (e.g. "*.py" or "src/**/test_*.py"); only matching files are shown.
+    :param max_entries: Maximum number of lines returned (None = no limit).
     :return: A string representing the directory structure.
     """
-    path = os.getenv('REPO_PATH2')
-    if not path:
-        raise ValueError("Environment variable 'DIRECTORY_PATH' is not set")
-
-    structure = []
-
-    for root, dirs, files in os.walk(path):
-        level = root.replace(path, '').count(os.sep)
-        indent = ' ' * 4 * level
-        structure.append(f"{indent}{os.path.basename(root)}/")
-        sub_indent = ' ' * 4 * (level + 1)
-        for f in files:
-            structure.append(f"{sub_indent}{f}")
+    repo_path = current_repo_path()
+    if not repo_path:
+        raise ValueError("Environment variable 'REPO_PATH2' is not set")
 
-    return "\n".join(structure)
+    return get_file_index(repo_path).tree(path=path, max_depth=max_depth, pattern=pattern, max_entries=max_entries)
 
 # Example usage:
 # Make sure to set the environment variable 'DIRECTORY_PATH' before running the script
@@ -60,73 +102,160 @@ def get_directory_structure():
 
 def summarize_python_file(file_path):
     """
-    Returns a summary of a Python file as a string. The summary includes a list of methods and their documentation.
+    Returns a summary of a Python file as a string. The summary lists its classes, functions and methods
+    with their signatures, decorators and the first line of their documentation.
 
-    :param file_path: Path to the Python file.
+    :param file_path: Path to the Python file, relative to the repository root.
     :return: A string representing the summary of the file.
     """
 
-    path = os.getenv('REPO_PATH2')
-    file_path = path + file_path
+    path = current_repo_path()
+    file_path = os.path.join(path, file_path.lstrip('/'))
 
     if not os.path.isfile(file_path):
         raise ValueError(f"The file {file_path} does not exist")
 
-    summary = []
-    with open(file_path, 'r') as file:
-        lines = file.readlines()
-
-    inside_docstring = False
-    current_method = None
-    docstring_lines = []
-
-    for line in lines:
-        stripped_line = line.strip()
-        if stripped_line.startswith('def '):
-            if current_method:
-                summary.append(f"Method: {current_method}")
-                if docstring_lines:
-                    summary.append("Documentation:")
-                    summary.extend(docstring_lines)
-                summary.append("")
-            current_method = stripped_line.split('(')[0][4:]
-            docstring_lines = []
-        elif stripped_line.startswith('"""') or stripped_line.startswith("'''"):
-            if inside_docstring:
-                inside_docstring = False
-            else:
-                inside_docstring = True
-                docstring_lines.append(stripped_line)
-        elif inside_docstring:
-            docstring_lines.append(stripped_line)
-
-    if current_method:
-        summary.append(f"Method: {current_method}")
-        if docstring_lines:
-            summary.append("Documentation:")
-            summary.extend(docstring_lines)
-
-    return "\n".join(summary)
-
-
-def read_file_content(file_path):
-    """
-    Returns the content of a file as a string.
+    return get_python_summary_cache().summarize(file_path)
+
+
+def summarize_python_directory(path="", pattern="*.py", max_files=DIRECTORY_SUMMARY_MAX_FILES):
+    """
+    Returns the summaries of all the Python files of a directory of the repository in one string.
+    Files already summarized and not modified since are served from the cache; the rest are parsed in parallel.
+
+    :param path: Sub-directory to summarize, relative to the repository root (default: the whole repository).
+    :param pattern: Glob selecting the files to summarize (default: "*.py").
+    :param max_files: Maximum number of files summarized (None = no limit).
+    :return: A string with a section per file, headed by its relative path.
+    """
+    repo_path = current_repo_path()
+    if not repo_path:
+        raise ValueError("Environment variable 'REPO_PATH2' is not set")
+
+    files = [name for name in get_file_index(repo_path).files(pattern=pattern, path=path) if name.endswith('.py')]
+    omitted = 0
+    if max_files and len(files) > max_files:
+        omitted = len(files) - max_files
+        files = files[:max_files]
+
+    summaries = get_python_summary_cache().summarize_many(os.path.join(repo_path, name) for name in files)
+    sections = []
+    for name in files:
+        path = os.path.abspath(os.path.join(repo_path, name))
+        # Files deleted since the file index was refreshed are left out
+        if path in summaries:
+            summary = summaries[path]
+            sections.append(f"## {name}\n{summary}" if summary else f"## {name}")
+    if omitted:
+        sections.append(f"... ({omitted} more files, use path or pattern to narrow the summary)")
+
+    return "\n\n".join(sections)
+
+
+def search_code(query, regex=False, identifier=False, ignore_case=False, path="", pattern=None, max_results=50, context_lines=2):
+    """
+    Searches the files of the repository and returns the matching lines with some context, like grep.
+    The search uses an index of the repository, so only the files that can contain the query are read.
+
+    :param query: Text, regular expression or identifier to look for.
+    :param regex: Treat query as a regular expression.
+    :param identifier: Match query as a whole identifier (e.g. "get_agent" does not match "get_agent_card").
+    :param ignore_case: Case insensitive search.
+    :param path: Sub-directory to search in, relative to the repository root (default: the whole repository).
+    :param pattern: Optional glob the files must match (e.g. "*.py").
+    :param max_results: Maximum number of matching lines returned.
+    :param context_lines: Lines shown before and after every match.
+    :return: Matches as "path:line: text" (context lines as "path-line- text"), blocks separated by "--".
+    """
+    repo_path = current_repo_path()
+    if not repo_path:
+        raise ValueError("Environment variable 'REPO_PATH2' is not set")
+
+    expression = query if regex else re.escape(query)
+    if identifier:
+        expression = rf"(?<![\w]){expression}(?![\w])"
+
+    hits = get_code_search_index(repo_path).search(
+        expression, regex=True, ignore_case=ignore_case, path=path, glob=pattern, max_results=max_results, context_lines=context_lines
+    )
+    if not hits:
+        return f"No matches for '{query}'"
+
+    return format_hits(hits)
+
+
+def find_symbol(name, kind="all", max_results=50):
+    """
+    Finds where a Python symbol is defined, who imports it and who calls it, in one call.
+    The answer comes from a symbol table of the repository, so no file has to be read.
+    Calls are matched by name, so a call of "request" is listed for every "request" method.
+
+    :param name: Symbol name, short ("get_manager_agent") or qualified ("AzureDevOpsClient.request").
+    :param kind: "definitions", "imports", "callers" or "all".
+    :param max_results: Maximum number of entries of each section.
+    :return: A string with a section per kind, one "path:line" entry per line.
+    """
+    repo_path = current_repo_path()
+    if not repo_path:
+        raise ValueError("Environment variable 'REPO_PATH2' is not set")
+    kinds = ("definitions", "imports", "callers")
+    if kind != "all" and kind not in kinds:
+        raise ValueError(f"Unknown kind '{kind}'. Valid values: {kinds + ('all',)}")
+
+    index = get_symbol_index(repo_path)
+    sections = []
+    for section in kinds if kind == "all" else (kind,):
+        symbols = getattr(index, section)(name, limit=max_results)
+        lines = [f"{section.capitalize()} of '{name}' ({len(symbols)}):"]
+        for symbol in symbols:
+            where = "" if section != "callers" else f" in {symbol.scope}"
+            lines.append(f"    {symbol.path}:{symbol.line}{where}: {symbol.detail}")
+        sections.append("\n".join(lines))
+
+    return "\n\n".join(sections)
+
+
+def read_file_content(file_path, start_line=None, end_line=None, offset=None, length=None, max_bytes=READ_FILE_MAX_BYTES):
+    """
+    Returns the content of a file as a string, or part of it.
+
+    Large files are not loaded in memory: ask for a line range (or a byte range) to page through them.
+    At most max_bytes are returned; when the content is cut, a last line tells how to read the rest.
+    Binary files are not returned, only their size.
 
     :param file_path: Path to the file.
+    :param start_line: First line to return, starting at 1.
+    :param end_line: Last line to return (default: end of file).
+    :param offset: First byte to return, for byte ranges (cannot be combined with a line range).
+    :param length: Number of bytes to return from offset (default: end of file).
+    :param max_bytes: Maximum number of bytes returned (None = no limit).
     :return: A string representing the content of the file.
     """
 
-    path = os.getenv('REPO_PATH2')
+    path = current_repo_path()
     file_path = path + "/" + file_path
 
     if not os.path.isfile(file_path):
         raise ValueError(f"The file {file_path} does not exist")
 
-    with open(file_path, 'r') as file:
-        content = file.read()
+    part = read_range(file_path, start_line=start_line, end_line=end_line, offset=offset, length=length, max_bytes=max_bytes)
+    if part.binary:
+        return f"[Binary file, {part.total_bytes} bytes: content not shown]"
+    if not part.truncated:
+        return part.text
 
-    return content
+    if part.start_line is not None and part.text.endswith("\n"):
+        position = f"lines {part.start_line}-{part.end_line}"
+        next_call = f"start_line={part.end_line + 1}"
+    elif part.start_line is not None:
+        # A single line longer than max_bytes: the rest of it is read by bytes
+        position = f"bytes {part.start}-{part.end} (part of line {part.end_line + 1})"
+        next_call = f"offset={part.end}"
+    else:
+        position = f"bytes {part.start}-{part.end}"
+        next_call = f"offset={part.end}"
+    separator = "" if part.text.endswith("\n") else "\n"
+    return f"{part.text}{separator}[Truncated: showing {position} of a {part.total_bytes} bytes file. Continue with {next_call}]"
 
 # Example usage:
 # print(read_file_content('/path/to/your/file'))
\ No newline at end of file
@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import os
+import threading
+import weakref
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+# Git sync configuration - Global Variables from .env file
+# Commits fetched by a pull (0 = full history); shallow pulls keep large repositories small
+GIT_SYNC_DEPTH = int(os.getenv("GIT_SYNC_DEPTH", "0"))
+# Partial clone filter of git_clone, e.g. "blob:none" (file contents are fetched when checked out)
+GIT_CLONE_FILTER = os.getenv("GIT_CLONE_FILTER", "")
+GIT_SYNC_TIMEOUT = float(os.getenv("GIT_SYNC_TIMEOUT", "300"))
+
+
+class GitError(Exception):
+    """A git command failed."""
+
+
+class ChangedFile(NamedTuple):
+    """File changed between two commits ("A" added, "M" modified, "D" deleted...)."""
+    status: str
+    path: str
+
+
+class GitSyncResult(NamedTuple):
+    """What a sync changed in a repository."""
+    repo_path: str
+    old_head: Optional[str]
+    new_head: Optional[str]
+    # None when the difference is unknown (e.g. the old commit is gone): listeners must rebuild
+    changed_files: Optional[List[ChangedFile]]
+    output: str
+
+    @property
+    def changed(self) -> bool:
+        return self.old_head != self.new_head
+
+    @property
+    def paths(self) -> Optional[List[str]]:
+        """Relative paths of the changed files (None when unknown)."""
+        if self.changed_files is None:
+            return None
+        return [changed_file.path for changed_file in self.changed_files]
+
+
+# Called after every sync that moved HEAD, with the result of the sync
+SyncListener = Callable[[GitSyncResult], None]
+
+_listeners: List[SyncListener] = []
+_listeners_lock = threading.Lock()
+# One sync at a time per repository (asyncio locks belong to an event loop)
+_repo_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Lock]]" = weakref.WeakKeyDictionary()
+
+
+def subscribe(listener: SyncListener) -> None:
+    """
+    Register a function called after each sync that changed a repository.
+
+    Listeners run in registration order in a worker thread, so indexes that depend
+    on the file index should subscribe after it. They receive the result of every
+    repository and should ignore the ones they do not index.
+    """
+    with _listeners_lock:
+        if listener not in _listeners:
+            _listeners.append(listener)
+
+
+def unsubscribe(listener: SyncListener) -> None:
+    with _listeners_lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+
+async def run_git(repo_path: str, *args: str, timeout: float = GIT_SYNC_TIMEOUT) -> str:
+    """
+    Run a git command without blocking the event loop.
+
+    Args:
+        repo_path: Working directory of the command
+        args: Arguments of git
+        timeout: Seconds before the command is killed
+
+    Returns:
+        Standard output of the command
+    """
+    process = await asyncio.create_subprocess_exec(
+        "git", *args, cwd=repo_path, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise GitError(f"git {' '.join(args)} timed out after {timeout}s")
+    if process.returncode != 0:
+        raise GitError(f"git {' '.join(args)} failed: {stderr.decode('utf-8', errors='replace').strip()}")
+    return stdout.decode("utf-8", errors="surrogateescape")
+
+
+async def _head(repo_path: str) -> Optional[str]:
+    try:
+        return (await run_git(repo_path, "rev-parse", "--verify", "--quiet", "HEAD")).strip()
+    except GitError:
+        return None
+
+
+async def changed_files(repo_path: str, old_head: str, new_head: str) -> Optional[List[ChangedFile]]:
+    """
+    Files that differ between two commits.
+
+    Returns:
+        Changed files, or None if the old commit is not available (shallow history)
+    """
+    try:
+        diff = await run_git(repo_path, "diff", "--name-status", "--no-renames", "-z", old_head, new_head)
+    except GitError as e:
+        logger.warning("Changes of %s between %s and %s unknown: %s", repo_path, old_head, new_head, e)
+        return None
+    fields = diff.split("\0")
+    return [ChangedFile(status, path) for status, path in zip(fields[0::2], fields[1::2]) if status]
+
+
+async def git_sync(repo_path: str, remote: Optional[str] = None, branch: Optional[str] = None, depth: int = GIT_SYNC_DEPTH) -> GitSyncResult:
+    """
+    Pull a repository and report what changed.
+
+    The pull runs as an asyncio subprocess, and concurrent syncs of the same
+    repository are serialized. When HEAD moves, the subscribed listeners receive
+    the changed files so they update only those.
+
+    Args:
+        repo_path: Local checkout
+        remote: Remote to pull from (default: the upstream of the current branch)
+        branch: Branch to pull (requires remote)
+        depth: Fetch only this many commits (0 = full history)
+
+    Returns:
+        Old and new HEAD, changed files and the git output
+    """
+    loop_locks = _repo_locks.setdefault(asyncio.get_running_loop(), {})
+    lock = loop_locks.setdefault(os.path.abspath(repo_path), asyncio.Lock())
+    async with lock:
+        old_head = await _head(repo_path)
+        args = ["pull", "--no-edit"]
+        if depth:
+            args.append(f"--depth={depth}")
+        args.extend(filter(None, [remote, branch]))
+        output = await run_git(repo_path, *args)
+        new_head = await _head(repo_path)
+
+        files: Optional[List[ChangedFile]] = []
+        if old_head != new_head:
+            files = await changed_files(repo_path, old_head, new_head) if old_head and new_head else None
+        result = GitSyncResult(os.path.abspath(repo_path), old_head, new_head, files, output)
+        if result.changed:
+            logger.info("Repository %s updated %s..%s (%s files)", repo_path, old_head, new_head, "?" if files is None else len(files))
+            await asyncio.to_thread(notify, result)
+        return result
+
+
+async def git_clone(url: str, repo_path: str, branch: Optional[str] = None, depth: int = GIT_SYNC_DEPTH, filter_spec: str = GIT_CLONE_FILTER) -> str:
+    """
+    Clone a repository, optionally shallow and/or partial.
+
+    Args:
+        url: Repository URL
+        repo_path: Directory of the new checkout
+        branch: Branch to check out (default: the remote default branch)
+        depth: Clone only this many commits (0 = full history)
+        filter_spec: Partial clone filter such as "blob:none" ("" = full clone)
+
+    Returns:
+        HEAD of the new checkout
+    """
+    args = ["clone", "--quiet"]
+    if depth:
+        args.append(f"--depth={depth}")
+    if filter_spec:
+        args.append(f"--filter={filter_spec}")
+    if branch:
+        args.extend(["--branch", branch])
+    parent = os.path.dirname(os.path.abspath(repo_path))
+    os.makedirs(parent, exist_ok=True)
+    await run_git(parent, *args, url, os.path.abspath(repo_path))
+    return await _head(repo_path)
+
+
+def notify(result: GitSyncResult) -> None:
+    """Call the listeners with a sync result; a failing listener does not stop the others."""
+    with _listeners_lock:
+        listeners = list(_listeners)
+    for listener in listeners:
+        try:
+            listener(result)
+        except Exception:
+            logger.exception("Git sync listener %r failed for %s", listener, result.repo_path)
@@ -0,0 +1,137 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from buildgentic.code_operations.file_index import FILE_INDEX_REFRESH_SECONDS, FileIndex
+from buildgentic.code_operations.git_sync import GitSyncResult
+from buildgentic.storage.sqlite import connect
+
+
+logger = logging.getLogger(__name__)
+
+
+# Paths looked up per query when only some files are checked
+_KNOWN_BATCH = 500
+
+# (relative path, mtime_ns, size) of a new or modified file
+ChangedFile = Tuple[str, int, int]
+
+
+class IncrementalIndex:
+    """
+    Base of the SQLite indexes built from the files of a repository.
+
+    The database (one per repository in cache_dir) has a "files" table with the id,
+    path, mtime_ns and size of every file indexed. An update compares it with the
+    repository FileIndex and hands the subclass the new or modified files and the ids
+    of the deleted ones, so an update after a pull costs the changed files only.
+    Updates are skipped for refresh_seconds unless forced or limited to some paths.
+
+    Subclasses set _schema, _label and _pattern, and implement _apply.
+    """
+
+    # SQL creating the tables, the "files" table included
+    _schema = ""
+    # Name of the index in the logs
+    _label = "Index"
+    # Glob of the files indexed (None = every file)
+    _pattern: Optional[str] = None
+
+    def __init__(self, file_index: FileIndex, cache_dir: Optional[str], refresh_seconds: float = FILE_INDEX_REFRESH_SECONDS):
+        """
+        Args:
+            file_index: Index of the files of the repository
+            cache_dir: Directory of the SQLite database (None = in memory)
+            refresh_seconds: Seconds queries trust the index before checking for changed files
+        """
+        self.file_index = file_index
+        self.root = file_index.root
+        self.refresh_seconds = refresh_seconds
+        db_path = ":memory:"
+        if cache_dir:
+            digest = hashlib.sha1(self.root.encode("utf-8")).hexdigest()[:16]
+            db_path = os.path.join(cache_dir, f"{digest}.db")
+        self._lock = threading.RLock()
+        self._connection = connect(db_path)
+        self._connection.executescript(self._schema)
+        self._updated_at: Optional[float] = None
+
+    def update(self, force: bool = False, paths: Optional[Iterable[str]] = None) -> int:
+        """
+        Index the new and modified files and forget the deleted ones.
+
+        Args:
+            force: Check now even if the last update is younger than refresh_seconds
+            paths: Only check these relative paths (e.g. the files changed by a pull)
+
+        Returns:
+            Number of files indexed again or removed
+        """
+        with self._lock:
+            if paths is None and not force and self._updated_at is not None and time.monotonic() - self._updated_at < self.refresh_seconds:
+                return 0
+            started = time.perf_counter()
+            self.file_index.refresh(force=force)
+            candidates = self.file_index.files(pattern=self._pattern)
+            if paths is None:
+                known = {path: (file_id, mtime_ns, size) for file_id, path, mtime_ns, size in self._connection.execute("SELECT id, path, mtime_ns, size FROM files")}
+            else:
+                wanted = set(paths)
+                candidates = [path for path in candidates if path in wanted]
+                known = self._known(wanted)
+
+            current: Set[str] = set()
+            changed: List[ChangedFile] = []
+            for path in candidates:
+                try:
+                    stat = os.stat(os.path.join(self.root, path))
+                except OSError:
+                    continue
+                if not self._accepts(stat):
+                    continue
+                current.add(path)
+                entry = known.get(path)
+                if entry is None or entry[1:] != (stat.st_mtime_ns, stat.st_size):
+                    changed.append((path, stat.st_mtime_ns, stat.st_size))
+            removed = [entry[0] for path, entry in known.items() if path not in current]
+
+            self._apply(changed, removed)
+
+            self._updated_at = time.monotonic()
+            if changed or removed:
+                logger.info(
+                    "%s of %s: %d files indexed, %d removed in %.0f ms",
+                    self._label, self.root, len(changed), len(removed), (time.perf_counter() - started) * 1000,
+                )
+            return len(changed) + len(removed)
+
+    def on_sync(self, result: GitSyncResult) -> None:
+        """Git sync listener: only the files changed by the pull are checked."""
+        if result.repo_path == self.root:
+            self.update(force=True, paths=result.paths)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _accepts(self, stat: os.stat_result) -> bool:
+        """Whether a file of the pattern is indexed at all."""
+        return True
+
+    def _apply(self, changed: List[ChangedFile], removed: List[int]) -> None:
+        """Index the changed files again and delete the rows of the removed file ids (called with the lock held)."""
+        raise NotImplementedError
+
+    def _known(self, paths: Set[str]) -> Dict[str, tuple]:
+        known = {}
+        names = list(paths)
+        for start in range(0, len(names), _KNOWN_BATCH):
+            batch = names[start:start + _KNOWN_BATCH]
+            rows = self._connection.execute(
+                f"SELECT id, path, mtime_ns, size FROM files WHERE path IN ({','.join('?' * len(batch))})", batch
+            ).fetchall()
+            known.update({path: (file_id, mtime_ns, size) for file_id, path, mtime_ns, size in rows})
+        return known
@@ -0,0 +1,278 @@
+import ast
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, TypeVar, Union
+
+from buildgentic.code_operations.git_sync import GitSyncResult, subscribe
+from buildgentic.storage.sqlite import connect
+
+
+logger = logging.getLogger(__name__)
+
+
+# Python summary configuration - Global Variables from .env file
+PYTHON_SUMMARY_CACHE_PATH = os.getenv("PYTHON_SUMMARY_CACHE_PATH", "data/python_summaries.db")
+# Processes used to summarize many files at once (0 = one per CPU)
+PYTHON_SUMMARY_WORKERS = int(os.getenv("PYTHON_SUMMARY_WORKERS", "0"))
+# Below this number of files to parse, the summaries are computed in the calling process
+PYTHON_SUMMARY_POOL_THRESHOLD = int(os.getenv("PYTHON_SUMMARY_POOL_THRESHOLD", "32"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS summaries (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    summary TEXT NOT NULL
+);
+"""
+
+_INDENT = " " * 4
+
+FunctionNode = Union[ast.FunctionDef, ast.AsyncFunctionDef]
+T = TypeVar("T")
+
+
+def summarize_source(source: Union[str, bytes], filename: str = "<unknown>") -> str:
+    """
+    Outline of a Python module: classes, functions and methods with their signatures.
+
+    Every definition is listed with its decorators, its signature and the first line
+    of its docstring; nested classes and functions are indented below their parent.
+
+    Args:
+        source: Python source code
+        filename: Name used in syntax error messages
+
+    Returns:
+        The outline, one definition per line
+    """
+    try:
+        module = ast.parse(source, filename=filename)
+    except (SyntaxError, ValueError) as e:
+        return f"Could not parse {filename}: {e}"
+
+    lines: List[str] = []
+    docstring = _first_line(ast.get_docstring(module))
+    if docstring:
+        lines.append(f"Module: {docstring}")
+    _summarize_body(module.body, 0, False, lines)
+    return "\n".join(lines)
+
+
+def _summarize_body(body: List[ast.stmt], level: int, in_class: bool, lines: List[str]) -> None:
+    indent = _INDENT * level
+    for node in body:
+        if isinstance(node, ast.ClassDef):
+            for decorator in node.decorator_list:
+                lines.append(f"{indent}@{ast.unparse(decorator)}")
+            bases = [ast.unparse(base) for base in node.bases] + [ast.unparse(keyword) for keyword in node.keywords]
+            lines.append(f"{indent}Class: {node.name}({', '.join(bases)})" if bases else f"{indent}Class: {node.name}")
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            for decorator in node.decorator_list:
+                lines.append(f"{indent}@{ast.unparse(decorator)}")
+            kind = "Method" if in_class else "Function"
+            lines.append(f"{indent}{kind}: {_signature(node)}")
+        else:
+            continue
+        docstring = _first_line(ast.get_docstring(node))
+        if docstring:
+            lines.append(f"{indent}{_INDENT}Documentation: {docstring}")
+        _summarize_body(node.body, level + 1, isinstance(node, ast.ClassDef), lines)
+
+
+def _signature(node: FunctionNode) -> str:
+    prefix = "async " if isinstance(node, ast.AsyncFunctionDef) else ""
+    returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+    return f"{prefix}{node.name}({ast.unparse(node.args)}){returns}"
+
+
+def _first_line(docstring: Optional[str]) -> Optional[str]:
+    if not docstring:
+        return None
+    return docstring.strip().splitlines()[0].strip()
+
+
+def _summarize_path(path: str) -> Optional[Tuple[str, int, int, str]]:
+    """Read and summarize one file (runs in the worker processes); None if it cannot be read, e.g. it was just deleted."""
+    try:
+        stat = os.stat(path)
+        with open(path, "rb") as file:
+            source = file.read()
+    except OSError as e:
+        logger.debug("Python summary of %s skipped: %s", path, e)
+        return None
+    return path, stat.st_mtime_ns, stat.st_size, summarize_source(source, os.path.basename(path))
+
+
+class PythonSummaryCache:
+    """
+    Summaries of Python files kept in SQLite and keyed by (path, mtime, size).
+
+    A file is only parsed again when its modification time or size changes, so the
+    summaries survive restarts and most lookups are a single indexed read. When many
+    files are missing (a whole directory asked for the first time), they are parsed
+    in parallel on a process pool, since ast parsing is CPU bound.
+    """
+
+    def __init__(
+        self,
+        path: str = PYTHON_SUMMARY_CACHE_PATH,
+        workers: int = PYTHON_SUMMARY_WORKERS,
+        pool_threshold: int = PYTHON_SUMMARY_POOL_THRESHOLD,
+    ):
+        """
+        Args:
+            path: SQLite database file (":memory:" to keep the summaries in memory only)
+            workers: Processes the files are spread over (0 = one per CPU, 1 = the calling process);
+            the shared pool itself has PYTHON_SUMMARY_WORKERS processes
+            pool_threshold: Minimum number of files to parse before the pool is used
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.pool_threshold = pool_threshold
+        self._lock = threading.Lock()
+        self._connection = connect(path)
+        self._connection.executescript(_SCHEMA)
+
+    def summarize(self, path: str) -> str:
+        """
+        Summary of one Python file.
+
+        Args:
+            path: File to summarize
+
+        Returns:
+            Outline of the file (see summarize_source)
+
+        Raises:
+            FileNotFoundError: The file does not exist
+        """
+        path = os.path.abspath(path)
+        summaries = self.summarize_many([path])
+        if path not in summaries:
+            raise FileNotFoundError(f"The file {path} does not exist")
+        return summaries[path]
+
+    def summarize_many(self, paths: Iterable[str]) -> Dict[str, str]:
+        """
+        Summaries of several Python files, parsing only the files changed since they were cached.
+
+        Args:
+            paths: Files to summarize
+
+        Returns:
+            Dictionary of absolute path -> outline, in the order of paths; files that do not
+            exist (e.g. deleted by a pull meanwhile) are left out
+        """
+        paths = [os.path.abspath(path) for path in paths]
+        summaries: Dict[str, Optional[str]] = dict.fromkeys(paths)
+        stale: List[str] = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                del summaries[path]
+                continue
+            with self._lock:
+                row = self._connection.execute(
+                    "SELECT summary FROM summaries WHERE path = ? AND mtime_ns = ? AND size = ?",
+                    (path, stat.st_mtime_ns, stat.st_size),
+                ).fetchone()
+            if row is None:
+                stale.append(path)
+            else:
+                summaries[path] = row[0]
+
+        if stale:
+            results = self._parse(stale)
+            for path, result in zip(stale, results):
+                if result is None:
+                    del summaries[path]
+            results = [result for result in results if result is not None]
+            with self._lock, self._connection:
+                self._connection.executemany("INSERT OR REPLACE INTO summaries (path, mtime_ns, size, summary) VALUES (?, ?, ?, ?)", results)
+            for path, _, _, summary in results:
+                summaries[path] = summary
+            logger.debug("Python summaries: %d cached, %d parsed", len(summaries) - len(results), len(results))
+        return summaries
+
+    def on_sync(self, result: GitSyncResult) -> None:
+        """Git sync listener: drop deleted files and summarize again the cached files the pull changed."""
+        if not result.changed_files:
+            return
+        paths = [os.path.join(result.repo_path, changed_file.path) for changed_file in result.changed_files if changed_file.path.endswith(".py")]
+        with self._lock:
+            cached = {
+                row[0] for row in self._connection.execute(
+                    f"SELECT path FROM summaries WHERE path IN ({','.join('?' * len(paths))})", paths
+                )
+            } if paths else set()
+        deleted = [path for path in cached if not os.path.isfile(path)]
+        if deleted:
+            with self._lock, self._connection:
+                self._connection.executemany("DELETE FROM summaries WHERE path = ?", [(path,) for path in deleted])
+        self.summarize_many(path for path in cached if path not in deleted)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _parse(self, paths: List[str]) -> List[Optional[Tuple[str, int, int, str]]]:
+        return map_files(_summarize_path, paths, self.workers, self.pool_threshold)
+
+
+def map_files(function: Callable[[str], T], paths: List[str], workers: int = PYTHON_SUMMARY_WORKERS, pool_threshold: int = PYTHON_SUMMARY_POOL_THRESHOLD) -> List[T]:
+    """
+    Apply a CPU bound function (like an ast parse) to many files, on a process pool when they are many.
+
+    Args:
+        function: Module level function taking a path (it must be picklable)
+        paths: Files to process
+        workers: Processes the files are spread over (0 = one per CPU, 1 = the calling process);
+            the shared pool itself has PYTHON_SUMMARY_WORKERS processes
+        pool_threshold: Minimum number of files before the pool is used
+
+    Returns:
+        Results in the order of paths
+    """
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    if len(paths) < pool_threshold or workers < 2:
+        return [function(path) for path in paths]
+    pool = _get_pool()
+    return list(pool.map(function, paths, chunksize=max(1, len(paths) // (workers * 4))))
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Return the process pool shared by every map_files call, starting it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # spawn: the server process runs threads, which fork() does not copy safely.
+                # Started once, so the interpreters (and their imports) are paid once per process
+                context = multiprocessing.get_context("spawn")
+                _pool = ProcessPoolExecutor(max_workers=PYTHON_SUMMARY_WORKERS or os.cpu_count() or 1, mp_context=context)
+                atexit.register(_pool.shutdown, cancel_futures=True)
+    return _pool
+
+
+_summary_cache: Optional[PythonSummaryCache] = None
+_summary_cache_lock = threading.Lock()
+
+
+def get_python_summary_cache() -> PythonSummaryCache:
+    """Return the process-wide Python summary cache, creating it on first use."""
+    global _summary_cache
+    if _summary_cache is None:
+        with _summary_cache_lock:
+            if _summary_cache is None:
+                _summary_cache = PythonSummaryCache()
+                subscribe(_summary_cache.on_sync)
+    return _summary_cache
@@ -0,0 +1,320 @@
+import ast
+import logging
+import os
+import threading
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from buildgentic.code_operations.file_index import FILE_INDEX_REFRESH_SECONDS, FileIndex, get_file_index
+from buildgentic.code_operations.git_sync import subscribe
+from buildgentic.code_operations.incremental_index import ChangedFile, IncrementalIndex
+from buildgentic.code_operations.python_summary import map_files
+
+
+logger = logging.getLogger(__name__)
+
+
+# Symbol index configuration - Global Variables from .env file
+SYMBOL_INDEX_DIR = os.getenv("SYMBOL_INDEX_DIR", "data/symbols")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS symbols (
+    file_id INTEGER NOT NULL REFERENCES files (id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    qualname TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    scope TEXT NOT NULL,
+    detail TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS symbols_name ON symbols (name, kind);
+CREATE INDEX IF NOT EXISTS symbols_qualname ON symbols (qualname);
+CREATE INDEX IF NOT EXISTS symbols_file_id ON symbols (file_id);
+"""
+
+# Kinds of symbol rows
+DEFINITION_KINDS = ("class", "function", "method", "variable")
+IMPORT = "import"
+CALL = "call"
+
+MODULE_SCOPE = "<module>"
+
+
+class Symbol(NamedTuple):
+    """One definition, import or call site found in a Python file."""
+    path: str
+    kind: str
+    name: str
+    qualname: str
+    line: int
+    scope: str
+    detail: str
+
+
+# kind, name, qualname, line, scope, detail
+SymbolRow = Tuple[str, str, str, int, str, str]
+
+
+class _SymbolCollector(ast.NodeVisitor):
+    """Collects the symbol rows of a module, tracking the enclosing class and function."""
+
+    def __init__(self):
+        self.rows: List[SymbolRow] = []
+        self._scope: List[Tuple[str, bool]] = []
+
+    @property
+    def _qualname_prefix(self) -> str:
+        return ".".join(name for name, _ in self._scope)
+
+    @property
+    def _current_scope(self) -> str:
+        return self._qualname_prefix or MODULE_SCOPE
+
+    def _qualname(self, name: str) -> str:
+        return f"{self._qualname_prefix}.{name}" if self._scope else name
+
+    def _add(self, kind: str, name: str, line: int, detail: str, qualname: Optional[str] = None) -> None:
+        self.rows.append((kind, name, qualname or self._qualname(name), line, self._current_scope, detail))
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        bases = ", ".join(ast.unparse(base) for base in node.bases)
+        self._add("class", node.name, node.lineno, f"class {node.name}({bases})" if bases else f"class {node.name}")
+        for expression in [*node.decorator_list, *node.bases, *node.keywords]:
+            self.visit(expression)
+        self._visit_scope(node, is_class=True)
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        self._visit_function(node)
+
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> None:
+        self._visit_function(node)
+
+    def _visit_function(self, node) -> None:
+        in_class = bool(self._scope) and self._scope[-1][1]
+        prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+        returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+        self._add("method" if in_class else "function", node.name, node.lineno, f"{prefix} {node.name}({ast.unparse(node.args)}){returns}")
+        for decorator in node.decorator_list:
+            self.visit(decorator)
+        self._visit_scope(node, is_class=False)
+
+    def _visit_scope(self, node, is_class: bool) -> None:
+        self._scope.append((node.name, is_class))
+        for child in node.body:
+            self.visit(child)
+        self._scope.pop()
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            name = alias.asname or alias.name.split(".")[-1]
+            detail = f"import {alias.name} as {alias.asname}" if alias.asname else f"import {alias.name}"
+            self._add(IMPORT, name, node.lineno, detail, qualname=alias.name)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        module = "." * node.level + (node.module or "")
+        for alias in node.names:
+            detail = f"from {module} import {alias.name}" + (f" as {alias.asname}" if alias.asname else "")
+            self._add(IMPORT, alias.asname or alias.name, node.lineno, detail, qualname=f"{module}.{alias.name}")
+
+    def visit_Assign(self, node: ast.Assign) -> None:
+        self._add_variables(node.targets, node.lineno)
+        self.generic_visit(node)
+
+    def visit_AnnAssign(self, node: ast.AnnAssign) -> None:
+        self._add_variables([node.target], node.lineno)
+        self.generic_visit(node)
+
+    def _add_variables(self, targets: List[ast.expr], line: int) -> None:
+        # Only module and class attributes are definitions worth finding; locals are not
+        if self._scope and not self._scope[-1][1]:
+            return
+        for target in targets:
+            for name in _target_names(target):
+                self._add("variable", name, line, ast.unparse(target))
+
+    def visit_Call(self, node: ast.Call) -> None:
+        if isinstance(node.func, ast.Name):
+            name = node.func.id
+        elif isinstance(node.func, ast.Attribute):
+            name = node.func.attr
+        else:
+            name = None
+        if name:
+            self.rows.append((CALL, name, ast.unparse(node.func), node.lineno, self._current_scope, ast.unparse(node.func)))
+        self.generic_visit(node)
+
+
+def _target_names(target: ast.expr) -> Iterator[str]:
+    """Names bound by an assignment target; subscripts and attributes (os.environ["X"] = ...) bind none."""
+    if isinstance(target, ast.Name):
+        yield target.id
+    elif isinstance(target, (ast.Tuple, ast.List)):
+        for element in target.elts:
+            yield from _target_names(element)
+    elif isinstance(target, ast.Starred):
+        yield from _target_names(target.value)
+
+
+def extract_symbols(source: Union[str, bytes], filename: str = "<unknown>") -> List[SymbolRow]:
+    """
+    Definitions, imports and call sites of a Python module.
+
+    Args:
+        source: Python source code
+        filename: Name used in syntax error messages
+
+    Returns:
+        Rows of (kind, name, qualname, line, enclosing scope, detail); empty if the file does not parse
+    """
+    try:
+        module = ast.parse(source, filename=filename)
+    except (SyntaxError, ValueError) as e:
+        logger.debug("Symbols of %s skipped: %s", filename, e)
+        return []
+    collector = _SymbolCollector()
+    collector.visit(module)
+    return collector.rows
+
+
+def _extract_path(path: str) -> Optional[Tuple[str, int, int, List[SymbolRow]]]:
+    """Read one file and extract its symbols (runs in the worker processes); None if it cannot be read, e.g. it was just deleted."""
+    try:
+        stat = os.stat(path)
+        with open(path, "rb") as file:
+            source = file.read()
+    except OSError as e:
+        logger.debug("Symbols of %s skipped: %s", path, e)
+        return None
+    return path, stat.st_mtime_ns, stat.st_size, extract_symbols(source, os.path.basename(path))
+
+
+class SymbolIndex(IncrementalIndex):
+    """
+    Cross-reference table of the Python files of a repository, kept in SQLite.
+
+    Every file is parsed with ast into its definitions (classes, functions, methods,
+    module and class variables), imports and call sites, each with its line and the
+    function or class it belongs to. A file is parsed again only when its mtime or
+    size changes; the first build runs on a process pool. Queries such as "where is
+    X defined" or "who calls X" are single indexed lookups.
+
+    Calls are matched by name: without type inference, "client.request(...)" is a
+    call of every "request" method.
+    """
+
+    _schema = _SCHEMA
+    _label = "Symbol index"
+    _pattern = "*.py"
+
+    def __init__(self, file_index: FileIndex, cache_dir: Optional[str] = SYMBOL_INDEX_DIR, refresh_seconds: float = FILE_INDEX_REFRESH_SECONDS):
+        """
+        Args:
+            file_index: Index of the files of the repository
+            cache_dir: Directory of the SQLite table (None = in memory)
+            refresh_seconds: Seconds queries trust the table before checking for changed files
+        """
+        super().__init__(file_index, cache_dir, refresh_seconds)
+
+    def definitions(self, name: str, limit: int = 50) -> List[Symbol]:
+        """
+        Where a symbol is defined.
+
+        Args:
+            name: Short name ("request") or qualified name ("AzureDevOpsClient.request")
+
+        Returns:
+            Definitions sorted by path and line
+        """
+        kinds = ",".join("?" * len(DEFINITION_KINDS))
+        column = "qualname" if "." in name else "name"
+        return self._query(f"{column} = ? AND kind IN ({kinds})", (name, *DEFINITION_KINDS), limit)
+
+    def callers(self, name: str, limit: int = 50) -> List[Symbol]:
+        """
+        Call sites of a function or method (matched by its short name).
+
+        Args:
+            name: Short or qualified name; only the last part is used
+
+        Returns:
+            Calls sorted by path and line, with the calling function in scope
+        """
+        return self._query("name = ? AND kind = ?", (name.split(".")[-1], CALL), limit)
+
+    def imports(self, name: str, limit: int = 50) -> List[Symbol]:
+        """
+        Modules that import a name (as "import name", "from x import name" or an alias of it).
+
+        Args:
+            name: Imported name, or a dotted module path
+
+        Returns:
+            Imports sorted by path and line
+        """
+        short = name.split(".")[-1]
+        suffix = "%." + short.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return self._query("kind = ? AND (name = ? OR qualname = ? OR qualname LIKE ? ESCAPE '\\')", (IMPORT, short, name, suffix), limit)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            files, symbols = self._connection.execute("SELECT (SELECT COUNT(*) FROM files), (SELECT COUNT(*) FROM symbols)").fetchone()
+        return {"files": files, "symbols": symbols}
+
+    def _apply(self, changed: List[ChangedFile], removed: List[int]) -> None:
+        paths = [path for path, _, _ in changed]
+        results = map_files(_extract_path, [os.path.join(self.root, path) for path in paths])
+        with self._connection:
+            self._connection.executemany("DELETE FROM files WHERE id = ?", [(file_id,) for file_id in removed])
+            self._connection.executemany("DELETE FROM files WHERE path = ?", [(path,) for path in paths])
+            for path, result in zip(paths, results):
+                # Deleted since the update listed it: the next update forgets it
+                if result is None:
+                    continue
+                _, mtime_ns, size, rows = result
+                file_id = self._connection.execute(
+                    "INSERT INTO files (path, mtime_ns, size) VALUES (?, ?, ?)", (path, mtime_ns, size)
+                ).lastrowid
+                self._connection.executemany(
+                    "INSERT INTO symbols (file_id, kind, name, qualname, line, scope, detail) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(file_id, *row) for row in rows],
+                )
+
+    def _query(self, where: str, params: tuple, limit: int) -> List[Symbol]:
+        self.update()
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT f.path, s.kind, s.name, s.qualname, s.line, s.scope, s.detail FROM symbols s JOIN files f ON f.id = s.file_id "
+                f"WHERE {where} ORDER BY f.path, s.line LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+        return [Symbol(*row) for row in rows]
+
+
+_symbol_indexes: Dict[str, SymbolIndex] = {}
+_symbol_indexes_lock = threading.Lock()
+
+
+def get_symbol_index(root: Optional[str] = None) -> SymbolIndex:
+    """
+    Return the process-wide symbol index of a repository, creating it on first use.
+
+    Args:
+        root: Repository directory (defaults to the REPO_PATH2 environment variable)
+
+    Returns:
+        SymbolIndex of the repository
+    """
+    file_index = get_file_index(root)
+    index = _symbol_indexes.get(file_index.root)
+    if index is None:
+        with _symbol_indexes_lock:
+            index = _symbol_indexes.get(file_index.root)
+            if index is None:
+                index = _symbol_indexes[file_index.root] = SymbolIndex(file_index, cache_dir=SYMBOL_INDEX_DIR)
+                subscribe(index.on_sync)
+    return index
@@ -0,0 +1,430 @@
+import fcntl
+import hashlib
+import itertools
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+from buildgentic.code_operations.git_sync import GIT_SYNC_TIMEOUT, GitError
+
+
+logger = logging.getLogger(__name__)
+
+
+# Worktree pool configuration - Global Variables from .env file
+WORKTREE_POOL_DIR = os.getenv("WORKTREE_POOL_DIR", "data/worktrees")
+# Idle worktrees kept checked out, ready for the next task
+WORKTREE_POOL_SIZE = int(os.getenv("WORKTREE_POOL_SIZE", "2"))
+# Worktrees at most (idle and in use); further tasks wait for one to be released
+WORKTREE_POOL_MAX = int(os.getenv("WORKTREE_POOL_MAX", "8"))
+WORKTREE_ACQUIRE_TIMEOUT = float(os.getenv("WORKTREE_ACQUIRE_TIMEOUT", "300"))
+# Seconds a task waiting for input keeps its worktree (0 = until the pool is full)
+WORKTREE_PAUSED_TTL = float(os.getenv("WORKTREE_PAUSED_TTL", "3600"))
+# Commit of the main checkout new tasks start from (resolved on every acquire, so it follows git_pull)
+WORKTREE_BASE_REF = os.getenv("WORKTREE_BASE_REF", "HEAD")
+
+
+class Worktree(NamedTuple):
+    """Checkout of the repository lent to one task."""
+    path: str
+    task_id: str
+    branch: Optional[str]
+
+
+# Worktree of the task being executed; the code operations work in it instead of REPO_PATH2
+_current_worktree: ContextVar[Optional[Worktree]] = ContextVar("current_worktree", default=None)
+
+
+def current_worktree() -> Optional[Worktree]:
+    return _current_worktree.get()
+
+
+def current_repo_path() -> Optional[str]:
+    """Checkout the code operations work in: the worktree of the current task, else REPO_PATH2."""
+    worktree = _current_worktree.get()
+    return worktree.path if worktree else os.getenv("REPO_PATH2")
+
+
+@contextmanager
+def use_worktree(worktree: Optional[Worktree]) -> Iterator[Optional[Worktree]]:
+    """Make worktree the checkout of the code operations called in this context (tasks and threads started from it included)."""
+    token = _current_worktree.set(worktree)
+    try:
+        yield worktree
+    finally:
+        _current_worktree.reset(token)
+
+
+class WorktreePool:
+    """
+    Pool of git worktrees of one repository, lent to tasks that must not share a checkout.
+
+    Worktrees share the object store of the main checkout, so a new one costs a
+    checkout, not a clone. A few idle worktrees are kept ready (size); an acquired
+    worktree is forced onto the requested branch, or onto the current commit of
+    the main checkout. On release its changes are discarded (ignored files such as
+    node_modules or virtual environments are kept, so the next task starts warm) and
+    it goes back to the idle worktrees, or is removed when enough are idle. Branches
+    created by a task are kept.
+
+    A pool holds an exclusive lock on its directory for as long as it lives. Worktrees
+    left in the directory by a process that is gone are adopted at start; when another
+    live process holds the lock (a child process inheriting WORKER_INDEX, say), the pool
+    takes the next free directory (pool_dir.1, pool_dir.2...) and leaves those alone.
+
+    A task waiting for input keeps its worktree (pause), but not forever: after
+    paused_ttl seconds, or as soon as the pool is full and another task needs one,
+    the worktree of the task paused first is taken back. A task resumed after that
+    starts again from its branch.
+    """
+
+    def __init__(
+        self,
+        repo_path: str,
+        pool_dir: str = WORKTREE_POOL_DIR,
+        size: int = WORKTREE_POOL_SIZE,
+        max_worktrees: int = WORKTREE_POOL_MAX,
+        base_ref: str = WORKTREE_BASE_REF,
+        paused_ttl: float = WORKTREE_PAUSED_TTL,
+    ):
+        """
+        Args:
+            repo_path: Main checkout of the repository
+            pool_dir: Directory of the worktrees (one sub-directory per repository and process)
+            size: Idle worktrees kept ready
+            max_worktrees: Worktrees at most, idle and in use
+            base_ref: Commit of the main checkout new tasks start from
+            paused_ttl: Seconds a paused task keeps its worktree (0 = until the pool is full)
+        """
+        self.repo_path = os.path.abspath(repo_path)
+        digest = hashlib.sha1(self.repo_path.encode("utf-8")).hexdigest()[:8]
+        self.pool_dir, self._lock_file = self._claim_dir(os.path.join(os.path.abspath(pool_dir), f"{os.path.basename(self.repo_path)}-{digest}"))
+        self.size = size
+        self.max_worktrees = max(max_worktrees, 1)
+        self.base_ref = base_ref
+        self.paused_ttl = paused_ttl
+        self._condition = threading.Condition()
+        self._idle: List[str] = []
+        self._assigned: Dict[str, Worktree] = {}
+        # Tasks waiting for input -> monotonic time they were paused at
+        self._paused: Dict[str, float] = {}
+        # Worktrees being created, reset or removed
+        self._pending = 0
+        self._names = itertools.count()
+        self._adopt()
+
+    @property
+    def total(self) -> int:
+        """Worktrees idle, in use, or being created or removed."""
+        with self._condition:
+            return self._count()
+
+    @property
+    def idle(self) -> int:
+        with self._condition:
+            return len(self._idle)
+
+    def assigned(self) -> Dict[str, Worktree]:
+        """Worktrees in use, by task id."""
+        with self._condition:
+            return dict(self._assigned)
+
+    def acquire(self, task_id: str, branch: Optional[str] = None, timeout: float = WORKTREE_ACQUIRE_TIMEOUT) -> Worktree:
+        """
+        Lend a worktree to a task; a task that already has one gets it back unchanged.
+
+        Args:
+            task_id: Task the worktree is lent to
+            branch: Branch to check out, created from the base commit if it does not exist
+                (default: the base commit, detached)
+            timeout: Seconds to wait when max_worktrees are in use by running tasks
+
+        Returns:
+            The worktree of the task
+
+        Raises:
+            TimeoutError: No worktree was released in time
+            GitError: The worktree could not be created or checked out
+        """
+        self._release_expired()
+        deadline = time.monotonic() + timeout
+        reclaimed = False
+        with self._condition:
+            while True:
+                if task_id in self._assigned:
+                    self._paused.pop(task_id, None)
+                    return self._assigned[task_id]
+                if self._idle:
+                    path, create = self._idle.pop(), False
+                    break
+                if len(self._assigned) + self._pending < self.max_worktrees:
+                    path, create = self._new_path(), True
+                    self._pending += 1
+                    break
+                if self._paused:
+                    paused_task = min(self._paused, key=self._paused.get)
+                    del self._paused[paused_task]
+                    path, create, reclaimed = self._assigned.pop(paused_task).path, False, True
+                    # Counted as pending until it is lent again, like a new worktree
+                    self._pending += 1
+                    logger.warning("Worktree %s of paused task %s given to task %s: the pool is full", path, paused_task, task_id)
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No worktree of {self.repo_path} available after {timeout}s ({self.max_worktrees} in use)")
+                self._condition.wait(remaining)
+
+        try:
+            if create:
+                self._create(path)
+            elif reclaimed:
+                self._reset(path)
+            self._checkout(path, branch)
+        except Exception:
+            if create or reclaimed:
+                self._remove(path)
+            with self._condition:
+                if create or reclaimed:
+                    self._pending -= 1
+                else:
+                    self._idle.append(path)
+                self._condition.notify()
+            raise
+
+        worktree = Worktree(path, task_id, branch)
+        with self._condition:
+            if create or reclaimed:
+                self._pending -= 1
+            self._assigned[task_id] = worktree
+        logger.info("Worktree %s lent to task %s (%s)", path, task_id, branch or "detached")
+        return worktree
+
+    def pause(self, task_id: str) -> None:
+        """Keep the worktree of a task waiting for input, until it is resumed or taken back."""
+        with self._condition:
+            if task_id in self._assigned:
+                self._paused[task_id] = time.monotonic()
+                # A task waiting for a worktree may take this one now
+                self._condition.notify()
+
+    def release(self, task_id: str) -> None:
+        """Discard the changes of the worktree of a task and return it to the pool."""
+        with self._condition:
+            self._paused.pop(task_id, None)
+            worktree = self._assigned.pop(task_id, None)
+            if worktree is None:
+                return
+            # Still counted while it is reset or removed, so max_worktrees is never exceeded
+            self._pending += 1
+        self._return(worktree)
+
+    def release_paused(self, task_id: str) -> None:
+        """Release the worktree of a task only if it is waiting for input, not while the task runs."""
+        with self._condition:
+            if task_id not in self._paused:
+                return
+        self.release(task_id)
+
+    def warm(self) -> int:
+        """
+        Create idle worktrees until size are ready.
+
+        Returns:
+            Number of worktrees created
+        """
+        created = 0
+        while True:
+            with self._condition:
+                if len(self._idle) + self._pending >= self.size or self._count() >= self.max_worktrees:
+                    return created
+                path = self._new_path()
+                self._pending += 1
+            try:
+                self._create(path)
+            except GitError:
+                self._remove(path)
+                with self._condition:
+                    self._pending -= 1
+                raise
+            with self._condition:
+                self._pending -= 1
+                self._idle.append(path)
+                self._condition.notify()
+            created += 1
+
+    def warm_in_background(self) -> threading.Thread:
+        """Start creating the idle worktrees in a daemon thread."""
+        def warm():
+            try:
+                logger.info("Worktree pool of %s: %d worktrees created", self.repo_path, self.warm())
+            except GitError as e:
+                logger.warning("Could not warm the worktree pool of %s: %s", self.repo_path, e)
+
+        thread = threading.Thread(target=warm, name="warm-worktree-pool", daemon=True)
+        thread.start()
+        return thread
+
+    def close(self) -> None:
+        """Remove every worktree of the pool, idle or in use."""
+        with self._condition:
+            paths = self._idle + [worktree.path for worktree in self._assigned.values()]
+            self._idle, self._assigned, self._paused = [], {}, {}
+        for path in paths:
+            self._remove(path)
+        self._lock_file.close()
+
+    def _release_expired(self) -> None:
+        if not self.paused_ttl:
+            return
+        with self._condition:
+            expired = [task_id for task_id, paused_at in self._paused.items() if time.monotonic() - paused_at >= self.paused_ttl]
+            worktrees = [self._assigned.pop(task_id) for task_id in expired]
+            for task_id in expired:
+                del self._paused[task_id]
+            self._pending += len(worktrees)
+        for worktree in worktrees:
+            logger.info("Worktree of task %s taken back: paused for more than %ss", worktree.task_id, self.paused_ttl)
+            self._return(worktree)
+
+    def _return(self, worktree: Worktree) -> None:
+        try:
+            self._reset(worktree.path)
+            clean = True
+        except GitError as e:
+            logger.warning("Could not reset worktree %s: %s", worktree.path, e)
+            clean = False
+        with self._condition:
+            keep = clean and len(self._idle) < self.size
+            if keep:
+                self._idle.append(worktree.path)
+        if not keep:
+            self._remove(worktree.path)
+        with self._condition:
+            self._pending -= 1
+            self._condition.notify()
+
+    def _count(self) -> int:
+        return len(self._idle) + len(self._assigned) + self._pending
+
+    def _new_path(self) -> str:
+        while True:
+            path = os.path.join(self.pool_dir, f"wt-{next(self._names)}")
+            if not os.path.exists(path):
+                return path
+
+    def _git(self, cwd: str, *args: str) -> str:
+        try:
+            result = subprocess.run(["git", *args], cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=GIT_SYNC_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            raise GitError(f"git {' '.join(args)} timed out after {GIT_SYNC_TIMEOUT}s")
+        if result.returncode != 0:
+            raise GitError(f"git {' '.join(args)} failed: {result.stderr.decode('utf-8', errors='replace').strip()}")
+        return result.stdout.decode("utf-8", errors="surrogateescape")
+
+    def _base(self) -> str:
+        return self._git(self.repo_path, "rev-parse", "--verify", f"{self.base_ref}^{{commit}}").strip()
+
+    @staticmethod
+    def _claim_dir(base_dir: str) -> Tuple[str, TextIO]:
+        """Lock the first directory of base_dir, base_dir.1, base_dir.2... no live process holds."""
+        for number in itertools.count():
+            path = base_dir if number == 0 else f"{base_dir}.{number}"
+            os.makedirs(path, exist_ok=True)
+            lock_file = open(os.path.join(path, ".lock"), "w")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                continue
+            if number:
+                logger.info("Worktree pool directory %s is in use by another process, using %s", base_dir, path)
+            return path, lock_file
+
+    def _adopt(self) -> None:
+        # Called with the lock of pool_dir held: its worktrees belong to no live process
+        self._git(self.repo_path, "worktree", "prune")
+        listing = self._git(self.repo_path, "worktree", "list", "--porcelain")
+        for line in listing.splitlines():
+            if not line.startswith("worktree "):
+                continue
+            path = os.path.abspath(line[len("worktree "):])
+            if os.path.dirname(path) != self.pool_dir:
+                continue
+            try:
+                self._reset(path)
+            except GitError as e:
+                logger.warning("Removing worktree %s left by a previous run: %s", path, e)
+                self._remove(path)
+                continue
+            if len(self._idle) < self.max_worktrees:
+                self._idle.append(path)
+            else:
+                self._remove(path)
+        if self._idle:
+            logger.info("Worktree pool of %s: %d worktrees adopted", self.repo_path, len(self._idle))
+
+    def _create(self, path: str) -> None:
+        self._git(self.repo_path, "worktree", "add", "--quiet", "--detach", path, self._base())
+
+    def _checkout(self, path: str, branch: Optional[str]) -> None:
+        base = self._base()
+        if branch is None:
+            self._git(path, "checkout", "--quiet", "--force", "--detach", base)
+        elif self._git(path, "branch", "--list", branch).strip():
+            self._git(path, "checkout", "--quiet", "--force", branch)
+        else:
+            self._git(path, "checkout", "--quiet", "--force", "-b", branch, base)
+
+    def _reset(self, path: str) -> None:
+        # -x is not passed: ignored files (dependencies, build caches) keep the worktree warm
+        self._git(path, "reset", "--quiet", "--hard")
+        self._git(path, "clean", "--quiet", "-fd")
+        # Detached, so the branch of the task can be checked out by its next task
+        self._git(path, "checkout", "--quiet", "--detach")
+
+    def _remove(self, path: str) -> None:
+        try:
+            self._git(self.repo_path, "worktree", "remove", "--force", path)
+        except GitError:
+            shutil.rmtree(path, ignore_errors=True)
+            try:
+                self._git(self.repo_path, "worktree", "prune")
+            except GitError as e:
+                logger.warning("Could not prune the worktrees of %s: %s", self.repo_path, e)
+
+
+_worktree_pools: Dict[str, WorktreePool] = {}
+_worktree_pools_lock = threading.Lock()
+
+
+def get_worktree_pool(repo_path: Optional[str] = None) -> WorktreePool:
+    """
+    Return the process-wide worktree pool of a repository, creating it on first use.
+
+    Args:
+        repo_path: Main checkout (defaults to the REPO_PATH2 environment variable)
+
+    Returns:
+        WorktreePool of the repository
+    """
+    repo_path = repo_path or os.getenv("REPO_PATH2")
+    if not repo_path:
+        raise ValueError("Environment variable 'REPO_PATH2' is not set")
+    key = os.path.abspath(repo_path)
+    pool = _worktree_pools.get(key)
+    if pool is None:
+        with _worktree_pools_lock:
+            pool = _worktree_pools.get(key)
+            if pool is None:
+                pool_dir = WORKTREE_POOL_DIR
+                # Every worker of a multi-process server (see buildgentic.workers) has worktrees of its own
+                if os.getenv("WORKER_INDEX"):
+                    pool_dir = os.path.join(pool_dir, f"worker-{os.getenv('WORKER_INDEX')}")
+                pool = _worktree_pools[key] = WorktreePool(key, pool_dir=pool_dir)
+    return pool
@@ -1,27 +1,32 @@
 from google.adk.agents.llm_agent import Agent
-from google.adk.models.lite_llm import LiteLlm
 
 from a2a.types import AgentCapabilities, AgentCard, AgentSkill, TransportProtocol
 
+from buildgentic.code_operations.filesystem_resolver import find_symbol, search_code
+from buildgentic.llm import get_llm
 from buildgentic.tools.tools_azureDevOps import load_context
 
 
-
-manager_context = load_context("Anna")
-
 def get_developer_agent(model_name) -> Agent:
     """Creates and returns the developer agent."""
+    manager_context = load_context("Anna")
 
     return Agent(
-        model=LiteLlm(model=model_name),
+        model=get_llm(model_name, 'developer'),
         name='developer',
         description=manager_context['description'],
         instruction=manager_context['instruction'],
+        tools=[
+            search_code,
+            find_symbol
+        ],
     )
 
 
 def get_developer_agent_card(agent_url: str) -> AgentCard:
     """Creates and returns the developer agent card."""
+    manager_context = load_context("Anna")
+
     return AgentCard(
         name="Developer Agent",
         description=manager_context['description'],
@@ -42,4 +47,9 @@ def get_developer_agent_card(agent_url: str) -> AgentCard:
     )
 
 
-root_agent = get_developer_agent("openai/gpt-4o")
+def __getattr__(name):
+    # ADK tooling (adk web / adk run) looks up root_agent; build it on first access
+    # instead of at import time so importing this module does not hit the wiki.
+    if name == "root_agent":
+        return get_developer_agent("openai/gpt-4o")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,639 @@
+"""
+Event-driven ticket intake.
+
+Azure DevOps service hooks (work item created, updated or commented) are posted to
+POST /hooks/azure-devops. The events about work items assigned to AZURE_DEVOPS_USER_EMAIL
+are stored in a durable queue (SQLite, shared by the workers of the server) and a
+dispatcher running in every worker sends them to the agent in charge, so work starts
+seconds after a ticket changes instead of waiting for a WIQL query over the project.
+
+Recorded events can be fed to a server for testing:
+
+    python -m buildgentic.intake replay events.jsonl --url http://localhost:8008/a2a/hooks/azure-devops
+    python -m buildgentic.intake export > events.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+import httpx
+from a2a.client.client import ClientConfig
+from a2a.types import AgentCard, Message, Part, Role, Task, TaskState, TextPart, TransportProtocol
+
+from buildgentic.a2a_local import A2A_CLIENT_TIMEOUT, LocalAgentClientFactory, local_agents
+from buildgentic.a2a_remote import agent_directory
+from buildgentic.limits import PRIORITY_HEADER
+from buildgentic.storage.sqlite import connect
+from buildgentic.tools.tools_azureDevOps import AZURE_DEVOPS_PROJECT, AZURE_DEVOPS_USER_EMAIL, SUPPORTED_WORK_ITEM_TYPES
+
+
+logger = logging.getLogger(__name__)
+
+
+# Ticket intake configuration - Global Variables from .env file
+# Dispatch the queued service hook events to the agents from this process
+TICKET_INTAKE = os.getenv("TICKET_INTAKE", "true").lower() in ("1", "true", "yes")
+TICKET_INTAKE_PATH = os.getenv("TICKET_INTAKE_PATH", "data/ticket_events.db")
+# Agent receiving the tickets no route matches
+TICKET_INTAKE_AGENT = os.getenv("TICKET_INTAKE_AGENT", "manager")
+# Agents by work item type or tag, first match wins ("Bug=qa;security=compliance")
+TICKET_INTAKE_ROUTES = os.getenv("TICKET_INTAKE_ROUTES", "")
+# Shared secret expected in the X-Hook-Secret header of the service hooks (empty = hooks refused)
+TICKET_INTAKE_SECRET = os.getenv("TICKET_INTAKE_SECRET", "")
+# Accept service hooks without any secret when TICKET_INTAKE_SECRET is empty (local testing only:
+# their payload ends up in the prompts of the agents)
+TICKET_INTAKE_ALLOW_UNSIGNED = os.getenv("TICKET_INTAKE_ALLOW_UNSIGNED", "false").lower() in ("1", "true", "yes")
+# Events handled at the same time by the dispatcher of one process
+TICKET_INTAKE_CONCURRENCY = int(os.getenv("TICKET_INTAKE_CONCURRENCY", "2"))
+# Deliveries of an event to its agent before it is given up
+TICKET_INTAKE_MAX_ATTEMPTS = int(os.getenv("TICKET_INTAKE_MAX_ATTEMPTS", "3"))
+# Seconds before a failed delivery is retried (multiplied by the attempts made)
+TICKET_INTAKE_RETRY_DELAY = float(os.getenv("TICKET_INTAKE_RETRY_DELAY", "30"))
+# Seconds between two looks at the queue when no event arrives at this process
+TICKET_INTAKE_POLL_INTERVAL = float(os.getenv("TICKET_INTAKE_POLL_INTERVAL", "2"))
+# Days the handled events are kept (0 = forever)
+TICKET_INTAKE_RETENTION_DAYS = float(os.getenv("TICKET_INTAKE_RETENTION_DAYS", "7"))
+
+SECRET_HEADER = "X-Hook-Secret"
+INTAKE_EVENT_TYPES = ("workitem.created", "workitem.updated", "workitem.commented")
+
+# Seconds after which an event still running was dropped by a worker that died
+_LEASE_SECONDS = A2A_CLIENT_TIMEOUT + 60
+# Renewals of the lease of a running event per lease period
+_LEASE_RENEWALS = 3
+_PURGE_INTERVAL_SECONDS = 3600
+# Seconds the dispatcher waits for the cancelled deliveries when it stops
+_STOP_TIMEOUT_SECONDS = 5
+_PAUSED_OR_DONE = (TaskState.completed, TaskState.input_required, TaskState.auth_required)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ticket_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    event_id TEXT UNIQUE,
+    work_item_id INTEGER NOT NULL,
+    event_type TEXT NOT NULL,
+    agent TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    coalesced INTEGER NOT NULL DEFAULT 0,
+    claim TEXT,
+    not_before REAL NOT NULL,
+    received_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS ticket_events_status ON ticket_events (status, not_before);
+CREATE INDEX IF NOT EXISTS ticket_events_work_item ON ticket_events (work_item_id, status);
+-- Every event id received, those merged into another event included
+CREATE TABLE IF NOT EXISTS ticket_event_ids (
+    event_id TEXT PRIMARY KEY,
+    received_at REAL NOT NULL
+);
+INSERT OR IGNORE INTO ticket_event_ids (event_id, received_at)
+    SELECT event_id, received_at FROM ticket_events WHERE event_id IS NOT NULL;
+"""
+
+
+class TicketEvent(NamedTuple):
+    """A queued service hook event and the agent it goes to."""
+    id: int
+    work_item_id: int
+    event_type: str
+    agent: str
+    payload: Dict[str, Any]
+    attempts: int
+
+
+def parse_routes(value: str) -> List[Tuple[str, str]]:
+    """
+    Parse TICKET_INTAKE_ROUTES.
+
+    Args:
+        value: "key=agent" pairs separated by ";", where key is a work item type or a tag
+
+    Returns:
+        (lowercase key, agent) pairs in the order given
+    """
+    routes = []
+    for item in value.split(";"):
+        if not item.strip():
+            continue
+        key, _, agent = item.partition("=")
+        if not key.strip() or not agent.strip():
+            raise ValueError(f"Invalid TICKET_INTAKE_ROUTES entry '{item}', expected key=agent")
+        routes.append((key.strip().lower(), agent.strip()))
+    return routes
+
+
+def _identity(value: Any) -> str:
+    """Email of an identity field: "Name <email>" in the v1 payloads, an identity object in the newer ones."""
+    if isinstance(value, dict):
+        value = value.get("uniqueName") or value.get("displayName") or ""
+    value = str(value or "")
+    match = re.search(r"<([^>]+)>", value)
+    return (match.group(1) if match else value).strip().lower()
+
+
+def _event_fields(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields of the work item an event is about (updates carry them in their revision)."""
+    resource = event.get("resource") or {}
+    if event.get("eventType") == "workitem.updated":
+        return (resource.get("revision") or {}).get("fields") or {}
+    return resource.get("fields") or {}
+
+
+def _event_work_item_id(event: Dict[str, Any]) -> Optional[int]:
+    resource = event.get("resource") or {}
+    work_item_id = resource.get("workItemId") or resource.get("id")
+    return int(work_item_id) if work_item_id is not None else None
+
+
+def route_event(
+    event: Dict[str, Any],
+    routes: Optional[List[Tuple[str, str]]] = None,
+    default_agent: str = TICKET_INTAKE_AGENT,
+    assignee: str = AZURE_DEVOPS_USER_EMAIL,
+) -> Tuple[Optional[str], str]:
+    """
+    Agent in charge of a service hook event.
+
+    Only the events about supported work items of the project that are assigned to
+    the user of the agents are taken; the changes made by that user (the agents
+    themselves) are ignored, so their updates never start a new turn.
+
+    Args:
+        event: Service hook payload
+        routes: (lowercase work item type or tag, agent) pairs, TICKET_INTAKE_ROUTES by default
+        default_agent: Agent receiving the events no route matches
+        assignee: Email of the user the agents work as
+
+    Returns:
+        (agent, reason): the agent, or None and why the event is ignored
+    """
+    event_type = event.get("eventType")
+    if event_type not in INTAKE_EVENT_TYPES:
+        return None, f"event type {event_type} is not handled"
+    fields = _event_fields(event)
+    project = fields.get("System.TeamProject")
+    if project and project != AZURE_DEVOPS_PROJECT:
+        return None, f"work item of project {project}"
+    work_item_type = fields.get("System.WorkItemType")
+    if work_item_type and work_item_type not in SUPPORTED_WORK_ITEM_TYPES:
+        return None, f"work item type {work_item_type} is not supported"
+    if _identity(fields.get("System.AssignedTo")) != assignee.lower():
+        return None, "work item not assigned to the agents"
+    resource = event.get("resource") or {}
+    if _identity(resource.get("revisedBy") or fields.get("System.ChangedBy")) == assignee.lower():
+        return None, "change made by the agents"
+
+    keys = {str(work_item_type or "").lower()} | {tag.strip().lower() for tag in str(fields.get("System.Tags") or "").split(";") if tag.strip()}
+    for key, agent in parse_routes(TICKET_INTAKE_ROUTES) if routes is None else routes:
+        if key in keys:
+            return agent, f"route {key}"
+    return default_agent, "default agent"
+
+
+def build_message(event: TicketEvent) -> Message:
+    """A2A message telling an agent about a ticket event; the turns about one work item share a context."""
+    fields = _event_fields(event.payload)
+    action = event.event_type.split(".", 1)[1]
+    lines = [
+        f"Work item #{event.work_item_id} ({fields.get('System.WorkItemType', 'work item')} "
+        f"'{fields.get('System.Title', '')}', state {fields.get('System.State', 'unknown')}) was {action} "
+        f"by {_identity(fields.get('System.ChangedBy')) or 'someone'}. It is assigned to you.",
+    ]
+    if event.event_type == "workitem.updated":
+        changed = sorted(((event.payload.get("resource") or {}).get("fields") or {}).keys())
+        if changed:
+            lines.append(f"Changed fields: {', '.join(changed)}.")
+    if event.event_type == "workitem.commented" and fields.get("System.History"):
+        lines.append(f"Comment: {fields['System.History']}")
+    lines.append("Read the work item with get_work_item_details and carry on with it.")
+    return Message(
+        message_id=uuid.uuid4().hex,
+        role=Role.user,
+        parts=[Part(root=TextPart(text="\n".join(lines)))],
+        context_id=f"work-item-{event.work_item_id}",
+        metadata={"work_item_id": event.work_item_id, "event_type": event.event_type, "priority": "low"},
+    )
+
+
+class TicketEventQueue:
+    """
+    Durable queue of service hook events, in a SQLite database shared by the workers.
+
+    - Deduplication: Azure DevOps delivers an event again when a delivery fails; the id
+      of every event received is kept, so a redelivery is dropped even when the first
+      delivery was merged into another event.
+    - Coalescing: an event about a work item that already has an event waiting for the
+      same agent replaces it (the agent reads the current work item anyway), so a burst
+      of updates makes a single turn.
+    - Claims: an event is handed to one dispatcher at a time, and never while another
+      event about the same work item is running. The dispatcher renews the lease of the
+      events it is delivering; events not renewed within the lease (the worker died) are
+      handed out again.
+    """
+
+    def __init__(
+        self,
+        path: str = TICKET_INTAKE_PATH,
+        max_attempts: int = TICKET_INTAKE_MAX_ATTEMPTS,
+        retry_delay: float = TICKET_INTAKE_RETRY_DELAY,
+        retention_days: float = TICKET_INTAKE_RETENTION_DAYS,
+        lease_seconds: float = _LEASE_SECONDS,
+    ):
+        """
+        Args:
+            path: SQLite database file
+            max_attempts: Deliveries of an event before it is given up
+            retry_delay: Seconds before a failed delivery is retried, times the attempts made
+            retention_days: Days the handled events are kept (0 = forever)
+            lease_seconds: Seconds after which a running event is handed out again
+        """
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.retention_days = retention_days
+        self.lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        self._connection = connect(path)
+        self._connection.executescript(_SCHEMA)
+        self._last_purge = 0.0
+
+    def enqueue(self, event: Dict[str, Any], agent: str) -> Optional[int]:
+        """
+        Queue an event for an agent.
+
+        Args:
+            event: Service hook payload about a work item
+            agent: Name of the agent in charge
+
+        Returns:
+            ID of the queued event (the one it was merged into when coalesced), None for a duplicate
+        """
+        work_item_id = _event_work_item_id(event)
+        if work_item_id is None:
+            raise ValueError("Event without work item id")
+        now = time.time()
+        payload = json.dumps(event)
+        with self._lock, self._connection:
+            event_id = event.get("id")
+            if event_id and not self._connection.execute(
+                "INSERT OR IGNORE INTO ticket_event_ids (event_id, received_at) VALUES (?, ?)", (event_id, now)
+            ).rowcount:
+                return None
+            row = self._connection.execute(
+                "SELECT id FROM ticket_events WHERE work_item_id = ? AND agent = ? AND status = 'pending'",
+                (work_item_id, agent),
+            ).fetchone()
+            if row is not None:
+                self._connection.execute(
+                    "UPDATE ticket_events SET event_type = ?, payload = ?, coalesced = coalesced + 1, updated_at = ? WHERE id = ?",
+                    (event["eventType"], payload, now, row[0]),
+                )
+                return row[0]
+            cursor = self._connection.execute(
+                "INSERT INTO ticket_events (event_id, work_item_id, event_type, agent, payload, status, not_before, received_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, 'pending', ?, ?, ?)",
+                (event_id or None, work_item_id, event["eventType"], agent, payload, now, now, now),
+            )
+            self._purge(now)
+            return cursor.lastrowid
+
+    def claim(self) -> Optional[TicketEvent]:
+        """Take the oldest event that can run now, None if there is none."""
+        now = time.time()
+        claim = uuid.uuid4().hex
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE ticket_events SET status = 'pending', claim = NULL WHERE status = 'running' AND updated_at < ?",
+                (now - self.lease_seconds,),
+            )
+            self._connection.execute(
+                "UPDATE ticket_events SET status = 'running', claim = ?, attempts = attempts + 1, updated_at = ? "
+                "WHERE id = (SELECT id FROM ticket_events WHERE status = 'pending' AND not_before <= ? "
+                "AND work_item_id NOT IN (SELECT work_item_id FROM ticket_events WHERE status = 'running') "
+                "ORDER BY id LIMIT 1)",
+                (claim, now, now),
+            )
+            row = self._connection.execute(
+                "SELECT id, work_item_id, event_type, agent, payload, attempts FROM ticket_events WHERE claim = ?", (claim,)
+            ).fetchone()
+        if row is None:
+            return None
+        return TicketEvent(row[0], row[1], row[2], row[3], json.loads(row[4]), row[5])
+
+    def complete(self, event: TicketEvent, error: Optional[str] = None) -> None:
+        """Record the outcome of a delivery: done, or failed for good with error."""
+        self._set(event.id, "failed" if error else "done", error=error)
+
+    def retry(self, event: TicketEvent, error: str) -> None:
+        """Hand a failed delivery out again later, or give it up after max_attempts."""
+        if event.attempts >= self.max_attempts:
+            self._set(event.id, "failed", error=error)
+        else:
+            self._set(event.id, "pending", error=error, not_before=time.time() + self.retry_delay * event.attempts)
+
+    def renew(self, event: TicketEvent) -> bool:
+        """Extend the lease of a running event; False if it is no longer running."""
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "UPDATE ticket_events SET updated_at = ? WHERE id = ? AND status = 'running'",
+                (time.time(), event.id),
+            )
+        return cursor.rowcount > 0
+
+    def release(self, event: TicketEvent) -> None:
+        """Put back an event whose delivery was interrupted, without counting the attempt."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE ticket_events SET status = 'pending', claim = NULL, attempts = attempts - 1, updated_at = ? WHERE id = ? AND status = 'running'",
+                (time.time(), event.id),
+            )
+
+    def _set(self, event_id: int, status: str, error: Optional[str] = None, not_before: Optional[float] = None) -> None:
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE ticket_events SET status = ?, error = ?, claim = NULL, not_before = COALESCE(?, not_before), updated_at = ? WHERE id = ?",
+                (status, error, not_before, now, event_id),
+            )
+
+    def _purge(self, now: float) -> None:
+        if self.retention_days and time.monotonic() - self._last_purge >= _PURGE_INTERVAL_SECONDS:
+            self._connection.execute(
+                "DELETE FROM ticket_events WHERE status IN ('done', 'failed') AND updated_at < ?",
+                (now - self.retention_days * 86400,),
+            )
+            self._connection.execute("DELETE FROM ticket_event_ids WHERE received_at < ?", (now - self.retention_days * 86400,))
+            self._last_purge = time.monotonic()
+
+    def events(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Payloads of the queued events, oldest first."""
+        with self._lock:
+            rows = self._connection.execute("SELECT payload FROM ticket_events ORDER BY id LIMIT ?", (limit if limit else -1,)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        """Events by status, merged events, and age in seconds of the oldest pending event."""
+        with self._lock:
+            counts = dict(self._connection.execute("SELECT status, COUNT(*) FROM ticket_events GROUP BY status").fetchall())
+            coalesced, oldest = self._connection.execute(
+                "SELECT COALESCE(SUM(coalesced), 0), MIN(CASE WHEN status = 'pending' THEN received_at END) FROM ticket_events"
+            ).fetchone()
+        return {
+            **{status: counts.get(status, 0) for status in ("pending", "running", "done", "failed")},
+            "coalesced": coalesced,
+            "oldest_pending_seconds": round(time.time() - oldest, 3) if oldest is not None else 0.0,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class AgentSender:
+    """
+    Sends intake messages to the agents like they call each other: in-process when the
+    agent is mounted in this process, else over HTTP through the agent directory. Calls
+    go in the low priority lane of the agents (see AgentLimiter).
+    """
+
+    def __init__(self):
+        self._factory = LocalAgentClientFactory(
+            config=ClientConfig(
+                httpx_client=httpx.AsyncClient(timeout=httpx.Timeout(timeout=A2A_CLIENT_TIMEOUT), headers={PRIORITY_HEADER: "low"}),
+                streaming=False,
+                polling=False,
+                supported_transports=[TransportProtocol.jsonrpc, TransportProtocol.http_json],
+            )
+        )
+        self._clients: Dict[str, Any] = {}
+
+    async def _card(self, agent: str) -> AgentCard:
+        card = local_agents.get_card(agent)
+        if card is not None:
+            return card
+        async with httpx.AsyncClient(timeout=30) as client:
+            response = await client.get(agent_directory.card_url(agent))
+            response.raise_for_status()
+            return AgentCard.model_validate(response.json())
+
+    async def send(self, agent: str, message: Message) -> Union[Task, Message, None]:
+        """Send a message and wait for the end of the turn (the task, or the reply message)."""
+        client = self._clients.get(agent)
+        if client is None:
+            client = self._clients[agent] = self._factory.create(await self._card(agent))
+        result = None
+        async for result in client.send_message(message):
+            pass
+        return result[0] if isinstance(result, tuple) else result
+
+
+class TicketDispatcher:
+    """
+    Delivers the queued ticket events to their agents.
+
+    Every worker of the server runs one dispatcher on the shared queue. A dispatcher
+    starts as soon as notify() is called by the webhook of its own process, and looks
+    at the queue every poll_interval seconds for the events received by the others.
+    At most concurrency events are delivered at once; a delivery ends with the agent
+    turn. Transport errors are retried; a task that fails is not.
+    """
+
+    def __init__(
+        self,
+        queue: TicketEventQueue,
+        send: Optional[Callable[[str, Message], Awaitable[Union[Task, Message, None]]]] = None,
+        concurrency: int = TICKET_INTAKE_CONCURRENCY,
+        poll_interval: float = TICKET_INTAKE_POLL_INTERVAL,
+    ):
+        """
+        Args:
+            queue: Queue of the events
+            send: Sends a message to an agent and returns the end of the turn (AgentSender().send by default)
+            concurrency: Events delivered at the same time
+            poll_interval: Seconds between two looks at the queue without notification
+        """
+        self.queue = queue
+        self._send = send
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self._wakeup: Optional[asyncio.Event] = None
+        self._runner: Optional[asyncio.Task] = None
+        self._deliveries: Dict[asyncio.Task, TicketEvent] = {}
+
+    def notify(self) -> None:
+        """Look at the queue now (an event was queued)."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        """Start dispatching in the running event loop."""
+        if self._send is None:
+            self._send = AgentSender().send
+        self._wakeup = asyncio.Event()
+        self._runner = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop dispatching; the interrupted deliveries go back to the queue."""
+        if self._runner is not None:
+            self._runner.cancel()
+            await asyncio.gather(self._runner, return_exceptions=True)
+            self._runner = None
+        deliveries = dict(self._deliveries)
+        for task in deliveries:
+            task.cancel()
+        if not deliveries:
+            return
+        # A cancelled agent turn may take long to unwind: its event goes back to the queue anyway
+        _, unfinished = await asyncio.wait(deliveries, timeout=_STOP_TIMEOUT_SECONDS)
+        for task in unfinished:
+            await asyncio.to_thread(self.queue.release, deliveries[task])
+
+    async def _run(self) -> None:
+        slots = asyncio.Semaphore(self.concurrency)
+        while True:
+            await slots.acquire()
+            self._wakeup.clear()
+            try:
+                event = await asyncio.to_thread(self.queue.claim)
+            except Exception:
+                logger.exception("Could not read the ticket event queue")
+                event = None
+            if event is None:
+                slots.release()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            task = asyncio.create_task(self._deliver(event))
+            self._deliveries[task] = event
+            task.add_done_callback(lambda done: self._deliveries.pop(done, None))
+            task.add_done_callback(lambda _: slots.release())
+
+    async def _deliver(self, event: TicketEvent) -> None:
+        logger.info("Sending %s of work item %s to agent '%s' (attempt %d)", event.event_type, event.work_item_id, event.agent, event.attempts)
+        # An agent turn may outlast the lease: keep the event claimed while it runs
+        heartbeat = asyncio.create_task(self._keep_claimed(event))
+        try:
+            result = await self._send(event.agent, build_message(event))
+        except asyncio.CancelledError:
+            await asyncio.to_thread(self.queue.release, event)
+            raise
+        except Exception as e:
+            logger.warning("Delivery of work item %s to agent '%s' failed: %s", event.work_item_id, event.agent, e)
+            await asyncio.to_thread(self.queue.retry, event, f"{type(e).__name__}: {e}")
+            return
+        finally:
+            heartbeat.cancel()
+        error = None
+        if isinstance(result, Task) and result.status.state not in _PAUSED_OR_DONE:
+            error = f"Task {result.id} ended {result.status.state.value}"
+            logger.warning("Agent '%s' did not handle work item %s: %s", event.agent, event.work_item_id, error)
+        await asyncio.to_thread(self.queue.complete, event, error)
+
+    async def _keep_claimed(self, event: TicketEvent) -> None:
+        while True:
+            await asyncio.sleep(self.queue.lease_seconds / _LEASE_RENEWALS)
+            try:
+                if not await asyncio.to_thread(self.queue.renew, event):
+                    return
+            except Exception:
+                logger.exception("Could not renew the lease of work item %s", event.work_item_id)
+
+
+_ticket_event_queue: Optional[TicketEventQueue] = None
+_ticket_event_queue_lock = threading.Lock()
+
+
+def get_ticket_event_queue() -> TicketEventQueue:
+    """Return the ticket event queue of this process, opening it on first use."""
+    global _ticket_event_queue
+    if _ticket_event_queue is None:
+        with _ticket_event_queue_lock:
+            if _ticket_event_queue is None:
+                _ticket_event_queue = TicketEventQueue()
+    return _ticket_event_queue
+
+
+def _read_events(paths: Iterable[str]) -> Iterable[Dict[str, Any]]:
+    """Events of .json files (one event or a list) and .jsonl files (one event per line)."""
+    for path in paths:
+        with open(path, encoding="utf-8") as file:
+            if path.endswith(".jsonl"):
+                for line in file:
+                    if line.strip():
+                        yield json.loads(line)
+                continue
+            content = json.load(file)
+            yield from content if isinstance(content, list) else [content]
+
+
+def replay(paths: Iterable[str], url: str, secret: str = TICKET_INTAKE_SECRET, delay: float = 0.0, client: Optional[httpx.Client] = None) -> List[Dict[str, Any]]:
+    """
+    Post recorded service hook events to a server, like Azure DevOps does.
+
+    Args:
+        paths: Files with the events (.json or .jsonl)
+        url: URL of the webhook (.../hooks/azure-devops)
+        secret: Value of the X-Hook-Secret header (empty = not sent)
+        delay: Seconds between two events
+        client: HTTP client to use
+
+    Returns:
+        The responses of the server
+    """
+    headers = {SECRET_HEADER: secret} if secret else {}
+    http = client or httpx.Client(timeout=30)
+    responses = []
+    try:
+        for index, event in enumerate(_read_events(paths)):
+            if index and delay:
+                time.sleep(delay)
+            response = http.post(url, json=event, headers=headers)
+            response.raise_for_status()
+            responses.append(response.json())
+            logger.info("Replayed %s: %s", event.get("eventType"), response.json())
+    finally:
+        if client is None:
+            http.close()
+    return responses
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Replay recorded service hook events, or export the events of the queue as JSON lines."""
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(prog="python -m buildgentic.intake", description=main.__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+    replay_parser = commands.add_parser("replay", help="post recorded events to the webhook of a server")
+    replay_parser.add_argument("files", nargs="+", help=".json (an event or a list) or .jsonl files")
+    replay_parser.add_argument("--url", default="http://localhost:8008/a2a/hooks/azure-devops")
+    replay_parser.add_argument("--secret", default=TICKET_INTAKE_SECRET)
+    replay_parser.add_argument("--delay", type=float, default=0.0, help="seconds between two events")
+    export_parser = commands.add_parser("export", help="write the events of the queue as JSON lines")
+    export_parser.add_argument("--path", default=TICKET_INTAKE_PATH)
+    export_parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.command == "replay":
+        replay(args.files, args.url, args.secret, args.delay)
+    else:
+        queue = TicketEventQueue(args.path)
+        for event in queue.events(args.limit):
+            sys.stdout.write(json.dumps(event) + "\n")
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import threading
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+# Agent concurrency limits - Global Variables from .env file
+# Tasks an agent executes at once (0 = no limit)
+AGENT_MAX_IN_FLIGHT = int(os.getenv("AGENT_MAX_IN_FLIGHT", "4"))
+# Tasks waiting for a slot; when the queue is full new tasks are refused with 429
+AGENT_QUEUE_SIZE = int(os.getenv("AGENT_QUEUE_SIZE", "16"))
+# Seconds a refused client is asked to wait (Retry-After header)
+AGENT_RETRY_AFTER = int(os.getenv("AGENT_RETRY_AFTER", "5"))
+# Limits of some agents, "max_in_flight:queue_size" by agent, e.g. "developer=2:8;manager=8:32"
+AGENT_LIMITS = os.getenv("AGENT_LIMITS", "")
+
+# Header of the priority lane of a request ("high", "normal" or "low"). Agents send their
+# delegations with "high", so work started by the manager goes before new tickets
+PRIORITY_HEADER = "X-A2A-Priority"
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+DEFAULT_PRIORITY = "normal"
+
+
+class AgentBusyError(Exception):
+    """An agent runs as many tasks as allowed and its queue is full."""
+
+    def __init__(self, agent: str, retry_after: int):
+        super().__init__(f"Agent '{agent}' is busy, retry after {retry_after} seconds")
+        self.agent = agent
+        self.retry_after = retry_after
+
+
+class AgentLimiter:
+    """
+    Admission control of one agent.
+
+    At most max_in_flight tasks run at once. The next ones wait in a queue ordered by
+    priority lane, then by arrival; once queue_size are waiting, new ones are refused
+    with AgentBusyError (HTTP 429 with Retry-After). Calls that must not be refused
+    (delegations from a task already running) can skip the queue bound.
+
+    The limiter is used from the event loop of the server and is not thread-safe.
+    """
+
+    def __init__(self, name: str, max_in_flight: int = AGENT_MAX_IN_FLIGHT, queue_size: int = AGENT_QUEUE_SIZE, retry_after: int = AGENT_RETRY_AFTER):
+        """
+        Args:
+            name: Agent name
+            max_in_flight: Tasks run at once (0 = no limit)
+            queue_size: Tasks waiting for a slot before new ones are refused
+            retry_after: Seconds a refused client is asked to wait
+        """
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.queue_size = queue_size
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._order = itertools.count()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, priority: str = DEFAULT_PRIORITY, bounded: bool = True) -> None:
+        """
+        Wait for a slot.
+
+        Args:
+            priority: Priority lane ("high", "normal" or "low"; unknown lanes are "normal")
+            bounded: Refuse the call when the queue is full (False = always wait)
+
+        Raises:
+            AgentBusyError: The queue is full
+        """
+        if not self.max_in_flight or (self.in_flight < self.max_in_flight and not self._waiters):
+            self.in_flight += 1
+            self.admitted += 1
+            return
+        if bounded and len(self._waiters) >= self.queue_size:
+            self.rejected += 1
+            logger.warning("Agent '%s' busy (%d running, %d queued): request refused", self.name, self.in_flight, len(self._waiters))
+            raise AgentBusyError(self.name, self.retry_after)
+
+        entry = (PRIORITIES.get(priority, PRIORITIES[DEFAULT_PRIORITY]), next(self._order), asyncio.get_running_loop().create_future())
+        heapq.heappush(self._waiters, entry)
+        try:
+            await entry[2]
+        except asyncio.CancelledError:
+            if entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            elif entry[2].done() and not entry[2].cancelled():
+                # The slot was handed over just before the cancellation: pass it on
+                self.release()
+            raise
+        self.admitted += 1
+
+    def release(self) -> None:
+        """Give the slot back, to the first waiting task if any."""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                # The slot goes straight to the waiter: in_flight does not change
+                future.set_result(None)
+                return
+        self.in_flight -= 1
+
+    @asynccontextmanager
+    async def slot(self, priority: str = DEFAULT_PRIORITY, bounded: bool = True) -> AsyncIterator[None]:
+        await self.acquire(priority, bounded)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": self.in_flight,
+            "queue_depth": len(self._waiters),
+            "max_in_flight": self.max_in_flight,
+            "queue_size": self.queue_size,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
+
+
+def parse_limits(limits: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Parse per-agent limits.
+
+    Args:
+        limits: "name=max_in_flight:queue_size" entries separated by ";"
+
+    Returns:
+        (max_in_flight, queue_size) by agent name
+    """
+    parsed = {}
+    for entry in filter(None, (entry.strip() for entry in limits.split(";"))):
+        name, _, values = entry.partition("=")
+        max_in_flight, _, queue_size = values.partition(":")
+        try:
+            parsed[name.strip()] = (int(max_in_flight), int(queue_size or AGENT_QUEUE_SIZE))
+        except ValueError:
+            raise ValueError(f"Invalid AGENT_LIMITS entry '{entry}', expected name=max_in_flight:queue_size")
+    return parsed
+
+
+_limiters: Dict[str, AgentLimiter] = {}
+_limiters_lock = threading.Lock()
+_configured_limits: Optional[Dict[str, Tuple[int, int]]] = None
+
+
+def get_agent_limiter(name: str) -> AgentLimiter:
+    """Return the process-wide limiter of an agent, creating it on first use from AGENT_LIMITS or the defaults."""
+    global _configured_limits
+    limiter = _limiters.get(name)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(name)
+            if limiter is None:
+                if _configured_limits is None:
+                    _configured_limits = parse_limits(AGENT_LIMITS)
+                max_in_flight, queue_size = _configured_limits.get(name, (AGENT_MAX_IN_FLIGHT, AGENT_QUEUE_SIZE))
+                limiter = _limiters[name] = AgentLimiter(name, max_in_flight, queue_size)
+    return limiter
+
+
+def limiter_stats() -> Dict[str, Dict[str, int]]:
+    """Current load of every agent limiter (tasks running, queue depth...), by agent name."""
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {name: limiter.stats() for name, limiter in limiters.items()}
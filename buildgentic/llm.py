@@ -0,0 +1,110 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from collections.abc import AsyncGenerator, Iterable
+from typing import Optional
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.lite_llm import LiteLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from buildgentic.storage.response_cache import ResponseCache, get_shared_response_cache
+
+
+logger = logging.getLogger(__name__)
+
+
+# LLM configuration - Global Variables from .env file
+# Agents whose LLM responses are cached (comma separated names, e.g. "manager,qa")
+LLM_CACHE_AGENTS = {name.strip() for name in os.getenv("LLM_CACHE_AGENTS", "").split(",") if name.strip()}
+
+# Part of every cache key: changing it invalidates the cached responses
+_KEY_VERSION = 1
+
+
+def get_llm(model_name: str, agent_name: str, cache_agents: Optional[Iterable[str]] = None) -> BaseLlm:
+    """
+    Model of an agent: LiteLlm, behind a response cache when the agent opted in.
+
+    Args:
+        model_name: LiteLLM model name (e.g. "openai/gpt-4o")
+        agent_name: Agent using the model
+        cache_agents: Agents whose responses are cached (default: LLM_CACHE_AGENTS)
+
+    Returns:
+        Model to give to the agent
+    """
+    llm = LiteLlm(model=model_name)
+    if agent_name in (LLM_CACHE_AGENTS if cache_agents is None else set(cache_agents)):
+        return CachingLlm(model=model_name, llm=llm, agent_name=agent_name)
+    return llm
+
+
+def request_key(model: str, llm_request: LlmRequest) -> Optional[str]:
+    """
+    Cache key of an LLM request, None if the request cannot be serialized.
+
+    The key covers everything the answer depends on: the model, the conversation
+    (function calls and their results included), the system instruction and generation
+    settings, and the tools offered to the model.
+    """
+    try:
+        payload = json.dumps(
+            {
+                "version": _KEY_VERSION,
+                "model": llm_request.model or model,
+                "contents": [content.model_dump(mode="json", exclude_none=True) for content in llm_request.contents],
+                "config": llm_request.config.model_dump(mode="json", exclude_none=True) if llm_request.config else None,
+                "tools": sorted(llm_request.tools_dict),
+            },
+            sort_keys=True,
+        )
+    except (TypeError, ValueError) as e:
+        logger.debug("LLM request not cacheable: %s", e)
+        return None
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class CachingLlm(BaseLlm):
+    """
+    Model answering identical requests from the response cache instead of the provider.
+
+    Requests are keyed by request_key. On a miss the wrapped model is called and its
+    complete responses (not the partial chunks of a stream) are cached, unless one of
+    them is an error; on a hit they are replayed without calling the provider.
+    """
+
+    llm: BaseLlm
+    agent_name: str
+    cache: Optional[ResponseCache] = None
+
+    @property
+    def capabilities(self):
+        return self.llm.capabilities
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        cache = self.cache or get_shared_response_cache()
+        key = request_key(self.model, llm_request)
+        if key is not None:
+            cached = await asyncio.to_thread(cache.get, key, self.agent_name)
+            if cached is not None:
+                logger.debug("LLM cache hit for agent '%s'", self.agent_name)
+                for response in json.loads(cached):
+                    yield LlmResponse.model_validate_json(response)
+                return
+
+        responses = []
+        async for response in self.llm.generate_content_async(llm_request, stream):
+            if not response.partial:
+                responses.append(response)
+            yield response
+
+        if key is not None and responses and all(response.error_code is None for response in responses):
+            cached = json.dumps([response.model_dump_json(exclude_none=True) for response in responses])
+            await asyncio.to_thread(cache.put, key, cached, self.agent_name, self.model)
+
+    def connect(self, llm_request: LlmRequest):
+        return self.llm.connect(llm_request)
@@ -1,11 +1,13 @@
 from google.adk.agents.llm_agent import Agent
-from google.adk.models.lite_llm import LiteLlm
-from google.adk.agents.remote_a2a_agent import AGENT_CARD_WELL_KNOWN_PATH
 from google.adk.agents.remote_a2a_agent import RemoteA2aAgent
 
 from a2a.types import AgentCapabilities, AgentCard, AgentSkill, TransportProtocol
 
-from buildgentic.tools.tools_azureDevOps import add_comment_to_ticket, download_attachment, get_tickets_assigned_to_me, get_work_item_details, load_context, update_ticket_description, update_ticket_status 
+from buildgentic.a2a_local import LocalAgentClientFactory, local_agents
+from buildgentic.a2a_remote import agent_directory
+from buildgentic.llm import get_llm
+from buildgentic.tools.tools_azureDevOps import load_context
+from buildgentic.tools.tools_azureDevOps_async import add_comment_to_ticket, download_attachment, get_tickets_assigned_to_me, get_work_item_details, update_ticket_description, update_ticket_status
 
 import logging
 
@@ -14,12 +16,32 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(name)s - %(message)s'
 )
 
-manager_context = load_context("Wilson")
+
+def _get_sub_agent(name: str, description: str, client_factory: LocalAgentClientFactory) -> RemoteA2aAgent:
+    """
+    Sub-agent reached through A2A.
+
+    When the agent is mounted in this process its card is taken from the local registry
+    (no agent card fetch) and the client factory sends its calls in-process. Otherwise
+    the card is fetched from the agent directory (A2A_AGENT_URLS) and calls go over
+    HTTP, spread over the replicas of the agent.
+    """
+    agent_card = local_agents.get_card(name) or agent_directory.card_url(name)
+    return RemoteA2aAgent(
+        name=name,
+        description=description,
+        agent_card=agent_card,
+        a2a_client_factory=client_factory,
+    )
+
 
 def get_manager_agent(model_name) -> Agent:
     """Creates and returns the manager agent."""
+    manager_context = load_context("Wilson")
+    client_factory = LocalAgentClientFactory()
+
     return Agent(
-        model=LiteLlm(model=model_name),
+        model=get_llm(model_name, 'manager'),
         name='manager',
         description=manager_context['description'],
         instruction=manager_context['instruction'],
@@ -32,40 +54,17 @@ def get_manager_agent(model_name) -> Agent:
             update_ticket_status
         ],
         sub_agents=[
-            RemoteA2aAgent(
-                name="architect",
-                description="Architect",
-                agent_card=(
-                    f"http://localhost:8008/a2a/architect{AGENT_CARD_WELL_KNOWN_PATH}"
-                ),
-            ),
-            RemoteA2aAgent(
-                name="developer",
-                description="Developer",
-                agent_card=(
-                    f"http://localhost:8008/a2a/developer{AGENT_CARD_WELL_KNOWN_PATH}"
-                ),
-            ),
-            RemoteA2aAgent(
-                name="qa",
-                description="QA",
-                agent_card=(
-                    f"http://localhost:8008/a2a/qa{AGENT_CARD_WELL_KNOWN_PATH}"
-                ),
-            ),
-            RemoteA2aAgent(
-                name="compliance",
-                description="Compliance",
-                agent_card=(
-                    f"http://localhost:8008/a2a/compliance{AGENT_CARD_WELL_KNOWN_PATH}"
-                ),
-            ),
+            _get_sub_agent("architect", "Architect", client_factory),
+            _get_sub_agent("developer", "Developer", client_factory),
+            _get_sub_agent("qa", "QA", client_factory),
+            _get_sub_agent("compliance", "Compliance", client_factory),
         ]
     )
 
 
 def get_manager_agent_card(agent_url: str) -> AgentCard:
     """Creates and returns the manager agent card."""
+    manager_context = load_context("Wilson")
 
     return AgentCard(
         name="Manager Agent",
@@ -87,4 +86,9 @@ def get_manager_agent_card(agent_url: str) -> AgentCard:
     )
 
 
-root_agent = get_manager_agent("openai/gpt-4o")
+def __getattr__(name):
+    # ADK tooling (adk web / adk run) looks up root_agent; build it on first access
+    # instead of at import time so importing this module does not hit the wiki.
+    if name == "root_agent":
+        return get_manager_agent("openai/gpt-4o")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
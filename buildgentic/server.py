@@ -1,16 +1,35 @@
+import asyncio
+import hmac
 import logging
 import os
+from contextlib import asynccontextmanager
+from typing import Optional
  
 import uvicorn
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import Body, FastAPI, Header, HTTPException
 
 from buildgentic.architect.agent import get_architect_agent, get_architect_agent_card
 from buildgentic.compliance.agent import get_compliance_agent, get_compliance_agent_card
 from buildgentic.developer.agent import get_developer_agent, get_developer_agent_card
 from buildgentic.qa.agent import get_qa_agent, get_qa_agent_card
 
-from .a2a_utils import A2AUtils
+from .a2a_local import A2A_CLIENT_TIMEOUT
+from .a2a_utils import A2AUtils, AgentSpec, StartupTimings
+from .intake import (
+    SECRET_HEADER,
+    TICKET_INTAKE,
+    TICKET_INTAKE_ALLOW_UNSIGNED,
+    TICKET_INTAKE_SECRET,
+    TicketDispatcher,
+    get_ticket_event_queue,
+    route_event,
+)
+from .limits import limiter_stats
+from .storage.response_cache import get_shared_response_cache
+from .tools.work_item_batch import flush_shared_mutation_buffer
+from .tools.work_item_cache import get_work_item_cache
+from .workers import SERVER_WORKERS, TaskRoutingMiddleware, get_task_router, serve_workers
 
 from buildgentic.manager.agent import (
     get_manager_agent,
@@ -40,11 +59,36 @@ if not MODEL_NAME:
 logger.info(f"AGENT BASE URL {AGENT_BASE_URL}")
 
 
+# Delivers the ticket events received by POST /hooks/azure-devops to the agents (TICKET_INTAKE)
+ticket_dispatcher: Optional[TicketDispatcher] = None
+# Per-agent startup times, set when the agents are mounted
+startup_timings = StartupTimings()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The agents are built here rather than at import time: the processes that import this
+    # module without serving it (the process pools of code_operations, started with spawn,
+    # import the __main__ module of the server again) must not fetch contexts or open stores
+    global startup_timings, ticket_dispatcher
+    startup_timings = build_agents(app)
+    if TICKET_INTAKE:
+        ticket_dispatcher = TicketDispatcher(get_ticket_event_queue())
+        ticket_dispatcher.start()
+        ticket_dispatcher.start()
+    yield
+    if ticket_dispatcher is not None:
+        await ticket_dispatcher.stop()
+    # Updates of the turns interrupted by the shutdown are still sent
+    await flush_shared_mutation_buffer()
+
+
 app: FastAPI = FastAPI(
     title="Run multiple agents on single host using A2A protocol.",
     description="Run multiple agents on single host using A2A protocol.",
     version="1.0.0",
     root_path="/a2a",
+    lifespan=lifespan,
 )
 
  
@@ -53,54 +97,97 @@ async def health_check() -> dict[str, str]:
     return {"status": "ok"}
  
  
-# conversation agent integration with A2A server
-A2AUtils.build(
-    name="manager",
-    get_agent=get_manager_agent,
-    get_agent_card=get_manager_agent_card,
-    model_name=MODEL_NAME,
-    agent_base_url=AGENT_BASE_URL,
-    app=app,
-)
-
-A2AUtils.build(
-    name="architect",
-    get_agent=get_architect_agent,
-    get_agent_card=get_architect_agent_card,
-    model_name=MODEL_NAME,
-    agent_base_url=AGENT_BASE_URL,
-    app=app,
-)
-
-A2AUtils.build(
-    name="developer",
-    get_agent=get_developer_agent,
-    get_agent_card=get_developer_agent_card,
-    model_name=MODEL_NAME,
-    agent_base_url=AGENT_BASE_URL,
-    app=app,
-)
-
-A2AUtils.build(
-    name="qa",
-    get_agent=get_qa_agent,
-    get_agent_card=get_qa_agent_card,
-    model_name=MODEL_NAME,
-    agent_base_url=AGENT_BASE_URL,
-    app=app,
-)
-
-A2AUtils.build(
-    name="compliance",
-    get_agent=get_compliance_agent,
-    get_agent_card=get_compliance_agent_card,
-    model_name=MODEL_NAME,
-    agent_base_url=AGENT_BASE_URL,
-    app=app,
-)
-
-def run_server(host, port):
-    uvicorn.run(app, host=host, port=port)
+AGENTS = [
+    AgentSpec("manager", get_manager_agent, get_manager_agent_card),
+    AgentSpec("architect", get_architect_agent, get_architect_agent_card),
+    AgentSpec("developer", get_developer_agent, get_developer_agent_card),
+    AgentSpec("qa", get_qa_agent, get_qa_agent_card),
+    AgentSpec("compliance", get_compliance_agent, get_compliance_agent_card),
+]
+
+# Agents served by this process (comma separated names, default: all of them), so each agent
+# can run as a service of its own; the others are reached through A2A_AGENT_URLS
+SERVER_AGENTS = [name.strip() for name in os.getenv("SERVER_AGENTS", "").split(",") if name.strip()]
+unknown_agents = set(SERVER_AGENTS) - {spec.name for spec in AGENTS}
+if unknown_agents:
+    raise ValueError(f"Unknown agents in SERVER_AGENTS: {sorted(unknown_agents)}. Valid values: {[spec.name for spec in AGENTS]}")
+logger.info(f"Serving agents {SERVER_AGENTS or 'all'}")
+
+
+def build_agents(app: FastAPI) -> StartupTimings:
+    """Mount the agents of SERVER_AGENTS on the app (called by the lifespan of the server)."""
+    # agent integration with A2A server: contexts are fetched concurrently and agents
+    # are built according to AGENT_STARTUP_MODE (eager, background or lazy)
+    return A2AUtils.build_all(
+        agents=[spec for spec in AGENTS if not SERVER_AGENTS or spec.name in SERVER_AGENTS],
+        model_name=MODEL_NAME,
+        agent_base_url=AGENT_BASE_URL,
+        app=app,
+    )
+
+
+task_router = get_task_router()
+if task_router is not None:
+    # Worker of a multi-process server: requests about the tasks of other workers are sent to them
+    app.add_middleware(TaskRoutingMiddleware, router=task_router, timeout=A2A_CLIENT_TIMEOUT)
+
+
+@app.get("/startup")
+async def startup_report() -> dict[str, dict[str, float]]:
+    """Per-agent startup time breakdown (card = context fetch, agent = agent build)."""
+    return startup_timings.as_dict()
+
+
+@app.get("/limits")
+async def limits_report() -> dict[str, dict[str, int]]:
+    """Per-agent load: tasks running, queue depth, and requests admitted and refused (429)."""
+    return limiter_stats()
+
+
+@app.get("/llm-cache")
+async def llm_cache_report() -> dict:
+    """LLM response cache: entries, size, and hits, misses and hit rate by agent (LLM_CACHE_AGENTS)."""
+    return await asyncio.to_thread(get_shared_response_cache().stats)
+
+
+@app.post("/hooks/azure-devops")
+async def azure_devops_hook(event: dict = Body(...), hook_secret: Optional[str] = Header(None, alias=SECRET_HEADER)) -> dict:
+    """
+    Azure DevOps service hook (work item created, updated, commented or deleted).
+
+    The work item is dropped from the work item cache of the worker receiving the event;
+    the other workers notice the new revision when their entry is older than WORK_ITEM_CACHE_TTL.
+    Events about the tickets of the agents are queued for the agent in charge (see buildgentic.intake).
+    """
+    if not TICKET_INTAKE_SECRET:
+        # The payload reaches the prompts of the agents: anyone able to post here could instruct them
+        if not TICKET_INTAKE_ALLOW_UNSIGNED:
+            raise HTTPException(status_code=503, detail="Service hooks are disabled: set TICKET_INTAKE_SECRET")
+    elif not hmac.compare_digest(hook_secret or "", TICKET_INTAKE_SECRET):
+        raise HTTPException(status_code=401, detail=f"Missing or invalid {SECRET_HEADER} header")
+    work_item_id = get_work_item_cache().handle_event(event)
+    agent, reason = route_event(event) if work_item_id is not None else (None, "not a work item event")
+    if agent is None:
+        logger.debug(f"Ignored {event.get('eventType')} event: {reason}")
+        return {"work_item_id": work_item_id, "queued": None, "agent": None, "reason": reason}
+    queued = await asyncio.to_thread(get_ticket_event_queue().enqueue, event, agent)
+    if ticket_dispatcher is not None:
+        ticket_dispatcher.notify()
+    return {"work_item_id": work_item_id, "queued": queued, "agent": agent, "reason": reason}
+
+
+@app.get("/intake")
+async def intake_report() -> dict:
+    """Ticket event queue: events by status, events merged into a pending one, age of the oldest pending event."""
+    return await asyncio.to_thread(get_ticket_event_queue().stats)
+
+
+def run_server(host, port, workers=SERVER_WORKERS):
+    if workers > 1:
+        # Every worker imports this module again and builds its own agents when it starts
+        serve_workers("buildgentic.server:app", host, port, workers)
+    else:
+        uvicorn.run(app, host=host, port=port)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,292 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Optional, Union
+
+from google.adk.artifacts import artifact_util
+from google.adk.artifacts.base_artifact_service import ArtifactVersion, BaseArtifactService, ensure_part
+from google.adk.artifacts.in_memory_artifact_service import InMemoryArtifactService
+from google.adk.errors.input_validation_error import InputValidationError
+from google.genai import types
+
+from buildgentic.storage.blob_store import BlobStore, get_shared_blob_store
+from buildgentic.storage.sqlite import connect
+
+
+logger = logging.getLogger(__name__)
+
+
+# Artifact service configuration - Global Variables from .env file
+ARTIFACT_STORE_BACKEND = os.getenv("ARTIFACT_STORE_BACKEND", "disk")
+ARTIFACT_STORE_BACKENDS = ("disk", "memory")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    sha256 TEXT,
+    part TEXT NOT NULL,
+    mime_type TEXT,
+    custom_metadata TEXT,
+    create_time REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id, scope, filename, version)
+);
+"""
+
+# Scope of the artifacts whose filename starts with "user:" (shared by every session)
+_USER_SCOPE = ""
+
+
+class ContentAddressedArtifactService(BaseArtifactService):
+    """
+    ADK artifact service that keeps artifact payloads in the content-addressed BlobStore.
+
+    Inline data and text payloads are written to the blob store (identical payloads,
+    like the same spec saved by several agents, are stored once); the rest of the part
+    and the version history live in a SQLite table next to it. Nothing is kept in RAM,
+    and blob reads use mmap for large files. When the blob store evicts a payload to
+    stay under its size limit, the versions that used it load as missing.
+    """
+
+    def __init__(self, blob_store: Optional[BlobStore] = None):
+        """
+        Args:
+            blob_store: Store for the payloads (defaults to the shared blob store)
+        """
+        self.blob_store = blob_store or get_shared_blob_store()
+        self._lock = threading.Lock()
+        self._connection = connect(os.path.join(self.blob_store.root, "artifacts.db"))
+        self._connection.executescript(_SCHEMA)
+
+    async def save_artifact(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        artifact: Union[types.Part, dict[str, Any]],
+        session_id: Optional[str] = None,
+        custom_metadata: Optional[dict[str, Any]] = None,
+    ) -> int:
+        scope = self._scope(app_name, user_id, filename, session_id)
+        part = ensure_part(artifact)
+        if part.file_data is not None and artifact_util.is_artifact_ref(part):
+            parsed_uri = artifact_util.parse_artifact_uri(part.file_data.file_uri)
+            if not parsed_uri:
+                raise InputValidationError(f"Invalid artifact reference URI: {part.file_data.file_uri}")
+            artifact_util.validate_artifact_reference_scope(app_name=app_name, user_id=user_id, session_id=session_id, parsed_uri=parsed_uri)
+        return await asyncio.to_thread(self._save, app_name, user_id, scope, filename, part, custom_metadata)
+
+    async def load_artifact(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: Optional[str] = None,
+        version: Optional[int] = None,
+    ) -> Optional[types.Part]:
+        remaining_depth = artifact_util._MAX_ARTIFACT_REFERENCE_DEPTH
+        while True:
+            scope = self._scope(app_name, user_id, filename, session_id)
+            part = await asyncio.to_thread(self._load, app_name, user_id, scope, filename, version)
+            if part is None or not artifact_util.is_artifact_ref(part):
+                break
+            parsed_uri = artifact_util.resolve_artifact_reference(
+                file_uri=part.file_data.file_uri,
+                app_name=app_name,
+                user_id=user_id,
+                session_id=session_id,
+                remaining_depth=remaining_depth,
+            )
+            app_name, user_id, filename = parsed_uri.app_name, parsed_uri.user_id, parsed_uri.filename
+            session_id, version = parsed_uri.session_id, parsed_uri.version
+            remaining_depth -= 1
+
+        if part is None or part == types.Part() or artifact_util._is_rewind_tombstone(part):
+            return None
+        return part
+
+    async def list_artifact_keys(self, *, app_name: str, user_id: str, session_id: Optional[str] = None) -> list[str]:
+        artifact_util.validate_path_segment(app_name, "app_name")
+        artifact_util.validate_path_segment(user_id, "user_id")
+        scopes = [_USER_SCOPE]
+        if session_id is not None:
+            artifact_util.validate_path_segment(session_id, "session_id")
+            scopes.append(session_id)
+        rows = await asyncio.to_thread(
+            self._query,
+            f"SELECT DISTINCT filename FROM artifacts WHERE app_name = ? AND user_id = ? AND scope IN ({','.join('?' * len(scopes))})",
+            (app_name, user_id, *scopes),
+        )
+        return sorted(row[0] for row in rows)
+
+    async def delete_artifact(self, *, app_name: str, user_id: str, filename: str, session_id: Optional[str] = None) -> None:
+        scope = self._scope(app_name, user_id, filename, session_id)
+        await asyncio.to_thread(self._delete, app_name, user_id, scope, filename)
+
+    async def list_versions(self, *, app_name: str, user_id: str, filename: str, session_id: Optional[str] = None) -> list[int]:
+        scope = self._scope(app_name, user_id, filename, session_id)
+        rows = await asyncio.to_thread(
+            self._query,
+            "SELECT version FROM artifacts WHERE app_name = ? AND user_id = ? AND scope = ? AND filename = ? ORDER BY version",
+            (app_name, user_id, scope, filename),
+        )
+        return [row[0] for row in rows]
+
+    async def list_artifact_versions(
+        self, *, app_name: str, user_id: str, filename: str, session_id: Optional[str] = None
+    ) -> list[ArtifactVersion]:
+        scope = self._scope(app_name, user_id, filename, session_id)
+        rows = await asyncio.to_thread(
+            self._query,
+            "SELECT version, sha256, mime_type, custom_metadata, create_time FROM artifacts "
+            "WHERE app_name = ? AND user_id = ? AND scope = ? AND filename = ? ORDER BY version",
+            (app_name, user_id, scope, filename),
+        )
+        return [self._artifact_version(app_name, user_id, filename, session_id, row) for row in rows]
+
+    async def get_artifact_version(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: Optional[str] = None,
+        version: Optional[int] = None,
+    ) -> Optional[ArtifactVersion]:
+        versions = await self.list_artifact_versions(app_name=app_name, user_id=user_id, filename=filename, session_id=session_id)
+        if not versions:
+            return None
+        if version is None:
+            return versions[-1]
+        return next((item for item in versions if item.version == version), None)
+
+    @staticmethod
+    def _scope(app_name: str, user_id: str, filename: str, session_id: Optional[str]) -> str:
+        artifact_util.validate_path_segment(app_name, "app_name")
+        artifact_util.validate_path_segment(user_id, "user_id")
+        if filename.startswith("user:"):
+            return _USER_SCOPE
+        if session_id is None:
+            raise InputValidationError("Session ID must be provided for session-scoped artifacts.")
+        artifact_util.validate_path_segment(session_id, "session_id")
+        return session_id
+
+    def _query(self, sql: str, params: tuple) -> list:
+        with self._lock:
+            return self._connection.execute(sql, params).fetchall()
+
+    def _delete(self, app_name: str, user_id: str, scope: str, filename: str) -> None:
+        # Blobs are shared by content, so they are left to the size based eviction
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM artifacts WHERE app_name = ? AND user_id = ? AND scope = ? AND filename = ?",
+                (app_name, user_id, scope, filename),
+            )
+
+    def _save(self, app_name: str, user_id: str, scope: str, filename: str, part: types.Part, custom_metadata: Optional[dict]) -> int:
+        sha256 = None
+        if part.inline_data is not None:
+            sha256 = self.blob_store.put_bytes(part.inline_data.data or b"")
+            mime_type = part.inline_data.mime_type
+            part_json = part.model_dump_json(exclude_none=True, exclude={"inline_data": {"data"}})
+        elif part.text is not None:
+            sha256 = self.blob_store.put_bytes(part.text.encode("utf-8"))
+            mime_type = "text/plain"
+            part_json = part.model_dump_json(exclude_none=True, exclude={"text"})
+        elif part.file_data is not None:
+            mime_type = None if artifact_util.is_artifact_ref(part) else part.file_data.mime_type
+            part_json = part.model_dump_json(exclude_none=True)
+        else:
+            raise InputValidationError("Not supported artifact type.")
+
+        with self._lock, self._connection:
+            version = self._connection.execute(
+                "SELECT COALESCE(MAX(version) + 1, 0) FROM artifacts WHERE app_name = ? AND user_id = ? AND scope = ? AND filename = ?",
+                (app_name, user_id, scope, filename),
+            ).fetchone()[0]
+            self._connection.execute(
+                "INSERT INTO artifacts (app_name, user_id, scope, filename, version, sha256, part, mime_type, custom_metadata, create_time) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (app_name, user_id, scope, filename, version, sha256, part_json, mime_type, json.dumps(custom_metadata or {}), time.time()),
+            )
+        return version
+
+    def _load(self, app_name: str, user_id: str, scope: str, filename: str, version: Optional[int]) -> Optional[types.Part]:
+        sql = "SELECT sha256, part, mime_type FROM artifacts WHERE app_name = ? AND user_id = ? AND scope = ? AND filename = ?"
+        params: tuple = (app_name, user_id, scope, filename)
+        if version is None:
+            sql += " ORDER BY version DESC LIMIT 1"
+        else:
+            sql += " AND version = ?"
+            params += (version,)
+        rows = self._query(sql, params)
+        if not rows:
+            return None
+        sha256, part_json, mime_type = rows[0]
+
+        part = types.Part.model_validate_json(part_json)
+        if sha256 is None:
+            return part
+        if not self.blob_store.contains(sha256):
+            logger.warning("Payload of artifact '%s' was evicted from the blob store", filename)
+            return None
+        data = self.blob_store.read_bytes(sha256)
+        if part.inline_data is not None:
+            part.inline_data.data = data
+        else:
+            part.text = data.decode("utf-8")
+        return part
+
+    def _artifact_version(self, app_name: str, user_id: str, filename: str, session_id: Optional[str], row: tuple) -> ArtifactVersion:
+        version, sha256, mime_type, custom_metadata, create_time = row
+        if sha256 is not None:
+            canonical_uri = f"file://{os.path.abspath(self.blob_store.path(sha256))}"
+        else:
+            scoped_session = None if filename.startswith("user:") else session_id
+            canonical_uri = artifact_util.get_artifact_uri(app_name, user_id, filename, version, scoped_session)
+        return ArtifactVersion(
+            version=version,
+            canonical_uri=canonical_uri,
+            custom_metadata=json.loads(custom_metadata or "{}"),
+            create_time=create_time,
+            mime_type=mime_type,
+        )
+
+
+def create_artifact_service(backend: str = ARTIFACT_STORE_BACKEND) -> BaseArtifactService:
+    """
+    Create an artifact service for the configured backend.
+
+    Args:
+        backend: "disk" (content-addressed, size bounded) or "memory" (ADK InMemoryArtifactService)
+
+    Returns:
+        New artifact service
+    """
+    if backend == "disk":
+        return ContentAddressedArtifactService()
+    if backend == "memory":
+        return InMemoryArtifactService()
+    raise ValueError(f"Unknown artifact store backend '{backend}'. Valid values: {ARTIFACT_STORE_BACKENDS}")
+
+
+_artifact_service: Optional[BaseArtifactService] = None
+_artifact_service_lock = threading.Lock()
+
+
+def get_shared_artifact_service() -> BaseArtifactService:
+    """Return the process-wide artifact service shared by every agent, creating it on first use."""
+    global _artifact_service
+    if _artifact_service is None:
+        with _artifact_service_lock:
+            if _artifact_service is None:
+                _artifact_service = create_artifact_service()
+    return _artifact_service
@@ -0,0 +1,266 @@
+import contextlib
+import hashlib
+import logging
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import BinaryIO, Iterable, Iterator, Optional
+
+from buildgentic.storage.sqlite import connect
+
+
+logger = logging.getLogger(__name__)
+
+
+# Blob store configuration - Global Variables from .env file
+ARTIFACT_STORE_PATH = os.getenv("ARTIFACT_STORE_PATH", "data/artifacts")
+ARTIFACT_STORE_MAX_BYTES = int(os.getenv("ARTIFACT_STORE_MAX_BYTES", str(1024 * 1024 * 1024)))
+# Blobs at least this large are read through mmap instead of a buffered read
+ARTIFACT_MMAP_THRESHOLD = int(os.getenv("ARTIFACT_MMAP_THRESHOLD", str(1024 * 1024)))
+
+_CHUNK_SIZE = 64 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256 TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS blobs_last_access ON blobs (last_access);
+CREATE TABLE IF NOT EXISTS refs (
+    key TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL
+);
+"""
+
+
+class BlobWriter:
+    """
+    Incremental writer for one blob: hashes the data while it is written to a temp file.
+
+    Use BlobStore.writer(); nothing is visible in the store until commit().
+    """
+
+    def __init__(self, store: "BlobStore"):
+        self._store = store
+        self._hash = hashlib.sha256()
+        self.size = 0
+        fd, self._tmp_path = tempfile.mkstemp(dir=store.tmp_dir)
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        self._hash.update(chunk)
+        self._file.write(chunk)
+        self.size += len(chunk)
+
+    def commit(self, ref: Optional[str] = None) -> str:
+        """
+        Move the data into the store (a blob with the same hash is reused).
+
+        Args:
+            ref: Optional key (e.g. an attachment id) that will point to the blob
+
+        Returns:
+            sha256 of the data
+        """
+        self._file.close()
+        return self._store._commit(self._tmp_path, self._hash.hexdigest(), self.size, ref)
+
+    def abort(self) -> None:
+        self._file.close()
+        with contextlib.suppress(OSError):
+            os.remove(self._tmp_path)
+
+
+class BlobStore:
+    """
+    Content-addressed store of files on disk, bounded by total size.
+
+    Every blob is saved once under its sha256 (objects/ab/cdef...), so the same content
+    downloaded or generated several times takes the space of one copy. Keys such as
+    Azure DevOps attachment ids point to blobs through a small SQLite index. When the
+    total size goes over max_bytes, the least recently used blobs (and the keys that
+    point to them) are deleted.
+    """
+
+    def __init__(self, root: str = ARTIFACT_STORE_PATH, max_bytes: int = ARTIFACT_STORE_MAX_BYTES):
+        """
+        Args:
+            root: Directory of the store
+            max_bytes: Maximum total size of the blobs (0 = no limit)
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.objects_dir = os.path.join(root, "objects")
+        self.tmp_dir = os.path.join(root, "tmp")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = connect(os.path.join(root, "index.db"))
+        self._connection.executescript(_SCHEMA)
+        self.total_bytes = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def writer(self) -> BlobWriter:
+        """Start writing a new blob incrementally (see BlobWriter)."""
+        return BlobWriter(self)
+
+    def put_stream(self, chunks: Iterable[bytes], ref: Optional[str] = None) -> str:
+        """Store the data produced by chunks and return its sha256."""
+        writer = self.writer()
+        try:
+            for chunk in chunks:
+                writer.write(chunk)
+        except BaseException:
+            writer.abort()
+            raise
+        return writer.commit(ref)
+
+    def put_bytes(self, data: bytes, ref: Optional[str] = None) -> str:
+        """Store data and return its sha256."""
+        return self.put_stream([data], ref)
+
+    def get_ref(self, key: str) -> Optional[str]:
+        """sha256 of the blob a key points to, or None if the key or the blob is gone."""
+        with self._lock:
+            row = self._connection.execute("SELECT sha256 FROM refs WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        sha256 = row[0]
+        if not os.path.isfile(self.path(sha256)):
+            self._forget(sha256)
+            return None
+        return sha256
+
+    def contains(self, sha256: str) -> bool:
+        return os.path.isfile(self.path(sha256))
+
+    def path(self, sha256: str) -> str:
+        return os.path.join(self.objects_dir, sha256[:2], sha256[2:])
+
+    def size(self, sha256: str) -> int:
+        return os.path.getsize(self.path(sha256))
+
+    def open(self, sha256: str) -> BinaryIO:
+        """Open a blob for streaming reads (marks it as recently used)."""
+        file = open(self.path(sha256), "rb")
+        self._touch(sha256)
+        return file
+
+    def iter_chunks(self, sha256: str, chunk_size: int = _CHUNK_SIZE) -> Iterator[bytes]:
+        with self.open(sha256) as file:
+            while chunk := file.read(chunk_size):
+                yield chunk
+
+    def read_bytes(self, sha256: str) -> bytes:
+        """Read a whole blob; large blobs are copied out of a memory map."""
+        with self.open(sha256) as file:
+            size = os.fstat(file.fileno()).st_size
+            if size < ARTIFACT_MMAP_THRESHOLD or size == 0:
+                return file.read()
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return mapped[:]
+
+    @contextlib.contextmanager
+    def mmap(self, sha256: str) -> Iterator[mmap.mmap]:
+        """Memory-map a blob read-only, without copying it (not for empty blobs)."""
+        with self.open(sha256) as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+    def copy_to(self, sha256: str, destination: str) -> None:
+        """Write a copy of a blob to destination (the blob itself is never handed out)."""
+        directory = os.path.dirname(destination)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        shutil.copyfile(self.path(sha256), destination)
+        self._touch(sha256)
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """
+        Delete least recently used blobs until the store fits in max_bytes.
+
+        Args:
+            keep: Blob that must not be evicted (the one just written)
+
+        Returns:
+            Number of bytes freed
+        """
+        if not self.max_bytes or self.total_bytes <= self.max_bytes:
+            return 0
+        freed = 0
+        with self._lock:
+            rows = self._connection.execute("SELECT sha256, size FROM blobs ORDER BY last_access").fetchall()
+        for sha256, size in rows:
+            if self.total_bytes <= self.max_bytes:
+                break
+            if sha256 == keep:
+                continue
+            self._forget(sha256)
+            freed += size
+        if freed:
+            logger.info("Blob store evicted %d bytes (now %d of %d)", freed, self.total_bytes, self.max_bytes)
+        return freed
+
+    def stats(self) -> dict:
+        with self._lock:
+            blobs, refs = self._connection.execute("SELECT (SELECT COUNT(*) FROM blobs), (SELECT COUNT(*) FROM refs)").fetchone()
+        return {"blobs": blobs, "refs": refs, "total_bytes": self.total_bytes, "max_bytes": self.max_bytes}
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _commit(self, tmp_path: str, sha256: str, size: int, ref: Optional[str]) -> str:
+        final_path = self.path(sha256)
+        with self._lock:
+            if os.path.isfile(final_path):
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                os.chmod(tmp_path, 0o444)
+                os.replace(tmp_path, final_path)
+            with self._connection:
+                known = self._connection.execute("SELECT 1 FROM blobs WHERE sha256 = ?", (sha256,)).fetchone()
+                self._connection.execute(
+                    "INSERT INTO blobs (sha256, size, last_access) VALUES (?, ?, ?) "
+                    "ON CONFLICT(sha256) DO UPDATE SET last_access = excluded.last_access",
+                    (sha256, size, time.time()),
+                )
+                if ref is not None:
+                    self._connection.execute("INSERT OR REPLACE INTO refs (key, sha256) VALUES (?, ?)", (ref, sha256))
+            if not known:
+                self.total_bytes += size
+        self.evict(keep=sha256)
+        return sha256
+
+    def _touch(self, sha256: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("UPDATE blobs SET last_access = ? WHERE sha256 = ?", (time.time(), sha256))
+
+    def _forget(self, sha256: str) -> None:
+        with self._lock:
+            with self._connection:
+                row = self._connection.execute("SELECT size FROM blobs WHERE sha256 = ?", (sha256,)).fetchone()
+                self._connection.execute("DELETE FROM blobs WHERE sha256 = ?", (sha256,))
+                self._connection.execute("DELETE FROM refs WHERE sha256 = ?", (sha256,))
+            if row is not None:
+                self.total_bytes -= row[0]
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.path(sha256))
+
+
+_blob_store: Optional[BlobStore] = None
+_blob_store_lock = threading.Lock()
+
+
+def get_shared_blob_store() -> BlobStore:
+    """Return the process-wide blob store, creating it on first use."""
+    global _blob_store
+    if _blob_store is None:
+        with _blob_store_lock:
+            if _blob_store is None:
+                _blob_store = BlobStore()
+    return _blob_store
@@ -0,0 +1,79 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Generic, Hashable, Optional, TypeVar
+
+
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class BoundedCache(Generic[V]):
+    """
+    Thread-safe LRU cache with an optional time to live.
+
+    Holds at most max_entries values; adding one more evicts the least recently used.
+    Values older than ttl_seconds (None = no expiry) are dropped when they are read.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: Optional[float] = None):
+        """
+        Args:
+            max_entries: Maximum number of values kept (0 disables the cache)
+            ttl_seconds: Seconds a value is kept after it was stored, None to keep it until evicted
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Optional[V]:
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            stored_at, value = entry
+            if self.ttl_seconds is not None and time.monotonic() - stored_at >= self.ttl_seconds:
+                del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: V) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,138 @@
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from buildgentic.storage.sqlite import connect
+
+
+logger = logging.getLogger(__name__)
+
+
+# LLM response cache configuration - Global Variables from .env file
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "data/llm_cache.db")
+# Seconds a cached response is served (0 = until evicted for size)
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "86400"))
+# Maximum total size of the cached responses (0 = no limit)
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    agent TEXT NOT NULL,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access);
+"""
+
+
+class ResponseCache:
+    """
+    On-disk cache of LLM responses, bounded by age and total size.
+
+    Responses are stored in a SQLite table shared by the worker processes, under a key
+    computed by the caller from the exact request. Entries older than ttl are never
+    served; when the total size goes over max_bytes the least recently used entries are
+    deleted. Hits and misses are counted by agent in this process.
+    """
+
+    def __init__(self, path: str = LLM_CACHE_PATH, ttl: float = LLM_CACHE_TTL, max_bytes: int = LLM_CACHE_MAX_BYTES):
+        """
+        Args:
+            path: SQLite database file
+            ttl: Seconds a response is served (0 = no expiry)
+            max_bytes: Maximum total size of the responses (0 = no limit)
+        """
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._connection = connect(path)
+        self._connection.executescript(_SCHEMA)
+        self._hits: Dict[str, int] = {}
+        self._misses: Dict[str, int] = {}
+
+    def get(self, key: str, agent: str = "") -> Optional[str]:
+        """Cached response of a request, None if it is missing or expired."""
+        now = time.time()
+        with self._lock, self._connection:
+            row = self._connection.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl and now - row[1] > self.ttl:
+                self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is not None:
+                self._connection.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            counts = self._hits if row is not None else self._misses
+            counts[agent] = counts.get(agent, 0) + 1
+        return row[0] if row is not None else None
+
+    def put(self, key: str, response: str, agent: str = "", model: str = "") -> None:
+        """Cache the response of a request, then evict entries if the cache is over its size."""
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, agent, model, response, size, created_at, last_access) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, agent, model, response, len(response.encode()), now, now),
+            )
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Delete the expired entries, then the least recently used ones until the cache fits in max_bytes.
+
+        Returns:
+            Number of entries deleted
+        """
+        deleted = 0
+        with self._lock, self._connection:
+            if self.ttl:
+                deleted += self._connection.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,)).rowcount
+            if self.max_bytes:
+                total = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+                if total > self.max_bytes:
+                    rows = self._connection.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall()
+                    for key, size in rows:
+                        if total <= self.max_bytes:
+                            break
+                        self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                        total -= size
+                        deleted += 1
+        if deleted:
+            logger.info("LLM response cache evicted %d entries", deleted)
+        return deleted
+
+    def stats(self) -> dict:
+        """Entries and size of the cache, and the hits, misses and hit rate of every agent."""
+        with self._lock:
+            entries, total_bytes = self._connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            agents = {
+                agent: {
+                    "hits": self._hits.get(agent, 0),
+                    "misses": self._misses.get(agent, 0),
+                    "hit_rate": round(self._hits.get(agent, 0) / (self._hits.get(agent, 0) + self._misses.get(agent, 0)), 4),
+                }
+                for agent in sorted(set(self._hits) | set(self._misses))
+            }
+        return {"entries": entries, "total_bytes": total_bytes, "max_bytes": self.max_bytes, "agents": agents}
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_shared_response_cache() -> ResponseCache:
+    """Return the process-wide LLM response cache, creating it on first use."""
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = ResponseCache()
+    return _response_cache
@@ -0,0 +1,188 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from typing import List, Optional, Set
+
+from google.adk.apps.app import EventsCompactionConfig
+from google.adk.events.event import Event
+from google.adk.sessions import BaseSessionService, InMemorySessionService, Session
+from google.adk.sessions.sqlite_session_service import CREATE_SCHEMA_SQL, SqliteSessionService
+
+from buildgentic.storage.sqlite import connect
+
+
+logger = logging.getLogger(__name__)
+
+
+# Session store configuration - Global Variables from .env file
+SESSION_STORE_BACKEND = os.getenv("SESSION_STORE_BACKEND", "sqlite")
+SESSION_STORE_PATH = os.getenv("SESSION_STORE_PATH", "data/sessions.db")
+SESSION_RETENTION_DAYS = float(os.getenv("SESSION_RETENTION_DAYS", "7"))
+SESSION_STORE_BACKENDS = ("sqlite", "memory")
+
+# History compaction: once the prompt of a session reaches the token budget, older
+# events are summarized by the agent model and only the last events are kept verbatim
+SESSION_COMPACTION_TOKEN_BUDGET = int(os.getenv("SESSION_COMPACTION_TOKEN_BUDGET", "16000"))
+SESSION_COMPACTION_KEEP_EVENTS = int(os.getenv("SESSION_COMPACTION_KEEP_EVENTS", "8"))
+
+# How often expired sessions are purged while the service is in use
+_PURGE_INTERVAL_SECONDS = 3600
+
+
+class CompactingSqliteSessionService(SqliteSessionService):
+    """
+    ADK SqliteSessionService that keeps sessions small on disk.
+
+    Sessions are read from SQLite (WAL mode) on every invocation, so nothing is held
+    in memory between turns. When a compaction event is appended, the raw events it
+    summarizes are deleted: they are never sent to the model again, so the session
+    load and the database only grow by the summary. Events with a function call that
+    is still waiting for its response are kept. Sessions that have not been updated
+    for retention_days are deleted.
+    """
+
+    def __init__(self, db_path: str = SESSION_STORE_PATH, retention_days: float = SESSION_RETENTION_DAYS):
+        """
+        Args:
+            db_path: SQLite database file
+            retention_days: Days a session is kept after its last event (0 = forever)
+        """
+        # WAL is a property of the database file: set it (and create the schema) once so
+        # the aiosqlite connections of the base class do not block each other
+        connection = connect(db_path)
+        try:
+            connection.executescript(CREATE_SCHEMA_SQL)
+        finally:
+            connection.close()
+        super().__init__(db_path)
+        self.retention_days = retention_days
+        self._maintenance_lock = threading.Lock()
+        self._last_purge = 0.0
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        event = await super().append_event(session, event)
+        compaction = event.actions.compaction if event.actions else None
+        if compaction and compaction.start_timestamp is not None and compaction.end_timestamp is not None:
+            await asyncio.to_thread(self.prune_compacted_events, session, compaction.start_timestamp, compaction.end_timestamp)
+        if time.monotonic() - self._last_purge >= _PURGE_INTERVAL_SECONDS:
+            await asyncio.to_thread(self.purge_expired)
+        return event
+
+    def prune_compacted_events(self, session: Session, start_timestamp: float, end_timestamp: float) -> int:
+        """
+        Delete the raw events of a session covered by a compaction.
+
+        Args:
+            session: Session that received the compaction event
+            start_timestamp: First timestamp summarized by the compaction
+            end_timestamp: Last timestamp summarized by the compaction
+
+        Returns:
+            Number of deleted events
+        """
+        key = (session.app_name, session.user_id, session.id)
+        with self._maintenance_lock:
+            connection = connect(self._db_path)
+            try:
+                rows = connection.execute(
+                    "SELECT id, event_data FROM events WHERE app_name=? AND user_id=? AND session_id=? "
+                    "AND timestamp >= ? AND timestamp <= ? AND json_extract(event_data, '$.actions.compaction') IS NULL",
+                    (*key, start_timestamp, end_timestamp),
+                ).fetchall()
+                removable = _removable_event_ids(rows)
+                with connection:
+                    connection.executemany(
+                        "DELETE FROM events WHERE app_name=? AND user_id=? AND session_id=? AND id=?",
+                        [(*key, event_id) for event_id in removable],
+                    )
+            finally:
+                connection.close()
+        logger.debug("Session %s: pruned %d compacted events", session.id, len(removable))
+        return len(removable)
+
+    def purge_expired(self) -> int:
+        """
+        Delete sessions (and their events) older than the retention period.
+
+        Returns:
+            Number of deleted sessions
+        """
+        self._last_purge = time.monotonic()
+        if self.retention_days <= 0:
+            return 0
+        cutoff = time.time() - self.retention_days * 86400
+        with self._maintenance_lock:
+            connection = connect(self._db_path)
+            try:
+                with connection:
+                    deleted = connection.execute("DELETE FROM sessions WHERE update_time < ?", (cutoff,)).rowcount
+            finally:
+                connection.close()
+        if deleted:
+            logger.info("Session store purged %d sessions older than %s days", deleted, self.retention_days)
+        return deleted
+
+
+def _removable_event_ids(rows: List[tuple]) -> List[str]:
+    """Ids of compacted events that can be deleted without orphaning a pending function call."""
+    call_ids: dict = {}
+    answered: Set[str] = set()
+    for event_id, event_data in rows:
+        content = json.loads(event_data).get("content") or {}
+        for part in content.get("parts") or []:
+            if part.get("function_call", {}).get("id"):
+                call_ids.setdefault(event_id, set()).add(part["function_call"]["id"])
+            if part.get("function_response", {}).get("id"):
+                answered.add(part["function_response"]["id"])
+    return [event_id for event_id, _ in rows if not (call_ids.get(event_id, set()) - answered)]
+
+
+def get_compaction_config() -> Optional[EventsCompactionConfig]:
+    """
+    History compaction settings for the agent apps (None when the budget is 0).
+
+    The summarizer is left unset so ADK summarizes with the model of the agent.
+    """
+    if SESSION_COMPACTION_TOKEN_BUDGET <= 0:
+        return None
+    return EventsCompactionConfig(
+        token_threshold=SESSION_COMPACTION_TOKEN_BUDGET,
+        event_retention_size=SESSION_COMPACTION_KEEP_EVENTS,
+    )
+
+
+def create_session_service(backend: str = SESSION_STORE_BACKEND) -> BaseSessionService:
+    """
+    Create a session service for the configured backend.
+
+    Args:
+        backend: "sqlite" (persistent, compacted) or "memory" (ADK InMemorySessionService)
+
+    Returns:
+        New session service
+    """
+    if backend == "sqlite":
+        logger.info("Using SQLite session store at %s", SESSION_STORE_PATH)
+        service = CompactingSqliteSessionService()
+        service.purge_expired()
+        return service
+    if backend == "memory":
+        return InMemorySessionService()
+    raise ValueError(f"Unknown session store backend '{backend}'. Valid values: {SESSION_STORE_BACKENDS}")
+
+
+_session_service: Optional[BaseSessionService] = None
+_session_service_lock = threading.Lock()
+
+
+def get_shared_session_service() -> BaseSessionService:
+    """Return the process-wide session service shared by every agent, creating it on first use."""
+    global _session_service
+    if _session_service is None:
+        with _session_service_lock:
+            if _session_service is None:
+                _session_service = create_session_service()
+    return _session_service
@@ -0,0 +1,37 @@
+import logging
+import os
+import sqlite3
+
+
+logger = logging.getLogger(__name__)
+
+
+# Seconds a connection waits for a lock held by another connection or process
+SQLITE_BUSY_TIMEOUT = float(os.getenv("SQLITE_BUSY_TIMEOUT", "5"))
+
+
+def connect(path: str, check_same_thread: bool = False) -> sqlite3.Connection:
+    """
+    Open a SQLite database tuned for the stores of this package.
+
+    The database runs in WAL mode, so readers never block the writer (and the other
+    way round), with synchronous=NORMAL: a power loss may drop the last commits but
+    never corrupts the file. Parent directories are created when needed.
+
+    Args:
+        path: Database file (":memory:" for a private in-memory database)
+        check_same_thread: Passed to sqlite3.connect; stores share connections behind a lock
+
+    Returns:
+        Open connection (use "with connection:" to commit a group of statements)
+    """
+    if path != ":memory:":
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    connection = sqlite3.connect(path, timeout=SQLITE_BUSY_TIMEOUT, check_same_thread=check_same_thread)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.execute("PRAGMA foreign_keys=ON")
+    return connection
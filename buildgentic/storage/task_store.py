@@ -0,0 +1,264 @@
+import asyncio
+import atexit
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from a2a.server.context import ServerCallContext
+from a2a.server.tasks import InMemoryTaskStore, TaskStore
+from a2a.types import Task
+
+from buildgentic.storage.lru import BoundedCache
+from buildgentic.storage.sqlite import connect
+
+
+logger = logging.getLogger(__name__)
+
+
+# Task store configuration - Global Variables from .env file
+TASK_STORE_BACKEND = os.getenv("TASK_STORE_BACKEND", "sqlite")
+TASK_STORE_PATH = os.getenv("TASK_STORE_PATH", "data/tasks.db")
+TASK_STORE_CACHE_SIZE = int(os.getenv("TASK_STORE_CACHE_SIZE", "1000"))
+TASK_STORE_CACHE_TTL = float(os.getenv("TASK_STORE_CACHE_TTL", "600"))
+TASK_STORE_BATCH_SIZE = int(os.getenv("TASK_STORE_BATCH_SIZE", "100"))
+TASK_STORE_FLUSH_INTERVAL = float(os.getenv("TASK_STORE_FLUSH_INTERVAL", "0.2"))
+TASK_STORE_RETENTION_DAYS = float(os.getenv("TASK_STORE_RETENTION_DAYS", "7"))
+TASK_STORE_BACKENDS = ("sqlite", "memory")
+
+# How often the writer thread deletes tasks older than the retention period
+_PURGE_INTERVAL_SECONDS = 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    context_id TEXT,
+    state TEXT,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_updated_at ON tasks (updated_at);
+"""
+
+# task_id -> serialized task (None = delete), context id, state, save time
+PendingWrite = Tuple[Optional[str], Optional[str], Optional[str], float]
+
+
+class SQLiteTaskStore(TaskStore):
+    """
+    A2A task store on an embedded SQLite database with a bounded in-memory hot tier.
+
+    - Hot tier: the most recently used tasks are kept in an LRU cache (cache_size
+      entries, cache_ttl seconds), so memory stays flat however many tasks are served.
+    - Write-behind: save() only serializes the task and queues it; a writer thread
+      commits the queue in one transaction every flush_interval seconds or as soon as
+      batch_size tasks are waiting. Repeated saves of the same task in between (every
+      status update) are coalesced into a single row write.
+    - Retention: tasks not updated for retention_days are deleted (0 keeps them forever).
+
+    Tasks survive restarts; at most the last flush_interval of updates is lost on a crash.
+    One store can be shared by every agent of the process (task ids are UUIDs).
+    """
+
+    def __init__(
+        self,
+        path: str = TASK_STORE_PATH,
+        cache_size: int = TASK_STORE_CACHE_SIZE,
+        cache_ttl: float = TASK_STORE_CACHE_TTL,
+        batch_size: int = TASK_STORE_BATCH_SIZE,
+        flush_interval: float = TASK_STORE_FLUSH_INTERVAL,
+        retention_days: float = TASK_STORE_RETENTION_DAYS,
+    ):
+        """
+        Args:
+            path: SQLite database file
+            cache_size: Maximum number of tasks kept in memory
+            cache_ttl: Seconds a task stays in memory after its last save
+            batch_size: Number of queued tasks that triggers an immediate flush
+            flush_interval: Maximum seconds a saved task waits before being committed
+            retention_days: Days a task is kept after its last update (0 = forever)
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        self._cache: BoundedCache[Task] = BoundedCache(cache_size, cache_ttl)
+
+        self._connection = connect(path)
+        self._connection.executescript(_SCHEMA)
+        self._db_lock = threading.Lock()
+
+        self._pending: Dict[str, PendingWrite] = {}
+        self._flushing: Dict[str, PendingWrite] = {}
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self._last_purge = 0.0
+
+        self.purge_expired()
+        self._writer = threading.Thread(target=self._run_writer, name="task-store-writer", daemon=True)
+        self._writer.start()
+
+    async def save(self, task: Task, context: ServerCallContext | None = None) -> None:
+        """Keep the task in memory and queue it for the next batched write."""
+        state = task.status.state.value if task.status else None
+        write = (task.model_dump_json(exclude_none=True), task.context_id, state, time.time())
+        with self._pending_lock:
+            self._pending[task.id] = write
+            queued = len(self._pending)
+        self._cache.put(task.id, task)
+        if queued >= self.batch_size:
+            self._wake.set()
+
+    async def get(self, task_id: str, context: ServerCallContext | None = None) -> Task | None:
+        """Return the task from memory, the write queue or the database (in that order)."""
+        task = self._cache.get(task_id)
+        if task is not None:
+            return task
+
+        with self._pending_lock:
+            write = self._pending.get(task_id) or self._flushing.get(task_id)
+        if write is not None:
+            data = write[0]
+        else:
+            data = await asyncio.to_thread(self._load, task_id)
+        if data is None:
+            return None
+
+        task = Task.model_validate_json(data)
+        self._cache.put(task_id, task)
+        return task
+
+    async def delete(self, task_id: str, context: ServerCallContext | None = None) -> None:
+        self._cache.pop(task_id)
+        with self._pending_lock:
+            self._pending[task_id] = (None, None, None, time.time())
+        self._wake.set()
+
+    def flush(self) -> int:
+        """
+        Commit every queued write in one transaction.
+
+        Returns:
+            Number of tasks written or deleted
+        """
+        with self._flush_lock:
+            return self._flush()
+
+    def _flush(self) -> int:
+        with self._pending_lock:
+            if not self._pending:
+                return 0
+            self._flushing, self._pending = self._pending, {}
+            batch = self._flushing
+
+        upserts = [(task_id, context_id, state, data, saved_at) for task_id, (data, context_id, state, saved_at) in batch.items() if data is not None]
+        deletes = [(task_id,) for task_id, (data, _, _, _) in batch.items() if data is None]
+        try:
+            with self._db_lock, self._connection:
+                if upserts:
+                    self._connection.executemany(
+                        "INSERT INTO tasks (id, context_id, state, data, updated_at) VALUES (?, ?, ?, ?, ?) "
+                        "ON CONFLICT(id) DO UPDATE SET context_id = excluded.context_id, state = excluded.state, "
+                        "data = excluded.data, updated_at = excluded.updated_at",
+                        upserts,
+                    )
+                if deletes:
+                    self._connection.executemany("DELETE FROM tasks WHERE id = ?", deletes)
+        except Exception as e:
+            # Put the batch back (newer saves win) so it is retried on the next flush
+            logger.error("Error writing %d tasks to %s: %s", len(batch), self.path, e)
+            with self._pending_lock:
+                self._pending = {**batch, **self._pending}
+                self._flushing = {}
+            return 0
+
+        with self._pending_lock:
+            self._flushing = {}
+        logger.debug("Task store flushed %d upserts and %d deletes", len(upserts), len(deletes))
+        return len(batch)
+
+    def purge_expired(self) -> int:
+        """
+        Delete tasks older than the retention period.
+
+        Returns:
+            Number of deleted tasks
+        """
+        self._last_purge = time.monotonic()
+        if self.retention_days <= 0:
+            return 0
+        cutoff = time.time() - self.retention_days * 86400
+        with self._db_lock, self._connection:
+            deleted = self._connection.execute("DELETE FROM tasks WHERE updated_at < ?", (cutoff,)).rowcount
+        if deleted:
+            logger.info("Task store purged %d tasks older than %s days", deleted, self.retention_days)
+        return deleted
+
+    def stats(self) -> dict:
+        with self._pending_lock:
+            pending = len(self._pending) + len(self._flushing)
+        return {"cache": self._cache.stats(), "pending_writes": pending}
+
+    def close(self) -> None:
+        """Stop the writer thread and commit whatever is still queued."""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._wake.set()
+        self._writer.join()
+        self.flush()
+        with self._db_lock:
+            self._connection.close()
+
+    def _load(self, task_id: str) -> Optional[str]:
+        with self._db_lock:
+            row = self._connection.execute("SELECT data FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return row[0] if row else None
+
+    def _run_writer(self) -> None:
+        while not self._closed.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+            if time.monotonic() - self._last_purge >= _PURGE_INTERVAL_SECONDS:
+                try:
+                    self.purge_expired()
+                except Exception as e:
+                    logger.error("Error purging expired tasks: %s", e)
+
+
+def create_task_store(backend: str = TASK_STORE_BACKEND) -> TaskStore:
+    """
+    Create a task store for the configured backend.
+
+    Args:
+        backend: "sqlite" (persistent, bounded memory) or "memory" (a2a InMemoryTaskStore)
+
+    Returns:
+        New TaskStore instance
+    """
+    if backend == "sqlite":
+        logger.info("Using SQLite task store at %s", TASK_STORE_PATH)
+        return SQLiteTaskStore()
+    if backend == "memory":
+        return InMemoryTaskStore()
+    raise ValueError(f"Unknown task store backend '{backend}'. Valid values: {TASK_STORE_BACKENDS}")
+
+
+_task_store: Optional[TaskStore] = None
+_task_store_lock = threading.Lock()
+
+
+def get_shared_task_store() -> TaskStore:
+    """Return the process-wide task store shared by every agent, creating it on first use."""
+    global _task_store
+    if _task_store is None:
+        with _task_store_lock:
+            if _task_store is None:
+                _task_store = create_task_store()
+                if isinstance(_task_store, SQLiteTaskStore):
+                    atexit.register(_task_store.close)
+    return _task_store
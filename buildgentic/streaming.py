@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Optional
+
+from a2a.server.agent_execution import AgentExecutor, RequestContext
+from a2a.server.events import EventQueue
+from a2a.types import TaskStatusUpdateEvent, TextPart
+from google.adk.a2a.converters.event_converter import convert_event_to_a2a_events
+from google.adk.a2a.converters.request_converter import AgentRunRequest, convert_a2a_request_to_agent_run_request
+from google.adk.a2a.executor.a2a_agent_executor import A2aAgentExecutorConfig
+from google.adk.agents.run_config import StreamingMode
+
+
+logger = logging.getLogger(__name__)
+
+
+# Token streaming configuration - Global Variables from .env file
+# Stream the model output of message/stream requests token by token (false = one message per model turn)
+AGENT_STREAMING = os.getenv("AGENT_STREAMING", "true").lower() in ("1", "true", "yes")
+# Seconds partial text is held to be sent with the next chunks (the first chunk of a task is sent at once)
+STREAM_FLUSH_INTERVAL = float(os.getenv("STREAM_FLUSH_INTERVAL", "0.05"))
+# Characters of held partial text that make it sent before the flush interval
+STREAM_COALESCE_CHARS = int(os.getenv("STREAM_COALESCE_CHARS", "512"))
+
+# Metadata of the status updates carrying a chunk of a model turn rather than a whole message
+PARTIAL_METADATA_KEY = "adk_partial"
+
+
+def executor_config(streaming: bool = AGENT_STREAMING) -> A2aAgentExecutorConfig:
+    """
+    Configuration of the agent executors.
+
+    With streaming, message/stream requests run the agent in SSE mode, so the model
+    output reaches the client as it is generated; every chunk is a working status
+    update marked with PARTIAL_METADATA_KEY, followed by the complete message of the
+    turn. message/send requests, whose client only sees the result, run unchanged.
+    """
+    if not streaming:
+        return A2aAgentExecutorConfig()
+    return A2aAgentExecutorConfig(request_converter=_streaming_request_converter, event_converter=_partial_event_converter)
+
+
+def _streaming_request_converter(context: RequestContext, part_converter) -> AgentRunRequest:
+    run_request = convert_a2a_request_to_agent_run_request(context, part_converter)
+    if context.call_context is not None and context.call_context.state.get("method") == "message/stream":
+        run_request.run_config.streaming_mode = StreamingMode.SSE
+    return run_request
+
+
+def _partial_event_converter(event, invocation_context, task_id=None, context_id=None, part_converter=None):
+    kwargs = {"part_converter": part_converter} if part_converter is not None else {}
+    a2a_events = convert_event_to_a2a_events(event, invocation_context, task_id, context_id, **kwargs)
+    if event.partial:
+        for a2a_event in a2a_events:
+            if isinstance(a2a_event, TaskStatusUpdateEvent):
+                a2a_event.metadata = {**(a2a_event.metadata or {}), PARTIAL_METADATA_KEY: True}
+    return a2a_events
+
+
+class ChunkCoalescingExecutor(AgentExecutor):
+    """
+    Agent executor merging the partial text chunks of a streamed model turn.
+
+    Models stream a few characters per chunk; sending each one as an SSE event (and a
+    task store update) costs more than the text. The first chunk of a task is sent at
+    once, so the time to first token is not affected; the next ones are merged and
+    sent every flush_interval seconds, or as soon as max_chars are held. Any other
+    event sends the held text first, so the order of the events is kept.
+    """
+
+    def __init__(self, executor: AgentExecutor, flush_interval: float = STREAM_FLUSH_INTERVAL, max_chars: int = STREAM_COALESCE_CHARS):
+        self._executor = executor
+        self._flush_interval = flush_interval
+        self._max_chars = max_chars
+
+    async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
+        coalescer = _ChunkCoalescer(event_queue, self._flush_interval, self._max_chars)
+        try:
+            await self._executor.execute(context, coalescer)
+        finally:
+            await coalescer.flush()
+
+    async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
+        await self._executor.cancel(context, event_queue)
+
+
+class _ChunkCoalescer:
+    """Event queue proxy holding the partial text chunks for ChunkCoalescingExecutor."""
+
+    def __init__(self, event_queue: EventQueue, flush_interval: float, max_chars: int):
+        self._event_queue = event_queue
+        self._flush_interval = flush_interval
+        self._max_chars = max_chars
+        self._lock = asyncio.Lock()
+        self._held: Optional[TaskStatusUpdateEvent] = None
+        self._held_text: Optional[TextPart] = None
+        self._last_flush = float("-inf")
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def enqueue_event(self, event) -> None:
+        text = _partial_text(event)
+        if text is None:
+            await self.flush()
+            await self._event_queue.enqueue_event(event)
+            return
+
+        async with self._lock:
+            if self._held is not None and self._held.task_id == event.task_id:
+                self._held_text.text += text.text
+            else:
+                await self._flush_held()
+                self._held, self._held_text = event, text
+            wait = self._last_flush + self._flush_interval - time.monotonic()
+            if wait <= 0 or len(self._held_text.text) >= self._max_chars:
+                await self._flush_held()
+            elif self._timer is None:
+                self._timer = asyncio.get_running_loop().call_later(wait, lambda: asyncio.ensure_future(self.flush()))
+
+    async def flush(self) -> None:
+        """Send the held text, if any."""
+        async with self._lock:
+            await self._flush_held()
+
+    async def _flush_held(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        held, self._held, self._held_text = self._held, None, None
+        if held is not None:
+            await self._event_queue.enqueue_event(held)
+            self._last_flush = time.monotonic()
+
+    def __getattr__(self, name):
+        return getattr(self._event_queue, name)
+
+
+def _partial_text(event) -> Optional[TextPart]:
+    """Text part of a status update carrying a chunk of plain text, None for any other event."""
+    if not isinstance(event, TaskStatusUpdateEvent) or not (event.metadata or {}).get(PARTIAL_METADATA_KEY):
+        return None
+    message = event.status.message
+    if message is None or len(message.parts) != 1 or not isinstance(message.parts[0].root, TextPart):
+        return None
+    return message.parts[0].root
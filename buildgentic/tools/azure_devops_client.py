@@ -0,0 +1,210 @@
+import asyncio
+import logging
+import os
+import threading
+import weakref
+from typing import Callable, Dict, Optional, Tuple
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+logger = logging.getLogger(__name__)
+
+
+# Connection pool / timeout configuration - Global Variables from .env file
+AZURE_DEVOPS_POOL_CONNECTIONS = int(os.getenv("AZURE_DEVOPS_POOL_CONNECTIONS", "4"))
+AZURE_DEVOPS_POOL_MAXSIZE = int(os.getenv("AZURE_DEVOPS_POOL_MAXSIZE", "16"))
+AZURE_DEVOPS_CONNECT_TIMEOUT = float(os.getenv("AZURE_DEVOPS_CONNECT_TIMEOUT", "5"))
+AZURE_DEVOPS_READ_TIMEOUT = float(os.getenv("AZURE_DEVOPS_READ_TIMEOUT", "30"))
+AZURE_DEVOPS_MAX_RETRIES = int(os.getenv("AZURE_DEVOPS_MAX_RETRIES", "2"))
+AZURE_DEVOPS_MAX_CONNECTIONS = int(os.getenv("AZURE_DEVOPS_MAX_CONNECTIONS", "32"))
+
+JSON_PATCH_CONTENT_TYPE = "application/json-patch+json"
+
+
+class AzureDevOpsClient:
+    """
+    Shared HTTP client for the Azure DevOps REST API.
+
+    Wraps a single requests.Session so every tool call reuses pooled keep-alive
+    connections instead of paying a new TCP+TLS handshake. Authentication headers
+    are computed once when the client is created and every request gets a
+    (connect, read) timeout unless the caller passes its own.
+    """
+
+    def __init__(
+        self,
+        headers: Dict[str, str],
+        pool_connections: int = AZURE_DEVOPS_POOL_CONNECTIONS,
+        pool_maxsize: int = AZURE_DEVOPS_POOL_MAXSIZE,
+        connect_timeout: float = AZURE_DEVOPS_CONNECT_TIMEOUT,
+        read_timeout: float = AZURE_DEVOPS_READ_TIMEOUT,
+        max_retries: int = AZURE_DEVOPS_MAX_RETRIES,
+    ):
+        """
+        Args:
+            headers: Default headers (authentication, content type) sent with every request
+            pool_connections: Number of per-host connection pools to cache
+            pool_maxsize: Maximum number of keep-alive connections kept per host
+            connect_timeout: Seconds to wait for the TCP/TLS connection
+            read_timeout: Seconds to wait for the server to send data
+            max_retries: Retries for failed connections (never for requests already sent)
+        """
+        self.timeout: Tuple[float, float] = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+        self.session.headers.update(headers)
+
+        retry = Retry(total=max_retries, connect=max_retries, read=0, status=0, backoff_factor=0.3)
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request through the pooled session.
+
+        Headers passed by the caller are merged on top of the default headers for this
+        request only; the shared session headers are never modified.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def patch(self, url: str, **kwargs) -> requests.Response:
+        return self.request("PATCH", url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> requests.Response:
+        return self.request("PUT", url, **kwargs)
+
+    def close(self) -> None:
+        """Close every pooled connection."""
+        self.session.close()
+
+
+_client: Optional[AzureDevOpsClient] = None
+_client_lock = threading.Lock()
+
+
+def get_shared_client(get_headers: Callable[[], Dict[str, str]]) -> AzureDevOpsClient:
+    """
+    Return the process-wide AzureDevOpsClient, creating it on first use.
+
+    Args:
+        get_headers: Returns the default headers; only called when the client has to be created
+
+    Returns:
+        The shared client instance
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                logger.debug("Creating shared Azure DevOps HTTP client")
+                _client = AzureDevOpsClient(get_headers())
+    return _client
+
+
+def reset_shared_client() -> None:
+    """Close and discard the shared client (the next call creates a new one)."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+
+
+class AsyncAzureDevOpsClient:
+    """
+    Shared asyncio HTTP client for the Azure DevOps REST API.
+
+    Async counterpart of AzureDevOpsClient built on httpx.AsyncClient, so tool calls
+    made from the uvicorn event loop await the network instead of blocking it. The
+    pool is capped per host and keeps idle connections alive between tool calls.
+    """
+
+    def __init__(
+        self,
+        headers: Dict[str, str],
+        max_connections: int = AZURE_DEVOPS_MAX_CONNECTIONS,
+        max_keepalive_connections: int = AZURE_DEVOPS_POOL_MAXSIZE,
+        connect_timeout: float = AZURE_DEVOPS_CONNECT_TIMEOUT,
+        read_timeout: float = AZURE_DEVOPS_READ_TIMEOUT,
+        max_retries: int = AZURE_DEVOPS_MAX_RETRIES,
+    ):
+        """
+        Args:
+            headers: Default headers (authentication, content type) sent with every request
+            max_connections: Maximum number of concurrent connections
+            max_keepalive_connections: Maximum number of idle keep-alive connections
+            connect_timeout: Seconds to wait for the TCP/TLS connection
+            read_timeout: Seconds to wait for the server to send data
+            max_retries: Retries for failed connections (never for requests already sent)
+        """
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections)
+        self.client = httpx.AsyncClient(
+            headers=headers,
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            transport=httpx.AsyncHTTPTransport(limits=limits, retries=max_retries),
+        )
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request through the pooled async client."""
+        return await self.client.request(method, url, **kwargs)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def patch(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("PATCH", url, **kwargs)
+
+    async def put(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("PUT", url, **kwargs)
+
+    def stream(self, method: str, url: str, **kwargs):
+        """Return an async context manager that streams the response body."""
+        return self.client.stream(method, url, **kwargs)
+
+    async def aclose(self) -> None:
+        """Close every pooled connection."""
+        await self.client.aclose()
+
+
+# httpx connections belong to the event loop that opened them, so keep one client per loop
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncAzureDevOpsClient]" = weakref.WeakKeyDictionary()
+
+
+def get_shared_async_client(get_headers: Callable[[], Dict[str, str]]) -> AsyncAzureDevOpsClient:
+    """
+    Return the AsyncAzureDevOpsClient of the running event loop, creating it on first use.
+
+    Args:
+        get_headers: Returns the default headers; only called when the client has to be created
+
+    Returns:
+        The shared async client for the current loop
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        logger.debug("Creating shared async Azure DevOps HTTP client")
+        client = AsyncAzureDevOpsClient(get_headers())
+        _async_clients[loop] = client
+    return client
+
+
+async def close_shared_async_client() -> None:
+    """Close the async client of the running event loop, if any."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
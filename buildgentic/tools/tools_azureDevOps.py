@@ -3,13 +3,19 @@ import requests
 import base64
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 from google.adk.tools import ToolContext
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any, Tuple
 from datetime import datetime
 from dotenv import load_dotenv
 
+from buildgentic.tools.azure_devops_client import JSON_PATCH_CONTENT_TYPE, AzureDevOpsClient, get_shared_client
+from buildgentic.storage.blob_store import get_shared_blob_store
+from buildgentic.tools.wiki_cache import WikiPageCache
+from buildgentic.tools.work_item_cache import get_work_item_cache
+
 
 # Load environment variables from .env file
 load_dotenv()
@@ -71,6 +77,16 @@ AZURE_DEVOPS_PROJECT = os.getenv("AZURE_DEVOPS_PROJECT", "your-project")
 AZURE_DEVOPS_PAT = os.getenv("AZURE_DEVOPS_PAT", "your-pat-token")
 AZURE_DEVOPS_USER_EMAIL = os.getenv("AZURE_DEVOPS_USER_EMAIL", "your-email@company.com")
 
+# Work items batch API: maximum ids per request and batches downloaded at once
+WORK_ITEMS_BATCH_SIZE = 200
+AZURE_DEVOPS_FETCH_CONCURRENCY = int(os.getenv("AZURE_DEVOPS_FETCH_CONCURRENCY", "4"))
+
+# Caché de páginas de la wiki compartida por todos los agentes del proceso
+_wiki_page_cache = WikiPageCache()
+
+# Valores soportados por Azure DevOps: Bug, User Story, Epic, Task, Feature
+SUPPORTED_WORK_ITEM_TYPES = {"Bug", "User Story", "Epic", "Task", "Feature"}
+
 
 def get_azure_devops_headers() -> Dict[str, str]:
     """
@@ -100,51 +116,38 @@ def get_azure_devops_base_url() -> str:
     return f"https://dev.azure.com/{AZURE_DEVOPS_ORGANIZATION}"
 
 
-def get_tickets_assigned_to_me(tool_context: ToolContext, state: Optional[str] = None) -> List[Dict[str, Any]]:
+def get_azure_devops_client() -> AzureDevOpsClient:
+    """
+    Get the shared, connection-pooled client for Azure DevOps API requests
+
+    Returns:
+        AzureDevOpsClient whose authentication headers are computed only once
+    """
+    return get_shared_client(get_azure_devops_headers)
+
+
+def get_tickets_assigned_to_me(tool_context: ToolContext, state: Optional[str] = None, projection: str = "compact") -> List[Dict[str, Any]]:
     """
     Get all work items assigned to the configured user, acotados al proyecto definido en AZURE_DEVOPS_PROJECT.
 
     Args:
         state: Optional state filter (e.g., "New", "In Progress"). If None, no state filter is applied.
+        projection: Fields to return for each work item:
+            "summary" (id, title, state, type, tags),
+            "compact" (summary plus description, default) or
+            "full" (the complete work item payload).
 
     Returns:
-        List of work items assigned to the user en el proyecto actual
+        List of work items assigned to the user en el proyecto actual. If some work items could not
+        be fetched, a last entry {"failed_ids": [...], "error": "..."} lists them.
     """
-    
-    if state:
-        state_filter = f"AND [System.State] = '{state}'"
-    else:
-        state_filter = " AND [System.State] <> 'Closed' AND [System.State] <> 'Removed' "
-
+    if projection not in _WORK_ITEM_PROJECTIONS:
+        logger.error("projection '%s' no soportada. Valores válidos: %s", projection, sorted(_WORK_ITEM_PROJECTIONS))
+        return []
     try:
-        base_url = get_azure_devops_base_url()
-        headers = get_azure_devops_headers()
-        # WIQL query con filtro explícito de proyecto
-        wiql_query = {
-            "query": f"""
-            SELECT [System.Id], [System.Title], [System.State], [System.WorkItemType],
-                   [System.AssignedTo], [System.CreatedDate], [System.ChangedDate], [System.TeamProject]
-            FROM WorkItems
-            WHERE [System.AssignedTo] = '{AZURE_DEVOPS_USER_EMAIL}'
-            AND [System.TeamProject] = '{AZURE_DEVOPS_PROJECT}'
-            {state_filter}
-            ORDER BY [System.ChangedDate] DESC
-            """
-        }
-        url = f"{base_url}/{AZURE_DEVOPS_PROJECT}/_apis/wit/wiql?api-version=7.0"
-        response = requests.post(url, headers=headers, json=wiql_query)
-        __check_response(response, "WIQL assigned tickets")
-        wiql_result = response.json()
-        work_items = []
-        # Get detailed information for each work item
-        if wiql_result.get("workItems"):
-            ids = [str(item["id"]) for item in wiql_result["workItems"]]
-            if ids:
-                details_url = f"{base_url}/{AZURE_DEVOPS_PROJECT}/_apis/wit/workitems?ids={','.join(ids)}&api-version=7.0"
-                details_response = requests.get(details_url, headers=headers)
-                __check_response(details_response, f"work items details for ids {','.join(ids)}")
-                work_items = details_response.json().get("value", [])
-        return work_items
+        ids = _execute_wiql_for_ids(_build_assigned_clause(state))
+        report = _fetch_work_items_details(ids, _WORK_ITEM_PROJECTIONS[projection])
+        return [_project_work_item(it, projection) for it in report["items"]] + _missing_work_items(report)
     except requests.exceptions.RequestException as e:
         logger.exception("Error fetching assigned tickets: %s", e)
         return []
@@ -162,10 +165,10 @@ def get_work_item_details(work_item_id: int) -> Optional[Dict[str, Any]]:
     """
     try:
         base_url = get_azure_devops_base_url()
-        headers = get_azure_devops_headers()
+        client = get_azure_devops_client()
 
         url = f"{base_url}/{AZURE_DEVOPS_PROJECT}/_apis/wit/workitems/{work_item_id}?$expand=all&api-version=7.0"
-        response = requests.get(url, headers=headers)
+        response = client.get(url)
         __check_response(response, f"get work item {work_item_id}")
 
         return response.json()
@@ -175,6 +178,21 @@ def get_work_item_details(work_item_id: int) -> Optional[Dict[str, Any]]:
         return None
 
 
+def _patch_work_item(work_item_id: int, patch_document: List[Dict[str, Any]], context: str) -> None:
+    """
+    Envía un PATCH de un work item y lo quita de la caché de work items.
+
+    Las herramientas síncronas envían un PATCH por llamada: la agrupación de
+    actualizaciones (WorkItemMutationBuffer) solo existe en tools_azureDevOps_async.
+    """
+    url = f"{get_azure_devops_base_url()}/{AZURE_DEVOPS_PROJECT}/_apis/wit/workitems/{work_item_id}?api-version=7.0"
+    try:
+        response = get_azure_devops_client().patch(url, json=patch_document, headers={"Content-Type": JSON_PATCH_CONTENT_TYPE})
+    finally:
+        get_work_item_cache().invalidate(work_item_id)
+    __check_response(response, context)
+
+
 def update_ticket_description(work_item_id: int, new_description_markdown: str) -> bool:
     """
     Update the description of a work item
@@ -187,28 +205,12 @@ def update_ticket_description(work_item_id: int, new_description_markdown: str)
         True if successful, False otherwise
     """
     try:
-        base_url = get_azure_devops_base_url()
-        headers = get_azure_devops_headers()
-
         # Azure DevOps uses PATCH operations with JSON Patch format
-        patch_document = [
-            {
-                "op": "replace",
-                "path": "/fields/System.Description",
-                "value": new_description_markdown
-            },
-            {
-                "op": "add",
-                "path": "/multilineFieldsFormat/System.Description",
-                "value": "Markdown"
-            },
-        ]
-
-        url = f"{base_url}/{AZURE_DEVOPS_PROJECT}/_apis/wit/workitems/{work_item_id}?api-version=7.0"
-        headers["Content-Type"] = "application/json-patch+json"
-
-        response = requests.patch(url, headers=headers, json=patch_document)
-        __check_response(response, f"update description for work item {work_item_id}")
+        _patch_work_item(
+            work_item_id,
+            _description_patch_document(new_description_markdown),
+            f"update description for work item {work_item_id}",
+        )
 
         logger.info("Successfully updated description for work item %s", work_item_id)
         return True
@@ -230,18 +232,15 @@ def add_comment_to_ticket(work_item_id: int, comment: str) -> bool:
     """
     try:
         base_url = get_azure_devops_base_url()
-        headers = get_azure_devops_headers()
-        # Procesar saltos de línea para Markdown: Azure DevOps requiere doble espacio antes de salto de línea para soft break, o doble salto para hard break.
-        # Aquí convertimos cada salto de línea simple en doble espacio + salto de línea (soft break)
-        processed_comment = comment.replace("\r\n", "\n")  # Normalizar saltos de línea
-        processed_comment = processed_comment.replace("\n", "  \n")
+        client = get_azure_devops_client()
+        processed_comment = _format_markdown_comment(comment)
         comment_data = {
             "text": processed_comment
         }
         logger.debug("Processed comment for work_item %s: %s", work_item_id, processed_comment)
         url = f"{base_url}/{AZURE_DEVOPS_PROJECT}/_apis/wit/workitems/{work_item_id}/comments?format=0&api-version=7.1-preview.4"
-        headers["Content-Type"] = "application/json"
-        response = requests.post(url, headers=headers, json=comment_data)
+        response = client.post(url, json=comment_data)
+        get_work_item_cache().invalidate(work_item_id)
         __check_response(response, f"add comment to work item {work_item_id}")
         logger.info("Successfully added markdown comment to work item %s", work_item_id)
         return True
@@ -250,10 +249,19 @@ def add_comment_to_ticket(work_item_id: int, comment: str) -> bool:
         return False
 
 
+def _attachment_ref(attachment_id: str) -> str:
+    """Key of an attachment in the blob store (attachment contents never change)."""
+    return f"azure-devops-attachment:{attachment_id}"
+
+
 def download_attachment(attachment_id: str, file_name: str, download_path: str = ".") -> bool:
     """
     Download an attachment from a work item
 
+    Attachments are kept in the shared content-addressed blob store, so an attachment
+    that was already downloaded (by any agent) is copied from disk without calling
+    Azure DevOps.
+
     Args:
         attachment_id: ID of the attachment
         file_name: Name to save the file as
@@ -263,18 +271,28 @@ def download_attachment(attachment_id: str, file_name: str, download_path: str =
         True if successful, False otherwise
     """
     try:
+        file_path = os.path.join(download_path, file_name)
+        blob_store = get_shared_blob_store()
+
+        sha256 = blob_store.get_ref(_attachment_ref(attachment_id))
+        if sha256 is not None:
+            try:
+                blob_store.copy_to(sha256, file_path)
+                logger.info("Attachment %s served from the local cache to %s", attachment_id, file_path)
+                return True
+            except FileNotFoundError:
+                # Evicted since get_ref: downloaded again below
+                logger.info("Attachment %s left the local cache, downloading it again", attachment_id)
+
         base_url = get_azure_devops_base_url()
-        headers = get_azure_devops_headers()
+        client = get_azure_devops_client()
 
         url = f"{base_url}/_apis/wit/attachments/{attachment_id}?api-version=7.0"
-        response = requests.get(url, headers=headers, stream=True)
+        response = client.get(url, stream=True)
         __check_response(response, f"download attachment {attachment_id}")
 
-        file_path = os.path.join(download_path, file_name)
-
-        with open(file_path, 'wb') as file:
-            for chunk in response.iter_content(chunk_size=8192):
-                file.write(chunk)
+        sha256 = blob_store.put_stream(response.iter_content(chunk_size=65536), ref=_attachment_ref(attachment_id))
+        blob_store.copy_to(sha256, file_path)
 
         logger.info("Successfully downloaded attachment to %s", file_path)
         return True
@@ -299,22 +317,7 @@ def update_ticket_status(work_item_id: int, new_status: str) -> bool:
         True if successful, False otherwise
     """
     try:
-        base_url = get_azure_devops_base_url()
-        headers = get_azure_devops_headers()
-
-        patch_document = [
-            {
-                "op": "replace",
-                "path": "/fields/System.State",
-                "value": new_status
-            }
-        ]
-
-        url = f"{base_url}/{AZURE_DEVOPS_PROJECT}/_apis/wit/workitems/{work_item_id}?api-version=7.0"
-        headers["Content-Type"] = "application/json-patch+json"
-
-        response = requests.patch(url, headers=headers, json=patch_document)
-        __check_response(response, f"update status for work item {work_item_id} to {new_status}")
+        _patch_work_item(work_item_id, _status_patch_document(new_status), f"update status for work item {work_item_id} to {new_status}")
 
         logger.info("Successfully updated status of work item %s to '%s'", work_item_id, new_status)
         return True
@@ -341,23 +344,7 @@ def get_work_item_attachments(work_item_id: int) -> List[Dict[str, Any]]:
         if not work_item:
             return []
 
-        attachments = []
-        relations = work_item.get("relations", [])
-
-        for relation in relations:
-            if relation.get("rel") == "AttachedFile":
-                attachment_url = relation.get("url", "")
-                # Extract attachment ID from URL
-                if "/attachments/" in attachment_url:
-                    attachment_id = attachment_url.split("/attachments/")[-1].split("?")[0]
-                    attachment_info = {
-                        "id": attachment_id,
-                        "url": attachment_url,
-                        "attributes": relation.get("attributes", {})
-                    }
-                    attachments.append(attachment_info)
-
-        return attachments
+        return _extract_attachments(work_item)
 
     except Exception as e:
         logger.exception("Error getting attachments for work item %s: %s", work_item_id, e)
@@ -374,30 +361,19 @@ def create_ticket(title: str, description_in_markdown: Optional[str] = None, wor
     Returns:
         Created work item details or None if creation failed
     """
-    # Valores soportados por Azure DevOps: Bug, User Story, Epic, Task, Feature
-    supported_types = {"Bug", "User Story", "Epic", "Task", "Feature"}
-    if work_item_type not in supported_types:
-        logger.error("work_item_type '%s' no soportado. Valores válidos: %s", work_item_type, supported_types)
+    if work_item_type not in SUPPORTED_WORK_ITEM_TYPES:
+        logger.error("work_item_type '%s' no soportado. Valores válidos: %s", work_item_type, SUPPORTED_WORK_ITEM_TYPES)
         return None
     try:
         base_url = get_azure_devops_base_url()
-        headers = get_azure_devops_headers()
-        work_item_data = [
-            {"op": "add", "path": "/fields/System.Title", "value": title},
-            {"op": "add", "path": "/fields/System.AssignedTo", "value": AZURE_DEVOPS_USER_EMAIL},
-            {"op": "add", "path": "/fields/System.State", "value": "New"}
-        ]
+        client = get_azure_devops_client()
+        work_item_data = _new_ticket_patch_document(title, description_in_markdown)
         url = f"{base_url}/{AZURE_DEVOPS_PROJECT}/_apis/wit/workitems/${work_item_type}?api-version=7.0"
-        headers["Content-Type"] = "application/json-patch+json"
-        response = requests.post(url, headers=headers, json=work_item_data)
+        response = client.post(url, json=work_item_data, headers={"Content-Type": JSON_PATCH_CONTENT_TYPE})
         __check_response(response, f"create work item '{title}'")
         created_work_item = response.json()
         work_item_id = created_work_item.get("id")
         logger.info("Successfully created work item %s of type '%s' with title: '%s'", work_item_id, work_item_type, title)
-
-        if description_in_markdown:
-            update_ticket_description(work_item_id, description_in_markdown)
-
         return created_work_item
     except requests.exceptions.RequestException as e:
         logger.exception("Error creating work item with title '%s': %s", title, e)
@@ -415,9 +391,9 @@ def get_comments_from_ticket(work_item_id: int) -> Optional[list]:
     """
     try:
         base_url = get_azure_devops_base_url()
-        headers = get_azure_devops_headers()
+        client = get_azure_devops_client()
         url = f"{base_url}/{AZURE_DEVOPS_PROJECT}/_apis/wit/workitems/{work_item_id}/comments?api-version=7.0-preview.3"
-        response = requests.get(url, headers=headers)
+        response = client.get(url)
         __check_response(response, f"get comments for work item {work_item_id}")
         data = response.json()
         # Los comentarios están en el campo 'comments' (lista de dicts)
@@ -437,43 +413,15 @@ def load_context(agentName : str) -> Dict[str, str]:
     Returns:
         Diccionario con 'description' e 'instruction', o vacío si hay error
     """
-    context = {
-        "name": agentName,
-        "description": "",
-        "instruction": ""
-    }
-
     agent_definition = get_wiki_page_content(agentName)
 
     # Validar que la página se haya recuperado correctamente
     if agent_definition is None:
         print(f"Error: No se pudo recuperar la definición del agente '{agentName}'.")
-        return context
-
-    # Aquí asumimos que la página tiene un formato específico para separar descripción e instrucciones
-    # Por ejemplo, usando encabezados Markdown: ## Description y ## Instruction
-    description_marker = "## Description"
-    instruction_marker = "## Instruction"
+        return _build_agent_context(agentName, None, None)
 
-    description_start = agent_definition.find(description_marker)
-
-    instruction_start = agent_definition.find(instruction_marker)
-
-    if description_start != -1 and instruction_start != -1:
-        context["description"] = agent_definition[description_start + len(description_marker):instruction_start].strip()
-        context["instruction"] = agent_definition[instruction_start + len(instruction_marker):].strip()
-    elif description_start != -1:
-        context["description"] = agent_definition[description_start + len(description_marker):].strip()
-    elif instruction_start != -1:
-        context["instruction"] = agent_definition[instruction_start + len(instruction_marker):].strip()
-    else:
-        logger.warning("No se encontraron secciones de descripción o instrucciones en la definición del agente '%s'.", agentName)
-    
     workflow_description = get_wiki_page_content("Management Workflows")
-    if workflow_description:
-        context["instruction"] += "\n\n" + workflow_description
-
-    return context
+    return _build_agent_context(agentName, agent_definition, workflow_description)
 
 def get_instructions(agentName : str) -> Optional[str]:
     """
@@ -501,47 +449,66 @@ def get_instructions(agentName : str) -> Optional[str]:
     return agent_definition + "\n\n" + workflow_description
 
 
-def get_wiki_page_content(page_path: str) -> Optional[str]:
+def get_wiki_page_content(page_path: str, use_cache: bool = True) -> Optional[str]:
     """
     Recupera el contenido de una página de la wiki asociada al proyecto Azure DevOps.
 
+    Las páginas se sirven desde la caché compartida (ver wiki_cache.WikiPageCache)
+    mientras no caduquen; después se revalidan con su ETag.
+
     Args:
         page_path: Ruta de la página dentro de la wiki (ejemplo: 'Home', 'docs/intro')
-        wiki_name: Nombre de la wiki (si no se indica, se usa la primera wiki del proyecto)
+        use_cache: Si es False se descarga siempre la página sin pasar por la caché
     Returns:
         Contenido de la página como string, o None si hay error
     """
-
-    wiki_name = "buildgentic.wiki"
-
     try:
-        base_url = get_azure_devops_base_url()
-        headers = get_azure_devops_headers()
-        # Si no se indica wiki_name, obtenemos la primera wiki del proyecto
-        if not wiki_name:
-            wikis_url = f"{base_url}/{AZURE_DEVOPS_PROJECT}/_apis/wiki/wikis?api-version=7.0"
-            wikis_response = requests.get(wikis_url, headers=headers)
-            __check_response(wikis_response, "get wikis list")
-            wikis = wikis_response.json().get("value", [])
-            if not wikis:
-                logger.warning("No se encontró ninguna wiki asociada al proyecto.")
-                return None
-            wiki_name = wikis[0].get("name")
-        # Recuperar el contenido de la página
-        page_url = f"{base_url}/{AZURE_DEVOPS_PROJECT}/_apis/wiki/wikis/{wiki_name}/pages?path={page_path}&includeContent=true&api-version=7.0"
-        page_response = requests.get(page_url, headers=headers)
-        __check_response(page_response, f"get wiki page {page_path}")
-        page_data = page_response.json()
-        content = page_data.get("content")
-        if content is None:
-            logger.warning("No se encontró contenido en la página '%s' de la wiki '%s'.", page_path, wiki_name)
-
+        if use_cache:
+            return _wiki_page_cache.get(page_path, _request_wiki_page)
+        content, _, _ = _request_wiki_page(page_path)
         return content
     except requests.exceptions.RequestException as e:
         logger.exception("Error recuperando la página de la wiki: %s", e)
         return None
 
 
+def _request_wiki_page(page_path: str, etag: Optional[str] = None) -> Tuple[Optional[str], Optional[str], bool]:
+    """
+    Descarga una página de la wiki.
+
+    Returns:
+        Tupla (contenido, ETag, no_modificada). Si se indica etag y la página no ha
+        cambiado, el servidor responde 304 y no se descarga el contenido.
+    """
+    wiki_name = "buildgentic.wiki"
+
+    base_url = get_azure_devops_base_url()
+    client = get_azure_devops_client()
+    # Si no se indica wiki_name, obtenemos la primera wiki del proyecto
+    if not wiki_name:
+        wikis_url = f"{base_url}/{AZURE_DEVOPS_PROJECT}/_apis/wiki/wikis?api-version=7.0"
+        wikis_response = client.get(wikis_url)
+        __check_response(wikis_response, "get wikis list")
+        wikis = wikis_response.json().get("value", [])
+        if not wikis:
+            logger.warning("No se encontró ninguna wiki asociada al proyecto.")
+            return None, None, False
+        wiki_name = wikis[0].get("name")
+    # Recuperar el contenido de la página
+    page_url = _wiki_page_url(base_url, wiki_name, page_path)
+    page_response = client.get(page_url, headers={"If-None-Match": etag} if etag else None)
+    if etag and page_response.status_code == 304:
+        logger.debug("Wiki page '%s' not modified", page_path)
+        return None, etag, True
+    __check_response(page_response, f"get wiki page {page_path}")
+    page_data = page_response.json()
+    content = page_data.get("content")
+    if content is None:
+        logger.warning("No se encontró contenido en la página '%s' de la wiki '%s'.", page_path, wiki_name)
+
+    return content, page_response.headers.get("ETag"), False
+
+
 def update_wiki_page_content(page_path: str, new_content: str, comment: Optional[str] = None) -> bool:
     """
     Actualiza el contenido de una página existente en la wiki de Azure DevOps.
@@ -559,12 +526,12 @@ def update_wiki_page_content(page_path: str, new_content: str, comment: Optional
 
     try:
         base_url = get_azure_devops_base_url()
-        headers = get_azure_devops_headers()
+        client = get_azure_devops_client()
 
         # Si no se indica wiki_name, obtenemos la primera wiki del proyecto
         if not wiki_name:
             wikis_url = f"{base_url}/{AZURE_DEVOPS_PROJECT}/_apis/wiki/wikis?api-version=7.0"
-            wikis_response = requests.get(wikis_url, headers=headers)
+            wikis_response = client.get(wikis_url)
             __check_response(wikis_response, "get wikis list")
             wikis = wikis_response.json().get("value", [])
             if not wikis:
@@ -574,8 +541,8 @@ def update_wiki_page_content(page_path: str, new_content: str, comment: Optional
 
         # Primero obtenemos la página actual para obtener su ETag (versión)
         logger.debug("Primer acceso a la página wiki '%s' para path '%s'", wiki_name, page_path)
-        page_url = f"{base_url}/{AZURE_DEVOPS_PROJECT}/_apis/wiki/wikis/{wiki_name}/pages?path={page_path}&includeContent=true&api-version=7.0"
-        page_response = requests.get(page_url, headers=headers)
+        page_url = _wiki_page_url(base_url, wiki_name, page_path)
+        page_response = client.get(page_url)
         __check_response(page_response, f"get wiki page for update {page_path}")
         page_data = page_response.json()
         etag = page_response.headers.get('ETag')
@@ -596,11 +563,9 @@ def update_wiki_page_content(page_path: str, new_content: str, comment: Optional
             update_data["comment"] = comment
 
         # Actualizar la página con PUT
-        headers["If-Match"] = etag
-        headers["Content-Type"] = "application/json"
-
-        update_response = requests.put(page_url, headers=headers, json=update_data)
+        update_response = client.put(page_url, json=update_data, headers={"If-Match": etag})
         __check_response(update_response, f"update wiki page {page_path}")
+        _wiki_page_cache.invalidate(page_path)
 
         logger.info("Successfully updated wiki page '%s' in wiki '%s'", page_path, wiki_name)
         return True
@@ -628,31 +593,16 @@ def add_related_work_item(work_item_id: int, related_work_item_id: int) -> bool:
     """
     try:
         base_url = get_azure_devops_base_url()
-        headers = get_azure_devops_headers()
 
         # Construir la URL del work item relacionado
         related_work_item_url = f"{base_url}/{AZURE_DEVOPS_PROJECT}/_apis/wit/workItems/{related_work_item_id}"
 
         # Azure DevOps usa JSON Patch para añadir relaciones
-        patch_document = [
-            {
-                "op": "add",
-                "path": "/relations/-",
-                "value": {
-                    "rel": "System.LinkTypes.Related",
-                    "url": related_work_item_url,
-                    "attributes": {
-                        "comment": "Relación añadida automáticamente"
-                    }
-                }
-            }
-        ]
-
-        url = f"{base_url}/{AZURE_DEVOPS_PROJECT}/_apis/wit/workitems/{work_item_id}?api-version=7.0"
-        headers["Content-Type"] = "application/json-patch+json"
-
-        response = requests.patch(url, headers=headers, json=patch_document)
-        __check_response(response, f"add related work item link {work_item_id} -> {related_work_item_id}")
+        _patch_work_item(
+            work_item_id,
+            _related_link_patch_document(related_work_item_url),
+            f"add related work item link {work_item_id} -> {related_work_item_id}",
+        )
 
         logger.info("Successfully added Related link between work item %s and %s", work_item_id, related_work_item_id)
         return True
@@ -718,11 +668,22 @@ def _build_type_clause(work_item_type: Optional[str]) -> str:
     return ""
 
 
-def _execute_wiql_for_ids(where_clause: str) -> List[str]:
-    """Ejecuta una WIQL básica que devuelve IDs, limitando al proyecto actual."""
-    base_url = get_azure_devops_base_url()
-    headers = get_azure_devops_headers()
-    wiql_query = {
+def _build_tags_clause(tags: List[str], match: str) -> Optional[str]:
+    safe_tags = [_escape_wiql_value(t.strip()) for t in tags if t and t.strip()]
+    if not safe_tags:
+        return None
+
+    # Construir predicado de tags
+    if match.lower() == "all":
+        tag_predicate = " AND ".join([f"[System.Tags] CONTAINS '{t}'" for t in safe_tags])
+    else:
+        tag_predicate = " OR ".join([f"[System.Tags] CONTAINS '{t}'" for t in safe_tags])
+        tag_predicate = f"( {tag_predicate} )"
+    return f"AND {tag_predicate}"
+
+
+def _wiql_ids_query(where_clause: str) -> Dict[str, str]:
+    return {
         "query": f"""
         SELECT [System.Id]
         FROM WorkItems
@@ -731,28 +692,152 @@ def _execute_wiql_for_ids(where_clause: str) -> List[str]:
         ORDER BY [System.ChangedDate] DESC
         """
     }
+
+
+def _build_assigned_clause(state: Optional[str]) -> str:
+    return " ".join([
+        f"AND [System.AssignedTo] = '{_escape_wiql_value(AZURE_DEVOPS_USER_EMAIL)}'",
+        _build_state_clause(state),
+    ])
+
+
+def _execute_wiql_for_ids(where_clause: str) -> List[str]:
+    """Ejecuta una WIQL básica que devuelve IDs, limitando al proyecto actual."""
+    base_url = get_azure_devops_base_url()
+    client = get_azure_devops_client()
+    wiql_query = _wiql_ids_query(where_clause)
     url = f"{base_url}/{AZURE_DEVOPS_PROJECT}/_apis/wit/wiql?api-version=7.0"
-    response = requests.post(url, headers=headers, json=wiql_query)
+    response = client.post(url, json=wiql_query)
     __check_response(response, "execute WIQL for ids")
     wiql_result = response.json()
     return [str(item["id"]) for item in wiql_result.get("workItems", [])]
 
 
-def _fetch_work_items_details(ids: List[str], fields: List[str]) -> List[Dict[str, Any]]:
+def _work_items_batch_url(group: List[str], fields: Optional[List[str]]) -> str:
+    # Sin fields se devuelve el work item completo
+    field_param = f"&fields={','.join(fields)}" if fields else ""
+    return (
+        f"{get_azure_devops_base_url()}/{AZURE_DEVOPS_PROJECT}/_apis/wit/workitems"
+        f"?ids={','.join(group)}{field_param}&api-version=7.0"
+    )
+
+
+def _order_batch(group: List[str], items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Ordena los items de un lote según el orden de ids de la WIQL."""
+    position = {work_item_id: index for index, work_item_id in enumerate(group)}
+    return sorted(items, key=lambda item: position.get(str(item.get("id")), len(position)))
+
+
+def _fetch_work_items_batch(group: List[str], fields: Optional[List[str]]) -> List[Dict[str, Any]]:
+    client = get_azure_devops_client()
+    details_response = client.get(_work_items_batch_url(group, fields))
+    __check_response(details_response, f"fetch work items details for ids {','.join(group)}")
+    return _order_batch(group, details_response.json().get("value", []))
+
+
+def _iter_work_items_details(
+    ids: List[str],
+    fields: Optional[List[str]],
+    max_concurrency: int = AZURE_DEVOPS_FETCH_CONCURRENCY,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Descarga los work items por lotes concurrentes y los va entregando página a página.
+
+    Hasta max_concurrency lotes se descargan a la vez, pero las páginas se entregan en el
+    orden de la WIQL: el llamante puede procesar la primera mientras llegan las siguientes.
+
+    Yields:
+        Diccionarios con 'ids' (ids del lote), 'items' (work items en orden WIQL)
+        y 'error' (mensaje si el lote falló, None en caso contrario)
+    """
+    groups = _chunk(ids, WORK_ITEMS_BATCH_SIZE)
+    if not groups:
+        return
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(groups))))
+    try:
+        futures = [executor.submit(_fetch_work_items_batch, group, fields) for group in groups]
+        for group, future in zip(groups, futures):
+            try:
+                yield {"ids": group, "items": future.result(), "error": None}
+            except requests.exceptions.RequestException as e:
+                yield {"ids": group, "items": [], "error": str(e)}
+    finally:
+        # Si el llamante deja de iterar, no seguimos descargando lotes pendientes
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _fetch_work_items_details_report(
+    ids: List[str],
+    fields: Optional[List[str]],
+    max_concurrency: int = AZURE_DEVOPS_FETCH_CONCURRENCY,
+) -> Dict[str, Any]:
+    """
+    Descarga todos los work items y reporta los lotes que fallaron.
+
+    Returns:
+        Diccionario con 'items' (en orden WIQL), 'failed_ids' y 'errors'
+    """
+    report: Dict[str, Any] = {"items": [], "failed_ids": [], "errors": []}
+    for page in _iter_work_items_details(ids, fields, max_concurrency):
+        if page["error"]:
+            report["failed_ids"].extend(page["ids"])
+            report["errors"].append(page["error"])
+        else:
+            report["items"].extend(page["items"])
+    return report
+
+
+def _fetch_work_items_details(ids: List[str], fields: Optional[List[str]]) -> Dict[str, Any]:
+    """
+    Descarga los work items; solo lanza la excepción si no se pudo descargar ninguno.
+
+    Returns:
+        Informe de _fetch_work_items_details_report ('items', 'failed_ids', 'errors')
+    """
     if not ids:
-        return []
-    base_url = get_azure_devops_base_url()
-    headers = get_azure_devops_headers()
-    field_param = ",".join(fields)
-    all_items: List[Dict[str, Any]] = []
-    for group in _chunk(ids, 200):
-        details_url = (
-            f"{base_url}/{AZURE_DEVOPS_PROJECT}/_apis/wit/workitems?ids={','.join(group)}&fields={field_param}&api-version=7.0"
+        return {"items": [], "failed_ids": [], "errors": []}
+    report = _fetch_work_items_details_report(ids, fields)
+    if report["failed_ids"]:
+        if len(report["failed_ids"]) == len(ids):
+            raise requests.exceptions.RequestException(report["errors"][0])
+        logger.warning(
+            "Could not fetch %d of %d work items: %s", len(report["failed_ids"]), len(ids), "; ".join(report["errors"])
         )
-        details_response = requests.get(details_url, headers=headers)
-        __check_response(details_response, f"fetch work items details for ids {','.join(group)}")
-        all_items.extend(details_response.json().get("value", []))
-    return all_items
+    return report
+
+
+def _missing_work_items(report: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Entrada final de los resultados de una herramienta con los work items que no se pudieron descargar,
+    para que el agente sepa que la lista está incompleta (lista vacía si no falló nada).
+    """
+    if not report["failed_ids"]:
+        return []
+    return [{
+        "failed_ids": [int(work_item_id) for work_item_id in report["failed_ids"]],
+        "error": f"Could not fetch {len(report['failed_ids'])} work items: {'; '.join(report['errors'])}",
+    }]
+
+
+_SEARCH_FIELDS = [
+    "System.Id",
+    "System.Title",
+    "System.Description",
+    "System.State",
+    "System.WorkItemType",
+    "System.Tags",
+]
+
+
+_SUMMARY_FIELDS = [field for field in _SEARCH_FIELDS if field != "System.Description"]
+
+# Proyecciones disponibles para los listados de work items (None = payload completo)
+_WORK_ITEM_PROJECTIONS: Dict[str, Optional[List[str]]] = {
+    "summary": _SUMMARY_FIELDS,
+    "compact": _SEARCH_FIELDS,
+    "full": None,
+}
 
 
 def _format_work_item(item: Dict[str, Any]) -> Dict[str, Any]:
@@ -767,6 +852,140 @@ def _format_work_item(item: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+def _project_work_item(item: Dict[str, Any], projection: str) -> Dict[str, Any]:
+    if projection == "full":
+        return item
+    formatted = _format_work_item(item)
+    if projection == "summary":
+        formatted.pop("description")
+    return formatted
+
+
+# ---------------------------------
+# Helpers privados (payloads y parseo)
+# ---------------------------------
+def _description_patch_document(description_markdown: str) -> List[Dict[str, Any]]:
+    return [
+        {
+            "op": "replace",
+            "path": "/fields/System.Description",
+            "value": description_markdown
+        },
+        {
+            "op": "add",
+            "path": "/multilineFieldsFormat/System.Description",
+            "value": "Markdown"
+        },
+    ]
+
+
+def _status_patch_document(new_status: str) -> List[Dict[str, Any]]:
+    return [
+        {
+            "op": "replace",
+            "path": "/fields/System.State",
+            "value": new_status
+        }
+    ]
+
+
+def _related_link_patch_document(related_work_item_url: str) -> List[Dict[str, Any]]:
+    return [
+        {
+            "op": "add",
+            "path": "/relations/-",
+            "value": {
+                "rel": "System.LinkTypes.Related",
+                "url": related_work_item_url,
+                "attributes": {
+                    "comment": "Relación añadida automáticamente"
+                }
+            }
+        }
+    ]
+
+
+def _new_ticket_patch_document(title: str, description_markdown: Optional[str] = None) -> List[Dict[str, Any]]:
+    document = [
+        {"op": "add", "path": "/fields/System.Title", "value": title},
+        {"op": "add", "path": "/fields/System.AssignedTo", "value": AZURE_DEVOPS_USER_EMAIL},
+        {"op": "add", "path": "/fields/System.State", "value": "New"}
+    ]
+    if description_markdown:
+        # Set with the creation, instead of a second PATCH
+        document += [
+            {"op": "add", "path": "/fields/System.Description", "value": description_markdown},
+            {"op": "add", "path": "/multilineFieldsFormat/System.Description", "value": "Markdown"},
+        ]
+    return document
+
+
+def _format_markdown_comment(comment: str) -> str:
+    # Procesar saltos de línea para Markdown: Azure DevOps requiere doble espacio antes de salto de línea para soft break, o doble salto para hard break.
+    # Aquí convertimos cada salto de línea simple en doble espacio + salto de línea (soft break)
+    processed_comment = comment.replace("\r\n", "\n")  # Normalizar saltos de línea
+    return processed_comment.replace("\n", "  \n")
+
+
+def _extract_attachments(work_item: Dict[str, Any]) -> List[Dict[str, Any]]:
+    attachments = []
+    relations = work_item.get("relations", [])
+
+    for relation in relations:
+        if relation.get("rel") == "AttachedFile":
+            attachment_url = relation.get("url", "")
+            # Extract attachment ID from URL
+            if "/attachments/" in attachment_url:
+                attachment_id = attachment_url.split("/attachments/")[-1].split("?")[0]
+                attachment_info = {
+                    "id": attachment_id,
+                    "url": attachment_url,
+                    "attributes": relation.get("attributes", {})
+                }
+                attachments.append(attachment_info)
+
+    return attachments
+
+
+def _build_agent_context(agentName: str, agent_definition: Optional[str], workflow_description: Optional[str]) -> Dict[str, str]:
+    context = {
+        "name": agentName,
+        "description": "",
+        "instruction": ""
+    }
+
+    if agent_definition is None:
+        return context
+
+    # Aquí asumimos que la página tiene un formato específico para separar descripción e instrucciones
+    # Por ejemplo, usando encabezados Markdown: ## Description y ## Instruction
+    description_marker = "## Description"
+    instruction_marker = "## Instruction"
+
+    description_start = agent_definition.find(description_marker)
+
+    instruction_start = agent_definition.find(instruction_marker)
+
+    if description_start != -1 and instruction_start != -1:
+        context["description"] = agent_definition[description_start + len(description_marker):instruction_start].strip()
+        context["instruction"] = agent_definition[instruction_start + len(instruction_marker):].strip()
+    elif description_start != -1:
+        context["description"] = agent_definition[description_start + len(description_marker):].strip()
+    elif instruction_start != -1:
+        context["instruction"] = agent_definition[instruction_start + len(instruction_marker):].strip()
+    else:
+        logger.warning("No se encontraron secciones de descripción o instrucciones en la definición del agente '%s'.", agentName)
+
+    if workflow_description:
+        context["instruction"] += "\n\n" + workflow_description
+
+    return context
+
+
+def _wiki_page_url(base_url: str, wiki_name: str, page_path: str) -> str:
+    return f"{base_url}/{AZURE_DEVOPS_PROJECT}/_apis/wiki/wikis/{wiki_name}/pages?path={page_path}&includeContent=true&api-version=7.0"
+
+
 # -----------------------
 # Nuevos métodos search_*
 # -----------------------
@@ -777,6 +996,8 @@ def search_work_items_by_type(
     """
     Busca work items por tipo, devolviendo una estructura unificada:
     id, title, description, state, type, tags.
+    Si algunos work items no se pudieron descargar, una última entrada
+    {"failed_ids": [...], "error": "..."} los indica.
     """
     try:
         where_clause = " ".join([
@@ -784,16 +1005,8 @@ def search_work_items_by_type(
             _build_state_clause(state),
         ])
         ids = _execute_wiql_for_ids(where_clause)
-        fields = [
-            "System.Id",
-            "System.Title",
-            "System.Description",
-            "System.State",
-            "System.WorkItemType",
-            "System.Tags",
-        ]
-        items = _fetch_work_items_details(ids, fields)
-        return [_format_work_item(it) for it in items]
+        report = _fetch_work_items_details(ids, _SEARCH_FIELDS)
+        return [_format_work_item(it) for it in report["items"]] + _missing_work_items(report)
     except requests.exceptions.RequestException as e:
         print(f"Error searching work items by type '{work_item_type}': {e}")
         return []
@@ -808,39 +1021,26 @@ def search_work_items_by_tags(
     """
     Busca work items por uno o varios tags, devolviendo una estructura unificada:
     id, title, description, state, type, tags.
+    Si algunos work items no se pudieron descargar, una última entrada
+    {"failed_ids": [...], "error": "..."} los indica.
     """
     try:
         if not tags:
             return []
 
-        safe_tags = [_escape_wiql_value(t.strip()) for t in tags if t and t.strip()]
-        if not safe_tags:
+        tags_clause = _build_tags_clause(tags, match)
+        if not tags_clause:
             return []
 
-        # Construir predicado de tags
-        if match.lower() == "all":
-            tag_predicate = " AND ".join([f"[System.Tags] CONTAINS '{t}'" for t in safe_tags])
-        else:
-            tag_predicate = " OR ".join([f"[System.Tags] CONTAINS '{t}'" for t in safe_tags])
-            tag_predicate = f"( {tag_predicate} )"
-
         where_clause = " ".join([
             _build_type_clause(work_item_type),
             _build_state_clause(state),
-            f"AND {tag_predicate}",
+            tags_clause,
         ])
 
         ids = _execute_wiql_for_ids(where_clause)
-        fields = [
-            "System.Id",
-            "System.Title",
-            "System.Description",
-            "System.State",
-            "System.WorkItemType",
-            "System.Tags",
-        ]
-        items = _fetch_work_items_details(ids, fields)
-        return [_format_work_item(it) for it in items]
+        report = _fetch_work_items_details(ids, _SEARCH_FIELDS)
+        return [_format_work_item(it) for it in report["items"]] + _missing_work_items(report)
     except requests.exceptions.RequestException as e:
         print(f"Error searching work items by tags {tags}: {e}")
         return []
@@ -0,0 +1,641 @@
+"""
+Asyncio versions of the Azure DevOps tools.
+
+Same tool surface (names, arguments and return values) as tools_azureDevOps, but every
+call awaits a shared httpx.AsyncClient instead of blocking the event loop, so several
+agents served by the same uvicorn worker can have Azure DevOps requests in flight at once.
+Payload building and response parsing are shared with the synchronous module.
+"""
+
+import asyncio
+import copy
+import logging
+import os
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+from google.adk.tools import ToolContext
+
+from buildgentic.storage.blob_store import get_shared_blob_store
+from buildgentic.tools.azure_devops_client import JSON_PATCH_CONTENT_TYPE, AsyncAzureDevOpsClient, get_shared_async_client
+from buildgentic.tools import tools_azureDevOps
+from buildgentic.tools.work_item_batch import get_shared_mutation_buffer
+from buildgentic.tools.work_item_cache import CachedWorkItem, get_work_item_cache
+from buildgentic.tools.tools_azureDevOps import (
+    AZURE_DEVOPS_FETCH_CONCURRENCY,
+    AZURE_DEVOPS_PROJECT,
+    SUPPORTED_WORK_ITEM_TYPES,
+    WORK_ITEMS_BATCH_SIZE,
+    _SEARCH_FIELDS,
+    _WORK_ITEM_PROJECTIONS,
+    _attachment_ref,
+    _build_assigned_clause,
+    _build_state_clause,
+    _build_tags_clause,
+    _build_type_clause,
+    _chunk,
+    _description_patch_document,
+    _extract_attachments,
+    _format_markdown_comment,
+    _format_work_item,
+    _missing_work_items,
+    _new_ticket_patch_document,
+    _order_batch,
+    _project_work_item,
+    _related_link_patch_document,
+    _status_patch_document,
+    _wiki_page_url,
+    _work_items_batch_url,
+    _wiql_ids_query,
+    get_azure_devops_base_url,
+    get_azure_devops_headers,
+)
+
+
+# Logger for this module
+logger = logging.getLogger(__name__)
+
+# Bytes of a downloaded attachment buffered before each write to disk
+_WRITE_BLOCK_SIZE = 1024 * 1024
+
+
+def _check_response(response: httpx.Response, context: str = "request") -> None:
+    """Helper to validate HTTP responses and log useful debug info.
+
+    Raises an httpx.HTTPStatusError when the response status is not 2xx.
+    """
+    if response.is_success:
+        logger.debug("HTTP %s OK for %s", response.status_code, context)
+        return
+
+    try:
+        body = response.text
+    except httpx.ResponseNotRead:
+        body = "<streamed>"
+    short = body if len(body) <= 1000 else body[:1000] + "..."
+    logger.error("HTTP %s error for %s. Response body (truncated): %s", response.status_code, context, short)
+    raise httpx.HTTPStatusError(f"HTTP {response.status_code} for {context}", request=response.request, response=response)
+
+
+def get_azure_devops_async_client() -> AsyncAzureDevOpsClient:
+    """
+    Get the shared async client of the running event loop
+
+    Returns:
+        AsyncAzureDevOpsClient whose authentication headers are computed only once
+    """
+    return get_shared_async_client(get_azure_devops_headers)
+
+
+async def get_tickets_assigned_to_me(tool_context: ToolContext, state: Optional[str] = None, projection: str = "compact") -> List[Dict[str, Any]]:
+    """
+    Get all work items assigned to the configured user in the current project.
+
+    Args:
+        state: Optional state filter (e.g., "New", "In Progress"). If None, no state filter is applied.
+        projection: Fields to return for each work item:
+            "summary" (id, title, state, type, tags),
+            "compact" (summary plus description, default) or
+            "full" (the complete work item payload).
+
+    Returns:
+        List of work items assigned to the user in the current project. If some work items could not
+        be fetched, a last entry {"failed_ids": [...], "error": "..."} lists them.
+    """
+    if projection not in _WORK_ITEM_PROJECTIONS:
+        logger.error("projection '%s' no soportada. Valores válidos: %s", projection, sorted(_WORK_ITEM_PROJECTIONS))
+        return []
+    try:
+        ids = await _execute_wiql_for_ids(_build_assigned_clause(state))
+        report = await _fetch_work_items_details(ids, _WORK_ITEM_PROJECTIONS[projection])
+        return [_project_work_item(it, projection) for it in report["items"]] + _missing_work_items(report)
+    except httpx.HTTPError as e:
+        logger.exception("Error fetching assigned tickets: %s", e)
+        return []
+
+
+async def get_work_item_details(work_item_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Get detailed information about a specific work item
+
+    Args:
+        work_item_id: ID of the work item
+
+    Returns:
+        Work item details or None if not found
+    """
+    try:
+        cache = get_work_item_cache()
+        cached = await _cached_work_item(work_item_id)
+        if cached is not None:
+            return copy.deepcopy(cached.work_item)
+
+        base_url = get_azure_devops_base_url()
+        client = get_azure_devops_async_client()
+
+        url = f"{base_url}/{AZURE_DEVOPS_PROJECT}/_apis/wit/workitems/{work_item_id}?$expand=all&api-version=7.0"
+        response = await client.get(url)
+        _check_response(response, f"get work item {work_item_id}")
+
+        work_item = response.json()
+        cache.put(work_item)
+        return work_item
+
+    except httpx.HTTPError as e:
+        logger.exception("Error fetching work item %s: %s", work_item_id, e)
+        return None
+
+
+async def _cached_work_item(work_item_id: int) -> Optional[CachedWorkItem]:
+    """Cached work item if it is still current, checking its revision once the entry is older than the cache TTL."""
+    cache = get_work_item_cache()
+    cached = cache.get(work_item_id)
+    if cached is None or cache.is_fresh(cached):
+        return cached
+    base_url = get_azure_devops_base_url()
+    client = get_azure_devops_async_client()
+    url = f"{base_url}/{AZURE_DEVOPS_PROJECT}/_apis/wit/workitems/{work_item_id}?fields=System.Rev,System.ChangedDate&api-version=7.0"
+    response = await client.get(url)
+    _check_response(response, f"check revision of work item {work_item_id}")
+    return cached if cache.confirm(work_item_id, response.json().get("rev")) else None
+
+
+async def _patch_work_item(work_item_id: int, patch_document: List[Dict[str, Any]], context: str) -> Dict[str, Any]:
+    # Updates made together (e.g. the parallel tool calls of one agent turn) share one request
+    buffer = get_shared_mutation_buffer(lambda: get_azure_devops_async_client(), get_azure_devops_base_url(), AZURE_DEVOPS_PROJECT)
+    try:
+        return await buffer.patch(work_item_id, patch_document, context)
+    finally:
+        get_work_item_cache().invalidate(work_item_id)
+
+
+async def update_ticket_description(work_item_id: int, new_description_markdown: str) -> bool:
+    """
+    Update the description of a work item
+
+    Args:
+        work_item_id: ID of the work item
+        new_description_markdown: New description text in Markdown
+
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        await _patch_work_item(
+            work_item_id,
+            _description_patch_document(new_description_markdown),
+            f"update description for work item {work_item_id}",
+        )
+        logger.info("Successfully updated description for work item %s", work_item_id)
+        return True
+
+    except httpx.HTTPError as e:
+        logger.exception("Error updating work item %s description: %s", work_item_id, e)
+        return False
+
+
+async def add_comment_to_ticket(work_item_id: int, comment: str) -> bool:
+    """
+    Add a comment to a work item. The text is uploaded as Markdown.
+
+    Args:
+        work_item_id: ID of the work item
+        comment: Comment text to add (may contain Markdown syntax)
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        base_url = get_azure_devops_base_url()
+        client = get_azure_devops_async_client()
+        processed_comment = _format_markdown_comment(comment)
+        logger.debug("Processed comment for work_item %s: %s", work_item_id, processed_comment)
+        url = f"{base_url}/{AZURE_DEVOPS_PROJECT}/_apis/wit/workitems/{work_item_id}/comments?format=0&api-version=7.1-preview.4"
+        response = await client.post(url, json={"text": processed_comment})
+        get_work_item_cache().invalidate(work_item_id)
+        _check_response(response, f"add comment to work item {work_item_id}")
+        logger.info("Successfully added markdown comment to work item %s", work_item_id)
+        return True
+    except httpx.HTTPError as e:
+        logger.exception("Error adding comment to work item %s: %s", work_item_id, e)
+        return False
+
+
+async def download_attachment(attachment_id: str, file_name: str, download_path: str = ".") -> bool:
+    """
+    Download an attachment from a work item
+
+    Attachments already in the shared blob store are copied from disk without
+    calling Azure DevOps.
+
+    Args:
+        attachment_id: ID of the attachment
+        file_name: Name to save the file as
+        download_path: Path to save the file (default: current directory)
+
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        file_path = os.path.join(download_path, file_name)
+        blob_store = get_shared_blob_store()
+
+        sha256 = await asyncio.to_thread(blob_store.get_ref, _attachment_ref(attachment_id))
+        if sha256 is not None:
+            try:
+                await asyncio.to_thread(blob_store.copy_to, sha256, file_path)
+                logger.info("Attachment %s served from the local cache to %s", attachment_id, file_path)
+                return True
+            except FileNotFoundError:
+                # Evicted since get_ref: downloaded again below
+                logger.info("Attachment %s left the local cache, downloading it again", attachment_id)
+
+        base_url = get_azure_devops_base_url()
+        client = get_azure_devops_async_client()
+
+        url = f"{base_url}/_apis/wit/attachments/{attachment_id}?api-version=7.0"
+        async with client.stream("GET", url) as response:
+            if not response.is_success:
+                await response.aread()
+            _check_response(response, f"download attachment {attachment_id}")
+
+            writer = await asyncio.to_thread(blob_store.writer)
+            block = bytearray()
+            try:
+                # Disk writes run off the event loop, in blocks of _WRITE_BLOCK_SIZE bytes
+                async for chunk in response.aiter_bytes(chunk_size=65536):
+                    block += chunk
+                    if len(block) >= _WRITE_BLOCK_SIZE:
+                        await asyncio.to_thread(writer.write, bytes(block))
+                        block.clear()
+                if block:
+                    await asyncio.to_thread(writer.write, bytes(block))
+            except BaseException:
+                writer.abort()
+                raise
+        sha256 = await asyncio.to_thread(writer.commit, _attachment_ref(attachment_id))
+        await asyncio.to_thread(blob_store.copy_to, sha256, file_path)
+
+        logger.info("Successfully downloaded attachment to %s", file_path)
+        return True
+
+    except httpx.HTTPError as e:
+        logger.exception("Error downloading attachment %s: %s", attachment_id, e)
+        return False
+    except IOError as e:
+        logger.exception("Error saving file %s: %s", file_name, e)
+        return False
+
+
+async def update_ticket_status(work_item_id: int, new_status: str) -> bool:
+    """
+    Update the status/state of a work item
+
+    Args:
+        work_item_id: ID of the work item
+        new_status: New status (e.g., 'Active', 'Resolved', 'Closed', etc.)
+
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        await _patch_work_item(
+            work_item_id,
+            _status_patch_document(new_status),
+            f"update status for work item {work_item_id} to {new_status}",
+        )
+        logger.info("Successfully updated status of work item %s to '%s'", work_item_id, new_status)
+        return True
+
+    except httpx.HTTPError as e:
+        logger.exception("Error updating work item %s status: %s", work_item_id, e)
+        return False
+
+
+async def get_work_item_attachments(work_item_id: int) -> List[Dict[str, Any]]:
+    """
+    Get list of attachments for a work item
+
+    Args:
+        work_item_id: ID of the work item
+
+    Returns:
+        List of attachment information
+    """
+    try:
+        work_item = await get_work_item_details(work_item_id)
+        if not work_item:
+            return []
+        return _extract_attachments(work_item)
+
+    except Exception as e:
+        logger.exception("Error getting attachments for work item %s: %s", work_item_id, e)
+        return []
+
+
+async def create_ticket(title: str, description_in_markdown: Optional[str] = None, work_item_type: Optional[str] = "Task") -> Optional[Dict[str, Any]]:
+    """
+    Create a new work item/ticket with the specified title and type.
+
+    Args:
+        title: Title of the new work item
+        description_in_markdown: Optional description in Markdown
+        work_item_type: Work item type. Supported values: "Bug", "User Story", "Epic", "Task", "Feature". (Default: "Task")
+    Returns:
+        Created work item details or None if creation failed
+    """
+    if work_item_type not in SUPPORTED_WORK_ITEM_TYPES:
+        logger.error("work_item_type '%s' no soportado. Valores válidos: %s", work_item_type, SUPPORTED_WORK_ITEM_TYPES)
+        return None
+    try:
+        base_url = get_azure_devops_base_url()
+        client = get_azure_devops_async_client()
+        url = f"{base_url}/{AZURE_DEVOPS_PROJECT}/_apis/wit/workitems/${work_item_type}?api-version=7.0"
+        response = await client.post(
+            url,
+            json=_new_ticket_patch_document(title, description_in_markdown),
+            headers={"Content-Type": JSON_PATCH_CONTENT_TYPE},
+        )
+        _check_response(response, f"create work item '{title}'")
+        created_work_item = response.json()
+        work_item_id = created_work_item.get("id")
+        logger.info("Successfully created work item %s of type '%s' with title: '%s'", work_item_id, work_item_type, title)
+        return created_work_item
+    except httpx.HTTPError as e:
+        logger.exception("Error creating work item with title '%s': %s", title, e)
+        return None
+
+
+async def get_comments_from_ticket(work_item_id: int) -> Optional[list]:
+    """
+    Get the comments of an Azure DevOps work item/ticket.
+
+    Args:
+        work_item_id: ID of the work item
+    Returns:
+        List of comments (each one as a dict), or None on error
+    """
+    try:
+        cached = await _cached_work_item(work_item_id)
+        if cached is not None and cached.comments is not None:
+            return copy.deepcopy(cached.comments)
+
+        base_url = get_azure_devops_base_url()
+        client = get_azure_devops_async_client()
+        url = f"{base_url}/{AZURE_DEVOPS_PROJECT}/_apis/wit/workitems/{work_item_id}/comments?api-version=7.0-preview.3"
+        response = await client.get(url)
+        _check_response(response, f"get comments for work item {work_item_id}")
+        comments = response.json().get("comments", [])
+        if cached is not None:
+            get_work_item_cache().put_comments(work_item_id, cached.rev, comments)
+        logger.info("Se han recuperado %d comentarios del work item %s", len(comments), work_item_id)
+        return comments
+    except httpx.HTTPError as e:
+        logger.exception("Error obteniendo comentarios del work item %s: %s", work_item_id, e)
+        return None
+
+
+async def load_context(agentName: str) -> Dict[str, str]:
+    """
+    Load the context of an agent from the Azure DevOps wiki.
+
+    Args:
+        agentName: Name of the agent (matches the wiki page name)
+    Returns:
+        Dictionary with 'name', 'description' and 'instruction'
+    """
+    return await asyncio.to_thread(tools_azureDevOps.load_context, agentName)
+
+
+async def get_wiki_page_content(page_path: str) -> Optional[str]:
+    """
+    Get the content of a page of the project wiki.
+
+    Pages go through the wiki cache shared with the synchronous tools, so a page is
+    downloaded once per process no matter which module asks for it.
+
+    Args:
+        page_path: Path of the page inside the wiki (e.g. 'Home', 'docs/intro')
+    Returns:
+        Page content as a string, or None on error
+    """
+    return await asyncio.to_thread(tools_azureDevOps.get_wiki_page_content, page_path)
+
+
+async def update_wiki_page_content(page_path: str, new_content: str, comment: Optional[str] = None) -> bool:
+    """
+    Update the content of an existing page of the project wiki.
+
+    Args:
+        page_path: Path of the page inside the wiki (e.g. 'Home', 'docs/intro')
+        new_content: New Markdown content of the page
+        comment: Optional comment stored in the page history
+    Returns:
+        True if the update succeeded, False otherwise
+    """
+    wiki_name = "CIC.wiki"
+
+    try:
+        base_url = get_azure_devops_base_url()
+        client = get_azure_devops_async_client()
+
+        # Azure DevOps requiere el ETag para actualizaciones (control de concurrencia)
+        page_url = _wiki_page_url(base_url, wiki_name, page_path)
+        page_response = await client.get(page_url)
+        _check_response(page_response, f"get wiki page for update {page_path}")
+        etag = page_response.headers.get('ETag')
+
+        update_data = {"content": new_content}
+        if comment:
+            update_data["comment"] = comment
+
+        update_response = await client.put(page_url, json=update_data, headers={"If-Match": etag})
+        _check_response(update_response, f"update wiki page {page_path}")
+        tools_azureDevOps._wiki_page_cache.invalidate(page_path)
+
+        logger.info("Successfully updated wiki page '%s' in wiki '%s'", page_path, wiki_name)
+        return True
+
+    except httpx.HTTPError as e:
+        logger.exception("Error actualizando la página de la wiki '%s': %s", page_path, e)
+        return False
+
+
+async def add_related_work_item(work_item_id: int, related_work_item_id: int) -> bool:
+    """
+    Add a "Related" link between two work items.
+
+    Args:
+        work_item_id: ID of the work item that receives the link
+        related_work_item_id: ID of the work item added as related
+    Returns:
+        True if the link was created, False otherwise
+    """
+    try:
+        base_url = get_azure_devops_base_url()
+        related_work_item_url = f"{base_url}/{AZURE_DEVOPS_PROJECT}/_apis/wit/workItems/{related_work_item_id}"
+        await _patch_work_item(
+            work_item_id,
+            _related_link_patch_document(related_work_item_url),
+            f"add related work item link {work_item_id} -> {related_work_item_id}",
+        )
+        logger.info("Successfully added Related link between work item %s and %s", work_item_id, related_work_item_id)
+        return True
+
+    except httpx.HTTPError as e:
+        logger.exception("Error adding related work item link: %s", e)
+        return False
+
+
+# -----------------------
+# Helpers privados (WIQL)
+# -----------------------
+async def _execute_wiql_for_ids(where_clause: str) -> List[str]:
+    """Run a basic WIQL query that returns IDs, limited to the current project."""
+    base_url = get_azure_devops_base_url()
+    client = get_azure_devops_async_client()
+    url = f"{base_url}/{AZURE_DEVOPS_PROJECT}/_apis/wit/wiql?api-version=7.0"
+    response = await client.post(url, json=_wiql_ids_query(where_clause))
+    _check_response(response, "execute WIQL for ids")
+    return [str(item["id"]) for item in response.json().get("workItems", [])]
+
+
+async def _fetch_work_items_batch(group: List[str], fields: Optional[List[str]]) -> List[Dict[str, Any]]:
+    client = get_azure_devops_async_client()
+    details_response = await client.get(_work_items_batch_url(group, fields))
+    _check_response(details_response, f"fetch work items details for ids {','.join(group)}")
+    return _order_batch(group, details_response.json().get("value", []))
+
+
+async def _aiter_work_items_details(
+    ids: List[str],
+    fields: Optional[List[str]],
+    max_concurrency: int = AZURE_DEVOPS_FETCH_CONCURRENCY,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Download work items in concurrent batches and yield them page by page.
+
+    At most max_concurrency batches are in flight at once; pages are yielded in WIQL
+    order, so the caller can work on the first page while the rest are still arriving.
+
+    Yields:
+        Dicts with 'ids' (batch ids), 'items' (work items in WIQL order) and
+        'error' (message when the batch failed, None otherwise)
+    """
+    groups = _chunk(ids, WORK_ITEMS_BATCH_SIZE)
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def fetch(group: List[str]) -> List[Dict[str, Any]]:
+        async with semaphore:
+            return await _fetch_work_items_batch(group, fields)
+
+    tasks = [asyncio.ensure_future(fetch(group)) for group in groups]
+    try:
+        for group, task in zip(groups, tasks):
+            try:
+                yield {"ids": group, "items": await task, "error": None}
+            except httpx.HTTPError as e:
+                yield {"ids": group, "items": [], "error": str(e)}
+    finally:
+        # If the caller stops iterating, pending batches are not downloaded
+        for task in tasks:
+            task.cancel()
+
+
+async def _fetch_work_items_details_report(
+    ids: List[str],
+    fields: Optional[List[str]],
+    max_concurrency: int = AZURE_DEVOPS_FETCH_CONCURRENCY,
+) -> Dict[str, Any]:
+    """
+    Download every work item and report the batches that failed.
+
+    Returns:
+        Dict with 'items' (in WIQL order), 'failed_ids' and 'errors'
+    """
+    report: Dict[str, Any] = {"items": [], "failed_ids": [], "errors": []}
+    async for page in _aiter_work_items_details(ids, fields, max_concurrency):
+        if page["error"]:
+            report["failed_ids"].extend(page["ids"])
+            report["errors"].append(page["error"])
+        else:
+            report["items"].extend(page["items"])
+    return report
+
+
+async def _fetch_work_items_details(ids: List[str], fields: Optional[List[str]]) -> Dict[str, Any]:
+    """
+    Download the work items; only raises when none of them could be downloaded.
+
+    Returns:
+        Report of _fetch_work_items_details_report ('items', 'failed_ids', 'errors')
+    """
+    if not ids:
+        return {"items": [], "failed_ids": [], "errors": []}
+    report = await _fetch_work_items_details_report(ids, fields)
+    if report["failed_ids"]:
+        if len(report["failed_ids"]) == len(ids):
+            raise httpx.HTTPError(report["errors"][0])
+        logger.warning(
+            "Could not fetch %d of %d work items: %s", len(report["failed_ids"]), len(ids), "; ".join(report["errors"])
+        )
+    return report
+
+
+# -----------------------
+# Métodos search_*
+# -----------------------
+async def search_work_items_by_type(
+    work_item_type: str,
+    state: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Search work items by type, returning a unified structure:
+    id, title, description, state, type, tags.
+    If some work items could not be fetched, a last entry
+    {"failed_ids": [...], "error": "..."} lists them.
+    """
+    try:
+        where_clause = " ".join([
+            _build_type_clause(work_item_type),
+            _build_state_clause(state),
+        ])
+        ids = await _execute_wiql_for_ids(where_clause)
+        report = await _fetch_work_items_details(ids, _SEARCH_FIELDS)
+        return [_format_work_item(it) for it in report["items"]] + _missing_work_items(report)
+    except httpx.HTTPError as e:
+        logger.exception("Error searching work items by type '%s': %s", work_item_type, e)
+        return []
+
+
+async def search_work_items_by_tags(
+    tags: List[str],
+    match: str = "any",
+    work_item_type: Optional[str] = None,
+    state: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Search work items by one or more tags, returning a unified structure:
+    id, title, description, state, type, tags.
+    If some work items could not be fetched, a last entry
+    {"failed_ids": [...], "error": "..."} lists them.
+    """
+    try:
+        if not tags:
+            return []
+
+        tags_clause = _build_tags_clause(tags, match)
+        if not tags_clause:
+            return []
+
+        where_clause = " ".join([
+            _build_type_clause(work_item_type),
+            _build_state_clause(state),
+            tags_clause,
+        ])
+
+        ids = await _execute_wiql_for_ids(where_clause)
+        report = await _fetch_work_items_details(ids, _SEARCH_FIELDS)
+        return [_format_work_item(it) for it in report["items"]] + _missing_work_items(report)
+    except httpx.HTTPError as e:
+        logger.exception("Error searching work items by tags %s: %s", tags, e)
+        return []
@@ -0,0 +1,126 @@
+import contextlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+# Wiki cache configuration - Global Variables from .env file
+AGENT_CONTEXT_CACHE_TTL = float(os.getenv("AGENT_CONTEXT_CACHE_TTL", "300"))
+AGENT_CONTEXT_CACHE_PATH = os.getenv("AGENT_CONTEXT_CACHE_PATH")
+
+
+# fetch(page_path, etag) -> (content, etag, not_modified)
+WikiFetcher = Callable[[str, Optional[str]], Tuple[Optional[str], Optional[str], bool]]
+
+
+class WikiPageCache:
+    """
+    Cache of wiki pages keyed by page path, shared by every agent in the process.
+
+    Entries are served from memory while they are younger than ttl_seconds. Older
+    entries are revalidated with their ETag (a 304 answer only refreshes the entry).
+    Concurrent callers asking for the same page wait for a single download. When a
+    file path is configured the entries are also saved to disk, so a restart starts
+    warm and a stale copy is still served if Azure DevOps cannot be reached.
+    """
+
+    def __init__(self, ttl_seconds: float = AGENT_CONTEXT_CACHE_TTL, cache_path: Optional[str] = AGENT_CONTEXT_CACHE_PATH):
+        """
+        Args:
+            ttl_seconds: Seconds an entry is used without asking the server again
+            cache_path: Optional JSON file where the entries are persisted
+        """
+        self.ttl_seconds = ttl_seconds
+        self.cache_path = cache_path
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._page_locks: Dict[str, threading.Lock] = {}
+        # Saves of different pages run at the same time: one writes the file at a time
+        self._save_lock = threading.Lock()
+        self._load()
+
+    def get(self, page_path: str, fetch: WikiFetcher) -> Optional[str]:
+        """
+        Return the content of a page, downloading or revalidating it when needed.
+
+        Args:
+            page_path: Path of the page inside the wiki
+            fetch: Function that downloads the page, given the path and the cached ETag
+
+        Returns:
+            Page content (None when the page has no content)
+
+        Raises:
+            Whatever fetch raises when the page is not cached at all
+        """
+        with self._page_lock(page_path):
+            entry = self._entries.get(page_path)
+            if entry is not None and time.time() - entry["fetched_at"] < self.ttl_seconds:
+                return entry["content"]
+
+            try:
+                content, etag, not_modified = fetch(page_path, entry["etag"] if entry else None)
+            except Exception as e:
+                if entry is None:
+                    raise
+                logger.warning("Using cached copy of wiki page '%s', refresh failed: %s", page_path, e)
+                return entry["content"]
+
+            if not_modified and entry is not None:
+                entry["fetched_at"] = time.time()
+            else:
+                entry = {"content": content, "etag": etag, "fetched_at": time.time()}
+                self._entries[page_path] = entry
+            self._save()
+            return entry["content"]
+
+    def invalidate(self, page_path: Optional[str] = None) -> None:
+        """Forget one page, or every page when page_path is None."""
+        with self._lock:
+            if page_path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(page_path, None)
+        self._save()
+
+    def _page_lock(self, page_path: str) -> threading.Lock:
+        with self._lock:
+            return self._page_locks.setdefault(page_path, threading.Lock())
+
+    def _load(self) -> None:
+        if not self.cache_path or not os.path.isfile(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as file:
+                self._entries = json.load(file)
+            logger.info("Loaded %d cached wiki pages from %s", len(self._entries), self.cache_path)
+        except (OSError, ValueError) as e:
+            logger.warning("Could not load wiki cache from %s: %s", self.cache_path, e)
+
+    def _save(self) -> None:
+        if not self.cache_path:
+            return
+        with self._save_lock:
+            with self._lock:
+                snapshot = dict(self._entries)
+            tmp_path = None
+            try:
+                directory = os.path.dirname(self.cache_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=directory or None, suffix=".tmp")
+                with os.fdopen(fd, "w", encoding="utf-8") as file:
+                    json.dump(snapshot, file)
+                os.replace(tmp_path, self.cache_path)
+            except OSError as e:
+                logger.warning("Could not save wiki cache to %s: %s", self.cache_path, e)
+                if tmp_path:
+                    with contextlib.suppress(OSError):
+                        os.remove(tmp_path)
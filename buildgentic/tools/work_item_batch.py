@@ -0,0 +1,217 @@
+import asyncio
+import json
+import logging
+import os
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import httpx
+
+from buildgentic.tools.azure_devops_client import JSON_PATCH_CONTENT_TYPE, AsyncAzureDevOpsClient
+
+
+logger = logging.getLogger(__name__)
+
+
+# Work item mutation batching - Global Variables from .env file
+# Seconds a work item update waits for others to share its request (0 = sent at once)
+WORK_ITEM_BATCH_LINGER = float(os.getenv("WORK_ITEM_BATCH_LINGER", "0.05"))
+# Work items with pending updates that make the buffer flush before the linger time
+WORK_ITEM_BATCH_MAX_ITEMS = int(os.getenv("WORK_ITEM_BATCH_MAX_ITEMS", "50"))
+
+# Requests accepted by one call to the $batch endpoint of Azure DevOps
+_BATCH_LIMIT = 200
+
+
+class _PendingPatch:
+    """JSON Patch operations waiting to be sent for one work item, and the callers waiting for the result."""
+
+    def __init__(self):
+        self.operations: List[Dict[str, Any]] = []
+        self.contexts: List[str] = []
+        self.futures: List[asyncio.Future] = []
+
+
+class WorkItemMutationBuffer:
+    """
+    Buffer merging the updates of work items into as few requests as possible.
+
+    Updates are held for linger seconds (or until max_items work items have pending
+    updates). The JSON Patch operations of the same work item are merged into one
+    PATCH, so several fields changed in one agent turn make a single revision; the
+    PATCHes of several work items are sent together through the $batch endpoint.
+    Every caller awaits the result of its own update: the updated work item, or the
+    HTTP error of the PATCH that carried it.
+
+    A buffer belongs to the event loop that created it (see get_shared_mutation_buffer).
+    """
+
+    def __init__(
+        self,
+        get_client: Callable[[], AsyncAzureDevOpsClient],
+        base_url: str,
+        project: str,
+        linger: float = WORK_ITEM_BATCH_LINGER,
+        max_items: int = WORK_ITEM_BATCH_MAX_ITEMS,
+    ):
+        """
+        Args:
+            get_client: Returns the async client used to send the requests
+            base_url: Organization URL of Azure DevOps
+            project: Project of the work items
+            linger: Seconds an update waits for others (0 = no wait)
+            max_items: Work items with pending updates that trigger a flush
+        """
+        self._get_client = get_client
+        self.base_url = base_url
+        self.project = project
+        self.linger = linger
+        self.max_items = max_items
+        self._pending: Dict[int, _PendingPatch] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: Set[asyncio.Task] = set()
+
+    async def patch(self, work_item_id: int, operations: List[Dict[str, Any]], context: str = "") -> Dict[str, Any]:
+        """
+        Queue JSON Patch operations for a work item and wait until they are applied.
+
+        Args:
+            work_item_id: ID of the work item
+            operations: JSON Patch operations
+            context: Description of the update, for the logs
+
+        Returns:
+            The updated work item
+
+        Raises:
+            httpx.HTTPError: The request carrying the update failed
+        """
+        pending = self._pending.setdefault(work_item_id, _PendingPatch())
+        pending.operations.extend(operations)
+        pending.contexts.append(context or f"update work item {work_item_id}")
+        future = asyncio.get_running_loop().create_future()
+        pending.futures.append(future)
+
+        if self.linger <= 0 or len(self._pending) >= self.max_items:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.linger, self._start_flush)
+        return await future
+
+    async def flush(self) -> None:
+        """Send every pending update now."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if not batch:
+            return
+        items = list(batch.items())
+        if len(items) == 1:
+            await self._send_one(*items[0])
+            return
+        for start in range(0, len(items), _BATCH_LIMIT):
+            await self._send_batch(items[start:start + _BATCH_LIMIT])
+
+    def _start_flush(self) -> None:
+        task = asyncio.ensure_future(self.flush())
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    def _work_item_path(self, work_item_id: int) -> str:
+        return f"/{self.project}/_apis/wit/workitems/{work_item_id}?api-version=7.0"
+
+    async def _send_one(self, work_item_id: int, pending: _PendingPatch) -> None:
+        try:
+            response = await self._get_client().patch(
+                self.base_url + self._work_item_path(work_item_id),
+                json=pending.operations,
+                headers={"Content-Type": JSON_PATCH_CONTENT_TYPE},
+            )
+            _raise_for_status(response, "; ".join(pending.contexts))
+            _resolve(pending, result=response.json())
+        except Exception as e:
+            _resolve(pending, error=e)
+
+    async def _send_batch(self, items: List) -> None:
+        body = [
+            {
+                "method": "PATCH",
+                "uri": self._work_item_path(work_item_id),
+                "headers": {"Content-Type": JSON_PATCH_CONTENT_TYPE},
+                "body": pending.operations,
+            }
+            for work_item_id, pending in items
+        ]
+        try:
+            response = await self._get_client().post(f"{self.base_url}/_apis/wit/$batch?api-version=7.0", json=body)
+            _raise_for_status(response, f"batch update of {len(items)} work items")
+            results = response.json()["value"]
+        except Exception as e:
+            for _, pending in items:
+                _resolve(pending, error=e)
+            return
+
+        logger.info("Updated %d work items in one batch request", len(items))
+        for (work_item_id, pending), result in zip(items, results):
+            item_response = httpx.Response(result.get("code", 500), content=(result.get("body") or "").encode(), request=response.request)
+            try:
+                _raise_for_status(item_response, "; ".join(pending.contexts))
+                _resolve(pending, result=json.loads(item_response.text) if item_response.text else {})
+            except Exception as e:
+                _resolve(pending, error=e)
+        for _, pending in items[len(results):]:
+            _resolve(pending, error=httpx.HTTPError("Missing from the batch response"))
+
+
+def _raise_for_status(response: httpx.Response, context: str) -> None:
+    if response.is_success:
+        return
+    short = response.text if len(response.text) <= 1000 else response.text[:1000] + "..."
+    logger.error("HTTP %s error for %s. Response body (truncated): %s", response.status_code, context, short)
+    raise httpx.HTTPStatusError(f"HTTP {response.status_code} for {context}", request=response.request, response=response)
+
+
+def _resolve(pending: _PendingPatch, result: Any = None, error: Optional[BaseException] = None) -> None:
+    for future in pending.futures:
+        if future.done():
+            continue
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+
+# Futures and timers belong to the event loop that created them, so keep one buffer per loop
+_buffers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, WorkItemMutationBuffer]" = weakref.WeakKeyDictionary()
+
+
+def get_shared_mutation_buffer(get_client: Callable[[], AsyncAzureDevOpsClient], base_url: str, project: str) -> WorkItemMutationBuffer:
+    """
+    Return the work item mutation buffer of the running event loop, creating it on first use.
+
+    Args:
+        get_client: Returns the async client used to send the requests
+        base_url: Organization URL of Azure DevOps
+        project: Project of the work items
+
+    Returns:
+        The shared buffer for the current loop
+    """
+    loop = asyncio.get_running_loop()
+    buffer = _buffers.get(loop)
+    if buffer is None:
+        buffer = _buffers[loop] = WorkItemMutationBuffer(get_client, base_url, project)
+    return buffer
+
+
+async def flush_shared_mutation_buffer() -> None:
+    """
+    Send the pending updates of the running event loop, if any.
+
+    Every caller of patch() waits for its own update, so this only matters for the
+    updates of cancelled turns; the server calls it when it shuts down.
+    """
+    buffer = _buffers.get(asyncio.get_running_loop())
+    if buffer is not None:
+        await buffer.flush()
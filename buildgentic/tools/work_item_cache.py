@@ -0,0 +1,128 @@
+import copy
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from buildgentic.storage.lru import BoundedCache
+
+
+logger = logging.getLogger(__name__)
+
+
+# Work item cache configuration - Global Variables from .env file
+# Work items kept in memory (0 = no cache)
+WORK_ITEM_CACHE_SIZE = int(os.getenv("WORK_ITEM_CACHE_SIZE", "500"))
+# Seconds a cached work item is served before its revision is checked with Azure DevOps
+WORK_ITEM_CACHE_TTL = float(os.getenv("WORK_ITEM_CACHE_TTL", "30"))
+
+
+class CachedWorkItem(NamedTuple):
+    """A work item at one revision, with its comments when they were read at that revision."""
+    rev: int
+    work_item: Dict[str, Any]
+    comments: Optional[List[Dict[str, Any]]]
+    checked_at: float
+
+
+class WorkItemCache:
+    """
+    In-process cache of work items keyed by id and revision, shared by every agent.
+
+    Entries younger than ttl_seconds are served as they are. Older ones must be
+    confirmed by the caller with a cheap revision check (see confirm) before being
+    served; a new revision drops them. Comments are cached with the revision they were
+    read at (adding a comment makes a new revision). Entries are dropped as soon as
+    this process changes the work item, or when Azure DevOps reports a change through
+    a service hook (see handle_event). At most max_entries work items are kept, least
+    recently used first out.
+    """
+
+    def __init__(self, max_entries: int = WORK_ITEM_CACHE_SIZE, ttl_seconds: float = WORK_ITEM_CACHE_TTL):
+        """
+        Args:
+            max_entries: Maximum number of work items kept (0 disables the cache)
+            ttl_seconds: Seconds an entry is served without checking its revision
+        """
+        self.ttl_seconds = ttl_seconds
+        self._entries: BoundedCache[CachedWorkItem] = BoundedCache(max_entries)
+        self._lock = threading.Lock()
+
+    def get(self, work_item_id: int) -> Optional[CachedWorkItem]:
+        return self._entries.get(int(work_item_id))
+
+    def is_fresh(self, entry: CachedWorkItem) -> bool:
+        """Whether an entry can be served without checking its revision."""
+        return time.monotonic() - entry.checked_at < self.ttl_seconds
+
+    def put(self, work_item: Dict[str, Any]) -> None:
+        """Cache a work item read with $expand=all (the comments of an older revision are dropped)."""
+        if "id" not in work_item or "rev" not in work_item:
+            return
+        with self._lock:
+            self._entries.put(int(work_item["id"]), CachedWorkItem(work_item["rev"], copy.deepcopy(work_item), None, time.monotonic()))
+
+    def put_comments(self, work_item_id: int, rev: int, comments: List[Dict[str, Any]]) -> None:
+        """Cache the comments of a work item, if its cached revision is the one they were read at."""
+        with self._lock:
+            entry = self._entries.get(int(work_item_id))
+            if entry is not None and entry.rev == rev:
+                self._entries.put(int(work_item_id), entry._replace(comments=copy.deepcopy(comments)))
+
+    def confirm(self, work_item_id: int, rev: int) -> bool:
+        """
+        Record the current revision of a work item.
+
+        Returns:
+            True if the cached entry is at that revision (it is fresh again), False if it was dropped
+        """
+        with self._lock:
+            entry = self._entries.get(int(work_item_id))
+            if entry is not None and entry.rev == rev:
+                self._entries.put(int(work_item_id), entry._replace(checked_at=time.monotonic()))
+                return True
+            self._entries.pop(int(work_item_id))
+            return False
+
+    def invalidate(self, work_item_id: int) -> None:
+        self._entries.pop(int(work_item_id))
+
+    def handle_event(self, event: Dict[str, Any]) -> Optional[int]:
+        """
+        Drop the work item an Azure DevOps service hook event is about.
+
+        Args:
+            event: Payload of a workitem.created, workitem.updated, workitem.commented
+                or workitem.deleted event
+
+        Returns:
+            ID of the work item, None if the event is not about a work item
+        """
+        if not str(event.get("eventType", "")).startswith("workitem."):
+            return None
+        resource = event.get("resource") or {}
+        # workitem.updated resources are updates: their id is the update, workItemId the work item
+        work_item_id = resource.get("workItemId") or resource.get("id")
+        if work_item_id is None:
+            return None
+        self.invalidate(work_item_id)
+        logger.debug("Work item %s changed (%s), dropped from the cache", work_item_id, event.get("eventType"))
+        return int(work_item_id)
+
+    def stats(self) -> dict:
+        return self._entries.stats()
+
+
+_work_item_cache: Optional[WorkItemCache] = None
+_work_item_cache_lock = threading.Lock()
+
+
+def get_work_item_cache() -> WorkItemCache:
+    """Return the process-wide work item cache, creating it on first use."""
+    global _work_item_cache
+    if _work_item_cache is None:
+        with _work_item_cache_lock:
+            if _work_item_cache is None:
+                _work_item_cache = WorkItemCache()
+    return _work_item_cache
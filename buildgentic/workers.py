@@ -0,0 +1,330 @@
+import asyncio
+import json
+import logging
+import multiprocessing
+import multiprocessing.connection
+import os
+import signal
+import socket
+import threading
+import time
+from typing import Dict, List, Optional
+
+import httpx
+from a2a.server.agent_execution import AgentExecutor, RequestContext
+from a2a.server.events import EventQueue
+from dotenv import load_dotenv
+
+from buildgentic.storage.sqlite import connect
+
+
+logger = logging.getLogger(__name__)
+
+
+# Multi-worker server configuration - Global Variables from .env file
+# Worker processes of the A2A server (1 = a single process)
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "1"))
+# Interface of the private port of every worker, used to forward requests between workers
+WORKER_ROUTING_HOST = os.getenv("WORKER_ROUTING_HOST", "127.0.0.1")
+# Private port of the first worker (0 = public port + 1); worker i listens on this port + i
+WORKER_ROUTING_PORT = int(os.getenv("WORKER_ROUTING_PORT", "0"))
+TASK_ROUTES_PATH = os.getenv("TASK_ROUTES_PATH", "data/task_routes.db")
+# Days a task keeps its owner after its last execution
+TASK_ROUTES_RETENTION_DAYS = float(os.getenv("TASK_ROUTES_RETENTION_DAYS", "7"))
+
+# Marks a request forwarded by another worker, so it is never forwarded again
+FORWARDED_HEADER = b"x-forwarded-by-worker"
+# Stores that live in the memory of one process and cannot serve several workers
+_SHARED_STORES = ("TASK_STORE_BACKEND", "SESSION_STORE_BACKEND", "ARTIFACT_STORE_BACKEND")
+_PURGE_INTERVAL_SECONDS = 3600
+# Seconds to wait before starting again a worker that died
+_RESTART_DELAY_SECONDS = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS task_owners (
+    task_id TEXT PRIMARY KEY,
+    worker_url TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS task_owners_updated_at ON task_owners (updated_at);
+"""
+
+
+class TaskRouter:
+    """
+    Which worker owns each task, in a SQLite table shared by the worker processes.
+
+    A worker owns the tasks it executes: their event queues and the hot tier of the
+    task store are in its memory, so the other workers send it the requests about
+    them (see TaskRoutingMiddleware).
+    """
+
+    def __init__(self, worker_url: str, path: str = TASK_ROUTES_PATH, retention_days: float = TASK_ROUTES_RETENTION_DAYS):
+        """
+        Args:
+            worker_url: Private URL of this worker
+            path: SQLite database file shared by the workers
+            retention_days: Days a task keeps its owner after its last execution
+        """
+        self.worker_url = worker_url
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        self._connection = connect(path)
+        self._connection.executescript(_SCHEMA)
+        self._last_purge = 0.0
+
+    def claim(self, task_id: str) -> None:
+        """Record that this worker owns a task (the last worker executing it wins)."""
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO task_owners (task_id, worker_url, updated_at) VALUES (?, ?, ?)",
+                (task_id, self.worker_url, now),
+            )
+            if self.retention_days and time.monotonic() - self._last_purge >= _PURGE_INTERVAL_SECONDS:
+                self._connection.execute("DELETE FROM task_owners WHERE updated_at < ?", (now - self.retention_days * 86400,))
+                self._last_purge = time.monotonic()
+
+    def owner(self, task_id: str) -> Optional[str]:
+        """Private URL of the worker owning a task, None if no worker executed it."""
+        with self._lock:
+            row = self._connection.execute("SELECT worker_url FROM task_owners WHERE task_id = ?", (task_id,)).fetchone()
+        return row[0] if row else None
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class TaskClaimingExecutor(AgentExecutor):
+    """Agent executor recording that this worker owns the tasks it executes."""
+
+    def __init__(self, executor: AgentExecutor, router: TaskRouter):
+        self._executor = executor
+        self._router = router
+
+    async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
+        await asyncio.to_thread(self._router.claim, context.task_id)
+        await self._executor.execute(context, event_queue)
+
+    async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
+        await self._executor.cancel(context, event_queue)
+
+
+class TaskRoutingMiddleware:
+    """
+    ASGI middleware forwarding the A2A requests about a task to the worker that owns it.
+
+    JSON-RPC calls naming a task (message/send and message/stream continuing a task,
+    tasks/get, tasks/cancel, tasks/resubscribe...) are proxied, streamed responses
+    included, to the private port of the owner. Other requests, and requests about
+    tasks owned by an unreachable worker (restarted or gone), are served here.
+    """
+
+    def __init__(self, app, router: TaskRouter, timeout: float = 600, client: Optional[httpx.AsyncClient] = None):
+        """
+        Args:
+            app: ASGI application
+            router: Task router of this worker
+            timeout: Seconds to wait for the owner of a task
+            client: HTTP client used to reach the other workers (default: created on first use)
+        """
+        self.app = app
+        self.router = router
+        self.timeout = timeout
+        self._client = client
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or any(name == FORWARDED_HEADER for name, _ in scope["headers"]):
+            await self.app(scope, receive, send)
+            return
+
+        body = await _read_body(receive)
+        task_id = _task_id(body)
+        owner = await asyncio.to_thread(self.router.owner, task_id) if task_id else None
+        if owner and owner != self.router.worker_url:
+            try:
+                await self._forward(owner, scope, body, send)
+                return
+            except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+                logger.warning("Worker %s owning task %s is unreachable, serving the request here: %s", owner, task_id, e)
+        await self.app(scope, _replay(body, receive), send)
+
+    async def _forward(self, owner: str, scope, body: bytes, send) -> None:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+        url = owner + scope.get("raw_path", scope["path"].encode()).decode("latin-1")
+        if scope.get("query_string"):
+            url += "?" + scope["query_string"].decode("latin-1")
+        headers = [(name, value) for name, value in scope["headers"] if name not in (b"host", b"content-length")]
+        headers.append((FORWARDED_HEADER, self.router.worker_url.encode()))
+
+        response = await self._client.send(self._client.build_request("POST", url, headers=headers, content=body), stream=True)
+        try:
+            hop_by_hop = (b"content-length", b"transfer-encoding", b"connection")
+            await send({
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": [(name, value) for name, value in response.headers.raw if name.lower() not in hop_by_hop],
+            })
+            async for chunk in response.aiter_raw():
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            await response.aclose()
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+def _replay(body: bytes, receive):
+    replayed = False
+
+    async def replay():
+        nonlocal replayed
+        if replayed:
+            return await receive()
+        replayed = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return replay
+
+
+def _task_id(body: bytes) -> Optional[str]:
+    """Task named by a JSON-RPC request, if any."""
+    try:
+        request = json.loads(body)
+    except ValueError:
+        return None
+    if not isinstance(request, dict) or not isinstance(request.get("params"), dict):
+        return None
+    method, params = request.get("method") or "", request["params"]
+    if method in ("message/send", "message/stream"):
+        message = params.get("message")
+        return message.get("taskId") if isinstance(message, dict) else None
+    if method.startswith("tasks/"):
+        return params.get("id") or params.get("taskId")
+    return None
+
+
+_task_router: Optional[TaskRouter] = None
+_task_router_lock = threading.Lock()
+
+
+def get_task_router() -> Optional[TaskRouter]:
+    """Return the task router of this worker process, None when the server runs in a single process."""
+    global _task_router
+    # Set by serve_workers in every worker process, after this module is imported
+    worker_url = os.getenv("WORKER_URL")
+    if not worker_url:
+        return None
+    if _task_router is None:
+        with _task_router_lock:
+            if _task_router is None:
+                _task_router = TaskRouter(worker_url)
+    return _task_router
+
+
+def serve_workers(app: str, host: str, port: int, workers: int = SERVER_WORKERS, routing_port: int = WORKER_ROUTING_PORT) -> None:
+    """
+    Run the A2A server in several worker processes sharing host:port.
+
+    Every worker binds the public port with SO_REUSEPORT, so the kernel spreads the
+    connections across them, plus a private port used by the other workers to reach
+    the tasks it owns. The stores must be shared by the workers, so the in-memory
+    backends are refused. A worker that dies is started again. Returns on SIGINT or
+    SIGTERM, after stopping the workers.
+
+    Args:
+        app: Import string of the ASGI application ("module:attribute"), imported by each worker
+        host: Interface of the public port
+        port: Public port
+        workers: Worker processes
+        routing_port: Private port of the first worker (0 = port + 1)
+    """
+    if not hasattr(socket, "SO_REUSEPORT"):
+        raise ValueError("Several workers need SO_REUSEPORT, which this platform does not support")
+    for name in _SHARED_STORES:
+        if os.getenv(name) == "memory":
+            raise ValueError(f"{name}=memory cannot be shared by several workers")
+
+    routing_port = routing_port or port + 1
+    context = multiprocessing.get_context("spawn")
+
+    def start(index: int) -> multiprocessing.Process:
+        process = context.Process(
+            target=_run_worker,
+            args=(app, host, port, WORKER_ROUTING_HOST, routing_port + index, index),
+            name=f"a2a-worker-{index}",
+        )
+        process.start()
+        logger.info("Started worker %d (pid %s, private port %d)", index, process.pid, routing_port + index)
+        return process
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    previous_handler = signal.signal(signal.SIGTERM, stop)
+    processes: Dict[int, multiprocessing.Process] = {}
+    try:
+        for index in range(workers):
+            processes[index] = start(index)
+        while True:
+            multiprocessing.connection.wait([process.sentinel for process in processes.values()])
+            for index, process in list(processes.items()):
+                if not process.is_alive():
+                    logger.error("Worker %d (pid %s) exited with code %s, starting it again", index, process.pid, process.exitcode)
+                    time.sleep(_RESTART_DELAY_SECONDS)
+                    processes[index] = start(index)
+    except KeyboardInterrupt:
+        logger.info("Stopping %d workers", len(processes))
+    finally:
+        signal.signal(signal.SIGTERM, previous_handler)
+        _stop_processes(list(processes.values()))
+
+
+def _stop_processes(processes: List[multiprocessing.Process], timeout: float = 10) -> None:
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    deadline = time.monotonic() + timeout
+    for process in processes:
+        process.join(max(0.0, deadline - time.monotonic()))
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+
+def _run_worker(app: str, host: str, port: int, routing_host: str, routing_port: int, index: int) -> None:
+    """Entry point of a worker process: serve app on the shared public port and on a private port."""
+    import uvicorn
+
+    # Read by get_task_router and get_worktree_pool when the app below is imported
+    os.environ["WORKER_URL"] = f"http://{routing_host}:{routing_port}"
+    os.environ["WORKER_INDEX"] = str(index)
+
+    public = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    public.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    public.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    public.bind((host, port))
+    private = socket.create_server((routing_host, routing_port))
+
+    server = uvicorn.Server(uvicorn.Config(app))
+    server.run(sockets=[public, private])
+
+
+def main() -> None:
+    """Run buildgentic.server:app in SERVER_WORKERS workers; the supervisor does not import buildgentic.server."""
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+    serve_workers("buildgentic.server:app", "0.0.0.0", 8008, int(os.getenv("SERVER_WORKERS", str(SERVER_WORKERS))))
+
+
+if __name__ == "__main__":
+    main()
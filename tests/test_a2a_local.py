@@ -0,0 +1,152 @@
+"""
+Tests for the in-process A2A transport between agents of the same server.
+"""
+
+import asyncio
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+from a2a.client.errors import A2AClientJSONRPCError
+from a2a.client.transports.jsonrpc import JsonRpcTransport
+from a2a.server.agent_execution import AgentExecutor
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import InMemoryTaskStore
+from a2a.types import AgentCapabilities, AgentCard, Message, MessageSendParams, Part, Role, TaskQueryParams, TextPart
+from a2a.utils import new_agent_text_message
+
+from buildgentic.a2a_local import InProcessTransport, LocalAgentClientFactory, LocalAgentRegistry
+
+
+class EchoExecutor(AgentExecutor):
+    """Agent executor that answers with the text it received."""
+
+    async def execute(self, context, event_queue):
+        await event_queue.enqueue_event(new_agent_text_message(f"echo: {context.get_user_input()}"))
+
+    async def cancel(self, context, event_queue):
+        raise NotImplementedError
+
+
+def make_card(name):
+    return AgentCard(
+        name=name,
+        description=name,
+        url=f"http://localhost:8008/a2a/{name}/",
+        version="1.0",
+        capabilities=AgentCapabilities(streaming=True),
+        default_input_modes=["text/plain"],
+        default_output_modes=["text/plain"],
+        skills=[],
+    )
+
+
+def make_message(text):
+    return Message(role=Role.user, parts=[Part(root=TextPart(text=text))], message_id=str(uuid4()))
+
+
+def echo_handler():
+    return DefaultRequestHandler(agent_executor=EchoExecutor(), task_store=InMemoryTaskStore())
+
+
+class TestInProcessTransport:
+    """Tests for InProcessTransport."""
+
+    def test_send_message_reaches_the_handler(self):
+        """Messages are answered by the local request handler."""
+        transport = InProcessTransport(echo_handler(), make_card("qa"))
+
+        result = asyncio.run(transport.send_message(MessageSendParams(message=make_message("hello"))))
+
+        assert result.parts[0].root.text == "echo: hello"
+
+    def test_server_errors_become_client_errors(self):
+        """Server errors are raised as the JSON-RPC transport would raise them."""
+        transport = InProcessTransport(echo_handler(), make_card("qa"))
+
+        with pytest.raises(A2AClientJSONRPCError):
+            asyncio.run(transport.get_task(TaskQueryParams(id="missing")))
+
+    def test_get_card_does_not_fetch(self):
+        """The card is served from memory."""
+        card = make_card("qa")
+        assert asyncio.run(InProcessTransport(echo_handler(), card).get_card()) is card
+
+
+class TestLocalAgentClientFactory:
+    """Tests for LocalAgentClientFactory."""
+
+    def test_local_agents_use_in_process_transport(self):
+        """Cards of registered agents get an in-process client."""
+        registry = LocalAgentRegistry()
+        card = make_card("qa")
+        registry.register("qa", card, echo_handler())
+
+        client = LocalAgentClientFactory(registry=registry).create(card)
+
+        assert isinstance(client._transport, InProcessTransport)
+        assert registry.get_card("qa") is card
+
+    def test_remote_agents_fall_back_to_http(self):
+        """Cards of agents that are not in this process use JSON-RPC over HTTP."""
+        client = LocalAgentClientFactory(registry=LocalAgentRegistry()).create(make_card("qa"))
+
+        assert isinstance(client._transport, JsonRpcTransport)
+
+    def test_in_process_can_be_disabled(self):
+        """With in_process=False every agent goes over HTTP."""
+        registry = LocalAgentRegistry()
+        card = make_card("qa")
+        registry.register("qa", card, echo_handler())
+
+        client = LocalAgentClientFactory(registry=registry, in_process=False).create(card)
+
+        assert isinstance(client._transport, JsonRpcTransport)
+
+    def test_extensions_stay_with_their_client(self):
+        """Extensions asked for one client are not added to the clients created after it."""
+        registry = LocalAgentRegistry()
+        card = make_card("qa")
+        registry.register("qa", card, echo_handler())
+        factory = LocalAgentClientFactory(registry=registry)
+
+        local = factory.create(card, extensions=["urn:a"])
+        remote = factory.create(make_card("dev"), extensions=["urn:b"])
+        plain = factory.create(make_card("dev"))
+
+        assert local._config.extensions == ["urn:a"] and local._transport.extensions == ["urn:a"]
+        assert remote._config.extensions == ["urn:b"]
+        assert plain._config.extensions == [] and factory._config.extensions == []
+
+    def test_client_round_trip(self):
+        """A client created by the factory delivers messages to the local agent."""
+        registry = LocalAgentRegistry()
+        card = make_card("qa")
+        registry.register("qa", card, echo_handler())
+        client = LocalAgentClientFactory(registry=registry).create(card)
+
+        async def run():
+            return [event async for event in client.send_message(make_message("ping"))]
+
+        events = asyncio.run(run())
+        assert events[0].parts[0].root.text == "echo: ping"
+
+
+class TestManagerSubAgents:
+    """Tests for the manager sub-agents wiring."""
+
+    def test_local_sub_agents_use_registered_cards(self):
+        """Sub-agents mounted in this process are built from the registered card."""
+        from buildgentic.manager import agent as manager_agent
+
+        registry = LocalAgentRegistry()
+        card = make_card("qa")
+        registry.register("qa", card, echo_handler())
+
+        with patch.object(manager_agent, "local_agents", registry):
+            qa = manager_agent._get_sub_agent("qa", "QA", LocalAgentClientFactory(registry=registry))
+            developer = manager_agent._get_sub_agent("developer", "Developer", LocalAgentClientFactory(registry=registry))
+
+        assert qa._agent_card is card
+        assert developer._agent_card is None
+        assert developer._agent_card_source.endswith("/a2a/developer/.well-known/agent-card.json")
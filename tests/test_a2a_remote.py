@@ -0,0 +1,151 @@
+"""
+Tests for the agent directory and the client-side load balancing over agent replicas.
+"""
+
+import asyncio
+
+import pytest
+from a2a.client.errors import A2AClientHTTPError
+from a2a.types import AgentCapabilities, AgentCard, Message, MessageSendParams, Part, Role, Task, TaskQueryParams, TaskState, TaskStatus, TextPart
+
+from buildgentic.a2a_local import LocalAgentClientFactory, LocalAgentRegistry
+from buildgentic.a2a_remote import AgentDirectory, BalancedTransport, ReplicaSet
+
+
+URLS = "developer=http://dev-1:8008/a2a/developer/, http://dev-2:8008/a2a/developer/;qa=http://qa:8008/a2a/qa/"
+
+
+class FakeTransport:
+    """Transport answering with a task named after its replica, or failing."""
+
+    def __init__(self, name, error=None):
+        self.name = name
+        self.error = error
+        self.calls = []
+
+    async def send_message(self, request, *, context=None, extensions=None):
+        self.calls.append("send_message")
+        if self.error:
+            raise self.error
+        await asyncio.sleep(0)
+        return Task(id=request.message.task_id or f"task-{self.name}-{len(self.calls)}", context_id="c", status=TaskStatus(state=TaskState.working))
+
+    async def send_message_streaming(self, request, *, context=None, extensions=None):
+        self.calls.append("send_message_streaming")
+        if self.error:
+            raise self.error
+        yield Task(id=f"task-{self.name}", context_id="c", status=TaskStatus(state=TaskState.working))
+
+    async def get_task(self, request, *, context=None, extensions=None):
+        self.calls.append("get_task")
+        return Task(id=request.id, context_id="c", status=TaskStatus(state=TaskState.completed))
+
+    async def close(self):
+        self.calls.append("close")
+
+
+def message(task_id=None):
+    return MessageSendParams(message=Message(message_id="m", role=Role.user, parts=[Part(root=TextPart(text="hi"))], task_id=task_id))
+
+
+def balanced(*transports):
+    replicas = ReplicaSet("developer", [f"http://dev-{index}/" for index in range(len(transports))], cooldown=60)
+    return BalancedTransport(replicas, list(transports))
+
+
+class TestAgentDirectory:
+    """Tests for AgentDirectory."""
+
+    def test_configured_and_default_agents(self):
+        directory = AgentDirectory(URLS, base_url="http://localhost:8008/a2a/")
+
+        assert directory.replicas("developer").urls == ["http://dev-1:8008/a2a/developer/", "http://dev-2:8008/a2a/developer/"]
+        assert directory.card_url("qa") == "http://qa:8008/a2a/qa/.well-known/agent-card.json"
+        assert directory.replicas("architect").urls == ["http://localhost:8008/a2a/architect/"]
+        assert directory.replicas_of("http://dev-2:8008/a2a/developer") is directory.replicas("developer")
+        assert directory.replicas_of("http://elsewhere/developer/") is None
+
+    def test_invalid_entry(self):
+        with pytest.raises(ValueError):
+            AgentDirectory("developer http://dev-1/")
+
+
+class TestBalancedTransport:
+    """Tests for BalancedTransport."""
+
+    def test_spreads_new_tasks_and_keeps_tasks_on_their_replica(self):
+        first, second = FakeTransport("a"), FakeTransport("b")
+        transport = balanced(first, second)
+
+        async def run():
+            tasks = await asyncio.gather(*(transport.send_message(message()) for _ in range(4)))
+            for task in tasks:
+                await transport.get_task(TaskQueryParams(id=task.id))
+            return tasks
+
+        tasks = asyncio.run(run())
+
+        assert first.calls.count("send_message") == 2 and second.calls.count("send_message") == 2
+        assert first.calls.count("get_task") == 2 and second.calls.count("get_task") == 2
+        assert {task.id.split("-")[1] for task in tasks} == {"a", "b"}
+
+    def test_fails_over_when_a_replica_is_unreachable(self):
+        down = FakeTransport("a", A2AClientHTTPError(503, "Network communication error"))
+        up = FakeTransport("b")
+        transport = balanced(down, up)
+
+        tasks = [asyncio.run(transport.send_message(message())) for _ in range(3)]
+
+        assert [task.id.split("-")[1] for task in tasks] == ["b", "b", "b"]
+        # In cooldown after the first failure: tried last, so not called again
+        assert down.calls == ["send_message"]
+
+    def test_other_errors_are_not_retried(self):
+        broken = FakeTransport("a", A2AClientHTTPError(500, "Internal error"))
+        transport = balanced(broken, FakeTransport("b"))
+        transport.replicas.order = lambda task_id=None: [0, 1]
+
+        with pytest.raises(A2AClientHTTPError):
+            asyncio.run(transport.send_message(message()))
+
+    def test_streams_fail_over_and_bind_the_task(self):
+        down = FakeTransport("a", A2AClientHTTPError(429, "Too many requests"))
+        up = FakeTransport("b")
+        transport = balanced(down, up)
+
+        async def run():
+            return [event async for event in transport.send_message_streaming(message())]
+
+        events = asyncio.run(run())
+
+        assert [event.id for event in events] == ["task-b"]
+        assert transport.replicas.order("task-b") == [1]
+
+
+class TestLocalAgentClientFactory:
+    """Clients of agents with several replicas balance their calls."""
+
+    def card(self, url):
+        return AgentCard(
+            name="Developer Agent",
+            description="Developer",
+            url=url,
+            version="1.0",
+            capabilities=AgentCapabilities(streaming=True),
+            default_input_modes=["text/plain"],
+            default_output_modes=["text/plain"],
+            skills=[],
+        )
+
+    def test_balanced_client(self):
+        factory = LocalAgentClientFactory(registry=LocalAgentRegistry(), directory=AgentDirectory(URLS))
+
+        balanced_client = factory.create(self.card("http://dev-1:8008/a2a/developer/"))
+        single_client = factory.create(self.card("http://qa:8008/a2a/qa/"))
+
+        assert isinstance(balanced_client._transport, BalancedTransport)
+        assert [transport.url for transport in balanced_client._transport.transports] == [
+            "http://dev-1:8008/a2a/developer/",
+            "http://dev-2:8008/a2a/developer/",
+        ]
+        assert not isinstance(single_client._transport, BalancedTransport)
@@ -0,0 +1,115 @@
+"""
+Tests for the A2A server utilities: lazy agent construction and startup timings.
+"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock, AsyncMock, patch
+
+import pytest
+from a2a.types import AgentCapabilities, AgentCard
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from buildgentic.a2a_local import LocalAgentRegistry
+from buildgentic.a2a_utils import A2AUtils, AgentSpec, LazyRequestHandler, StartupTimings
+
+
+def make_card(agent_url):
+    return AgentCard(
+        name="Test Agent",
+        description="Test agent",
+        url=agent_url,
+        version="1.0",
+        capabilities=AgentCapabilities(streaming=True),
+        default_input_modes=["text/plain"],
+        default_output_modes=["text/plain"],
+        skills=[],
+    )
+
+
+def slow_card(agent_url):
+    time.sleep(0.2)
+    return make_card(agent_url)
+
+
+class TestLazyRequestHandler:
+    """Tests for LazyRequestHandler."""
+
+    def test_builds_once_under_concurrency(self):
+        """Concurrent first requests share a single build."""
+        real_handler = MagicMock()
+        real_handler.on_get_task = AsyncMock(return_value="task")
+        calls = []
+
+        def factory():
+            calls.append(threading.current_thread().name)
+            time.sleep(0.05)
+            return real_handler
+
+        handler = LazyRequestHandler("qa", factory)
+
+        async def run():
+            return await asyncio.gather(*(handler.on_get_task(MagicMock()) for _ in range(5)))
+
+        assert asyncio.run(run()) == ["task"] * 5
+        assert len(calls) == 1
+        assert handler.is_built
+
+    def test_records_build_time(self):
+        """The agent build time is recorded in the startup timings."""
+        timings = StartupTimings()
+        LazyRequestHandler("qa", MagicMock, timings).build()
+
+        assert "agent" in timings.as_dict()["qa"]
+
+
+class TestBuildAll:
+    """Tests for A2AUtils.build_all."""
+
+    def specs(self, get_agent):
+        return [AgentSpec(name, get_agent, slow_card) for name in ("manager", "qa", "developer")]
+
+    def test_lazy_mode_does_not_build_agents(self):
+        """In lazy mode only the cards are built at startup, in parallel."""
+        get_agent = MagicMock()
+        app = FastAPI()
+
+        start = time.perf_counter()
+        timings = A2AUtils.build_all(self.specs(get_agent), "openai/gpt-4o", "http://localhost:8008/a2a", app, startup_mode="lazy")
+        elapsed = time.perf_counter() - start
+
+        get_agent.assert_not_called()
+        assert elapsed < 0.5
+        assert set(timings.as_dict()) == {"manager", "qa", "developer"}
+        response = TestClient(app).get("/qa/.well-known/agent-card.json")
+        assert response.status_code == 200
+        assert response.json()["url"] == "http://localhost:8008/a2a/qa/"
+
+    def test_registers_local_agents(self):
+        """Mounted agents are registered for in-process delegation."""
+        registry = LocalAgentRegistry()
+
+        with patch("buildgentic.a2a_utils.local_agents", registry):
+            A2AUtils.build_all(self.specs(MagicMock()), "openai/gpt-4o", "http://localhost:8008/a2a", FastAPI(), startup_mode="lazy")
+
+        card = registry.get_card("qa")
+        assert card.url == "http://localhost:8008/a2a/qa/"
+        assert isinstance(registry.get_handler(card), LazyRequestHandler)
+
+    def test_eager_mode_builds_every_agent(self):
+        """In eager mode every agent is built before build_all returns."""
+        get_agent = MagicMock()
+
+        with patch("buildgentic.a2a_utils.A2ARequestHandler.get_request_handler") as get_request_handler:
+            timings = A2AUtils.build_all(self.specs(get_agent), "openai/gpt-4o", "http://localhost:8008/a2a", FastAPI(), startup_mode="eager")
+
+        assert get_agent.call_count == 3
+        assert get_request_handler.call_count == 3
+        assert all("agent" in phases for phases in timings.as_dict().values())
+
+    def test_unknown_mode(self):
+        """An unknown startup mode is rejected."""
+        with pytest.raises(ValueError):
+            A2AUtils.build_all([], "openai/gpt-4o", "http://localhost:8008/a2a", FastAPI(), startup_mode="sometimes")
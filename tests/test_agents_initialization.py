@@ -128,6 +128,8 @@ class TestDeveloperAgent:
         assert agent is not None
         assert agent.name == 'developer'
         mock_agent['developer'].assert_called_once()
+        tools = mock_agent['developer'].call_args.kwargs['tools']
+        assert [tool.__name__ for tool in tools] == ['search_code', 'find_symbol']
 
     def test_get_developer_agent_card(self, mock_load_context):
         """Test that developer agent card can be created successfully."""
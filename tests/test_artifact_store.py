@@ -0,0 +1,182 @@
+"""
+Tests for the content-addressed blob store, the artifact service and the attachment cache.
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+from google.genai import types
+
+from buildgentic.storage.artifact_service import ContentAddressedArtifactService
+from buildgentic.storage.blob_store import BlobStore, BlobWriter
+from buildgentic.tools import tools_azureDevOps, tools_azureDevOps_async
+from buildgentic.tools.azure_devops_client import AsyncAzureDevOpsClient, AzureDevOpsClient
+
+
+@pytest.fixture
+def blob_store(tmp_path):
+    return BlobStore(str(tmp_path / "store"), max_bytes=0)
+
+
+class TestBlobStore:
+    """Tests for BlobStore."""
+
+    def test_same_content_is_stored_once(self, blob_store):
+        """Blobs are deduplicated by sha256."""
+        first = blob_store.put_bytes(b"spec", ref="a")
+        second = blob_store.put_stream([b"sp", b"ec"], ref="b")
+
+        assert first == second == hashlib.sha256(b"spec").hexdigest()
+        assert blob_store.stats()["blobs"] == 1
+        assert blob_store.total_bytes == 4
+        assert blob_store.get_ref("a") == blob_store.get_ref("b") == first
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """The store deletes the oldest blobs once it grows over max_bytes."""
+        store = BlobStore(str(tmp_path / "store"), max_bytes=10)
+        old = store.put_bytes(b"123456", ref="old")
+        recent = store.put_bytes(b"abcdef", ref="recent")
+
+        assert not store.contains(old)
+        assert store.get_ref("old") is None
+        assert store.get_ref("recent") == recent
+        assert store.total_bytes == 6
+
+    def test_large_blobs_are_read_through_mmap(self, blob_store):
+        """Large blobs are read back intact."""
+        data = os.urandom(2 * 1024 * 1024)
+        sha256 = blob_store.put_bytes(data)
+
+        assert blob_store.read_bytes(sha256) == data
+        with blob_store.mmap(sha256) as mapped:
+            assert mapped[:10] == data[:10]
+
+
+class TestContentAddressedArtifactService:
+    """Tests for ContentAddressedArtifactService."""
+
+    def test_versions_and_dedupe(self, blob_store):
+        """Each save is a new version; identical payloads share one blob."""
+        service = ContentAddressedArtifactService(blob_store)
+        part = types.Part(inline_data=types.Blob(mime_type="application/pdf", data=b"%PDF"))
+
+        async def run():
+            for _ in range(2):
+                await service.save_artifact(app_name="qa", user_id="u", session_id="s", filename="spec.pdf", artifact=part)
+            await service.save_artifact(app_name="qa", user_id="u", session_id="s", filename="user:notes", artifact=types.Part(text="hi"))
+            return (
+                await service.load_artifact(app_name="qa", user_id="u", session_id="s", filename="spec.pdf"),
+                await service.list_versions(app_name="qa", user_id="u", session_id="s", filename="spec.pdf"),
+                await service.list_artifact_keys(app_name="qa", user_id="u", session_id="s"),
+                await service.load_artifact(app_name="qa", user_id="u", filename="user:notes"),
+            )
+
+        loaded, versions, keys, notes = asyncio.run(run())
+        assert loaded.inline_data.data == b"%PDF"
+        assert loaded.inline_data.mime_type == "application/pdf"
+        assert versions == [0, 1]
+        assert keys == ["spec.pdf", "user:notes"]
+        assert notes.text == "hi"
+        assert blob_store.stats()["blobs"] == 2
+
+    def test_delete(self, blob_store):
+        service = ContentAddressedArtifactService(blob_store)
+
+        async def run():
+            await service.save_artifact(app_name="qa", user_id="u", session_id="s", filename="a.txt", artifact=types.Part(text="a"))
+            await service.delete_artifact(app_name="qa", user_id="u", session_id="s", filename="a.txt")
+            return await service.load_artifact(app_name="qa", user_id="u", session_id="s", filename="a.txt")
+
+        assert asyncio.run(run()) is None
+
+
+class TestDownloadAttachment:
+    """Tests for the cached attachment download."""
+
+    def test_second_download_skips_the_network(self, blob_store, tmp_path):
+        """An attachment already in the blob store is copied without an HTTP request."""
+        response = MagicMock(status_code=200, text="")
+        response.iter_content.return_value = [b"attach", b"ment"]
+
+        with patch.object(tools_azureDevOps, "get_shared_blob_store", return_value=blob_store), \
+             patch.object(AzureDevOpsClient, "request", return_value=response) as mock_request:
+            assert tools_azureDevOps.download_attachment("guid-1", "a.txt", str(tmp_path / "first"))
+            assert tools_azureDevOps.download_attachment("guid-1", "b.txt", str(tmp_path / "second"))
+
+        assert mock_request.call_count == 1
+        assert (tmp_path / "second" / "b.txt").read_bytes() == b"attachment"
+
+    def test_blob_evicted_after_the_lookup_is_downloaded_again(self, blob_store, tmp_path):
+        """A blob deleted between get_ref and copy_to falls back to the network."""
+        response = MagicMock(status_code=200, text="")
+        response.iter_content.return_value = [b"attachment"]
+        get_ref = blob_store.get_ref
+
+        def get_ref_then_evict(key):
+            sha256 = get_ref(key)
+            if sha256 is not None:
+                os.remove(blob_store.path(sha256))
+            return sha256
+
+        with patch.object(tools_azureDevOps, "get_shared_blob_store", return_value=blob_store), \
+             patch.object(AzureDevOpsClient, "request", return_value=response) as mock_request:
+            assert tools_azureDevOps.download_attachment("guid-4", "a.txt", str(tmp_path / "first"))
+            with patch.object(blob_store, "get_ref", get_ref_then_evict):
+                assert tools_azureDevOps.download_attachment("guid-4", "b.txt", str(tmp_path / "second"))
+
+        assert mock_request.call_count == 2
+        assert (tmp_path / "second" / "b.txt").read_bytes() == b"attachment"
+
+    def test_async_download_fills_the_cache(self, blob_store, tmp_path):
+        """The async tool stores what it downloads and reuses it."""
+        calls = []
+
+        def handler(request):
+            calls.append(request.url)
+            return httpx.Response(200, content=b"attachment")
+
+        async def run():
+            client = AsyncAzureDevOpsClient({})
+            client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            with patch.object(tools_azureDevOps_async, "get_azure_devops_async_client", return_value=client), \
+                 patch.object(tools_azureDevOps_async, "get_shared_blob_store", return_value=blob_store):
+                first = await tools_azureDevOps_async.download_attachment("guid-2", "a.txt", str(tmp_path))
+                second = await tools_azureDevOps_async.download_attachment("guid-2", "b.txt", str(tmp_path))
+            return first, second
+
+        assert asyncio.run(run()) == (True, True)
+        assert len(calls) == 1
+        assert (tmp_path / "b.txt").read_bytes() == b"attachment"
+
+    def test_async_download_writes_off_the_event_loop(self, blob_store, tmp_path, monkeypatch):
+        """Large attachments are written to disk in blocks, from worker threads."""
+        monkeypatch.setattr(tools_azureDevOps_async, "_WRITE_BLOCK_SIZE", 4)
+        writes = []
+        write = BlobWriter.write
+
+        def recording_write(writer, chunk):
+            writes.append((chunk, threading.get_ident()))
+            write(writer, chunk)
+
+        async def stream():
+            for chunk in (b"at", b"tach", b"me", b"nt"):
+                yield chunk
+
+        async def run():
+            client = AsyncAzureDevOpsClient({})
+            client.client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, content=stream())))
+            with patch.object(tools_azureDevOps_async, "get_azure_devops_async_client", return_value=client), \
+                 patch.object(tools_azureDevOps_async, "get_shared_blob_store", return_value=blob_store), \
+                 patch.object(BlobWriter, "write", recording_write):
+                return await tools_azureDevOps_async.download_attachment("guid-3", "a.txt", str(tmp_path)), threading.get_ident()
+
+        result, loop_thread = asyncio.run(run())
+
+        assert result is True
+        assert (tmp_path / "a.txt").read_bytes() == b"attachment"
+        assert writes and all(thread != loop_thread for _, thread in writes)
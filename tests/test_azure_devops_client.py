@@ -0,0 +1,92 @@
+"""
+Tests for the shared, connection-pooled Azure DevOps HTTP client.
+"""
+
+import pytest
+from unittest.mock import patch, MagicMock
+
+from buildgentic.tools import azure_devops_client
+from buildgentic.tools.azure_devops_client import AzureDevOpsClient, get_shared_client, reset_shared_client
+
+
+@pytest.fixture(autouse=True)
+def fresh_shared_client():
+    """Make sure every test starts without a cached shared client."""
+    reset_shared_client()
+    yield
+    reset_shared_client()
+
+
+class TestAzureDevOpsClient:
+    """Tests for AzureDevOpsClient."""
+
+    def test_applies_default_timeout(self):
+        """Every request gets the configured (connect, read) timeout."""
+        client = AzureDevOpsClient({"Authorization": "Basic abc"}, connect_timeout=2, read_timeout=7)
+
+        with patch.object(client.session, "request") as mock_request:
+            client.get("https://dev.azure.com/org/_apis/test")
+
+        _, kwargs = mock_request.call_args
+        assert kwargs["timeout"] == (2, 7)
+
+    def test_caller_timeout_wins(self):
+        """A timeout passed by the caller is not overridden."""
+        client = AzureDevOpsClient({})
+
+        with patch.object(client.session, "request") as mock_request:
+            client.post("https://dev.azure.com/org/_apis/test", timeout=1)
+
+        _, kwargs = mock_request.call_args
+        assert kwargs["timeout"] == 1
+
+    def test_per_request_headers_do_not_leak(self):
+        """Per-request headers never modify the shared session headers."""
+        client = AzureDevOpsClient({"Content-Type": "application/json"})
+
+        with patch.object(client.session, "request"):
+            client.patch("https://dev.azure.com/org/_apis/test", headers={"Content-Type": "application/json-patch+json"})
+
+        assert client.session.headers["Content-Type"] == "application/json"
+
+    def test_mounts_pooled_adapter(self):
+        """The session uses a pooled adapter with the configured size."""
+        client = AzureDevOpsClient({}, pool_maxsize=3)
+
+        adapter = client.session.get_adapter("https://dev.azure.com")
+        assert adapter._pool_maxsize == 3
+
+
+class TestSharedClient:
+    """Tests for the process-wide client."""
+
+    def test_shared_client_is_reused(self):
+        """Headers are only used to build the client once."""
+        first = get_shared_client(lambda: {"Authorization": "Basic one"})
+        second = get_shared_client(lambda: {"Authorization": "Basic two"})
+
+        assert first is second
+        assert first.session.headers["Authorization"] == "Basic one"
+
+    def test_headers_are_only_built_with_the_client(self):
+        """The PAT is not encoded again on every tool call."""
+        from buildgentic.tools import tools_azureDevOps
+
+        with patch.object(tools_azureDevOps, "get_azure_devops_headers", return_value={"Authorization": "Basic x"}) as get_headers:
+            tools_azureDevOps.get_azure_devops_client()
+            tools_azureDevOps.get_azure_devops_client()
+
+        assert get_headers.call_count == 1
+
+    def test_tools_use_shared_client(self):
+        """Azure DevOps tools go through the shared client."""
+        from buildgentic.tools import tools_azureDevOps
+
+        response = MagicMock(status_code=200, text="{}")
+        response.json.return_value = {"id": 1}
+        with patch.object(azure_devops_client.AzureDevOpsClient, "request", return_value=response) as mock_request:
+            assert tools_azureDevOps.get_work_item_details(1) == {"id": 1}
+            assert tools_azureDevOps.get_work_item_details(2) == {"id": 1}
+
+        assert mock_request.call_count == 2
+        assert tools_azureDevOps.get_azure_devops_client() is tools_azureDevOps.get_azure_devops_client()
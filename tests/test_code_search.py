@@ -0,0 +1,118 @@
+"""
+Tests for the trigram code search index.
+"""
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+from buildgentic.code_operations import code_search, file_index, filesystem_resolver
+from buildgentic.code_operations.code_search import CodeSearchIndex, _required_literals, format_hits
+from buildgentic.code_operations.file_index import FileIndex
+from buildgentic.code_operations.git_sync import unsubscribe
+
+
+def write(root, name, content):
+    path = root / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    root = tmp_path / "repo"
+    write(root, "agents/manager.py", "def get_manager_agent(model):\n    return build(model)\n")
+    write(root, "agents/qa.py", "from agents.manager import get_manager_agent\n\nagent = get_manager_agent('gpt')\n")
+    write(root, "docs/notes.md", "The manager agent delegates.\n")
+    (root / "logo.png").write_bytes(b"\x89PNG\0\0get_manager_agent")
+    return root
+
+
+@pytest.fixture
+def index(repo):
+    return CodeSearchIndex(FileIndex(str(repo), cache_dir=None), cache_dir=None)
+
+
+@pytest.fixture
+def shared_indexes(tmp_path, monkeypatch):
+    """Process-wide indexes stored in tmp_path, unsubscribed from git_sync afterwards."""
+    monkeypatch.setattr(file_index, "FILE_INDEX_DIR", str(tmp_path / "file_index"))
+    monkeypatch.setattr(file_index, "_file_indexes", {})
+    monkeypatch.setattr(code_search, "CODE_SEARCH_INDEX_DIR", str(tmp_path / "code_search"))
+    monkeypatch.setattr(code_search, "_search_indexes", {})
+    yield
+    for index in code_search._search_indexes.values():
+        unsubscribe(index.on_sync)
+        index.close()
+    for index in file_index._file_indexes.values():
+        unsubscribe(index.on_sync)
+
+
+class TestCodeSearchIndex:
+    """Tests for CodeSearchIndex."""
+
+    def test_only_candidate_files_are_read(self, index):
+        """Files without the trigrams of the query are never opened."""
+        index.update(force=True)
+        with patch.object(index, "_search_file", wraps=index._search_file) as mock_search:
+            hits = index.search(r"def get_manager_\w+")
+
+        assert [(hit.path, hit.line) for hit in hits] == [("agents/manager.py", 1)]
+        assert mock_search.call_count == 1
+
+    def test_context_and_filters(self, index):
+        hits = index.search("get_manager_agent", regex=False, glob="*.py", context_lines=1)
+
+        assert [(hit.path, hit.line) for hit in hits] == [("agents/manager.py", 1), ("agents/qa.py", 1), ("agents/qa.py", 3)]
+        assert hits[2].before == [""]
+        assert index.search("MANAGER AGENT", ignore_case=True, path="docs")[0].path == "docs/notes.md"
+
+    def test_update_only_reindexes_changed_files(self, index, repo):
+        """Modified, new and deleted files are picked up; untouched files are not read again."""
+        assert index.update(force=True) == 4
+
+        write(repo, "agents/qa.py", "print('changed')\n")
+        os.utime(repo / "agents" / "qa.py", ns=(1, 1))
+        os.remove(repo / "docs" / "notes.md")
+
+        assert index.update(force=True) == 2
+        assert [hit.path for hit in index.search("get_manager_agent")] == ["agents/manager.py"]
+        assert index.stats()["files"] == 3
+
+    def test_binary_files_are_not_searched(self, index):
+        assert all(hit.path != "logo.png" for hit in index.search("get_manager_agent"))
+
+
+class TestRequiredLiterals:
+    """Tests for the literal extraction used to pick candidate files."""
+
+    def test_literals(self):
+        assert _required_literals(r"def\s+foo_bar\(") == ["def", "foo_bar("]
+        assert _required_literals(r"(?:client)+x|other") == []
+        assert _required_literals(r"load_(context)") == ["load_", "context"]
+
+    def test_optional_and_unsure_parts_are_dropped(self):
+        assert _required_literals(r"colou?r_name") == ["colo", "r_name"]
+        assert _required_literals(r"get_(manager|qa)_agent") == ["get_", "_agent"]
+        assert _required_literals(r"(abc)*defg[xyz]+\x41BCD") == ["defg", "BCD"]
+        assert _required_literals(r"abc(?=defg)xyz(?#note)") == ["abc", "xyz"]
+        assert _required_literals(r"(?x)abc def") == []
+
+
+class TestSearchCode:
+    """Tests for filesystem_resolver.search_code."""
+
+    def test_identifier_search(self, repo, shared_indexes, monkeypatch):
+        monkeypatch.setenv("REPO_PATH2", str(repo))
+        write(repo, "agents/other.py", "get_manager_agent_card()\n")
+
+        result = filesystem_resolver.search_code("get_manager_agent", identifier=True, pattern="manager.py", context_lines=0)
+
+        assert result == "agents/manager.py:1: def get_manager_agent(model):"
+        assert filesystem_resolver.search_code("missing_symbol") == "No matches for 'missing_symbol'"
+
+    def test_format_hits(self):
+        hit = code_search.SearchHit("a.py", 3, "x = 1", ["# before"], ["y = 2"])
+
+        assert format_hits([hit, hit]) == "a.py-2- # before\na.py:3: x = 1\na.py-4- y = 2\n--\na.py-2- # before\na.py:3: x = 1\na.py-4- y = 2"
@@ -0,0 +1,118 @@
+"""
+Tests for the repository file index behind get_directory_structure.
+"""
+
+import os
+import subprocess
+
+import pytest
+
+from buildgentic.code_operations import file_index, filesystem_resolver
+from buildgentic.code_operations.file_index import FileIndex
+from buildgentic.code_operations.git_sync import unsubscribe
+
+
+def git(repo, *args):
+    subprocess.run(["git", *args], cwd=repo, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+
+def write(repo, name, content="x"):
+    path = repo / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init", "-q")
+    git(repo, "config", "user.email", "dev@example.com")
+    git(repo, "config", "user.name", "dev")
+    write(repo, ".gitignore", "node_modules/\n")
+    write(repo, "src/app/main.py")
+    write(repo, "src/app/util.py")
+    write(repo, "docs/index.md")
+    write(repo, "node_modules/lib/index.js")
+    git(repo, "add", "-A")
+    git(repo, "commit", "-q", "-m", "initial")
+    return repo
+
+
+@pytest.fixture
+def shared_file_index(tmp_path, monkeypatch):
+    """Process-wide file indexes stored in tmp_path, unsubscribed from git_sync afterwards."""
+    monkeypatch.setattr(file_index, "FILE_INDEX_DIR", str(tmp_path / "file_index"))
+    monkeypatch.setattr(file_index, "_file_indexes", {})
+    yield
+    for index in file_index._file_indexes.values():
+        unsubscribe(index.on_sync)
+
+
+class TestFileIndex:
+    """Tests for FileIndex."""
+
+    def test_git_index_respects_gitignore(self, repo, tmp_path):
+        """Ignored folders and .git are not indexed."""
+        index = FileIndex(str(repo), cache_dir=str(tmp_path / "cache"))
+
+        assert index.files() == [".gitignore", "docs/index.md", "src/app/main.py", "src/app/util.py"]
+
+    def test_tree_depth_and_pattern(self, repo, tmp_path):
+        """Folders below max_depth are collapsed and the pattern filters the files."""
+        index = FileIndex(str(repo), cache_dir=None)
+
+        assert index.tree(max_depth=1).splitlines() == ["repo/", "    docs/ (1 files)", "    src/ (2 files)", "    .gitignore"]
+        assert index.tree(pattern="main.py").splitlines() == ["repo/", "    src/", "        app/", "            main.py"]
+        assert index.tree(path="src/app").splitlines() == ["app/", "    main.py", "    util.py"]
+        assert index.tree(max_entries=2).splitlines()[-1].startswith("... (")
+
+    def test_refresh_applies_commits_and_working_tree_changes(self, repo, tmp_path):
+        """A new HEAD and untracked or deleted files are picked up on refresh."""
+        index = FileIndex(str(repo), cache_dir=str(tmp_path / "cache"))
+        index.refresh(force=True)
+        first_head = index.head
+
+        write(repo, "src/app/new.py")
+        git(repo, "add", "-A")
+        git(repo, "commit", "-q", "-m", "add new.py")
+        write(repo, "scratch.txt")
+        os.remove(repo / "docs" / "index.md")
+
+        assert index.refresh(force=True)
+        assert index.head != first_head
+        assert "src/app/new.py" in index.files()
+        assert "scratch.txt" in index.files()
+        assert "docs/index.md" not in index.files()
+
+    def test_index_is_reloaded_from_disk(self, repo, tmp_path):
+        """A new instance reuses the persisted index instead of listing the whole tree."""
+        FileIndex(str(repo), cache_dir=str(tmp_path / "cache")).refresh(force=True)
+
+        reloaded = FileIndex(str(repo), cache_dir=str(tmp_path / "cache"))
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            monkeypatch.setattr(reloaded, "_tracked_files", lambda head: pytest.fail("index was rebuilt"))
+            assert "src/app/main.py" in reloaded.files()
+
+    def test_walk_index_outside_git(self, tmp_path):
+        """Without git the tree is walked, skipping the default ignored folders."""
+        root = tmp_path / "plain"
+        write(root, "a/b.txt")
+        write(root, "node_modules/c.js")
+        index = FileIndex(str(root), cache_dir=None)
+
+        assert index.files() == ["a/b.txt"]
+        write(root, "a/d.txt")
+        assert index.refresh(force=True)
+        assert index.files() == ["a/b.txt", "a/d.txt"]
+
+
+class TestGetDirectoryStructure:
+    """Tests for filesystem_resolver.get_directory_structure."""
+
+    def test_uses_repo_path(self, repo, shared_file_index, monkeypatch):
+        monkeypatch.setenv("REPO_PATH2", str(repo))
+
+        structure = filesystem_resolver.get_directory_structure(pattern="*.md")
+
+        assert structure.splitlines() == ["repo/", "    docs/", "        index.md"]
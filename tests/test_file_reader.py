@@ -0,0 +1,96 @@
+"""
+Tests for the ranged file reads behind read_file_content.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from buildgentic.code_operations import file_reader, filesystem_resolver
+from buildgentic.code_operations.file_reader import read_range
+
+
+def numbered_lines(count):
+    return "".join(f"line {i}\n" for i in range(1, count + 1))
+
+
+@pytest.fixture
+def text_file(tmp_path):
+    path = tmp_path / "log.txt"
+    path.write_text(numbered_lines(5000))
+    return str(path)
+
+
+class TestReadRange:
+    """Tests for read_range."""
+
+    def test_line_range(self, text_file):
+        part = read_range(text_file, start_line=2, end_line=3)
+
+        assert part.text == "line 2\nline 3\n"
+        assert (part.start_line, part.end_line, part.truncated) == (2, 3, False)
+
+    def test_byte_range(self, text_file):
+        part = read_range(text_file, offset=7, length=7)
+
+        assert part.text == "line 2\n"
+        assert (part.start, part.end) == (7, 14)
+
+    def test_max_bytes_cuts_at_a_line_boundary(self, text_file):
+        part = read_range(text_file, start_line=1, max_bytes=20)
+
+        assert part.text == "line 1\nline 2\n"
+        assert part.truncated
+        assert part.end_line == 2
+
+    def test_lines_longer_than_max_bytes_are_not_reported_complete(self, tmp_path):
+        path = tmp_path / "minified.js"
+        path.write_text("x" * 50 + "\nshort\n")
+
+        part = read_range(str(path), start_line=1, max_bytes=20)
+
+        assert part.text == "x" * 20
+        assert (part.end, part.start_line, part.end_line, part.truncated) == (20, 1, 0, True)
+
+    def test_large_files_use_mmap_and_the_line_index(self, text_file):
+        """Pages deep into a memory-mapped file match a plain read."""
+        with patch.object(file_reader, "READ_FILE_MMAP_THRESHOLD", 1024):
+            part = read_range(text_file, start_line=4000, end_line=4001)
+            again = read_range(text_file, start_line=4999)
+
+        assert part.text == "line 4000\nline 4001\n"
+        assert again.text == "line 4999\nline 5000\n"
+
+    def test_binary_files_are_not_decoded(self, tmp_path):
+        path = tmp_path / "image.png"
+        path.write_bytes(b"\x89PNG\r\n\x1a\n\0\0\0")
+
+        part = read_range(str(path))
+
+        assert part.binary
+        assert part.text == ""
+
+    def test_line_and_byte_ranges_are_exclusive(self, text_file):
+        with pytest.raises(ValueError):
+            read_range(text_file, start_line=1, offset=0)
+
+
+class TestReadFileContent:
+    """Tests for filesystem_resolver.read_file_content."""
+
+    def test_truncation_tells_how_to_continue(self, tmp_path, monkeypatch):
+        (tmp_path / "big.txt").write_text(numbered_lines(100))
+        monkeypatch.setenv("REPO_PATH2", str(tmp_path))
+
+        content = filesystem_resolver.read_file_content("big.txt", max_bytes=14)
+
+        assert content == "line 1\nline 2\n[Truncated: showing bytes 0-14 of a 792 bytes file. Continue with offset=14]"
+        assert filesystem_resolver.read_file_content("big.txt", start_line=100) == "line 100\n"
+
+    def test_a_line_cut_in_the_middle_continues_by_bytes(self, tmp_path, monkeypatch):
+        (tmp_path / "minified.js").write_text("x" * 50 + "\nshort\n")
+        monkeypatch.setenv("REPO_PATH2", str(tmp_path))
+
+        content = filesystem_resolver.read_file_content("minified.js", start_line=1, max_bytes=20)
+
+        assert content == "x" * 20 + "\n[Truncated: showing bytes 0-20 (part of line 1) of a 57 bytes file. Continue with offset=20]"
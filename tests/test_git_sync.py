@@ -0,0 +1,158 @@
+"""
+Tests for the async git sync and the index listeners.
+"""
+
+import asyncio
+import subprocess
+
+import pytest
+
+from buildgentic.code_operations import filesystem_resolver, git_sync as git_sync_module
+from buildgentic.code_operations.file_index import FileIndex
+from buildgentic.code_operations.git_sync import GitSyncResult, git_clone, git_sync, subscribe, unsubscribe
+from buildgentic.code_operations.symbol_index import SymbolIndex
+
+
+def git(repo, *args):
+    result = subprocess.run(["git", *args], cwd=repo, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    return result.stdout.decode().strip()
+
+
+def commit(repo, files, message):
+    for name, content in files.items():
+        path = repo / name
+        if content is None:
+            path.unlink()
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+    git(repo, "add", "-A")
+    git(repo, "commit", "-q", "-m", message)
+    return git(repo, "rev-parse", "HEAD")
+
+
+@pytest.fixture
+def upstream(tmp_path):
+    repo = tmp_path / "upstream"
+    repo.mkdir()
+    git(repo, "init", "-q", "-b", "main")
+    git(repo, "config", "user.email", "dev@example.com")
+    git(repo, "config", "user.name", "dev")
+    commit(repo, {"app/a.py": "def a():\n    pass\n", "app/b.py": "def b():\n    a()\n"}, "initial")
+    return repo
+
+
+@pytest.fixture
+def checkout(upstream, tmp_path):
+    path = tmp_path / "checkout"
+    asyncio.run(git_clone(str(upstream), str(path)))
+    return path
+
+
+@pytest.fixture
+def listener():
+    results = []
+    subscribe(results.append)
+    yield results
+    unsubscribe(results.append)
+
+
+class TestGitSync:
+    """Tests for git_sync."""
+
+    def test_reports_heads_and_changed_files(self, upstream, checkout, listener):
+        old_head = git(checkout, "rev-parse", "HEAD")
+        new_head = commit(upstream, {"app/a.py": None, "app/c.py": "x = 1\n", "app/b.py": "def b():\n    pass\n"}, "change")
+
+        result = asyncio.run(git_sync(str(checkout)))
+
+        assert (result.old_head, result.new_head) == (old_head, new_head)
+        assert sorted(result.changed_files) == [("A", "app/c.py"), ("D", "app/a.py"), ("M", "app/b.py")]
+        assert listener == [result]
+
+    def test_no_changes(self, checkout, listener):
+        result = asyncio.run(git_sync(str(checkout)))
+
+        assert not result.changed
+        assert result.changed_files == []
+        assert listener == []
+
+    def test_shallow_clone(self, upstream, tmp_path):
+        commit(upstream, {"app/c.py": "x = 1\n"}, "second")
+        path = tmp_path / "shallow"
+
+        head = asyncio.run(git_clone(f"file://{upstream}", str(path), depth=1))
+
+        assert head == git(upstream, "rev-parse", "HEAD")
+        assert git(path, "rev-list", "--count", "HEAD") == "1"
+
+    def test_failing_listener_does_not_stop_the_others(self, listener):
+        def broken(result):
+            raise RuntimeError("boom")
+
+        subscribe(broken)
+        try:
+            result = GitSyncResult("/repo", "a", "b", [], "")
+            git_sync_module.notify(result)
+        finally:
+            unsubscribe(broken)
+        assert listener == [result]
+
+
+class TestIndexListeners:
+    """The indexes only process the files of the sync."""
+
+    def test_symbol_index_parses_only_changed_files(self, upstream, checkout, monkeypatch):
+        index = SymbolIndex(FileIndex(str(checkout), cache_dir=None), cache_dir=None)
+        index.update(force=True)
+        calls = []
+        update = index.update
+
+        def recording_update(force=False, paths=None):
+            calls.append(paths)
+            return update(force, paths)
+
+        monkeypatch.setattr(index, "update", recording_update)
+        subscribe(index.file_index.on_sync)
+        subscribe(index.on_sync)
+        try:
+            commit(upstream, {"app/a.py": None, "app/c.py": "def c():\n    b()\n"}, "change")
+            asyncio.run(git_sync(str(checkout)))
+        finally:
+            unsubscribe(index.on_sync)
+            unsubscribe(index.file_index.on_sync)
+
+        assert sorted(calls[0]) == ["app/a.py", "app/c.py"]
+        assert index.definitions("a") == []
+        assert [symbol.scope for symbol in index.callers("b")] == ["c"]
+
+
+class TestGitPull:
+    """Tests for filesystem_resolver.git_pull."""
+
+    def test_report(self, upstream, checkout, monkeypatch):
+        monkeypatch.setenv("REPO_PATH2", str(checkout))
+        commit(upstream, {"app/c.py": "x = 1\n"}, "change")
+
+        report = filesystem_resolver.git_pull()
+
+        assert report.splitlines()[0].endswith(": 1 files changed")
+        assert report.splitlines()[1] == "A\tapp/c.py"
+        assert filesystem_resolver.git_pull().startswith("Already up to date at ")
+
+    def test_error(self, tmp_path, monkeypatch):
+        repo = tmp_path / "local"
+        repo.mkdir()
+        git(repo, "init", "-q")
+        monkeypatch.setenv("REPO_PATH2", str(repo))
+
+        assert filesystem_resolver.git_pull().startswith("Error occurred while running git pull")
+
+    def test_refused_inside_an_event_loop(self, checkout, monkeypatch):
+        monkeypatch.setenv("REPO_PATH2", str(checkout))
+
+        async def pull_from_the_loop():
+            filesystem_resolver.git_pull()
+
+        with pytest.raises(RuntimeError, match="git_pull_async"):
+            asyncio.run(pull_from_the_loop())
@@ -0,0 +1,267 @@
+"""
+Tests for the event-driven ticket intake: routing, durable queue, dispatcher and replay tool.
+"""
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+from a2a.types import Task, TaskState, TaskStatus
+
+from buildgentic import intake
+from buildgentic.intake import TicketDispatcher, TicketEventQueue, build_message, replay, route_event
+from buildgentic.tools.tools_azureDevOps import AZURE_DEVOPS_PROJECT, AZURE_DEVOPS_USER_EMAIL
+
+
+def work_item_event(work_item_id=7, event_type="workitem.updated", assigned_to=AZURE_DEVOPS_USER_EMAIL, changed_by="Ana <ana@company.com>",
+                    work_item_type="Bug", tags="", event_id=None):
+    """Service hook payload shaped like the ones Azure DevOps posts."""
+    fields = {
+        "System.TeamProject": AZURE_DEVOPS_PROJECT,
+        "System.WorkItemType": work_item_type,
+        "System.Title": "Login fails",
+        "System.State": "New",
+        "System.AssignedTo": f"Agents <{assigned_to}>",
+        "System.ChangedBy": changed_by,
+        "System.Tags": tags,
+    }
+    if event_type == "workitem.updated":
+        resource = {"id": 3, "workItemId": work_item_id, "fields": {"System.State": {"oldValue": "New", "newValue": "Active"}},
+                    "revision": {"id": work_item_id, "fields": fields}}
+    else:
+        resource = {"id": work_item_id, "fields": fields}
+    return {"id": event_id or f"event-{work_item_id}-{time.monotonic_ns()}", "eventType": event_type, "resource": resource}
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = TicketEventQueue(str(tmp_path / "events.db"), max_attempts=2, retry_delay=0)
+    yield queue
+    queue.close()
+
+
+class TestRouteEvent:
+    """Tests for route_event."""
+
+    def test_tickets_of_the_agents_go_to_the_default_agent(self):
+        assert route_event(work_item_event(), routes=[]) == ("manager", "default agent")
+        assert route_event(work_item_event(event_type="workitem.commented"), routes=[])[0] == "manager"
+
+    def test_routes_match_the_work_item_type_or_a_tag(self):
+        routes = intake.parse_routes("security=compliance; Bug=qa")
+
+        assert route_event(work_item_event(), routes=routes)[0] == "qa"
+        assert route_event(work_item_event(tags="Security; backend"), routes=routes)[0] == "compliance"
+        assert route_event(work_item_event(work_item_type="Task"), routes=routes)[0] == "manager"
+
+    def test_other_events_are_ignored(self):
+        assert route_event(work_item_event(assigned_to="someone@company.com"), routes=[])[0] is None
+        assert route_event(work_item_event(event_type="workitem.deleted"), routes=[])[0] is None
+        assert route_event(work_item_event(work_item_type="Test Case"), routes=[])[0] is None
+
+    def test_changes_made_by_the_agents_are_ignored(self):
+        event = work_item_event(changed_by={"displayName": "Agents", "uniqueName": AZURE_DEVOPS_USER_EMAIL.upper()})
+
+        assert route_event(event, routes=[]) == (None, "change made by the agents")
+
+    def test_invalid_routes_are_refused(self):
+        with pytest.raises(ValueError):
+            intake.parse_routes("qa")
+
+
+class TestTicketEventQueue:
+    """Tests for TicketEventQueue."""
+
+    def test_redelivered_events_are_queued_once(self, queue):
+        event = work_item_event(event_id="abc")
+
+        assert queue.enqueue(event, "manager") is not None
+        assert queue.enqueue(event, "manager") is None
+        assert queue.stats()["pending"] == 1
+
+    def test_redeliveries_of_merged_events_are_dropped(self, queue):
+        merged = work_item_event(event_type="workitem.commented", event_id="second")
+        queue.enqueue(work_item_event(event_id="first"), "manager")
+        queue.enqueue(merged, "manager")
+
+        assert queue.enqueue(merged, "manager") is None
+        assert queue.stats()["coalesced"] == 1
+
+    def test_events_of_a_waiting_work_item_are_merged(self, queue):
+        first = queue.enqueue(work_item_event(), "manager")
+        second = queue.enqueue(work_item_event(event_type="workitem.commented"), "manager")
+
+        assert first == second
+        claimed = queue.claim()
+        assert claimed.event_type == "workitem.commented"
+        assert queue.claim() is None
+        assert queue.stats()["coalesced"] == 1
+
+    def test_events_survive_a_restart(self, tmp_path):
+        path = str(tmp_path / "events.db")
+        queue = TicketEventQueue(path)
+        queue.enqueue(work_item_event(7), "manager")
+        queue.close()
+
+        reopened = TicketEventQueue(path)
+        assert reopened.claim().work_item_id == 7
+        reopened.close()
+
+    def test_a_work_item_runs_one_event_at_a_time(self, queue):
+        queue.enqueue(work_item_event(7), "manager")
+        running = queue.claim()
+        queue.enqueue(work_item_event(7), "manager")
+        queue.enqueue(work_item_event(8), "manager")
+
+        assert queue.claim().work_item_id == 8
+        assert queue.claim() is None
+        queue.complete(running)
+        assert queue.claim().work_item_id == 7
+
+    def test_failed_deliveries_are_retried_then_given_up(self, queue):
+        queue.enqueue(work_item_event(), "manager")
+
+        queue.retry(queue.claim(), "ConnectError")
+        assert queue.stats()["pending"] == 1
+        queue.retry(queue.claim(), "ConnectError")
+        assert queue.stats()["failed"] == 1 and queue.claim() is None
+
+    def test_events_of_a_dead_worker_are_handed_out_again(self, tmp_path):
+        queue = TicketEventQueue(str(tmp_path / "events.db"), lease_seconds=0)
+        queue.enqueue(work_item_event(), "manager")
+
+        assert queue.claim() is not None
+        assert queue.claim().attempts == 2
+        queue.close()
+
+
+class TestTicketDispatcher:
+    """Tests for TicketDispatcher."""
+
+    def run(self, queue, send, events, wait_for, poll_interval=60):
+        async def run():
+            dispatcher = TicketDispatcher(queue, send=send, poll_interval=poll_interval)
+            dispatcher.start()
+            for event, agent in events:
+                queue.enqueue(event, agent)
+                dispatcher.notify()
+            start = time.perf_counter()
+            while not wait_for() and time.perf_counter() - start < 5:
+                await asyncio.sleep(0.01)
+            elapsed = time.perf_counter() - start
+            await dispatcher.stop()
+            return elapsed
+
+        return asyncio.run(run())
+
+    def test_notified_events_are_sent_at_once(self, queue):
+        sent = []
+
+        async def send(agent, message):
+            sent.append((agent, message))
+            return Task(id="t", context_id=message.context_id, status=TaskStatus(state=TaskState.completed))
+
+        elapsed = self.run(queue, send, [(work_item_event(7), "qa")], lambda: queue.stats()["done"] == 1)
+
+        assert elapsed < 1
+        agent, message = sent[0]
+        assert agent == "qa" and message.context_id == "work-item-7"
+        assert message.metadata["priority"] == "low"
+        assert "#7" in message.parts[0].root.text and "System.State" in message.parts[0].root.text
+
+    def test_failed_tasks_are_not_retried(self, queue):
+        async def send(agent, message):
+            return Task(id="t", context_id=message.context_id, status=TaskStatus(state=TaskState.failed))
+
+        self.run(queue, send, [(work_item_event(), "qa")], lambda: queue.stats()["failed"] == 1)
+
+        assert queue.stats()["failed"] == 1 and queue.stats()["pending"] == 0
+
+    def test_transport_errors_are_retried(self, queue):
+        calls = []
+
+        async def send(agent, message):
+            calls.append(agent)
+            if len(calls) == 1:
+                raise httpx.ConnectError("refused")
+            return None
+
+        self.run(queue, send, [(work_item_event(), "qa")], lambda: queue.stats()["done"] == 1, poll_interval=0.01)
+
+        assert calls == ["qa", "qa"]
+
+    def test_interrupted_deliveries_go_back_to_the_queue(self, queue):
+        started = []
+
+        async def send(agent, message):
+            started.append(agent)
+            await asyncio.sleep(60)
+
+        self.run(queue, send, [(work_item_event(), "qa")], lambda: bool(started))
+
+        assert queue.stats()["pending"] == 1
+        assert queue.claim().attempts == 1
+
+    def test_long_turns_keep_their_event(self, tmp_path):
+        queue = TicketEventQueue(str(tmp_path / "events.db"), lease_seconds=0.2)
+        reclaimed = []
+
+        async def send(agent, message):
+            await asyncio.sleep(0.6)
+            reclaimed.append(queue.claim())
+            return None
+
+        self.run(queue, send, [(work_item_event(), "qa")], lambda: queue.stats()["done"] == 1)
+
+        assert reclaimed == [None]
+        assert queue.stats()["done"] == 1
+        queue.close()
+
+    def test_stop_does_not_wait_for_turns_that_do_not_end(self, queue, monkeypatch):
+        monkeypatch.setattr(intake, "_STOP_TIMEOUT_SECONDS", 0.1)
+        started = []
+
+        async def send(agent, message):
+            started.append(agent)
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                await asyncio.sleep(60)
+
+        start = time.perf_counter()
+        self.run(queue, send, [(work_item_event(), "qa")], lambda: bool(started))
+
+        assert time.perf_counter() - start < 2
+        assert queue.claim().attempts == 1
+
+
+class TestReplay:
+    """Tests for the replay tool."""
+
+    def test_recorded_events_are_posted_in_order(self, tmp_path):
+        first, second, third = work_item_event(1), work_item_event(2), work_item_event(3)
+        (tmp_path / "one.json").write_text(json.dumps(first))
+        (tmp_path / "more.jsonl").write_text(json.dumps(second) + "\n\n" + json.dumps(third) + "\n")
+        posted = []
+
+        def handler(request):
+            posted.append((request.headers.get(intake.SECRET_HEADER), json.loads(request.content)["resource"]))
+            return httpx.Response(200, json={"queued": len(posted)})
+
+        client = httpx.Client(transport=httpx.MockTransport(handler))
+        responses = replay([str(tmp_path / "one.json"), str(tmp_path / "more.jsonl")], "http://server/a2a/hooks/azure-devops", secret="s3cret", client=client)
+
+        assert responses == [{"queued": 1}, {"queued": 2}, {"queued": 3}]
+        assert [secret for secret, _ in posted] == ["s3cret"] * 3
+        assert [resource["workItemId"] for _, resource in posted] == [1, 2, 3]
+
+    def test_exported_events_can_be_replayed(self, queue, tmp_path, capsys):
+        queue.enqueue(work_item_event(5, event_type="workitem.created"), "manager")
+
+        intake.main(["export", "--path", str(tmp_path / "events.db")])
+
+        exported = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert [event["resource"]["id"] for event in exported] == [5]
+        assert build_message(queue.claim()).parts[0].root.text.startswith("Work item #5 (Bug 'Login fails', state New) was created")
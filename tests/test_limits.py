@@ -0,0 +1,243 @@
+"""
+Tests for the concurrency limits of the agents: admission, priority lanes and HTTP 429 backpressure.
+"""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+from a2a.server.agent_execution import AgentExecutor
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import InMemoryTaskStore, TaskUpdater
+from a2a.types import AgentCapabilities, AgentCard, Task, TaskState, TaskStatus
+from a2a.utils import new_task
+from fastapi import FastAPI
+
+from buildgentic.a2a_utils import A2AFastApiApp, LazyRequestHandler, SlotHoldingExecutor
+from buildgentic.limits import PRIORITY_HEADER, AgentBusyError, AgentLimiter, parse_limits
+
+
+def send(text="hi", metadata=None):
+    params = {"message": {"messageId": "m", "role": "user", "parts": [{"kind": "text", "text": text}]}}
+    if metadata:
+        params["metadata"] = metadata
+    return {"jsonrpc": "2.0", "id": 1, "method": "message/send", "params": params}
+
+
+class BlockingHandler:
+    """Request handler whose messages run until release is set."""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.started = []
+
+    async def on_message_send(self, params, context=None):
+        self.started.append(params.message.parts[0].root.text)
+        await self.release.wait()
+        return Task(id="t", context_id="c", status=TaskStatus(state=TaskState.completed))
+
+    async def on_get_task(self, params, context=None):
+        return Task(id=params.id, context_id="c", status=TaskStatus(state=TaskState.working))
+
+
+class WaitingExecutor(AgentExecutor):
+    """Agent executor whose tasks run until finish is set."""
+
+    def __init__(self):
+        self.finish = asyncio.Event()
+
+    async def execute(self, context, event_queue):
+        await event_queue.enqueue_event(new_task(context.message))
+        await self.finish.wait()
+        await TaskUpdater(event_queue, context.task_id, context.context_id).complete()
+
+    async def cancel(self, context, event_queue):
+        raise NotImplementedError
+
+
+def agent_app(handler, limiter):
+    card = AgentCard(
+        name="Test Agent",
+        description="Test agent",
+        url="http://localhost/qa/",
+        version="1.0",
+        capabilities=AgentCapabilities(streaming=True),
+        default_input_modes=["text/plain"],
+        default_output_modes=["text/plain"],
+        skills=[],
+    )
+    app = FastAPI()
+    A2AFastApiApp(fastapi_app=app, agent_card=card, http_handler=handler, limiter=limiter).build(rpc_url="/qa/")
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://localhost")
+
+
+class TestAgentLimiter:
+    """Tests for AgentLimiter."""
+
+    def test_queues_by_priority_then_refuses(self):
+        limiter = AgentLimiter("qa", max_in_flight=1, queue_size=2, retry_after=7)
+        order = []
+
+        async def task(name, priority):
+            async with limiter.slot(priority):
+                order.append(name)
+                await asyncio.sleep(0)
+
+        async def run():
+            await limiter.acquire()
+            waiting = [asyncio.create_task(task("normal", "normal")), asyncio.create_task(task("high", "high"))]
+            await asyncio.sleep(0)
+            assert limiter.stats()["queue_depth"] == 2
+            with pytest.raises(AgentBusyError) as busy:
+                await limiter.acquire("low")
+            limiter.release()
+            await asyncio.gather(*waiting)
+            return busy.value
+
+        busy = asyncio.run(run())
+
+        assert order == ["high", "normal"]
+        assert busy.retry_after == 7
+        assert limiter.stats() == {"in_flight": 0, "queue_depth": 0, "max_in_flight": 1, "queue_size": 2, "admitted": 3, "rejected": 1}
+
+    def test_unbounded_calls_wait_past_the_queue_size(self):
+        limiter = AgentLimiter("qa", max_in_flight=1, queue_size=0)
+
+        async def run():
+            await limiter.acquire()
+            waiter = asyncio.create_task(limiter.acquire("high", bounded=False))
+            await asyncio.sleep(0)
+            assert limiter.queue_depth == 1
+            limiter.release()
+            await waiter
+            limiter.release()
+
+        asyncio.run(run())
+
+        assert limiter.in_flight == 0
+
+    def test_cancelled_waiters_leave_the_queue(self):
+        limiter = AgentLimiter("qa", max_in_flight=1, queue_size=4)
+
+        async def run():
+            await limiter.acquire()
+            waiter = asyncio.create_task(limiter.acquire())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+            assert limiter.queue_depth == 0
+            limiter.release()
+
+        asyncio.run(run())
+
+        assert limiter.in_flight == 0
+
+    def test_parse_limits(self):
+        assert parse_limits("developer=2:8; manager=8") == {"developer": (2, 8), "manager": (8, 16)}
+        with pytest.raises(ValueError):
+            parse_limits("developer=two")
+
+
+class TestHttpBackpressure:
+    """A2AFastApiApp admits messages through the limiter of the agent."""
+
+    def test_refuses_with_429_when_the_queue_is_full(self):
+        handler = BlockingHandler()
+        limiter = AgentLimiter("qa", max_in_flight=1, queue_size=1, retry_after=3)
+
+        async def run():
+            async with agent_app(handler, limiter) as client:
+                first = asyncio.create_task(client.post("/qa/", json=send("first")))
+                while not handler.started:
+                    await asyncio.sleep(0.01)
+                queued = asyncio.create_task(client.post("/qa/", json=send("queued")))
+                while not limiter.queue_depth:
+                    await asyncio.sleep(0.01)
+                refused = await client.post("/qa/", json=send("refused"))
+                # Reading a task is not limited
+                task = await client.post("/qa/", json={"jsonrpc": "2.0", "id": 2, "method": "tasks/get", "params": {"id": "t"}})
+                handler.release.set()
+                return refused, task, await first, await queued
+
+        refused, task, first, queued = asyncio.run(run())
+
+        assert refused.status_code == 429
+        assert refused.headers["Retry-After"] == "3"
+        assert refused.json()["error"]["message"] == "Agent 'qa' is busy, retry after 3 seconds"
+        assert task.json()["result"]["id"] == "t"
+        assert first.status_code == queued.status_code == 200
+        assert handler.started == ["first", "queued"]
+        assert limiter.stats()["in_flight"] == 0
+
+    def test_priority_lanes(self):
+        handler = BlockingHandler()
+        limiter = AgentLimiter("qa", max_in_flight=1, queue_size=4)
+
+        async def run():
+            async with agent_app(handler, limiter) as client:
+                requests = [asyncio.create_task(client.post("/qa/", json=send("first")))]
+                while not handler.started:
+                    await asyncio.sleep(0.01)
+                requests.append(asyncio.create_task(client.post("/qa/", json=send("low", {"priority": "low"}))))
+                requests.append(asyncio.create_task(client.post("/qa/", json=send("normal"))))
+                requests.append(asyncio.create_task(client.post("/qa/", json=send("high"), headers={PRIORITY_HEADER: "high"})))
+                while limiter.queue_depth < 3:
+                    await asyncio.sleep(0.01)
+                handler.release.set()
+                await asyncio.gather(*requests)
+
+        asyncio.run(run())
+
+        assert handler.started == ["first", "high", "normal", "low"]
+
+
+class TestInProcessLimits:
+    """Messages from agents of this process take a slot without going through HTTP."""
+
+    def test_in_process_messages_take_a_slot(self):
+        limiter = AgentLimiter("qa", max_in_flight=1, queue_size=0)
+        inner = BlockingHandler()
+        handler = LazyRequestHandler("qa", lambda: inner, limiter=limiter)
+        in_process = MagicMock(state={"transport": "in-process"})
+        params = MagicMock()
+        params.message.parts[0].root.text = "delegated"
+
+        async def run():
+            await limiter.acquire()
+            # Never refused, even with a full queue: it waits for the slot
+            delegated = asyncio.create_task(handler.on_message_send(params, in_process))
+            await asyncio.sleep(0)
+            assert limiter.queue_depth == 1 and not inner.started
+            limiter.release()
+            while not inner.started:
+                await asyncio.sleep(0.01)
+            assert limiter.in_flight == 1
+            inner.release.set()
+            await delegated
+
+        asyncio.run(run())
+
+        assert limiter.in_flight == 0
+
+    def test_non_blocking_messages_keep_their_slot_until_the_task_ends(self):
+        executor = WaitingExecutor()
+        handler = DefaultRequestHandler(agent_executor=SlotHoldingExecutor(executor), task_store=InMemoryTaskStore())
+        limiter = AgentLimiter("qa", max_in_flight=1, queue_size=0)
+        request = send("background")
+        request["params"]["configuration"] = {"blocking": False}
+
+        async def run():
+            async with agent_app(handler, limiter) as client:
+                response = await client.post("/qa/", json=request)
+                assert response.json()["result"]["status"]["state"] == "submitted"
+                # The task still runs after the response: its slot is taken
+                assert limiter.in_flight == 1
+                executor.finish.set()
+                while limiter.in_flight:
+                    await asyncio.sleep(0.01)
+
+        asyncio.run(asyncio.wait_for(run(), 10))
+
+        assert limiter.stats()["admitted"] == 1
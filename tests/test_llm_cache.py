@@ -0,0 +1,130 @@
+"""
+Tests for the LLM response cache and the caching model wrapper of the agents.
+"""
+
+import asyncio
+import time
+
+import pytest
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.lite_llm import LiteLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from buildgentic.llm import CachingLlm, get_llm, request_key
+from buildgentic.storage.response_cache import ResponseCache
+
+
+class FakeLlm(BaseLlm):
+    """Model answering with a numbered text, streamed in two chunks when asked."""
+
+    calls: int = 0
+    error: bool = False
+
+    async def generate_content_async(self, llm_request, stream=False):
+        self.calls += 1
+        text = f"answer {self.calls}"
+        if self.error:
+            yield LlmResponse(error_code="RATE_LIMIT", error_message="Too many requests")
+            return
+        if stream:
+            yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text[:3])]), partial=True)
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]))
+
+
+def request(text="triage ticket 42", instruction="You are the manager"):
+    return LlmRequest(
+        model="openai/gpt-4o",
+        contents=[types.Content(role="user", parts=[types.Part(text=text)])],
+        config=types.GenerateContentConfig(system_instruction=instruction),
+    )
+
+
+def texts(llm, llm_request, stream=False):
+    async def run():
+        return [response.content.parts[0].text async for response in llm.generate_content_async(llm_request, stream)]
+
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / "llm_cache.db"), ttl=3600, max_bytes=0)
+    yield cache
+    cache.close()
+
+
+class TestCachingLlm:
+    """Tests for CachingLlm."""
+
+    def test_identical_requests_are_served_from_the_cache(self, cache):
+        inner = FakeLlm(model="openai/gpt-4o")
+        llm = CachingLlm(model="openai/gpt-4o", llm=inner, agent_name="manager", cache=cache)
+
+        assert texts(llm, request()) == ["answer 1"]
+        assert texts(llm, request()) == ["answer 1"]
+        assert texts(llm, request(instruction="You are QA")) == ["answer 2"]
+
+        assert inner.calls == 2
+        assert cache.stats()["agents"] == {"manager": {"hits": 1, "misses": 2, "hit_rate": 0.3333}}
+
+    def test_streams_cache_the_complete_response(self, cache):
+        inner = FakeLlm(model="openai/gpt-4o")
+        llm = CachingLlm(model="openai/gpt-4o", llm=inner, agent_name="qa", cache=cache)
+
+        assert texts(llm, request(), stream=True) == ["ans", "answer 1"]
+        assert texts(llm, request(), stream=True) == ["answer 1"]
+        assert inner.calls == 1
+
+    def test_errors_are_not_cached(self, cache):
+        inner = FakeLlm(model="openai/gpt-4o", error=True)
+        llm = CachingLlm(model="openai/gpt-4o", llm=inner, agent_name="qa", cache=cache)
+
+        async def run():
+            return [response async for response in llm.generate_content_async(request())]
+
+        asyncio.run(run())
+        asyncio.run(run())
+
+        assert inner.calls == 2
+        assert cache.stats()["entries"] == 0
+
+    def test_key_covers_the_tools(self):
+        with_tool = request()
+        with_tool.tools_dict["get_work_item_details"] = object()
+
+        assert request_key("openai/gpt-4o", request()) == request_key("openai/gpt-4o", request())
+        assert request_key("openai/gpt-4o", request()) != request_key("openai/gpt-4o", with_tool)
+        assert request_key("openai/gpt-4o", request()) != request_key("openai/gpt-4o", request("triage ticket 43"))
+
+
+class TestGetLlm:
+    """Agents opt in to the cache."""
+
+    def test_opt_in(self):
+        assert isinstance(get_llm("openai/gpt-4o", "manager", cache_agents={"manager"}), CachingLlm)
+        assert isinstance(get_llm("openai/gpt-4o", "developer", cache_agents={"manager"}), LiteLlm)
+
+
+class TestResponseCache:
+    """Tests for ResponseCache."""
+
+    def test_expired_entries_are_not_served(self, cache):
+        cache.put("key", "response")
+        cache.ttl = 0.05
+        time.sleep(0.1)
+
+        assert cache.get("key") is None
+        assert cache.stats()["entries"] == 0
+
+    def test_least_recently_used_entries_are_evicted(self, cache):
+        cache.max_bytes = 20
+        cache.put("a", "x" * 10)
+        cache.put("b", "y" * 10)
+        cache.get("a")
+        cache.put("c", "z" * 10)
+
+        assert cache.get("a") == "x" * 10
+        assert cache.get("b") is None
+        assert cache.get("c") == "z" * 10
@@ -0,0 +1,144 @@
+"""
+Tests for the ast based Python summaries and their cache.
+"""
+
+import os
+import textwrap
+from unittest.mock import patch
+
+import pytest
+
+from buildgentic.code_operations import file_index, filesystem_resolver, python_summary
+from buildgentic.code_operations.git_sync import unsubscribe
+from buildgentic.code_operations.python_summary import PythonSummaryCache, summarize_source
+
+
+SOURCE = textwrap.dedent('''
+    """Work item helpers."""
+
+    class Client(Base, metaclass=Meta):
+        """Azure DevOps client.
+
+        More details.
+        """
+
+        @staticmethod
+        def build(url: str, retries: int = 3) -> "Client":
+            """Create a client."""
+
+            def helper(*args, **kwargs):
+                pass
+
+        async def fetch(self, work_item_id):
+            pass
+
+    def main():
+        pass
+''')
+
+
+def write(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+    return str(path)
+
+
+class TestSummarizeSource:
+    """Tests for summarize_source."""
+
+    def test_outline(self):
+        """Classes, decorators, signatures, nested functions and first docstring lines are listed."""
+        assert summarize_source(SOURCE).splitlines() == [
+            "Module: Work item helpers.",
+            "Class: Client(Base, metaclass=Meta)",
+            "    Documentation: Azure DevOps client.",
+            "    @staticmethod",
+            "    Method: build(url: str, retries: int=3) -> 'Client'",
+            "        Documentation: Create a client.",
+            "        Function: helper(*args, **kwargs)",
+            "    Method: async fetch(self, work_item_id)",
+            "Function: main()",
+        ]
+
+    def test_syntax_error(self):
+        assert summarize_source("def broken(:", "broken.py").startswith("Could not parse broken.py")
+
+
+class TestPythonSummaryCache:
+    """Tests for PythonSummaryCache."""
+
+    def test_unchanged_files_are_not_parsed_again(self, tmp_path):
+        """Summaries are reused until the file mtime or size changes, also after a restart."""
+        db_path = str(tmp_path / "summaries.db")
+        path = write(tmp_path / "src" / "a.py", "def first():\n    pass\n")
+        PythonSummaryCache(db_path).summarize(path)
+
+        cache = PythonSummaryCache(db_path)
+        with patch.object(python_summary, "_summarize_path", wraps=python_summary._summarize_path) as mock_parse:
+            assert cache.summarize(path) == "Function: first()"
+            assert mock_parse.call_count == 0
+
+            write(tmp_path / "src" / "a.py", "def second(x):\n    pass\n")
+            os.utime(path, ns=(1, 1))
+            assert cache.summarize(path) == "Function: second(x)"
+            assert mock_parse.call_count == 1
+
+    def test_many_files_use_the_process_pool(self, tmp_path):
+        """Above the threshold the files are parsed in worker processes."""
+        paths = [write(tmp_path / f"m{i}.py", f"def f{i}():\n    pass\n") for i in range(4)]
+        cache = PythonSummaryCache(":memory:", workers=2, pool_threshold=2)
+
+        summaries = cache.summarize_many(paths)
+
+        assert list(summaries.values()) == [f"Function: f{i}()" for i in range(4)]
+
+    def test_process_pool_is_started_once(self, tmp_path):
+        """Every parse above the threshold reuses the same worker processes."""
+        paths = [write(tmp_path / f"m{i}.py", f"def f{i}():\n    pass\n") for i in range(4)]
+
+        PythonSummaryCache(":memory:", workers=2, pool_threshold=2).summarize_many(paths)
+        pool = python_summary._pool
+        PythonSummaryCache(":memory:", workers=2, pool_threshold=2).summarize_many(paths)
+
+        assert pool is not None and python_summary._pool is pool
+
+    def test_deleted_files_are_left_out(self, tmp_path):
+        """Files missing before or deleted while the summaries are parsed do not fail the others."""
+        kept, deleted = write(tmp_path / "kept.py", "def kept():\n    pass\n"), write(tmp_path / "deleted.py", "")
+        cache = PythonSummaryCache(":memory:")
+        parse = cache._parse
+
+        def parse_after_a_delete(paths):
+            os.remove(deleted)
+            return parse(paths)
+
+        with patch.object(cache, "_parse", side_effect=parse_after_a_delete):
+            summaries = cache.summarize_many([str(tmp_path / "missing.py"), deleted, kept])
+
+        assert summaries == {kept: "Function: kept()"}
+        with pytest.raises(FileNotFoundError):
+            cache.summarize(deleted)
+
+
+@pytest.fixture
+def shared_file_index(tmp_path, monkeypatch):
+    """Process-wide file indexes stored in tmp_path, unsubscribed from git_sync afterwards."""
+    monkeypatch.setattr(file_index, "FILE_INDEX_DIR", str(tmp_path / "file_index"))
+    monkeypatch.setattr(file_index, "_file_indexes", {})
+    yield
+    for index in file_index._file_indexes.values():
+        unsubscribe(index.on_sync)
+
+
+class TestSummarizePythonDirectory:
+    """Tests for filesystem_resolver.summarize_python_directory."""
+
+    def test_outline_of_a_directory(self, tmp_path, shared_file_index, monkeypatch):
+        write(tmp_path / "repo" / "pkg" / "a.py", "class A:\n    pass\n")
+        write(tmp_path / "repo" / "pkg" / "b.py", "")
+        write(tmp_path / "repo" / "pkg" / "notes.txt", "")
+        monkeypatch.setenv("REPO_PATH2", str(tmp_path / "repo"))
+        monkeypatch.setattr(python_summary, "_summary_cache", PythonSummaryCache(":memory:"))
+
+        assert filesystem_resolver.summarize_python_directory("pkg") == "## pkg/a.py\nClass: A\n\n## pkg/b.py"
+        assert filesystem_resolver.summarize_python_file("/pkg/a.py") == "Class: A"
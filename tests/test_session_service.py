@@ -0,0 +1,92 @@
+"""
+Tests for the persistent, compacted session service.
+"""
+
+import asyncio
+import time
+
+from google.adk.events.event import Event
+from google.adk.events.event_actions import EventActions, EventCompaction
+from google.genai import types
+
+from buildgentic.storage.session_service import CompactingSqliteSessionService, get_compaction_config
+
+
+def text_event(text, timestamp, author="user"):
+    return Event(author=author, invocation_id="inv", timestamp=timestamp, content=types.Content(role="user", parts=[types.Part(text=text)]))
+
+
+def call_event(call_id, timestamp):
+    part = types.Part(function_call=types.FunctionCall(id=call_id, name="get_work_item_details", args={"work_item_id": 1}))
+    return Event(author="manager", invocation_id="inv", timestamp=timestamp, content=types.Content(role="model", parts=[part]))
+
+
+def compaction_event(start, end, timestamp):
+    compaction = EventCompaction(
+        start_timestamp=start,
+        end_timestamp=end,
+        compacted_content=types.Content(role="model", parts=[types.Part(text="summary")]),
+    )
+    return Event(author="user", invocation_id="inv", timestamp=timestamp, actions=EventActions(compaction=compaction))
+
+
+async def append_all(service, events):
+    session = await service.create_session(app_name="manager", user_id="user")
+    for event in events:
+        await service.append_event(session, event)
+    return await service.get_session(app_name="manager", user_id="user", session_id=session.id)
+
+
+class TestCompactingSqliteSessionService:
+    """Tests for CompactingSqliteSessionService."""
+
+    def test_compacted_events_are_pruned(self, tmp_path):
+        """Events summarized by a compaction are not loaded again."""
+        service = CompactingSqliteSessionService(str(tmp_path / "sessions.db"))
+        now = time.time()
+        events = [text_event(f"message {i}", now + i) for i in range(5)]
+        events.append(compaction_event(now, now + 2, now + 5))
+
+        session = asyncio.run(append_all(service, events))
+
+        texts = [event.content.parts[0].text for event in session.events if event.content]
+        assert texts == ["message 3", "message 4"]
+        assert session.events[-1].actions.compaction is not None
+
+    def test_pending_function_calls_are_kept(self, tmp_path):
+        """A function call without its response survives the compaction."""
+        service = CompactingSqliteSessionService(str(tmp_path / "sessions.db"))
+        now = time.time()
+        events = [text_event("message", now), call_event("call-1", now + 1), compaction_event(now, now + 1, now + 2)]
+
+        session = asyncio.run(append_all(service, events))
+
+        assert [event.get_function_calls()[0].id for event in session.events if event.get_function_calls()] == ["call-1"]
+        assert len(session.events) == 2
+
+    def test_sessions_survive_a_restart(self, tmp_path):
+        """A new service instance reads the sessions of the previous one."""
+        path = str(tmp_path / "sessions.db")
+        session = asyncio.run(append_all(CompactingSqliteSessionService(path), [text_event("hello", time.time())]))
+
+        reloaded = asyncio.run(CompactingSqliteSessionService(path).get_session(app_name="manager", user_id="user", session_id=session.id))
+
+        assert reloaded.events[0].content.parts[0].text == "hello"
+
+    def test_retention_purges_old_sessions(self, tmp_path):
+        """Sessions not updated within the retention period are deleted."""
+        # No retention while appending: the first append may already run the periodic purge
+        service = CompactingSqliteSessionService(str(tmp_path / "sessions.db"), retention_days=0)
+        asyncio.run(append_all(service, [text_event("old", time.time() - 2 * 86400)]))
+        service.retention_days = 1
+
+        assert service.purge_expired() == 1
+
+
+class TestCompactionConfig:
+    """Tests for the compaction settings."""
+
+    def test_budget_and_retention(self):
+        config = get_compaction_config()
+        assert config.token_threshold > 0
+        assert config.event_retention_size > 0
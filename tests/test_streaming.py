@@ -0,0 +1,192 @@
+"""
+Tests for token streaming through the A2A endpoints, with a fake streaming model and a real HTTP server.
+"""
+
+import asyncio
+import json
+import socket
+import threading
+import time
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+import uvicorn
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import InMemoryTaskStore
+from a2a.types import AgentCapabilities, AgentCard, Message, Part, Role, TaskState, TaskStatus, TaskStatusUpdateEvent, TextPart
+from fastapi import FastAPI
+from google.adk import Runner
+from google.adk.a2a.executor.a2a_agent_executor import A2aAgentExecutor
+from google.adk.agents.llm_agent import Agent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_response import LlmResponse
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from buildgentic.a2a_utils import A2AFastApiApp
+from buildgentic.streaming import PARTIAL_METADATA_KEY, ChunkCoalescingExecutor, executor_config
+
+
+CHUNKS = ["The ticket ", "is ", "a ", "duplicate ", "of ", "#41."]
+FIRST_TOKEN_DELAY = 0.05
+CHUNK_DELAY = 0.15
+
+
+class FakeStreamingLlm(BaseLlm):
+    """Model streaming CHUNKS one by one, like a provider generating tokens."""
+
+    async def generate_content_async(self, llm_request, stream=False):
+        await asyncio.sleep(FIRST_TOKEN_DELAY)
+        if stream:
+            for index, chunk in enumerate(CHUNKS):
+                if index:
+                    await asyncio.sleep(CHUNK_DELAY)
+                yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=chunk)]), partial=True)
+        else:
+            await asyncio.sleep(CHUNK_DELAY * (len(CHUNKS) - 1))
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text="".join(CHUNKS))]))
+
+
+def agent_server_app(streaming=True):
+    agent = Agent(model=FakeStreamingLlm(model="fake"), name="qa", instruction="Answer")
+    runner = Runner(app_name="qa", agent=agent, session_service=InMemorySessionService())
+    executor = ChunkCoalescingExecutor(A2aAgentExecutor(runner=runner, config=executor_config(streaming)), flush_interval=0.05)
+    card = AgentCard(
+        name="QA Agent",
+        description="QA",
+        url="http://localhost/qa/",
+        version="1.0",
+        capabilities=AgentCapabilities(streaming=True),
+        default_input_modes=["text/plain"],
+        default_output_modes=["text/plain"],
+        skills=[],
+    )
+    app = FastAPI()
+    A2AFastApiApp(fastapi_app=app, agent_card=card, http_handler=DefaultRequestHandler(executor, InMemoryTaskStore())).build(rpc_url="/qa/")
+    return app
+
+
+@pytest.fixture
+def server_url():
+    """Serve the agent over real HTTP: the in-memory ASGI transport of httpx buffers whole responses."""
+    sock = socket.create_server(("127.0.0.1", 0))
+    server = uvicorn.Server(uvicorn.Config(agent_server_app(), log_level="warning"))
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    yield f"http://127.0.0.1:{sock.getsockname()[1]}"
+    server.should_exit = True
+    thread.join(5)
+
+
+def stream_request(text="Is this ticket a duplicate?"):
+    return {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "message/stream",
+        "params": {"message": {"messageId": "m1", "role": "user", "parts": [{"kind": "text", "text": text}]}},
+    }
+
+
+async def timed_events(url, payload):
+    """SSE events of a request, each with the seconds elapsed since the request was sent."""
+    events = []
+    async with httpx.AsyncClient(timeout=30) as client:
+        start = time.perf_counter()
+        async with client.stream("POST", url, json=payload) as response:
+            assert response.headers["content-type"].startswith("text/event-stream")
+            async for line in response.aiter_lines():
+                if line.startswith("data:"):
+                    events.append((time.perf_counter() - start, json.loads(line[len("data:"):])["result"]))
+    return events
+
+
+def partial_texts(events):
+    return [
+        (elapsed, event["status"]["message"]["parts"][0]["text"])
+        for elapsed, event in events
+        if (event.get("metadata") or {}).get(PARTIAL_METADATA_KEY)
+    ]
+
+
+class TestTokenStreaming:
+    """message/stream delivers the model output as it is generated."""
+
+    def test_time_to_first_token(self, server_url):
+        events = asyncio.run(timed_events(server_url + "/qa/", stream_request()))
+
+        chunks = partial_texts(events)
+        total = events[-1][0]
+        time_to_first_token = chunks[0][0]
+
+        assert "".join(text for _, text in chunks) == "".join(CHUNKS)
+        assert chunks[0][1] == CHUNKS[0]
+        # The first token arrives long before the end of the turn
+        assert time_to_first_token < total / 2
+        assert total >= CHUNK_DELAY * (len(CHUNKS) - 1)
+        # Chunks arrive spread over the turn, not all at the end
+        assert chunks[-1][0] - chunks[0][0] >= CHUNK_DELAY * (len(CHUNKS) - 2)
+        final = events[-1][1]
+        assert final["final"] is True and final["status"]["state"] == "completed"
+        artifacts = [event for _, event in events if event.get("kind") == "artifact-update"]
+        assert artifacts[-1]["artifact"]["parts"][0]["text"] == "".join(CHUNKS)
+
+
+class TestChunkCoalescing:
+    """Tests for ChunkCoalescingExecutor."""
+
+    def partial(self, text, task_id="t1"):
+        return TaskStatusUpdateEvent(
+            task_id=task_id,
+            context_id="c",
+            final=False,
+            status=TaskStatus(
+                state=TaskState.working,
+                message=Message(message_id="m", role=Role.agent, parts=[Part(root=TextPart(text=text))]),
+            ),
+            metadata={PARTIAL_METADATA_KEY: True},
+        )
+
+    def run(self, produce, flush_interval=0.05, max_chars=512):
+        queue = AsyncMock()
+
+        class Inner:
+            async def execute(self, context, event_queue):
+                await produce(event_queue)
+
+        asyncio.run(ChunkCoalescingExecutor(Inner(), flush_interval, max_chars).execute(None, queue))
+        return [event.status.message.parts[0].root.text if event.status.message else event.status.state for event in
+                (call.args[0] for call in queue.enqueue_event.call_args_list)]
+
+    def test_first_chunk_is_sent_at_once_and_the_next_ones_are_merged(self):
+        async def produce(queue):
+            for text in ["a", "b", "c", "d"]:
+                await queue.enqueue_event(self.partial(text))
+
+        assert self.run(produce) == ["a", "bcd"]
+
+    def test_held_text_is_sent_after_the_flush_interval(self):
+        async def produce(queue):
+            await queue.enqueue_event(self.partial("a"))
+            await queue.enqueue_event(self.partial("b"))
+            await asyncio.sleep(0.1)
+            await queue.enqueue_event(self.partial("c"))
+
+        assert self.run(produce) == ["a", "b", "c"]
+
+    def test_other_events_keep_their_order(self):
+        async def produce(queue):
+            await queue.enqueue_event(self.partial("a"))
+            await queue.enqueue_event(self.partial("b"))
+            await queue.enqueue_event(TaskStatusUpdateEvent(task_id="t1", context_id="c", final=True, status=TaskStatus(state=TaskState.completed)))
+
+        assert self.run(produce) == ["a", "b", TaskState.completed]
+
+    def test_long_text_is_sent_before_the_interval(self):
+        async def produce(queue):
+            for text in ["a", "bb", "cc", "d"]:
+                await queue.enqueue_event(self.partial(text))
+
+        assert self.run(produce, flush_interval=10, max_chars=4) == ["a", "bbcc", "d"]
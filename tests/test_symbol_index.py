@@ -0,0 +1,149 @@
+"""
+Tests for the Python symbol cross-reference index.
+"""
+
+import os
+import textwrap
+from unittest.mock import patch
+
+import pytest
+
+from buildgentic.code_operations import file_index, filesystem_resolver, symbol_index
+from buildgentic.code_operations.file_index import FileIndex
+from buildgentic.code_operations.git_sync import unsubscribe
+from buildgentic.code_operations.symbol_index import SymbolIndex, extract_symbols
+
+
+CLIENT = textwrap.dedent('''
+    import requests as http
+
+    TIMEOUT = 30
+
+    class Client(Base):
+        retries = 3
+
+        def request(self, url: str) -> dict:
+            response = http.get(url)
+            return response.json()
+''')
+
+USER = textwrap.dedent('''
+    from pkg.client import Client
+
+    def fetch_all(urls):
+        client = Client()
+        return [client.request(url) for url in urls]
+''')
+
+
+def write(root, name, content):
+    path = root / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    root = tmp_path / "repo"
+    write(root, "pkg/client.py", CLIENT)
+    write(root, "pkg/user.py", USER)
+    write(root, "README.md", "Client docs")
+    return root
+
+
+@pytest.fixture
+def index(repo):
+    return SymbolIndex(FileIndex(str(repo), cache_dir=None), cache_dir=None)
+
+
+@pytest.fixture
+def shared_indexes(tmp_path, monkeypatch):
+    """Process-wide indexes stored in tmp_path, unsubscribed from git_sync afterwards."""
+    monkeypatch.setattr(file_index, "FILE_INDEX_DIR", str(tmp_path / "file_index"))
+    monkeypatch.setattr(file_index, "_file_indexes", {})
+    monkeypatch.setattr(symbol_index, "SYMBOL_INDEX_DIR", str(tmp_path / "symbols"))
+    monkeypatch.setattr(symbol_index, "_symbol_indexes", {})
+    yield
+    for index in symbol_index._symbol_indexes.values():
+        unsubscribe(index.on_sync)
+        index.close()
+    for index in file_index._file_indexes.values():
+        unsubscribe(index.on_sync)
+
+
+class TestExtractSymbols:
+    """Tests for extract_symbols."""
+
+    def test_definitions_imports_and_calls(self):
+        rows = {(kind, qualname, line, scope) for kind, _, qualname, line, scope, _ in extract_symbols(CLIENT)}
+
+        assert ("import", "requests", 2, "<module>") in rows
+        assert ("variable", "TIMEOUT", 4, "<module>") in rows
+        assert ("class", "Client", 6, "<module>") in rows
+        assert ("variable", "Client.retries", 7, "Client") in rows
+        assert ("method", "Client.request", 9, "Client") in rows
+        assert ("call", "http.get", 10, "Client.request") in rows
+        assert not any(kind == "variable" and qualname.endswith("response") for kind, qualname, _, _ in rows)
+
+    def test_subscript_and_attribute_targets_define_nothing(self):
+        source = "os.environ['X'] = 'y'\nconfig[key] = value\nfirst, *rest = items\n"
+
+        variables = [name for kind, name, *_ in extract_symbols(source) if kind == "variable"]
+
+        assert variables == ["first", "rest"]
+
+    def test_syntax_error(self):
+        assert extract_symbols("def broken(:") == []
+
+
+class TestSymbolIndex:
+    """Tests for SymbolIndex."""
+
+    def test_definitions_callers_and_imports(self, index):
+        assert [(s.path, s.line, s.detail) for s in index.definitions("Client.request")] == [("pkg/client.py", 9, "def request(self, url: str) -> dict")]
+        assert [(s.path, s.scope) for s in index.callers("Client.request")] == [("pkg/user.py", "fetch_all")]
+        assert [(s.path, s.detail) for s in index.imports("Client")] == [("pkg/user.py", "from pkg.client import Client")]
+        assert [s.path for s in index.imports("requests")] == ["pkg/client.py"]
+
+    def test_only_changed_files_are_parsed_again(self, index, repo):
+        assert index.update(force=True) == 2
+
+        write(repo, "pkg/user.py", "def fetch_all(urls):\n    return []\n")
+        os.utime(repo / "pkg" / "user.py", ns=(1, 1))
+        os.remove(repo / "pkg" / "client.py")
+
+        assert index.update(force=True) == 2
+        assert index.callers("request") == []
+        assert index.definitions("Client") == []
+        assert [s.path for s in index.definitions("fetch_all")] == ["pkg/user.py"]
+
+    def test_files_deleted_while_parsed_are_skipped(self, index, repo):
+        extract = symbol_index._extract_path
+
+        def extract_after_a_delete(path):
+            if path.endswith("client.py"):
+                os.remove(path)
+            return extract(path)
+
+        with patch.object(symbol_index, "_extract_path", side_effect=extract_after_a_delete):
+            assert index.update(force=True) == 2
+
+        assert index.definitions("Client") == []
+        assert [s.path for s in index.definitions("fetch_all")] == ["pkg/user.py"]
+
+
+class TestFindSymbol:
+    """Tests for filesystem_resolver.find_symbol."""
+
+    def test_report(self, repo, shared_indexes, monkeypatch):
+        monkeypatch.setenv("REPO_PATH2", str(repo))
+
+        report = filesystem_resolver.find_symbol("request")
+
+        assert report == (
+            "Definitions of 'request' (1):\n    pkg/client.py:9: def request(self, url: str) -> dict\n\n"
+            "Imports of 'request' (0):\n\n"
+            "Callers of 'request' (1):\n    pkg/user.py:6 in fetch_all: client.request"
+        )
+        with pytest.raises(ValueError):
+            filesystem_resolver.find_symbol("request", kind="subclasses")
@@ -0,0 +1,140 @@
+"""
+Tests for the persistent A2A task store.
+"""
+
+import asyncio
+import time
+
+import pytest
+from a2a.server.tasks import InMemoryTaskStore
+from a2a.types import Task, TaskState, TaskStatus
+
+from buildgentic.storage.lru import BoundedCache
+from buildgentic.storage.task_store import SQLiteTaskStore, create_task_store
+
+
+def make_task(task_id, state=TaskState.working):
+    return Task(id=task_id, context_id="ctx", status=TaskStatus(state=state))
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    return str(tmp_path / "tasks.db")
+
+
+class TestBoundedCache:
+    """Tests for the LRU/TTL hot tier."""
+
+    def test_evicts_least_recently_used(self):
+        """The oldest unused entry is dropped when the cache is full."""
+        cache = BoundedCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.stats()["evictions"] == 1
+
+    def test_expires_entries(self):
+        """Entries older than the TTL are not returned."""
+        cache = BoundedCache(max_entries=10, ttl_seconds=0.01)
+        cache.put("a", 1)
+        time.sleep(0.02)
+
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+
+class TestSQLiteTaskStore:
+    """Tests for SQLiteTaskStore."""
+
+    def test_tasks_survive_a_restart(self, store_path):
+        """Saved tasks are read back by a new store on the same file."""
+        store = SQLiteTaskStore(store_path, flush_interval=60)
+        asyncio.run(store.save(make_task("t1", TaskState.completed)))
+        store.close()
+
+        reopened = SQLiteTaskStore(store_path, flush_interval=60)
+        task = asyncio.run(reopened.get("t1"))
+        reopened.close()
+
+        assert task.status.state == TaskState.completed
+
+    def test_writes_are_batched_and_coalesced(self, store_path):
+        """Several saves of the same task become one row write."""
+        store = SQLiteTaskStore(store_path, flush_interval=60)
+
+        async def run():
+            for state in (TaskState.submitted, TaskState.working, TaskState.completed):
+                await store.save(make_task("t1", state))
+            await store.save(make_task("t2"))
+
+        asyncio.run(run())
+        assert store.stats()["pending_writes"] == 2
+        assert store.flush() == 2
+        assert store.stats()["pending_writes"] == 0
+        store.close()
+
+    def test_memory_stays_bounded(self, store_path):
+        """Only cache_size tasks are kept in memory; the rest are read from disk."""
+        store = SQLiteTaskStore(store_path, cache_size=10, flush_interval=60)
+
+        async def run():
+            for i in range(100):
+                await store.save(make_task(f"t{i}"))
+            store.flush()
+            return await store.get("t0")
+
+        assert asyncio.run(run()).id == "t0"
+        assert store.stats()["cache"]["entries"] == 10
+        store.close()
+
+    def test_unflushed_tasks_are_readable(self, store_path):
+        """Tasks still in the write queue are returned even if evicted from memory."""
+        store = SQLiteTaskStore(store_path, cache_size=0, flush_interval=60)
+
+        async def run():
+            await store.save(make_task("t1"))
+            return await store.get("t1")
+
+        assert asyncio.run(run()).id == "t1"
+        store.close()
+
+    def test_delete(self, store_path):
+        """Deleted tasks are gone from memory and disk."""
+        store = SQLiteTaskStore(store_path, flush_interval=60)
+
+        async def run():
+            await store.save(make_task("t1"))
+            store.flush()
+            await store.delete("t1")
+            store.flush()
+            store._cache.clear()
+            return await store.get("t1")
+
+        assert asyncio.run(run()) is None
+        store.close()
+
+    def test_retention_purges_old_tasks(self, store_path):
+        """Tasks not updated within the retention period are deleted."""
+        store = SQLiteTaskStore(store_path, flush_interval=60, retention_days=1)
+        asyncio.run(store.save(make_task("t1")))
+        store.flush()
+        store._connection.execute("UPDATE tasks SET updated_at = ?", (time.time() - 2 * 86400,))
+        store._connection.commit()
+
+        assert store.purge_expired() == 1
+        store.close()
+
+
+class TestCreateTaskStore:
+    """Tests for the backend selection."""
+
+    def test_memory_backend(self):
+        assert isinstance(create_task_store("memory"), InMemoryTaskStore)
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            create_task_store("redis")
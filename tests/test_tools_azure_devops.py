@@ -0,0 +1,176 @@
+"""
+Tests for the Azure DevOps tools helpers.
+"""
+
+import threading
+import time
+from unittest.mock import patch, MagicMock
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from buildgentic.tools import tools_azureDevOps
+from buildgentic.tools.azure_devops_client import AzureDevOpsClient
+
+
+def ids_from_url(url):
+    """Return the ids requested by a work items batch URL."""
+    return parse_qs(urlparse(url).query)["ids"][0].split(",")
+
+
+def batch_response(url, reverse=False):
+    """Build a fake successful batch response for the ids in url."""
+    ids = ids_from_url(url)
+    if reverse:
+        ids = list(reversed(ids))
+    response = MagicMock(status_code=200, text="{}")
+    response.json.return_value = {"value": [{"id": int(i), "fields": {"System.Title": f"T{i}"}} for i in ids]}
+    return response
+
+
+class TestFetchWorkItemsDetails:
+    """Tests for the concurrent batch fetch of work items."""
+
+    def test_keeps_wiql_order(self):
+        """Items come back in WIQL order even when batches finish out of order."""
+        ids = [str(i) for i in range(1, 451)]
+
+        def fake_request(method, url, **kwargs):
+            # The first batch is the slowest one
+            if ids_from_url(url)[0] == "1":
+                time.sleep(0.1)
+            return batch_response(url, reverse=True)
+
+        with patch.object(AzureDevOpsClient, "request", side_effect=fake_request) as mock_request:
+            items = tools_azureDevOps._fetch_work_items_details(ids, ["System.Title"])["items"]
+
+        assert mock_request.call_count == 3
+        assert [str(item["id"]) for item in items] == ids
+
+    def test_limits_concurrency(self):
+        """No more than max_concurrency batches are in flight at once."""
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+
+        def fake_request(method, url, **kwargs):
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.05)
+            with lock:
+                state["running"] -= 1
+            return batch_response(url)
+
+        ids = [str(i) for i in range(1, 1201)]
+        with patch.object(AzureDevOpsClient, "request", side_effect=fake_request):
+            report = tools_azureDevOps._fetch_work_items_details_report(ids, ["System.Title"], max_concurrency=2)
+
+        assert len(report["items"]) == 1200
+        assert state["peak"] == 2
+
+    def test_reports_partial_failures(self):
+        """A failed batch is reported without losing the other batches."""
+        def fake_request(method, url, **kwargs):
+            if ids_from_url(url)[0] == "201":
+                return MagicMock(status_code=500, text="boom")
+            return batch_response(url)
+
+        ids = [str(i) for i in range(1, 401)]
+        with patch.object(AzureDevOpsClient, "request", side_effect=fake_request):
+            report = tools_azureDevOps._fetch_work_items_details_report(ids, ["System.Title"])
+            items = tools_azureDevOps._fetch_work_items_details(ids, ["System.Title"])["items"]
+
+        assert report["failed_ids"] == ids[200:]
+        assert len(report["errors"]) == 1
+        assert [str(item["id"]) for item in report["items"]] == ids[:200]
+        assert len(items) == 200
+
+    def test_raises_when_every_batch_fails(self):
+        """Callers still see an error when nothing could be fetched."""
+        with patch.object(AzureDevOpsClient, "request", return_value=MagicMock(status_code=500, text="boom")):
+            with pytest.raises(Exception):
+                tools_azureDevOps._fetch_work_items_details(["1", "2"], ["System.Title"])
+
+    def test_streams_pages(self):
+        """Pages are yielded one batch at a time."""
+        ids = [str(i) for i in range(1, 301)]
+        with patch.object(AzureDevOpsClient, "request", side_effect=lambda method, url, **kwargs: batch_response(url)):
+            pages = list(tools_azureDevOps._iter_work_items_details(ids, ["System.Title"]))
+
+        assert [len(page["items"]) for page in pages] == [200, 100]
+        assert all(page["error"] is None for page in pages)
+
+
+class TestGetTicketsAssignedToMe:
+    """Tests for the chunked, projected assigned tickets query."""
+
+    def fake_request(self, calls):
+        def request(method, url, **kwargs):
+            calls.append((method, url, kwargs))
+            if method == "POST":
+                response = MagicMock(status_code=200, text="{}")
+                response.json.return_value = {"workItems": [{"id": i} for i in range(1, 251)]}
+                return response
+            ids = ids_from_url(url)
+            response = MagicMock(status_code=200, text="{}")
+            response.json.return_value = {"value": [
+                {"id": int(i), "rev": 3, "fields": {"System.Title": f"T{i}", "System.Description": "long text", "System.State": "New"}}
+                for i in ids
+            ]}
+            return response
+        return request
+
+    def test_chunks_and_projects_fields(self):
+        """Large queues are fetched in batches with a fields filter."""
+        calls = []
+        with patch.object(AzureDevOpsClient, "request", side_effect=self.fake_request(calls)):
+            items = tools_azureDevOps.get_tickets_assigned_to_me(None)
+
+        detail_urls = [url for method, url, _ in calls if method == "GET"]
+        assert len(detail_urls) == 2
+        assert all("fields=System.Id,System.Title,System.Description" in url for url in detail_urls)
+        assert "[System.AssignedTo]" in calls[0][2]["json"]["query"]
+        assert len(items) == 250
+        assert items[0] == {"id": 1, "title": "T1", "description": "long text", "state": "New", "type": "", "tags": ""}
+
+    def test_summary_projection_drops_description(self):
+        """The summary projection neither requests nor returns the description."""
+        calls = []
+        with patch.object(AzureDevOpsClient, "request", side_effect=self.fake_request(calls)):
+            items = tools_azureDevOps.get_tickets_assigned_to_me(None, projection="summary")
+
+        assert all("System.Description" not in url for method, url, _ in calls if method == "GET")
+        assert "description" not in items[0]
+
+    def test_full_projection_returns_raw_items(self):
+        """The full projection keeps the complete payload."""
+        calls = []
+        with patch.object(AzureDevOpsClient, "request", side_effect=self.fake_request(calls)):
+            items = tools_azureDevOps.get_tickets_assigned_to_me(None, projection="full")
+
+        assert all("fields=" not in url for method, url, _ in calls if method == "GET")
+        assert items[0]["rev"] == 3
+
+    def test_unknown_projection(self):
+        """An unknown projection returns no items without calling the API."""
+        with patch.object(AzureDevOpsClient, "request") as mock_request:
+            assert tools_azureDevOps.get_tickets_assigned_to_me(None, projection="everything") == []
+
+        mock_request.assert_not_called()
+
+    def test_reports_work_items_that_could_not_be_fetched(self):
+        """A failed batch is listed in a last entry instead of being dropped silently."""
+        calls = []
+        fake_request = self.fake_request(calls)
+
+        def request(method, url, **kwargs):
+            if method == "GET" and ids_from_url(url)[0] == "201":
+                return MagicMock(status_code=500, text="boom")
+            return fake_request(method, url, **kwargs)
+
+        with patch.object(AzureDevOpsClient, "request", side_effect=request):
+            items = tools_azureDevOps.get_tickets_assigned_to_me(None)
+
+        assert len(items) == 201
+        assert items[-1]["failed_ids"] == list(range(201, 251))
+        assert items[-1]["error"].startswith("Could not fetch 50 work items")
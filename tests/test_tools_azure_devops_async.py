@@ -0,0 +1,112 @@
+"""
+Tests for the asyncio Azure DevOps tools.
+"""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import httpx
+
+from buildgentic.tools import tools_azureDevOps_async
+from buildgentic.tools.azure_devops_client import AsyncAzureDevOpsClient, get_shared_async_client
+
+
+def make_client(handler) -> AsyncAzureDevOpsClient:
+    """Build an async client whose requests are answered by handler."""
+    client = AsyncAzureDevOpsClient({"Authorization": "Basic test"})
+    client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler), headers={"Authorization": "Basic test"})
+    return client
+
+
+class TestAsyncTools:
+    """Tests for the async tool surface."""
+
+    def test_get_work_item_details(self):
+        """The async tool returns the parsed work item."""
+        def handler(request):
+            assert request.headers["Authorization"] == "Basic test"
+            return httpx.Response(200, json={"id": 7})
+
+        async def run():
+            client = make_client(handler)
+            with patch.object(tools_azureDevOps_async, "get_azure_devops_async_client", return_value=client):
+                return await tools_azureDevOps_async.get_work_item_details(7)
+
+        assert asyncio.run(run()) == {"id": 7}
+
+    def test_http_error_returns_false(self):
+        """Errors are logged and reported with the same return values as the sync tools."""
+        async def run():
+            client = make_client(lambda request: httpx.Response(500, text="boom"))
+            with patch.object(tools_azureDevOps_async, "get_azure_devops_async_client", return_value=client):
+                return await tools_azureDevOps_async.update_ticket_status(7, "Active")
+
+        assert asyncio.run(run()) is False
+
+    def test_patch_uses_json_patch_content_type(self):
+        """Work item updates are sent as JSON Patch documents."""
+        seen = {}
+
+        def handler(request):
+            seen["content_type"] = request.headers["Content-Type"]
+            return httpx.Response(200, json={})
+
+        async def run():
+            client = make_client(handler)
+            with patch.object(tools_azureDevOps_async, "get_azure_devops_async_client", return_value=client):
+                return await tools_azureDevOps_async.update_ticket_description(7, "# Title")
+
+        assert asyncio.run(run()) is True
+        assert seen["content_type"] == "application/json-patch+json"
+
+    def test_requests_run_concurrently(self):
+        """Several tool calls can be in flight on one event loop at the same time."""
+        async def handler(request):
+            await asyncio.sleep(0.2)
+            return httpx.Response(200, json={"id": 1})
+
+        async def run():
+            client = make_client(handler)
+            with patch.object(tools_azureDevOps_async, "get_azure_devops_async_client", return_value=client):
+                start = time.perf_counter()
+                await asyncio.gather(*(tools_azureDevOps_async.get_work_item_details(i) for i in range(5)))
+                return time.perf_counter() - start
+
+        assert asyncio.run(run()) < 0.6
+
+
+class TestSharedAsyncClient:
+    """Tests for the per-loop shared async client."""
+
+    def test_client_is_shared_within_a_loop(self):
+        """The same loop always gets the same client."""
+        async def run():
+            return get_shared_async_client(dict) is get_shared_async_client(dict)
+
+        assert asyncio.run(run())
+
+
+class TestAsyncFetchWorkItemsDetails:
+    """Tests for the concurrent async batch fetch of work items."""
+
+    def test_keeps_wiql_order_and_reports_failures(self):
+        """Batches run concurrently, keep WIQL order and report failed batches."""
+        async def handler(request):
+            ids = request.url.params["ids"].split(",")
+            if ids[0] == "201":
+                return httpx.Response(500, text="boom")
+            if ids[0] == "1":
+                await asyncio.sleep(0.05)
+            return httpx.Response(200, json={"value": [{"id": int(i)} for i in reversed(ids)]})
+
+        ids = [str(i) for i in range(1, 601)]
+
+        async def run():
+            client = make_client(handler)
+            with patch.object(tools_azureDevOps_async, "get_azure_devops_async_client", return_value=client):
+                return await tools_azureDevOps_async._fetch_work_items_details_report(ids, ["System.Title"])
+
+        report = asyncio.run(run())
+        assert [str(item["id"]) for item in report["items"]] == ids[:200] + ids[400:]
+        assert report["failed_ids"] == ids[200:400]
@@ -0,0 +1,125 @@
+"""
+Tests for the shared wiki page cache used to load agent contexts.
+"""
+
+import threading
+import time
+from unittest.mock import patch, MagicMock
+
+import pytest
+import requests
+
+from buildgentic.tools import tools_azureDevOps
+from buildgentic.tools.wiki_cache import WikiPageCache
+
+
+class CountingFetcher:
+    """Fake fetch function that records every call."""
+
+    def __init__(self, not_modified=False, fail=False, delay=0):
+        self.calls = []
+        self.not_modified = not_modified
+        self.fail = fail
+        self.delay = delay
+
+    def __call__(self, page_path, etag):
+        self.calls.append((page_path, etag))
+        time.sleep(self.delay)
+        if self.fail:
+            raise requests.exceptions.ConnectionError("offline")
+        if self.not_modified and etag:
+            return None, etag, True
+        return f"content of {page_path}", f'"etag-{len(self.calls)}"', False
+
+
+class TestWikiPageCache:
+    """Tests for WikiPageCache."""
+
+    def test_fresh_entries_are_not_fetched_again(self):
+        """Within the TTL a page is downloaded only once."""
+        cache = WikiPageCache(ttl_seconds=60, cache_path=None)
+        fetch = CountingFetcher()
+
+        assert cache.get("Anna", fetch) == "content of Anna"
+        assert cache.get("Anna", fetch) == "content of Anna"
+        assert len(fetch.calls) == 1
+
+    def test_expired_entries_are_revalidated_with_etag(self):
+        """Expired pages send their ETag and keep the content on 304."""
+        cache = WikiPageCache(ttl_seconds=0, cache_path=None)
+        fetch = CountingFetcher(not_modified=True)
+
+        cache.get("Anna", fetch)
+        assert cache.get("Anna", fetch) == "content of Anna"
+        assert fetch.calls == [("Anna", None), ("Anna", '"etag-1"')]
+
+    def test_stale_copy_is_served_when_offline(self):
+        """A failed refresh falls back to the cached copy."""
+        cache = WikiPageCache(ttl_seconds=0, cache_path=None)
+        cache.get("Anna", CountingFetcher())
+
+        assert cache.get("Anna", CountingFetcher(fail=True)) == "content of Anna"
+
+    def test_errors_propagate_without_cached_copy(self):
+        """Without a cached copy the fetch error reaches the caller."""
+        cache = WikiPageCache(ttl_seconds=60, cache_path=None)
+
+        with pytest.raises(requests.exceptions.ConnectionError):
+            cache.get("Anna", CountingFetcher(fail=True))
+
+    def test_persists_to_disk(self, tmp_path):
+        """A new cache instance starts warm from the cache file."""
+        cache_path = str(tmp_path / "wiki.json")
+        WikiPageCache(ttl_seconds=60, cache_path=cache_path).get("Anna", CountingFetcher())
+
+        fetch = CountingFetcher()
+        assert WikiPageCache(ttl_seconds=60, cache_path=cache_path).get("Anna", fetch) == "content of Anna"
+        assert fetch.calls == []
+
+    def test_concurrent_callers_share_one_download(self):
+        """Threads asking for the same page wait for a single download."""
+        cache = WikiPageCache(ttl_seconds=60, cache_path=None)
+        fetch = CountingFetcher(delay=0.05)
+
+        threads = [threading.Thread(target=cache.get, args=("Management Workflows", fetch)) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(fetch.calls) == 1
+
+    def test_concurrent_saves_keep_the_file_valid(self, tmp_path):
+        """Pages saved from several threads at once leave a complete cache file."""
+        cache_path = tmp_path / "wiki.json"
+        cache = WikiPageCache(ttl_seconds=60, cache_path=str(cache_path))
+        fetch = CountingFetcher()
+
+        threads = [threading.Thread(target=cache.get, args=(f"Page {i}", fetch)) for i in range(50)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(WikiPageCache(ttl_seconds=60, cache_path=str(cache_path))._entries) == 50
+        assert [path.name for path in tmp_path.iterdir()] == ["wiki.json"]
+
+
+class TestLoadContext:
+    """Tests for load_context on top of the cache."""
+
+    def test_each_wiki_page_is_requested_once(self):
+        """Loading the five agent contexts downloads every page only once."""
+        response = MagicMock(status_code=200, text="{}", headers={"ETag": '"1"'})
+        response.json.return_value = {"content": "## Description\nd\n## Instruction\ni"}
+
+        with patch.object(tools_azureDevOps, "_wiki_page_cache", WikiPageCache(ttl_seconds=60, cache_path=None)), \
+             patch.object(tools_azureDevOps.AzureDevOpsClient, "request", return_value=response) as mock_request:
+            for page in ["Wilson", "Jonathan", "Anna", "Anna", "Jenkins"]:
+                context = tools_azureDevOps.load_context(page)
+
+        requested = [call.args[1] for call in mock_request.call_args_list]
+        assert len(requested) == 5
+        assert sum("Management Workflows" in url for url in requested) == 1
+        assert context["description"] == "d"
+        assert context["instruction"].startswith("i")
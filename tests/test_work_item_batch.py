@@ -0,0 +1,156 @@
+"""
+Tests for the batching of work item updates.
+"""
+
+import asyncio
+import json
+from unittest.mock import patch
+
+import httpx
+
+from buildgentic.tools import tools_azureDevOps, tools_azureDevOps_async
+from buildgentic.tools.azure_devops_client import AsyncAzureDevOpsClient
+from buildgentic.tools import work_item_batch
+from buildgentic.tools.work_item_batch import WorkItemMutationBuffer, flush_shared_mutation_buffer
+
+
+def make_client(handler) -> AsyncAzureDevOpsClient:
+    client = AsyncAzureDevOpsClient({"Authorization": "Basic test"})
+    client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+class RecordingAzureDevOps:
+    """Answers work item PATCHes and $batch calls, recording them; work item 13 is refused."""
+
+    def __init__(self):
+        self.requests = []
+
+    def __call__(self, request):
+        body = json.loads(request.content)
+        self.requests.append((request.method, request.url.path, body))
+        if request.url.path.endswith("/$batch"):
+            return httpx.Response(200, json={"count": len(body), "value": [self.answer(item["uri"], item["body"]) for item in body]})
+        answer = self.answer(request.url.path, body)
+        return httpx.Response(answer["code"], text=answer["body"])
+
+    def answer(self, uri, operations):
+        work_item_id = int(uri.split("?")[0].rsplit("/", 1)[1])
+        if work_item_id == 13:
+            return {"code": 400, "body": json.dumps({"message": "TF401320: Rule error"})}
+        return {"code": 200, "body": json.dumps({"id": work_item_id, "operations": len(operations)})}
+
+
+def buffer_for(server, linger=0.05, max_items=50):
+    return WorkItemMutationBuffer(lambda: make_client(server), "https://dev.azure.com/org", "project", linger=linger, max_items=max_items)
+
+
+def ops(field, value):
+    return [{"op": "replace", "path": f"/fields/{field}", "value": value}]
+
+
+class TestWorkItemMutationBuffer:
+    """Tests for WorkItemMutationBuffer."""
+
+    def test_updates_of_one_work_item_are_merged(self):
+        server = RecordingAzureDevOps()
+        buffer = buffer_for(server)
+
+        async def run():
+            return await asyncio.gather(buffer.patch(7, ops("System.State", "Active")), buffer.patch(7, ops("System.Title", "New title")))
+
+        results = asyncio.run(run())
+
+        assert results == [{"id": 7, "operations": 2}] * 2
+        assert [(method, path) for method, path, _ in server.requests] == [("PATCH", "/org/project/_apis/wit/workitems/7")]
+
+    def test_several_work_items_share_one_batch_with_results_per_item(self):
+        server = RecordingAzureDevOps()
+        buffer = buffer_for(server)
+
+        async def run():
+            return await asyncio.gather(
+                buffer.patch(7, ops("System.State", "Active")),
+                buffer.patch(8, ops("System.State", "Closed")),
+                buffer.patch(13, ops("System.State", "Closed")),
+                return_exceptions=True,
+            )
+
+        first, second, refused = asyncio.run(run())
+
+        assert first == {"id": 7, "operations": 1} and second == {"id": 8, "operations": 1}
+        assert isinstance(refused, httpx.HTTPStatusError) and refused.response.status_code == 400
+        method, path, body = server.requests[0]
+        assert len(server.requests) == 1 and (method, path) == ("POST", "/org/_apis/wit/$batch")
+        assert [item["uri"] for item in body] == [f"/project/_apis/wit/workitems/{i}?api-version=7.0" for i in (7, 8, 13)]
+        assert body[0]["headers"] == {"Content-Type": "application/json-patch+json"}
+
+    def test_flushes_when_enough_work_items_are_pending(self):
+        server = RecordingAzureDevOps()
+        buffer = buffer_for(server, linger=60, max_items=2)
+
+        async def run():
+            return await asyncio.wait_for(asyncio.gather(buffer.patch(1, ops("System.State", "Active")), buffer.patch(2, ops("System.State", "Active"))), 5)
+
+        assert [result["id"] for result in asyncio.run(run())] == [1, 2]
+
+    def test_failed_batch_fails_every_update(self):
+        buffer = buffer_for(lambda request: httpx.Response(503, text="unavailable"))
+
+        async def run():
+            return await asyncio.gather(buffer.patch(1, []), buffer.patch(2, []), return_exceptions=True)
+
+        assert all(isinstance(result, httpx.HTTPStatusError) for result in asyncio.run(run()))
+
+    def test_updates_of_cancelled_turns_are_sent_by_the_shutdown_flush(self):
+        server = RecordingAzureDevOps()
+
+        async def run():
+            buffer = work_item_batch._buffers[asyncio.get_running_loop()] = buffer_for(server, linger=60)
+            turn = asyncio.ensure_future(buffer.patch(7, ops("System.State", "Active")))
+            await asyncio.sleep(0)
+            turn.cancel()
+            await flush_shared_mutation_buffer()
+
+        asyncio.run(run())
+
+        assert [(method, path) for method, path, _ in server.requests] == [("PATCH", "/org/project/_apis/wit/workitems/7")]
+
+
+class TestBatchedTools:
+    """The ticket tools of one agent turn share their requests."""
+
+    def test_parallel_tool_calls_make_one_request(self):
+        server = RecordingAzureDevOps()
+
+        async def run():
+            client = make_client(server)
+            with patch.object(tools_azureDevOps_async, "get_azure_devops_async_client", return_value=client):
+                return await asyncio.gather(
+                    tools_azureDevOps_async.update_ticket_description(7, "# Spec"),
+                    tools_azureDevOps_async.update_ticket_status(7, "Active"),
+                    tools_azureDevOps_async.add_related_work_item(8, 7),
+                    tools_azureDevOps_async.update_ticket_status(13, "Closed"),
+                )
+
+        assert asyncio.run(run()) == [True, True, True, False]
+        assert len(server.requests) == 1
+        _, _, body = server.requests[0]
+        assert [len(item["body"]) for item in body] == [3, 1, 1]
+
+    def test_create_ticket_sets_the_description_in_the_same_request(self):
+        server_requests = []
+
+        def handler(request):
+            server_requests.append(json.loads(request.content))
+            return httpx.Response(200, json={"id": 42})
+
+        async def run():
+            client = make_client(handler)
+            with patch.object(tools_azureDevOps_async, "get_azure_devops_async_client", return_value=client):
+                return await tools_azureDevOps_async.create_ticket("Title", "# Description")
+
+        assert asyncio.run(run()) == {"id": 42}
+        assert len(server_requests) == 1
+        assert {"op": "add", "path": "/fields/System.Description", "value": "# Description"} in server_requests[0]
+        assert tools_azureDevOps._new_ticket_patch_document("Title") == server_requests[0][:3]
@@ -0,0 +1,151 @@
+"""
+Tests for the in-process work item cache and its use by the async ticket tools.
+"""
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+
+from buildgentic.tools import tools_azureDevOps, tools_azureDevOps_async
+from buildgentic.tools.azure_devops_client import AsyncAzureDevOpsClient, AzureDevOpsClient
+from buildgentic.tools.work_item_cache import WorkItemCache
+
+
+class FakeAzureDevOps:
+    """Serves work item 7 at a revision that can be bumped, recording the requests."""
+
+    def __init__(self):
+        self.rev = 1
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append(request.url.path.split("/_apis/wit/")[1] + ("?fields" if "fields" in request.url.params else ""))
+        if request.url.path.endswith("/comments"):
+            if request.method == "POST":
+                self.rev += 1
+            return httpx.Response(200, json={"comments": [{"text": f"comment at rev {self.rev}"}]})
+        if request.method == "PATCH":
+            self.rev += 1
+            return httpx.Response(200, json={"id": 7, "rev": self.rev})
+        if "fields" in request.url.params:
+            return httpx.Response(200, json={"id": 7, "rev": self.rev, "fields": {"System.Rev": self.rev}})
+        return httpx.Response(200, json={"id": 7, "rev": self.rev, "fields": {"System.Title": f"rev {self.rev}"}, "relations": []})
+
+
+@pytest.fixture
+def server():
+    return FakeAzureDevOps()
+
+
+def run_tools(server, cache, *calls):
+    async def run():
+        client = AsyncAzureDevOpsClient({"Authorization": "Basic test"})
+        client.client = httpx.AsyncClient(transport=httpx.MockTransport(server))
+        with patch.object(tools_azureDevOps_async, "get_azure_devops_async_client", return_value=client), \
+                patch.object(tools_azureDevOps_async, "get_work_item_cache", return_value=cache):
+            return [await call() for call in calls]
+
+    return asyncio.run(run())
+
+
+class TestCachedTools:
+    """Repeated reads of a work item within a workflow do not reach Azure DevOps."""
+
+    def test_repeated_reads_are_served_from_the_cache(self, server):
+        cache = WorkItemCache(max_entries=10, ttl_seconds=60)
+
+        details, again, attachments, comments, comments_again = run_tools(
+            server,
+            cache,
+            lambda: tools_azureDevOps_async.get_work_item_details(7),
+            lambda: tools_azureDevOps_async.get_work_item_details(7),
+            lambda: tools_azureDevOps_async.get_work_item_attachments(7),
+            lambda: tools_azureDevOps_async.get_comments_from_ticket(7),
+            lambda: tools_azureDevOps_async.get_comments_from_ticket(7),
+        )
+
+        assert details == again and details["fields"]["System.Title"] == "rev 1"
+        assert attachments == [] and comments == comments_again
+        assert server.requests == ["workitems/7", "workitems/7/comments"]
+
+    def test_own_mutations_invalidate(self, server):
+        cache = WorkItemCache(max_entries=10, ttl_seconds=60)
+
+        before, _, after_status, _, after_comment = run_tools(
+            server,
+            cache,
+            lambda: tools_azureDevOps_async.get_work_item_details(7),
+            lambda: tools_azureDevOps_async.update_ticket_status(7, "Active"),
+            lambda: tools_azureDevOps_async.get_work_item_details(7),
+            lambda: tools_azureDevOps_async.add_comment_to_ticket(7, "Done"),
+            lambda: tools_azureDevOps_async.get_work_item_details(7),
+        )
+
+        assert [item["fields"]["System.Title"] for item in (before, after_status, after_comment)] == ["rev 1", "rev 2", "rev 3"]
+
+    def test_stale_entries_are_revalidated_by_revision(self, server):
+        cache = WorkItemCache(max_entries=10, ttl_seconds=0)
+
+        first, unchanged = run_tools(
+            server,
+            cache,
+            lambda: tools_azureDevOps_async.get_work_item_details(7),
+            lambda: tools_azureDevOps_async.get_work_item_details(7),
+        )
+        server.rev = 5
+        (changed,) = run_tools(server, cache, lambda: tools_azureDevOps_async.get_work_item_details(7))
+
+        assert first == unchanged and changed["fields"]["System.Title"] == "rev 5"
+        assert server.requests == [
+            "workitems/7",
+            "workitems/7?fields",
+            "workitems/7?fields",
+            "workitems/7",
+        ]
+
+    def test_sync_tools_invalidate_too(self):
+        cache = WorkItemCache(max_entries=10, ttl_seconds=60)
+        for work_item_id in (7, 8, 9):
+            cache.put({"id": work_item_id, "rev": 1})
+
+        with patch.object(AzureDevOpsClient, "request", return_value=MagicMock(status_code=200, text="{}")), \
+                patch.object(tools_azureDevOps, "get_work_item_cache", return_value=cache):
+            assert tools_azureDevOps.update_ticket_status(7, "Active")
+            assert tools_azureDevOps.update_ticket_description(8, "# Spec")
+            assert tools_azureDevOps.add_related_work_item(9, 7)
+
+        assert [cache.get(work_item_id) for work_item_id in (7, 8, 9)] == [None, None, None]
+
+
+class TestWorkItemCache:
+    """Tests for WorkItemCache."""
+
+    def test_service_hook_events_invalidate(self):
+        cache = WorkItemCache(max_entries=10, ttl_seconds=60)
+        cache.put({"id": 7, "rev": 1})
+        cache.put({"id": 8, "rev": 1})
+
+        assert cache.handle_event({"eventType": "workitem.updated", "resource": {"id": 99, "workItemId": 7, "rev": 2}}) == 7
+        assert cache.handle_event({"eventType": "workitem.commented", "resource": {"id": 8}}) == 8
+        assert cache.handle_event({"eventType": "git.push", "resource": {"id": 8}}) is None
+        assert cache.get(7) is None and cache.get(8) is None
+
+    def test_comments_of_an_older_revision_are_not_cached(self):
+        cache = WorkItemCache(max_entries=10, ttl_seconds=60)
+        cache.put({"id": 7, "rev": 2})
+
+        cache.put_comments(7, 1, [{"text": "old"}])
+        assert cache.get(7).comments is None
+        cache.put_comments(7, 2, [{"text": "current"}])
+        assert cache.get(7).comments == [{"text": "current"}]
+
+    def test_cached_work_items_are_copies(self):
+        cache = WorkItemCache(max_entries=10, ttl_seconds=60)
+        work_item = {"id": 7, "rev": 1, "fields": {"System.Title": "Title"}}
+        cache.put(work_item)
+
+        work_item["fields"]["System.Title"] = "Changed by the caller"
+
+        assert cache.get(7).work_item["fields"]["System.Title"] == "Title"
@@ -0,0 +1,120 @@
+"""
+Tests for the multi-worker server: task ownership and request routing between workers.
+"""
+
+import asyncio
+import json
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from buildgentic.workers import FORWARDED_HEADER, TaskClaimingExecutor, TaskRouter, TaskRoutingMiddleware, _task_id, serve_workers
+
+
+def worker_app(name):
+    async def rpc(request: Request):
+        body = await request.json()
+        forwarded = request.headers.get(FORWARDED_HEADER.decode())
+        return JSONResponse({"worker": name, "method": body["method"], "forwarded_by": forwarded})
+
+    return Starlette(routes=[Route("/developer/", rpc, methods=["POST"])])
+
+
+def rpc(method, params):
+    return {"jsonrpc": "2.0", "id": 1, "method": method, "params": params}
+
+
+@pytest.fixture
+def routers(tmp_path):
+    path = str(tmp_path / "routes.db")
+    return TaskRouter("http://worker-0", path), TaskRouter("http://worker-1", path)
+
+
+class TestTaskRouter:
+    """Tests for TaskRouter."""
+
+    def test_last_claim_wins(self, routers):
+        first, second = routers
+
+        assert first.owner("task-1") is None
+        first.claim("task-1")
+        assert second.owner("task-1") == "http://worker-0"
+        second.claim("task-1")
+        assert first.owner("task-1") == "http://worker-1"
+
+    def test_executor_claims_the_task(self, routers):
+        inner = MagicMock()
+        inner.execute = MagicMock(side_effect=lambda context, queue: asyncio.sleep(0))
+        context = MagicMock(task_id="task-1")
+
+        asyncio.run(TaskClaimingExecutor(inner, routers[1]).execute(context, MagicMock()))
+
+        assert routers[0].owner("task-1") == "http://worker-1"
+        inner.execute.assert_called_once()
+
+
+class TestTaskId:
+    """Tests for the task id extraction of JSON-RPC requests."""
+
+    def test_methods(self):
+        assert _task_id(json.dumps(rpc("tasks/get", {"id": "t1"})).encode()) == "t1"
+        assert _task_id(json.dumps(rpc("tasks/resubscribe", {"id": "t2"})).encode()) == "t2"
+        assert _task_id(json.dumps(rpc("message/stream", {"message": {"taskId": "t3", "parts": []}})).encode()) == "t3"
+        assert _task_id(json.dumps(rpc("message/send", {"message": {"parts": []}})).encode()) is None
+        assert _task_id(b"not json") is None
+
+
+class TestTaskRoutingMiddleware:
+    """Requests about a task are served by its owner."""
+
+    def client(self, routers, owner_transport):
+        router = routers[0]
+        forwarder = httpx.AsyncClient(transport=owner_transport)
+        app = TaskRoutingMiddleware(worker_app("worker-0"), router, client=forwarder)
+        return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://worker-0")
+
+    def post(self, routers, owner_transport, payload):
+        async def run():
+            async with self.client(routers, owner_transport) as client:
+                return (await client.post("/developer/", json=payload)).json()
+
+        return asyncio.run(run())
+
+    def test_forwards_to_the_owner(self, routers):
+        routers[1].claim("task-1")
+
+        result = self.post(routers, httpx.ASGITransport(app=worker_app("worker-1")), rpc("tasks/get", {"id": "task-1"}))
+
+        assert result == {"worker": "worker-1", "method": "tasks/get", "forwarded_by": "http://worker-0"}
+
+    def test_serves_own_and_new_tasks(self, routers):
+        routers[0].claim("task-1")
+        owner = httpx.ASGITransport(app=worker_app("worker-1"))
+
+        assert self.post(routers, owner, rpc("tasks/get", {"id": "task-1"}))["worker"] == "worker-0"
+        assert self.post(routers, owner, rpc("message/send", {"message": {"parts": []}}))["worker"] == "worker-0"
+
+    def test_unreachable_owner(self, routers):
+        routers[1].claim("task-1")
+
+        def refuse(request):
+            raise httpx.ConnectError("connection refused", request=request)
+
+        result = self.post(routers, httpx.MockTransport(refuse), rpc("tasks/cancel", {"id": "task-1"}))
+
+        assert result["worker"] == "worker-0"
+
+
+class TestServeWorkers:
+    """Tests for serve_workers."""
+
+    def test_refuses_in_memory_stores(self, monkeypatch):
+        monkeypatch.setenv("TASK_STORE_BACKEND", "memory")
+
+        with pytest.raises(ValueError):
+            serve_workers("buildgentic.server:app", "127.0.0.1", 8000, workers=2)
@@ -0,0 +1,230 @@
+"""
+Tests for the git worktree pool and the worktree agent executor.
+"""
+
+import asyncio
+import os
+import subprocess
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from a2a.types import TaskState, TaskStatus, TaskStatusUpdateEvent
+
+from buildgentic.a2a_utils import WorktreeAgentExecutor
+from buildgentic.code_operations import filesystem_resolver
+from buildgentic.code_operations.worktree_pool import WorktreePool, current_repo_path, use_worktree
+
+
+def git(repo, *args):
+    result = subprocess.run(["git", *args], cwd=repo, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    return result.stdout.decode().strip()
+
+
+@pytest.fixture
+def repo(tmp_path):
+    root = tmp_path / "repo"
+    root.mkdir()
+    git(root, "init", "-q", "-b", "main")
+    git(root, "config", "user.email", "dev@example.com")
+    git(root, "config", "user.name", "dev")
+    (root / "app.py").write_text("VERSION = 1\n")
+    (root / ".gitignore").write_text("node_modules/\n")
+    git(root, "add", "-A")
+    git(root, "commit", "-q", "-m", "initial")
+    return root
+
+
+@pytest.fixture
+def pool(repo, tmp_path):
+    pool = WorktreePool(str(repo), pool_dir=str(tmp_path / "worktrees"), size=1, max_worktrees=2)
+    yield pool
+    pool.close()
+
+
+class TestWorktreePool:
+    """Tests for WorktreePool."""
+
+    def test_warm_and_reuse(self, pool):
+        assert pool.warm() == 1
+        warm_path = git(pool.repo_path, "worktree", "list").splitlines()[1].split()[0]
+
+        worktree = pool.acquire("task-1")
+
+        assert worktree.path == warm_path
+        assert pool.acquire("task-1") == worktree
+        assert open(os.path.join(worktree.path, "app.py")).read() == "VERSION = 1\n"
+
+    def test_release_discards_changes_but_keeps_ignored_files(self, pool):
+        worktree = pool.acquire("task-1", branch="feature")
+        with open(os.path.join(worktree.path, "app.py"), "w") as file:
+            file.write("VERSION = 2\n")
+        open(os.path.join(worktree.path, "notes.txt"), "w").close()
+        os.makedirs(os.path.join(worktree.path, "node_modules"))
+
+        pool.release("task-1")
+
+        assert open(os.path.join(worktree.path, "app.py")).read() == "VERSION = 1\n"
+        assert not os.path.exists(os.path.join(worktree.path, "notes.txt"))
+        assert os.path.isdir(os.path.join(worktree.path, "node_modules"))
+        # The branch is free again for the next task
+        assert pool.acquire("task-2", branch="feature").path == worktree.path
+        assert git(worktree.path, "rev-parse", "--abbrev-ref", "HEAD") == "feature"
+
+    def test_parallel_tasks_get_separate_worktrees(self, pool, repo):
+        first = pool.acquire("task-1", branch="one")
+        second = pool.acquire("task-2", branch="two")
+
+        assert first.path != second.path
+        assert git(repo, "rev-parse", "--abbrev-ref", "HEAD") == "main"
+        with pytest.raises(TimeoutError):
+            pool.acquire("task-3", timeout=0.1)
+
+        pool.release("task-1")
+        pool.release("task-2")
+        # Only size worktrees are kept once released
+        assert (pool.idle, pool.total) == (1, 1)
+
+    def test_starts_from_the_current_commit(self, pool, repo):
+        pool.warm()
+        (repo / "app.py").write_text("VERSION = 3\n")
+        git(repo, "commit", "-q", "-am", "bump")
+
+        worktree = pool.acquire("task-1")
+
+        assert open(os.path.join(worktree.path, "app.py")).read() == "VERSION = 3\n"
+
+    def test_adopts_worktrees_of_a_previous_run(self, repo, tmp_path):
+        WorktreePool(str(repo), pool_dir=str(tmp_path / "worktrees"), size=1).warm()
+
+        pool = WorktreePool(str(repo), pool_dir=str(tmp_path / "worktrees"), size=1)
+
+        assert pool.idle == 1
+        assert pool.warm() == 0
+
+    def test_leaves_the_worktrees_of_a_live_pool_alone(self, pool, repo, tmp_path):
+        worktree = pool.acquire("task-1")
+        with open(os.path.join(worktree.path, "app.py"), "w") as file:
+            file.write("VERSION = 2\n")
+
+        other = WorktreePool(str(repo), pool_dir=str(tmp_path / "worktrees"), size=1)
+        try:
+            assert other.pool_dir != pool.pool_dir
+            assert other.idle == 0
+            assert open(os.path.join(worktree.path, "app.py")).read() == "VERSION = 2\n"
+        finally:
+            other.close()
+
+    def test_paused_worktrees_are_taken_back_when_the_pool_is_full(self, pool):
+        paused = pool.acquire("task-1", branch="feature")
+        with open(os.path.join(paused.path, "draft.py"), "w") as file:
+            file.write("draft\n")
+        pool.pause("task-1")
+        pool.acquire("task-2")
+
+        worktree = pool.acquire("task-3", timeout=0)
+
+        assert worktree.path == paused.path
+        assert not os.path.exists(os.path.join(worktree.path, "draft.py"))
+        assert sorted(pool.assigned()) == ["task-2", "task-3"]
+        with pytest.raises(TimeoutError):
+            pool.acquire("task-4", timeout=0)
+
+    def test_paused_worktrees_expire(self, repo, tmp_path):
+        pool = WorktreePool(str(repo), pool_dir=str(tmp_path / "worktrees"), size=1, max_worktrees=2, paused_ttl=0.01)
+        paused = pool.acquire("task-1")
+        pool.pause("task-1")
+        time.sleep(0.02)
+
+        worktree = pool.acquire("task-2")
+
+        assert list(pool.assigned()) == ["task-2"]
+        assert worktree.path == paused.path and pool.total == 1
+        pool.close()
+
+    def test_resumed_tasks_keep_their_worktree(self, pool):
+        worktree = pool.acquire("task-1")
+        pool.pause("task-1")
+
+        assert pool.acquire("task-1") == worktree
+        pool.acquire("task-2")
+        with pytest.raises(TimeoutError):
+            pool.acquire("task-3", timeout=0)
+
+
+class TestCurrentRepoPath:
+    """The code operations work in the worktree of the current task."""
+
+    def test_tools_read_the_worktree(self, pool, repo, monkeypatch):
+        monkeypatch.setenv("REPO_PATH2", str(repo))
+        worktree = pool.acquire("task-1")
+        with open(os.path.join(worktree.path, "app.py"), "w") as file:
+            file.write("VERSION = 2\n")
+
+        with use_worktree(worktree):
+            assert current_repo_path() == worktree.path
+            assert filesystem_resolver.read_file_content("app.py") == "VERSION = 2\n"
+        assert current_repo_path() == str(repo)
+        assert filesystem_resolver.read_file_content("app.py") == "VERSION = 1\n"
+
+
+class FakeExecutor:
+    def __init__(self, state):
+        self.state = state
+        self.repo_paths = []
+
+    async def execute(self, context, event_queue):
+        self.repo_paths.append(current_repo_path())
+        status = TaskStatus(state=self.state)
+        await event_queue.enqueue_event(TaskStatusUpdateEvent(task_id="task-1", context_id="context", status=status, final=True))
+
+    async def cancel(self, context, event_queue):
+        pass
+
+
+def request_context(task_id="task-1", metadata=None):
+    context = MagicMock()
+    context.task_id = task_id
+    context.metadata = metadata or {}
+    return context
+
+
+class TestWorktreeAgentExecutor:
+    """Tests for WorktreeAgentExecutor."""
+
+    def test_task_runs_in_its_worktree_and_releases_it(self, pool):
+        inner = FakeExecutor(TaskState.completed)
+        queue = MagicMock()
+        queue.enqueue_event = MagicMock(side_effect=lambda event: asyncio.sleep(0))
+
+        asyncio.run(WorktreeAgentExecutor(inner, pool).execute(request_context(metadata={"branch": "feature"}), queue))
+
+        assert inner.repo_paths[0].startswith(pool.pool_dir)
+        assert queue.enqueue_event.call_count == 1
+        assert pool.assigned() == {}
+
+    def test_task_waiting_for_input_keeps_its_worktree(self, pool):
+        queue = MagicMock()
+        queue.enqueue_event = MagicMock(side_effect=lambda event: asyncio.sleep(0))
+        executor = WorktreeAgentExecutor(FakeExecutor(TaskState.input_required), pool)
+
+        asyncio.run(executor.execute(request_context(), queue))
+
+        assert list(pool.assigned()) == ["task-1"]
+
+    def test_cancel_leaves_a_running_task_its_worktree(self, pool):
+        pool.acquire("task-1")
+        executor = WorktreeAgentExecutor(FakeExecutor(TaskState.working), pool)
+
+        asyncio.run(executor.cancel(request_context(), MagicMock()))
+
+        assert list(pool.assigned()) == ["task-1"]
+
+    def test_cancel_releases_the_worktree_of_a_task_waiting_for_input(self, pool):
+        pool.acquire("task-1")
+        pool.pause("task-1")
+        executor = WorktreeAgentExecutor(FakeExecutor(TaskState.input_required), pool)
+
+        asyncio.run(executor.cancel(request_context(), MagicMock()))
+
+        assert pool.assigned() == {}